@@ -0,0 +1,44 @@
+#!/usr/bin/env python3
+"""
+Benchmark get_yt_videos_info throughput at several concurrency limits against
+a local stub extractor.
+
+Usage:
+    uv run python benchmarks/bench_batch.py [videos] [delay]
+"""
+import asyncio
+import sys
+import time
+from unittest.mock import patch
+
+from stubs import sleeping_info, sleeping_transcript
+
+from mcp_youtube_extract import config, pipeline, server
+
+
+async def run_benchmark(videos: int, delay: float, levels=(1, 2, 4, 8, 16)):
+    """Measure videos/second for each concurrency level"""
+
+    stub_info = sleeping_info(delay)
+    stub_transcript = sleeping_transcript(delay)
+
+    video_ids = [f"video{i:06d}" for i in range(videos)]
+    baseline = None
+    print(f"📊 {videos} videos, {delay:.3f}s per upstream call")
+    with patch.object(pipeline, "get_video_info", stub_info), \
+         patch.object(pipeline, "get_video_transcript", stub_transcript), \
+         patch.object(config, "BATCH_CONCURRENCY", max(levels)):
+        for level in levels:
+            start = time.perf_counter()
+            results = await server.get_yt_videos_info(video_ids, max_concurrency=level)
+            elapsed = time.perf_counter() - start
+            assert all(r["error"] is None for r in results)
+            throughput = videos / elapsed
+            baseline = baseline or throughput
+            print(f"  concurrency {level:>3}: {elapsed:6.3f}s  {throughput:8.1f} videos/s  speedup {throughput / baseline:5.2f}x")
+
+
+if __name__ == "__main__":
+    videos = int(sys.argv[1]) if len(sys.argv) > 1 else 32
+    delay = float(sys.argv[2]) if len(sys.argv) > 2 else 0.05
+    asyncio.run(run_benchmark(videos, delay))
@@ -0,0 +1,44 @@
+#!/usr/bin/env python3
+"""
+Benchmark get_yt_video_info with stubbed fetchers to show that metadata and
+transcript are fetched concurrently.
+
+Usage:
+    uv run python benchmarks/bench_concurrent_fetch.py [info_delay] [transcript_delay]
+"""
+import asyncio
+import sys
+import time
+from unittest.mock import patch
+
+from stubs import sleeping_info, sleeping_transcript
+
+from mcp_youtube_extract import pipeline, server
+
+
+async def run_benchmark(info_delay: float, transcript_delay: float, rounds: int = 5):
+    """Time the tool against fetchers that just sleep for a fixed delay"""
+
+    stub_info = sleeping_info(info_delay)
+    stub_transcript = sleeping_transcript(transcript_delay)
+
+    timings = []
+    with patch.object(pipeline, "get_video_info", stub_info), \
+         patch.object(pipeline, "get_video_transcript", stub_transcript):
+        for _ in range(rounds):
+            start = time.perf_counter()
+            await server.get_yt_video_info("dQw4w9WgXcQ")
+            timings.append(time.perf_counter() - start)
+
+    mean = sum(timings) / len(timings)
+    print(f"📊 info delay:        {info_delay:.3f}s")
+    print(f"📊 transcript delay:  {transcript_delay:.3f}s")
+    print(f"⏱️  sequential would be {info_delay + transcript_delay:.3f}s")
+    print(f"⏱️  slower fetch alone  {max(info_delay, transcript_delay):.3f}s")
+    print(f"✅ measured mean      {mean:.3f}s over {rounds} rounds (min {min(timings):.3f}s, max {max(timings):.3f}s)")
+
+
+if __name__ == "__main__":
+    info_delay = float(sys.argv[1]) if len(sys.argv) > 1 else 0.4
+    transcript_delay = float(sys.argv[2]) if len(sys.argv) > 2 else 0.6
+    asyncio.run(run_benchmark(info_delay, transcript_delay))
@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+Benchmark cross-video corpus search: query latency as the corpus grows.
+
+Transcripts are generated from a Zipf-distributed vocabulary and added one by
+one, as the server does after each fetch, to a corpus in a temporary directory.
+At each checkpoint the corpus size on disk is reported with the latency of
+queries for a rare, a mid-frequency and a common word, and for two words.
+
+Usage:
+    uv run python benchmarks/bench_corpus.py [--videos 250 1000 4000] [--segments 250] [--queries 50] [--json PATH] 2>/dev/null
+"""
+import argparse
+import json
+import random
+import sys
+import tempfile
+import time
+
+from mcp_youtube_extract.corpus import Corpus
+from mcp_youtube_extract.search_index import SearchIndex
+from mcp_youtube_extract.segments import SegmentIndex
+
+VOCABULARY = [f"w{i}" for i in range(20000)]
+WEIGHTS = [1 / (rank + 1) for rank in range(len(VOCABULARY))]
+WORDS_PER_SEGMENT = 8
+QUERIES = {
+    "rare word": "w15000",
+    "mid word": "w300",
+    "common word": "w3",
+    "two words": "w300 w2000",
+}
+
+
+def make_transcript(rng: random.Random, segments: int) -> SegmentIndex:
+    words = rng.choices(VOCABULARY, WEIGHTS, k=segments * WORDS_PER_SEGMENT)
+    return SegmentIndex.from_segments(
+        {"text": " ".join(words[i * WORDS_PER_SEGMENT:(i + 1) * WORDS_PER_SEGMENT]), "start": 2.0 * i, "duration": 2.0}
+        for i in range(segments)
+    )
+
+
+def per_query_ms(corpus: Corpus, query: str, repeats: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeats):
+        corpus.search(query, limit=10)
+    return (time.perf_counter() - start) / repeats * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--videos", type=int, nargs="+", default=[250, 1000, 4000], help="corpus sizes to measure at")
+    parser.add_argument("--segments", type=int, default=250, help="transcript segments per video")
+    parser.add_argument("--queries", type=int, default=50, help="repeats of each query")
+    parser.add_argument("--merge-factor", type=int, default=8, help="files of similar size merged into one")
+    parser.add_argument("--json", metavar="PATH", help="write results as JSON ('-' for stdout)")
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    report = {}
+    print(f"📊 {args.segments} segments of {WORDS_PER_SEGMENT} words per video, "
+          f"{len(VOCABULARY)} word Zipf vocabulary, mean of {args.queries} queries")
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        corpus = Corpus(tmp_dir, merge_factor=args.merge_factor)
+        added = 0
+        add_seconds = 0.0
+        for checkpoint in sorted(args.videos):
+            while added < checkpoint:
+                index = make_transcript(rng, args.segments)
+                search_index = SearchIndex.build(index)
+                start = time.perf_counter()
+                corpus.add(f"video{added:07d}", "en", index, search_index)
+                add_seconds += time.perf_counter() - start
+                added += 1
+            stats = corpus.stats()
+            latency = {name: per_query_ms(corpus, query, args.queries) for name, query in QUERIES.items()}
+            report[checkpoint] = {**stats, "add_ms": add_seconds / added * 1000, "query_ms": latency}
+            print(f"  {stats['videos']:6d} videos  {stats['segments']:9d} segments  {stats['files']:3d} files  "
+                  f"{stats['bytes'] / 2**20:7.1f} MiB ({stats['bytes'] / stats['segments']:5.1f} B/segment)  "
+                  f"add {add_seconds / added * 1000:6.2f} ms/video")
+            print("  " + " " * 14 + "  ".join(f"{name} {ms:8.2f} ms" for name, ms in latency.items()))
+
+    if args.json == "-":
+        json.dump(report, sys.stdout, indent=2)
+        print()
+    elif args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"✅ results written to {args.json}")
+
+
+if __name__ == "__main__":
+    main()
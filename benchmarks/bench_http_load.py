@@ -0,0 +1,218 @@
+#!/usr/bin/env python3
+"""
+Load test the streamable HTTP transport with 1..N worker processes behind one port.
+
+For each worker count a server is started against stubbed upstreams with the
+shared on-disk cache in a fresh temporary directory. Every video is requested
+once (cold: upstream fetch plus cache write), then all videos again for several
+rounds (warm: served from the cache by whichever worker takes the request).
+Throughput is reported per phase, with the number of upstream transcript
+fetches made by all workers together, which stays at one per video when the
+cache is shared.
+
+Client load comes from separate processes, so on a machine with few cores the
+clients compete with the workers; scaling is bounded by `nproc`.
+
+Usage:
+    uv run python benchmarks/bench_http_load.py [--workers 1 2 4] [--videos 32] [--rounds 5]
+        [--concurrency 16] [--clients 2] [--segments 2000] [--latency 0.05] [--json PATH] 2>/dev/null
+"""
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from contextlib import ExitStack
+from pathlib import Path
+
+import httpx
+
+HEADERS = {"Accept": "application/json, text/event-stream"}
+
+
+# Server side: runs in every uvicorn worker process
+
+class LoggedStubExtractor:
+    """Mixin recording each upstream track-list request in a file shared by all workers"""
+
+    def call_innertube_api(self, video_id, api_key):
+        with open(os.environ["BENCH_FETCH_LOG"], "a") as f:
+            f.write(video_id + "\n")
+        return super().call_innertube_api(video_id, api_key)
+
+
+_stubs = ExitStack()
+
+
+def create_stub_app():
+    """create_app with upstreams stubbed and the shared cache enabled, for uvicorn's factory"""
+    from stubs import StubUpstreamExtractor, make_transcript_xml, stub_upstreams
+
+    from mcp_youtube_extract import config, extractor_pool, server
+    from mcp_youtube_extract.extractor_pool import ExtractorPool
+    from mcp_youtube_extract.ratelimit import TokenBucket
+
+    latency = float(os.environ["BENCH_LATENCY"])
+    xml = make_transcript_xml(int(os.environ["BENCH_SEGMENTS"]))
+    extractor = type("Extractor", (LoggedStubExtractor, StubUpstreamExtractor), {})
+    limiter = TokenBucket(rate=1e9, capacity=1e9)
+
+    _stubs.enter_context(stub_upstreams(transcript_latency=latency))
+    # stub_upstreams turns the cache off; this benchmark is about sharing it
+    config.CACHE_ENABLED = True
+    extractor_pool.set_extractor_pool(ExtractorPool(32, lambda: extractor(limiter, xml, latency)))
+    # Single-worker runs are stateless too, so every worker count serves the same requests
+    server.mcp.settings.stateless_http = True
+    return server.create_app()
+
+
+def serve(port: int, workers: int, max_in_flight: int):
+    from mcp_youtube_extract import server
+
+    server.run_http("streamable-http", "127.0.0.1", port, workers, max_in_flight, app_factory="bench_http_load:create_stub_app")
+
+
+# Client side
+
+async def call_tools(url: str, video_ids: list[str], concurrency: int) -> list[float]:
+    """Call get_yt_transcript_segments for each video ID and return the latencies"""
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+
+    async def call(client, request_id, video_id):
+        request = {
+            "jsonrpc": "2.0", "id": request_id, "method": "tools/call",
+            "params": {"name": "get_yt_transcript_segments", "arguments": {"video_id": video_id}},
+        }
+        async with semaphore:
+            start = time.perf_counter()
+            response = await client.post(url, json=request, headers=HEADERS)
+            response.raise_for_status()
+            if '"isError":true' in response.text:
+                raise RuntimeError(f"tool call failed for {video_id}")
+            latencies.append(time.perf_counter() - start)
+
+    limits = httpx.Limits(max_connections=concurrency)
+    async with httpx.AsyncClient(timeout=120, limits=limits) as client:
+        await asyncio.gather(*(call(client, i, video_id) for i, video_id in enumerate(video_ids)))
+    return latencies
+
+
+def client_process(args: tuple[str, list[str], int]) -> list[float]:
+    return asyncio.run(call_tools(*args))
+
+
+def run_phase(pool, url: str, video_ids: list[str], clients: int, concurrency: int) -> dict:
+    shares = [(url, video_ids[i::clients], max(1, concurrency // clients)) for i in range(clients)]
+    start = time.perf_counter()
+    latencies = [latency for part in pool.map(client_process, shares) for latency in part]
+    elapsed = time.perf_counter() - start
+    latencies.sort()
+    return {
+        "requests": len(latencies),
+        "seconds": elapsed,
+        "requests_per_second": len(latencies) / elapsed,
+        "p50_ms": statistics.median(latencies) * 1000,
+        "p99_ms": latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))] * 1000,
+    }
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def wait_until_ready(url: str, server: subprocess.Popen, timeout: float = 60.0):
+    request = {"jsonrpc": "2.0", "id": 0, "method": "tools/list"}
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if server.poll() is not None:
+            raise RuntimeError("server exited during startup")
+        try:
+            if httpx.post(url, json=request, headers=HEADERS).status_code == 200:
+                return
+        except httpx.TransportError:
+            pass
+        time.sleep(0.2)
+    raise RuntimeError("server did not start")
+
+
+def measure(workers: int, args, pool) -> dict:
+    port = free_port()
+    url = f"http://127.0.0.1:{port}/mcp"
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        fetch_log = Path(tmp_dir) / "fetches.log"
+        fetch_log.touch()
+        env = dict(
+            os.environ,
+            YOUTUBE_CACHE_DIR=tmp_dir,
+            BENCH_FETCH_LOG=str(fetch_log),
+            BENCH_LATENCY=str(args.latency),
+            BENCH_SEGMENTS=str(args.segments),
+        )
+        command = [sys.executable, __file__, "--serve", str(port), "--workers", str(workers),
+                   "--max-in-flight", str(args.max_in_flight)]
+        server = subprocess.Popen(command, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        try:
+            wait_until_ready(url, server)
+            video_ids = [f"video{i:06d}" for i in range(args.videos)]
+            cold = run_phase(pool, url, video_ids, args.clients, args.concurrency)
+            warm = run_phase(pool, url, video_ids * args.rounds, args.clients, args.concurrency)
+        finally:
+            server.terminate()
+            server.wait(timeout=30)
+        upstream_fetches = len(fetch_log.read_text().split())
+    return {"cold": cold, "warm": warm, "upstream_fetches": upstream_fetches}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4], help="worker counts to compare")
+    parser.add_argument("--videos", type=int, default=32, help="distinct videos requested")
+    parser.add_argument("--rounds", type=int, default=5, help="warm passes over all videos")
+    parser.add_argument("--concurrency", type=int, default=16, help="requests in flight across all clients")
+    parser.add_argument("--clients", type=int, default=2, help="client processes generating load")
+    parser.add_argument("--segments", type=int, default=2000, help="transcript length in segments")
+    parser.add_argument("--latency", type=float, default=0.05, help="seconds per stubbed upstream request")
+    parser.add_argument("--max-in-flight", type=int, default=64, help="requests in flight per worker")
+    parser.add_argument("--json", metavar="PATH", help="write results as JSON ('-' for stdout)")
+    parser.add_argument("--serve", type=int, metavar="PORT", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.serve:
+        serve(args.serve, args.workers[0], args.max_in_flight)
+        return
+
+    print(f"📊 {args.videos} videos x {args.segments} segments, {args.rounds} warm rounds, "
+          f"{args.concurrency} in flight from {args.clients} client processes, {os.cpu_count()} CPUs")
+    report = {}
+    with multiprocessing.Pool(args.clients) as pool:
+        for workers in args.workers:
+            report[workers] = result = measure(workers, args, pool)
+            cold, warm = result["cold"], result["warm"]
+            print(f"  {workers} workers  {result['upstream_fetches']:4d} upstream fetches  "
+                  f"cold {cold['requests_per_second']:7.1f} req/s  warm {warm['requests_per_second']:7.1f} req/s  p50 {warm['p50_ms']:7.1f} ms  p99 {warm['p99_ms']:7.1f} ms")
+
+    base = report[args.workers[0]]["warm"]["requests_per_second"]
+    print("⏱️  warm throughput relative to the first worker count")
+    for workers, result in report.items():
+        print(f"  {workers} workers  {result['warm']['requests_per_second'] / base:5.2f}x")
+
+    if args.json == "-":
+        json.dump(report, sys.stdout, indent=2)
+        print()
+    elif args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"✅ results written to {args.json}")
+
+
+if __name__ == "__main__":
+    main()
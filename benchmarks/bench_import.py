@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""
+Benchmark package import time in fresh interpreters, as the stdio server pays it
+on every launch.
+
+Each case is timed over several runs. The slowest modules are taken from
+`python -X importtime`, and the report says which heavy dependencies were
+loaded. With --baseline REV, the same cases also run against a git revision
+checked out into a temporary worktree, for a before/after comparison.
+
+Usage:
+    uv run python benchmarks/bench_import.py [--runs 7] [--top 5] [--baseline REV] [--json PATH]
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+REPO = Path(__file__).resolve().parent.parent
+
+CASES = {
+    "package": "import mcp_youtube_extract",
+    "format_video_info": "from mcp_youtube_extract import format_video_info",
+    "server": "import mcp_youtube_extract.server",
+}
+
+HEAVY = ["mcp", "yt_info_extract", "yt_ts_extract", "yt_dlp", "requests"]
+
+PROBE = """
+import time
+start = time.perf_counter()
+{statement}
+elapsed = time.perf_counter() - start
+import json, sys
+print(json.dumps({{"seconds": elapsed, "heavy": [m for m in {heavy!r} if m in sys.modules]}}))
+"""
+
+
+def run_python(args: list[str], src: Path) -> subprocess.CompletedProcess:
+    env = dict(os.environ, PYTHONPATH=str(src))
+    return subprocess.run(
+        [sys.executable, *args], capture_output=True, text=True, env=env, cwd=tempfile.gettempdir(), check=True
+    )
+
+
+def import_times(statement: str, src: Path) -> list[tuple[str, float]]:
+    """(module, cumulative ms) for every import made by the statement, from -X importtime"""
+    stderr = run_python(["-X", "importtime", "-c", statement], src).stderr
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line.split("|")
+        rows.append((name.strip(), int(cumulative) / 1000))
+    return rows
+
+
+def slowest_modules(statement: str, src: Path, top: int) -> list[tuple[str, float]]:
+    """Modules with the largest cumulative import time, leaving out interpreter startup"""
+    startup = {name for name, _ in import_times("pass", src)}
+    rows = [row for row in import_times(statement, src) if row[0] not in startup]
+    rows.sort(key=lambda row: row[1], reverse=True)
+    return rows[:top]
+
+
+def measure(src: Path, runs: int, top: int) -> dict:
+    results = {}
+    for case, statement in CASES.items():
+        probe = PROBE.format(statement=statement, heavy=HEAVY)
+        samples = []
+        heavy = []
+        for _ in range(runs):
+            sample = json.loads(run_python(["-c", probe], src).stdout)
+            samples.append(sample["seconds"])
+            heavy = sample["heavy"]
+        results[case] = {
+            "median_ms": statistics.median(samples) * 1000,
+            "min_ms": min(samples) * 1000,
+            "heavy_modules": heavy,
+            "slowest": slowest_modules(statement, src, top),
+        }
+    return results
+
+
+def print_results(label: str, results: dict):
+    print(f"📊 {label}")
+    for case, row in results.items():
+        heavy = ", ".join(row["heavy_modules"]) or "none"
+        print(f"  {case:<18} median {row['median_ms']:8.1f} ms  min {row['min_ms']:8.1f} ms  heavy: {heavy}")
+        for name, ms in row["slowest"]:
+            print(f"      {ms:8.1f} ms  {name}")
+
+
+def measure_revision(revision: str, runs: int, top: int) -> dict:
+    """Run the cases against another revision checked out in a temporary worktree"""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        worktree = Path(tmp_dir) / "baseline"
+        subprocess.run(["git", "-C", str(REPO), "worktree", "add", "--detach", str(worktree), revision],
+                       capture_output=True, check=True)
+        try:
+            return measure(worktree / "src", runs, top)
+        finally:
+            subprocess.run(["git", "-C", str(REPO), "worktree", "remove", "--force", str(worktree)],
+                           capture_output=True, check=False)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--runs", type=int, default=7, help="fresh interpreters per case")
+    parser.add_argument("--top", type=int, default=5, help="slowest modules listed per case")
+    parser.add_argument("--baseline", metavar="REV", help="also measure this git revision")
+    parser.add_argument("--json", metavar="PATH", help="write results as JSON ('-' for stdout)")
+    args = parser.parse_args()
+
+    report = {"current": measure(REPO / "src", args.runs, args.top)}
+    if args.baseline:
+        report["baseline"] = measure_revision(args.baseline, args.runs, args.top)
+        print_results(f"baseline {args.baseline}", report["baseline"])
+    print_results("current tree", report["current"])
+
+    if args.baseline:
+        print("⏱️  median speedup")
+        for case in CASES:
+            before = report["baseline"][case]["median_ms"]
+            after = report["current"][case]["median_ms"]
+            print(f"  {case:<18} {before:8.1f} ms -> {after:8.1f} ms  ({before / after:5.1f}x)")
+
+    if args.json == "-":
+        json.dump(report, sys.stdout, indent=2)
+        print()
+    elif args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"✅ results written to {args.json}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+"""
+Benchmark per-call logging overhead with the file handler enabled, comparing the
+previous setup (synchronous FileHandler, eager f-string messages) with the queued
+background writer and lazy %-formatting.
+
+Tool calls are timed twice: against the local filesystem, and with each flush to
+the log file delayed to mimic a slow or contended disk. With the old backend,
+that delay lands on the request path once per record.
+
+Usage:
+    uv run python benchmarks/bench_logging.py [records] [tool_calls] [flush_latency] 2>/dev/null
+"""
+import asyncio
+import logging
+import queue
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from stubs import make_video_id, stub_upstreams
+
+from mcp_youtube_extract import server
+from mcp_youtube_extract.logger import (
+    BackgroundLogWriter,
+    BatchingRotatingFileHandler,
+    DroppingQueueHandler,
+    FORMATTER,
+    root_logger,
+)
+
+VIDEO_ID = "dQw4w9WgXcQ"
+PAYLOAD = {f"field{i}": list(range(10)) for i in range(20)}
+
+
+class SlowFlushStream:
+    """File wrapper whose flush takes at least `latency` seconds"""
+
+    def __init__(self, stream, latency: float):
+        self._stream = stream
+        self._latency = latency
+
+    def flush(self):
+        time.sleep(self._latency)
+        self._stream.flush()
+
+    def __getattr__(self, name):
+        return getattr(self._stream, name)
+
+
+def sync_handler(path: Path, flush_latency: float = 0.0) -> tuple[logging.Handler, None]:
+    """The previous backend: every record is written and flushed on the calling thread"""
+    handler = logging.FileHandler(path)
+    handler.setFormatter(FORMATTER)
+    if flush_latency:
+        handler.stream = SlowFlushStream(handler.stream, flush_latency)
+    return handler, None
+
+
+def queued_handler(path: Path, flush_latency: float = 0.0) -> tuple[logging.Handler, BackgroundLogWriter]:
+    """The current backend; unbounded here so the benchmark never measures dropped records"""
+    file_handler = BatchingRotatingFileHandler(path, maxBytes=64 * 1024 * 1024, backupCount=1)
+    file_handler.setFormatter(FORMATTER)
+    if flush_latency:
+        file_handler.stream = SlowFlushStream(file_handler.stream, flush_latency)
+    log_queue = queue.Queue()
+    writer = BackgroundLogWriter(log_queue, [file_handler])
+    writer.start()
+    return DroppingQueueHandler(log_queue), writer
+
+
+def bench_records(make_handler, lazy: bool, records: int, tmp: Path) -> dict:
+    """Time INFO records that are written and DEBUG records that are filtered out"""
+    handler, writer = make_handler(tmp / f"records-{make_handler.__name__}-{lazy}.log")
+    log = logging.getLogger(f"bench.{make_handler.__name__}.{lazy}")
+    log.handlers[:] = [handler]
+    log.propagate = False
+    log.setLevel(logging.INFO)
+
+    start = time.perf_counter()
+    if lazy:
+        for i in range(records):
+            log.info("Fetching transcript for video: %s (%d)", VIDEO_ID, i)
+    else:
+        for i in range(records):
+            log.info(f"Fetching transcript for video: {VIDEO_ID} ({i})")
+    enabled = time.perf_counter() - start
+
+    start = time.perf_counter()
+    if lazy:
+        for i in range(records):
+            log.debug("Formatted payload %d: %s", i, PAYLOAD)
+    else:
+        for i in range(records):
+            log.debug(f"Formatted payload {i}: {PAYLOAD}")
+    filtered = time.perf_counter() - start
+
+    drain = 0.0
+    if writer is not None:
+        start = time.perf_counter()
+        writer.stop()
+        drain = time.perf_counter() - start
+    handler.close()
+    return {
+        "enabled_us": enabled / records * 1e6,
+        "filtered_us": filtered / records * 1e6,
+        "drain_s": drain,
+    }
+
+
+async def bench_tool_calls(make_handler, calls: int, tmp: Path, flush_latency: float = 0.0) -> float:
+    """Mean get_yt_video_info latency with the package logger routed to the given handler"""
+    handler, writer = make_handler(tmp / f"tool-{make_handler.__name__}-{flush_latency}.log", flush_latency)
+    saved = root_logger.handlers[:]
+    root_logger.handlers[:] = [handler]
+    try:
+        with stub_upstreams(segments=200):
+            await server.get_yt_video_info(make_video_id("warmup"))
+            start = time.perf_counter()
+            for i in range(calls):
+                await server.get_yt_video_info(f"video{i:06d}")
+            elapsed = time.perf_counter() - start
+    finally:
+        root_logger.handlers[:] = saved
+        if writer is not None:
+            writer.stop()
+        handler.close()
+    return elapsed / calls * 1e6
+
+
+async def run_benchmark(records: int, calls: int, flush_latency: float):
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        tmp = Path(tmp_dir)
+        before = bench_records(sync_handler, False, records, tmp)
+        after = bench_records(queued_handler, True, records, tmp)
+        print(f"📊 {records} log records per case, file handler enabled")
+        print(f"  INFO written     before {before['enabled_us']:7.2f} µs/record   after {after['enabled_us']:7.2f} µs/record")
+        print(f"  DEBUG filtered   before {before['filtered_us']:7.2f} µs/record   after {after['filtered_us']:7.2f} µs/record")
+        print(f"  background writer drained the backlog in {after['drain_s']:.3f}s after the last call")
+
+        # Warm up stubs, pools and executor threads for both backends before timing
+        await bench_tool_calls(sync_handler, 10, tmp)
+        await bench_tool_calls(queued_handler, 10, tmp)
+        print(f"📊 {calls} get_yt_video_info calls against zero-latency stubs")
+        for latency in (0.0, flush_latency):
+            tool_before = await bench_tool_calls(sync_handler, calls, tmp, latency)
+            tool_after = await bench_tool_calls(queued_handler, calls, tmp, latency)
+            print(f"  flush latency {latency * 1000:5.2f} ms: before {tool_before:9.1f} µs/call"
+                  f"   after {tool_after:9.1f} µs/call   saved {tool_before - tool_after:8.1f} µs/call")
+
+
+if __name__ == "__main__":
+    records = int(sys.argv[1]) if len(sys.argv) > 1 else 50000
+    calls = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+    flush_latency = float(sys.argv[3]) if len(sys.argv) > 3 else 0.001
+    asyncio.run(run_benchmark(records, calls, flush_latency))
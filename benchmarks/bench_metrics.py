@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""
+Benchmark the cost of the metrics layer: one span and one counter increment in
+isolation, and get_yt_video_info with metrics enabled and disabled.
+
+Usage:
+    uv run python benchmarks/bench_metrics.py [iterations] [tool_calls] 2>/dev/null
+"""
+import asyncio
+import sys
+import time
+from unittest.mock import patch
+
+from stubs import make_video_id, stub_upstreams
+
+from mcp_youtube_extract import config, server
+from mcp_youtube_extract.metrics import UPSTREAM_REQUESTS, reset_metrics, span
+
+
+def per_op_ns(func, iterations: int) -> float:
+    start = time.perf_counter()
+    func(iterations)
+    return (time.perf_counter() - start) / iterations * 1e9
+
+
+def spans(iterations: int) -> None:
+    for _ in range(iterations):
+        with span("bench.stage"):
+            pass
+
+
+def counters(iterations: int) -> None:
+    for _ in range(iterations):
+        UPSTREAM_REQUESTS.inc(endpoint="bench")
+
+
+async def tool_calls(calls: int) -> float:
+    with stub_upstreams(segments=200):
+        await server.get_yt_video_info(make_video_id("warmup"))
+        start = time.perf_counter()
+        for i in range(calls):
+            await server.get_yt_video_info(f"video{i:06d}")
+        return (time.perf_counter() - start) / calls * 1e6
+
+
+async def run_benchmark(iterations: int, calls: int):
+    print(f"📊 {iterations} operations each")
+    print(f"  span           {per_op_ns(spans, iterations):8.0f} ns")
+    print(f"  counter inc    {per_op_ns(counters, iterations):8.0f} ns")
+
+    results = {}
+    for enabled in (False, True, False, True):
+        with patch.object(config, "METRICS_ENABLED", enabled):
+            results.setdefault(enabled, []).append(await tool_calls(calls))
+    off, on = min(results[False]), min(results[True])
+    print(f"📊 {calls} get_yt_video_info calls against zero-latency stubs (best of two)")
+    print(f"  metrics off {off:9.1f} µs/call   on {on:9.1f} µs/call   overhead {on - off:7.1f} µs/call")
+    reset_metrics()
+
+
+if __name__ == "__main__":
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 200000
+    calls = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+    asyncio.run(run_benchmark(iterations, calls))
@@ -0,0 +1,207 @@
+#!/usr/bin/env python3
+"""
+Benchmark the get_yt_video_info tool end to end against stubbed upstreams.
+
+Measures latency percentiles, throughput at several concurrency levels, memory
+allocated per call, and how the tool scales with transcript length. Results are
+printed as a summary on stdout and can be written as JSON to track regressions
+over time. Application logs go to stderr; redirect it to keep the summary readable.
+
+Usage:
+    uv run python benchmarks/bench_pipeline.py [--latency 0.02] [--calls 200]
+        [--levels 1,4,16,64] [--sizes 1000,10000,100000,500000] [--json results.json] 2>/dev/null
+"""
+import argparse
+import asyncio
+import json
+import platform
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timezone
+
+from stubs import make_video_id, stub_upstreams
+
+from mcp_youtube_extract import server
+
+
+def percentile(samples: list[float], pct: float) -> float:
+    """Nearest-rank percentile of the samples"""
+    ordered = sorted(samples)
+    rank = max(0, min(len(ordered) - 1, round(pct / 100 * len(ordered)) - 1))
+    return ordered[rank]
+
+
+def summarize(samples: list[float]) -> dict:
+    """Latency summary in milliseconds"""
+    return {
+        "count": len(samples),
+        "mean_ms": statistics.fmean(samples) * 1000,
+        "p50_ms": percentile(samples, 50) * 1000,
+        "p90_ms": percentile(samples, 90) * 1000,
+        "p99_ms": percentile(samples, 99) * 1000,
+        "max_ms": max(samples) * 1000,
+    }
+
+
+async def timed_call(video_id: str) -> float:
+    start = time.perf_counter()
+    result = await server.get_yt_video_info(make_video_id(video_id))
+    elapsed = time.perf_counter() - start
+    assert "=== TRANSCRIPT ===" in result, result
+    return elapsed
+
+
+async def bench_latency(calls: int, latency: float, segments: int) -> dict:
+    """Sequential calls, one at a time"""
+    with stub_upstreams(info_latency=latency, transcript_latency=latency, segments=segments):
+        samples = [await timed_call(f"lat{i:06d}") for i in range(calls)]
+    return summarize(samples)
+
+
+async def bench_throughput(calls: int, latency: float, segments: int, levels: list[int]) -> list[dict]:
+    """Calls per second with `level` calls kept in flight"""
+    results = []
+    with stub_upstreams(info_latency=latency, transcript_latency=latency, segments=segments):
+        for level in levels:
+            semaphore = asyncio.Semaphore(level)
+
+            async def limited(video_id):
+                async with semaphore:
+                    return await timed_call(video_id)
+
+            start = time.perf_counter()
+            samples = await asyncio.gather(*(limited(f"tp{level}-{i:06d}") for i in range(calls)))
+            elapsed = time.perf_counter() - start
+            results.append({"concurrency": level, "calls_per_s": calls / elapsed, **summarize(samples)})
+    return results
+
+
+async def bench_allocations(calls: int, segments: int) -> dict:
+    """Peak traced memory and retained memory per call, with no simulated latency"""
+    with stub_upstreams(segments=segments):
+        # Warm up imports, pools and executor threads before tracing
+        await timed_call("warmup")
+        tracemalloc.start()
+        try:
+            peaks = []
+            baseline, _ = tracemalloc.get_traced_memory()
+            for i in range(calls):
+                tracemalloc.reset_peak()
+                before, _ = tracemalloc.get_traced_memory()
+                await timed_call(f"alloc{i:06d}")
+                _, peak = tracemalloc.get_traced_memory()
+                peaks.append(peak - before)
+            retained, _ = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+    return {
+        "calls": calls,
+        "segments": segments,
+        "peak_bytes_per_call": statistics.median(peaks),
+        "retained_bytes_per_call": (retained - baseline) / calls,
+    }
+
+
+async def bench_transcript_sizes(sizes: list[int]) -> list[dict]:
+    """Wall time of one call per transcript length, then its peak memory in a traced rerun"""
+    results = []
+    for segments in sizes:
+        with stub_upstreams(segments=segments):
+            start = time.perf_counter()
+            result = await server.get_yt_video_info(make_video_id(f"size{segments}"))
+            elapsed = time.perf_counter() - start
+            # tracemalloc slows allocation-heavy code down, so it gets its own run
+            tracemalloc.start()
+            try:
+                await server.get_yt_video_info(make_video_id(f"size{segments}-traced"))
+                _, peak = tracemalloc.get_traced_memory()
+            finally:
+                tracemalloc.stop()
+        results.append({
+            "segments": segments,
+            "seconds": elapsed,
+            "output_chars": len(result),
+            "peak_bytes": peak,
+            "segments_per_s": segments / elapsed,
+        })
+    return results
+
+
+def git_revision() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+async def run_benchmark(args) -> dict:
+    report = {
+        "benchmark": "pipeline",
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "revision": git_revision(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "parameters": {
+            "latency_s": args.latency,
+            "calls": args.calls,
+            "segments": args.segments,
+            "levels": args.levels,
+            "sizes": args.sizes,
+        },
+    }
+
+    print(f"📊 latency: {args.calls} sequential calls, {args.latency * 1000:.0f} ms per upstream request")
+    report["latency"] = await bench_latency(args.calls, args.latency, args.segments)
+    lat = report["latency"]
+    print(f"  p50 {lat['p50_ms']:8.2f} ms  p90 {lat['p90_ms']:8.2f} ms  p99 {lat['p99_ms']:8.2f} ms")
+
+    print(f"📊 throughput: {args.calls} calls per concurrency level")
+    report["throughput"] = await bench_throughput(args.calls, args.latency, args.segments, args.levels)
+    for row in report["throughput"]:
+        print(f"  concurrency {row['concurrency']:>3}: {row['calls_per_s']:8.1f} calls/s  p99 {row['p99_ms']:8.2f} ms")
+
+    print(f"📊 allocations: {args.alloc_calls} calls, {args.segments} segments each")
+    report["allocations"] = await bench_allocations(args.alloc_calls, args.segments)
+    alloc = report["allocations"]
+    print(f"  peak {alloc['peak_bytes_per_call'] / 1024:10.1f} KiB/call  retained {alloc['retained_bytes_per_call'] / 1024:8.1f} KiB/call")
+
+    print("📊 transcript sizes")
+    report["transcript_sizes"] = await bench_transcript_sizes(args.sizes)
+    for row in report["transcript_sizes"]:
+        print(f"  {row['segments']:>7} segments: {row['seconds']:7.3f}s  {row['segments_per_s']:10.0f} segments/s  peak {row['peak_bytes'] / 2**20:7.1f} MiB")
+
+    return report
+
+
+def int_list(value: str) -> list[int]:
+    return [int(part) for part in value.split(",") if part]
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--latency", type=float, default=0.02, help="seconds per stubbed upstream request")
+    parser.add_argument("--calls", type=int, default=200, help="calls per latency and throughput run")
+    parser.add_argument("--alloc-calls", type=int, default=50, help="calls traced for allocations")
+    parser.add_argument("--segments", type=int, default=1000, help="transcript length for latency runs")
+    parser.add_argument("--levels", type=int_list, default=[1, 4, 16, 64], help="comma-separated concurrency levels")
+    parser.add_argument("--sizes", type=int_list, default=[1000, 10000, 100000, 500000],
+                        help="comma-separated transcript lengths in segments")
+    parser.add_argument("--json", metavar="PATH", help="write results as JSON ('-' for stdout)")
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    report = asyncio.run(run_benchmark(args))
+    if args.json == "-":
+        json.dump(report, sys.stdout, indent=2)
+        print()
+    elif args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"✅ results written to {args.json}")
@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Benchmark metadata lookup latency for popular videos while their cache entries go stale.
+
+A few videos are looked up in a tight loop from several threads for a fixed
+time, with view counts going stale every `--views-ttl` seconds and each upstream
+lookup taking `--delay` seconds. With stale-while-revalidate the stale entry is
+returned at once and refreshed in the background; the baseline expires entries
+at the same age, as a plain TTL cache would, so the caller that finds one
+expired waits for the fetch.
+
+Usage:
+    uv run python benchmarks/bench_refresh.py [--seconds 5] [--views-ttl 0.5] [--delay 0.2] [--json PATH] 2>/dev/null
+"""
+import argparse
+import json
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from unittest.mock import patch
+
+from stubs import VIDEO_INFO, make_video_id
+
+from mcp_youtube_extract import cache, config, google_api
+from mcp_youtube_extract.cache import DiskCache
+
+
+def percentile(samples: list[float], fraction: float) -> float:
+    return samples[min(len(samples) - 1, int(len(samples) * fraction))]
+
+
+def run(mode: str, args, tmp_dir: str) -> dict:
+    def fetch(video_id):
+        time.sleep(args.delay)
+        return VIDEO_INFO
+
+    max_age = args.views_ttl if mode == "plain TTL" else 3600.0
+    latencies = []
+    lock = threading.Lock()
+
+    def client(n: int) -> None:
+        own = []
+        while time.perf_counter() < deadline:
+            start = time.perf_counter()
+            google_api.get_video_info("", make_video_id(f"popular{n % args.videos}"))
+            own.append(time.perf_counter() - start)
+        with lock:
+            latencies.extend(own)
+
+    disk_cache = DiskCache(f"{tmp_dir}/{mode.replace(' ', '_')}.sqlite3", 64 * 1024 * 1024)
+    cache.set_cache(disk_cache)
+    with patch.object(google_api, "yt_get_video_info", fetch), \
+         patch.object(config, "CACHE_ENABLED", True), \
+         patch.object(config, "CACHE_VIEWS_TTL", args.views_ttl), \
+         patch.object(config, "CACHE_INFO_MAX_AGE", max_age):
+        # Popular videos are already cached; only refreshes are measured
+        for n in range(args.videos):
+            google_api.get_video_info("", make_video_id(f"popular{n}"))
+        deadline = time.perf_counter() + args.seconds
+        threads = [threading.Thread(target=client, args=(n,)) for n in range(args.clients)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        google_api.wait_for_refreshes()
+    cache.set_cache(None)
+    disk_cache.close()
+
+    latencies.sort()
+    return {
+        "lookups": len(latencies),
+        "p50_ms": statistics.median(latencies) * 1000,
+        "p99_ms": percentile(latencies, 0.99) * 1000,
+        "p999_ms": percentile(latencies, 0.999) * 1000,
+        "max_ms": latencies[-1] * 1000,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--seconds", type=float, default=5.0, help="duration of each run")
+    parser.add_argument("--videos", type=int, default=4, help="popular videos looked up")
+    parser.add_argument("--clients", type=int, default=4, help="threads looking them up")
+    parser.add_argument("--views-ttl", type=float, default=0.5, help="seconds until view counts are stale")
+    parser.add_argument("--delay", type=float, default=0.2, help="seconds per upstream lookup")
+    parser.add_argument("--json", metavar="PATH", help="write results as JSON ('-' for stdout)")
+    args = parser.parse_args()
+
+    print(f"📊 {args.videos} videos, {args.clients} clients for {args.seconds:.0f}s, "
+          f"stale after {args.views_ttl}s, {args.delay}s per upstream lookup")
+    report = {}
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for mode in ("plain TTL", "stale-while-revalidate"):
+            result = report[mode] = run(mode, args, tmp_dir)
+            print(f"  {mode:>22}: {result['lookups']:8d} lookups  p50 {result['p50_ms']:6.3f} ms  "
+                  f"p99 {result['p99_ms']:8.3f} ms  p99.9 {result['p999_ms']:8.3f} ms  max {result['max_ms']:8.3f} ms")
+
+    if args.json == "-":
+        json.dump(report, sys.stdout, indent=2)
+        print()
+    elif args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"✅ results written to {args.json}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+Benchmark transcript search: building the index, loading it from its cached
+form, and keyword and phrase queries against a plain scan of the transcript.
+
+Transcripts are generated from a Zipf-distributed vocabulary so that common
+words occur in most segments and rare ones in a few, as in speech.
+
+Usage:
+    uv run python benchmarks/bench_search.py [--segments 500 5000 50000] [--queries 2000] [--json PATH]
+"""
+import argparse
+import json
+import random
+import re
+import sys
+import time
+
+from mcp_youtube_extract.search_index import SearchIndex, tokenize
+from mcp_youtube_extract.segments import SegmentIndex
+
+VOCABULARY = [f"w{i}" for i in range(5000)]
+WEIGHTS = [1 / (rank + 1) for rank in range(len(VOCABULARY))]
+
+
+def make_transcript(segments: int, seed: int = 0) -> SegmentIndex:
+    rng = random.Random(seed)
+    words = rng.choices(VOCABULARY, WEIGHTS, k=segments * 8)
+    return SegmentIndex.from_segments(
+        {"text": " ".join(words[i * 8:(i + 1) * 8]), "start": 2.0 * i, "duration": 2.0} for i in range(segments)
+    )
+
+
+def make_queries(index: SegmentIndex, count: int, seed: int = 1) -> dict[str, list[str]]:
+    """Keyword, two-keyword and phrase queries, all taken from the transcript so they match"""
+    rng = random.Random(seed)
+    queries = {"keyword": [], "two keywords": [], "phrase": []}
+    for _ in range(count):
+        tokens = tokenize(index.segment_text(rng.randrange(len(index))))
+        queries["keyword"].append(rng.choice(tokens))
+        queries["two keywords"].append(" ".join(rng.sample(tokens, 2)))
+        start = rng.randrange(len(tokens) - 2)
+        queries["phrase"].append('"' + " ".join(tokens[start:start + 3]) + '"')
+    return queries
+
+
+def scan(index: SegmentIndex, query: str) -> list[int]:
+    """Baseline without an index: test every segment"""
+    pattern = re.compile(r"\b" + re.escape(query.strip('"')) + r"\b", re.IGNORECASE)
+    return [i for i in range(len(index)) if pattern.search(index.segment_text(i))]
+
+
+def per_query_us(search, queries: list[str]) -> float:
+    start = time.perf_counter()
+    for query in queries:
+        search(query)
+    return (time.perf_counter() - start) / len(queries) * 1e6
+
+
+def measure(segments: int, query_count: int) -> dict:
+    index = make_transcript(segments)
+    start = time.perf_counter()
+    search_index = SearchIndex.build(index)
+    build_ms = (time.perf_counter() - start) * 1000
+
+    stored = json.dumps(search_index.to_dict())
+    start = time.perf_counter()
+    SearchIndex.from_dict(json.loads(stored))
+    load_ms = (time.perf_counter() - start) * 1000
+
+    queries = make_queries(index, query_count)
+    scan_queries = queries["keyword"][:max(1, query_count // 20)]
+    return {
+        "build_ms": build_ms,
+        "load_ms": load_ms,
+        "stored_bytes": len(stored),
+        "query_us": {kind: per_query_us(search_index.search, qs) for kind, qs in queries.items()},
+        "scan_keyword_us": per_query_us(lambda q: scan(index, q), scan_queries),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--segments", type=int, nargs="+", default=[500, 5000, 50000], help="transcript lengths")
+    parser.add_argument("--queries", type=int, default=2000, help="queries of each kind")
+    parser.add_argument("--json", metavar="PATH", help="write results as JSON ('-' for stdout)")
+    args = parser.parse_args()
+
+    report = {}
+    print(f"📊 {args.queries} queries of each kind, 8 words per segment")
+    for segments in args.segments:
+        report[segments] = result = measure(segments, args.queries)
+        query_us = result["query_us"]
+        print(f"  {segments:6d} segments  build {result['build_ms']:8.1f} ms  load {result['load_ms']:7.1f} ms  "
+              f"stored {result['stored_bytes'] / 1024:8.1f} KiB")
+        print(f"  {'':15s} keyword {query_us['keyword']:7.1f} µs  two keywords {query_us['two keywords']:7.1f} µs  "
+              f"phrase {query_us['phrase']:7.1f} µs  scan {result['scan_keyword_us']:9.1f} µs")
+
+    if args.json == "-":
+        json.dump(report, sys.stdout, indent=2)
+        print()
+    elif args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"✅ results written to {args.json}")
+
+
+if __name__ == "__main__":
+    main()
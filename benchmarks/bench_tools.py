@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Benchmark per-tool latency of get_yt_video_metadata, get_yt_transcript and get_yt_video_info.
+
+Each tool is called sequentially against stubbed upstreams, with a separate
+simulated latency for the metadata request and for each of the two transcript
+requests (caption track list and timedtext download). Every call uses a new
+video ID and the cache is disabled, so every call goes upstream. The combined
+tool is also measured with a metadata-only and a transcript-only selection,
+which take the same paths as the dedicated tools.
+
+Usage:
+    uv run python benchmarks/bench_tools.py [--info-latency 0.05] [--transcript-latency 0.03]
+        [--calls 50] [--segments 5000] [--json PATH] 2>/dev/null
+"""
+import argparse
+import asyncio
+import json
+import statistics
+import sys
+import time
+
+from stubs import make_video_id, stub_upstreams
+
+from mcp_youtube_extract import server
+
+CALLS = {
+    "get_yt_video_metadata": lambda video_id: server.get_yt_video_metadata(video_id),
+    "get_yt_transcript": lambda video_id: server.get_yt_transcript(video_id),
+    "get_yt_video_info": lambda video_id: server.get_yt_video_info(video_id),
+    "get_yt_video_info (metadata)": lambda video_id: server.get_yt_video_info(video_id, output_format="metadata"),
+    "get_yt_video_info (transcript)": lambda video_id: server.get_yt_video_info(video_id, fields="transcript"),
+}
+
+
+def percentile(samples: list[float], pct: float) -> float:
+    """Nearest-rank percentile of the samples"""
+    ordered = sorted(samples)
+    rank = max(0, min(len(ordered) - 1, round(pct / 100 * len(ordered)) - 1))
+    return ordered[rank]
+
+
+async def bench_tool(n: int, name: str, calls: int) -> dict:
+    samples = []
+    output_chars = 0
+    for i in range(calls):
+        start = time.perf_counter()
+        result = await CALLS[name](make_video_id(f"tool{n}-{i}"))
+        samples.append(time.perf_counter() - start)
+        assert not result.startswith("Error"), result
+        output_chars = len(result)
+    return {
+        "calls": calls,
+        "output_chars": output_chars,
+        "mean_ms": statistics.fmean(samples) * 1000,
+        "p50_ms": percentile(samples, 50) * 1000,
+        "p99_ms": percentile(samples, 99) * 1000,
+    }
+
+
+async def run_benchmark(args) -> dict:
+    report = {}
+    print(f"📊 {args.calls} sequential calls per tool: metadata {args.info_latency * 1000:.0f} ms, "
+          f"transcript 2 x {args.transcript_latency * 1000:.0f} ms, {args.segments} segments")
+    with stub_upstreams(
+        info_latency=args.info_latency, transcript_latency=args.transcript_latency, segments=args.segments
+    ):
+        for n, name in enumerate(CALLS):
+            result = report[name] = await bench_tool(n, name, args.calls)
+            print(f"  {name:32s} p50 {result['p50_ms']:8.2f} ms  p99 {result['p99_ms']:8.2f} ms  "
+                  f"{result['output_chars'] / 1024:8.1f} KiB out")
+    return report
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--info-latency", type=float, default=0.05, help="seconds per stubbed metadata request")
+    parser.add_argument("--transcript-latency", type=float, default=0.03,
+                        help="seconds per stubbed track list and timedtext request")
+    parser.add_argument("--calls", type=int, default=50, help="calls per tool")
+    parser.add_argument("--segments", type=int, default=5000, help="transcript length in segments")
+    parser.add_argument("--json", metavar="PATH", help="write results as JSON ('-' for stdout)")
+    return parser.parse_args(argv)
+
+
+def main():
+    args = parse_args()
+    report = asyncio.run(run_benchmark(args))
+    if args.json == "-":
+        json.dump(report, sys.stdout, indent=2)
+        print()
+    elif args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"✅ results written to {args.json}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Benchmark the binary transcript container against JSON: size, load time and single-segment reads.
+
+Transcripts of increasing length are generated from a Zipf-distributed
+vocabulary with caption-like timings. For each, the size of the plain text, the
+JSON form the cache used before and the container (zlib and uncompressed) are
+reported, with the time to load a full SegmentIndex from each, and the time to
+read one random segment from a memory-mapped container file without loading
+the rest.
+
+Usage:
+    uv run python benchmarks/bench_transcript_file.py [--segments 1000 10000 100000] [--repeats 20] [--json PATH] 2>/dev/null
+"""
+import argparse
+import json
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from mcp_youtube_extract.segments import SegmentIndex
+from mcp_youtube_extract.transcript_file import COMPRESSION_NONE, TranscriptFile, encode_transcript, write_transcript
+
+VOCABULARY = [f"word{i}" for i in range(5000)]
+WEIGHTS = [1 / (rank + 1) for rank in range(len(VOCABULARY))]
+
+
+def make_transcript(rng: random.Random, segments: int) -> SegmentIndex:
+    rows = []
+    start = 0.0
+    for _ in range(segments):
+        duration = round(rng.uniform(1.5, 5.0), 3)
+        rows.append({"text": " ".join(rng.choices(VOCABULARY, WEIGHTS, k=rng.randint(4, 12))), "start": start, "duration": duration})
+        start = round(start + duration, 3)
+    return SegmentIndex.from_segments(rows)
+
+
+def per_call_ms(func, repeats: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeats):
+        func()
+    return (time.perf_counter() - start) / repeats * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--segments", type=int, nargs="+", default=[1000, 10000, 100000], help="transcript lengths")
+    parser.add_argument("--repeats", type=int, default=20, help="repeats of each load")
+    parser.add_argument("--json", metavar="PATH", help="write results as JSON ('-' for stdout)")
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    report = {}
+    print(f"📊 Zipf vocabulary of {len(VOCABULARY)} words, 4-12 words per segment, mean of {args.repeats} loads")
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for segments in args.segments:
+            index = make_transcript(rng, segments)
+            as_json = json.dumps(index.to_dict())
+            packed = encode_transcript(index)
+            raw = encode_transcript(index, compression=COMPRESSION_NONE)
+            path = Path(tmp_dir) / f"{segments}.yttr"
+            write_transcript(path, index)
+            assert TranscriptFile(packed).to_index().text == index.text
+
+            positions = [rng.randrange(segments) for _ in range(args.repeats)]
+            mapped = TranscriptFile.open(path)
+            result = report[segments] = {
+                "text_bytes": len(index.text.encode("utf-8")),
+                "json_bytes": len(as_json),
+                "container_bytes": len(packed),
+                "uncompressed_container_bytes": len(raw),
+                "json_load_ms": per_call_ms(lambda: SegmentIndex.from_dict(json.loads(as_json)), args.repeats),
+                "container_load_ms": per_call_ms(lambda: TranscriptFile(packed).to_index(), args.repeats),
+                "uncompressed_load_ms": per_call_ms(lambda: TranscriptFile(raw).to_index(), args.repeats),
+                "open_mmap_ms": per_call_ms(lambda: TranscriptFile.open(path), args.repeats),
+                "random_segment_ms": per_call_ms(lambda: mapped.segment(positions.pop()), args.repeats),
+            }
+            print(f"  {segments:7d} segments  text {result['text_bytes'] / 1024:8.1f} KiB  "
+                  f"JSON {result['json_bytes'] / 1024:8.1f} KiB  container {result['container_bytes'] / 1024:7.1f} KiB "
+                  f"({result['container_bytes'] / result['json_bytes']:.0%} of JSON, "
+                  f"{result['uncompressed_container_bytes'] / 1024:.1f} KiB uncompressed)")
+            print(f"  {'':16s}load JSON {result['json_load_ms']:8.2f} ms  container {result['container_load_ms']:8.2f} ms  "
+                  f"uncompressed {result['uncompressed_load_ms']:8.2f} ms  "
+                  f"mmap open {result['open_mmap_ms']:6.3f} ms + one segment {result['random_segment_ms']:6.3f} ms")
+
+    if args.json == "-":
+        json.dump(report, sys.stdout, indent=2)
+        print()
+    elif args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"✅ results written to {args.json}")
+
+
+if __name__ == "__main__":
+    main()
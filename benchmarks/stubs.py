@@ -0,0 +1,138 @@
+"""
+Local stand-ins for the yt-info-extract and yt-ts-extract network calls, shared
+by the benchmark scripts.
+
+Latency is simulated with time.sleep in the worker threads, as a blocking HTTP
+request would be, and payload sizes are configurable so parsing and formatting
+costs scale like they would against real videos.
+"""
+import base64
+import hashlib
+import time
+from contextlib import contextmanager
+from html import escape
+from unittest.mock import patch
+
+from mcp_youtube_extract import cache, config, extractor_pool, google_api, transcript_api
+from mcp_youtube_extract.extractor_pool import ExtractorPool, PooledTranscriptExtractor
+from mcp_youtube_extract.ratelimit import TokenBucket
+
+VIDEO_INFO = {
+    "title": "Benchmark Video",
+    "channel_name": "Benchmark Channel",
+    "publication_date": "2020-01-01",
+    "description": "Stubbed description",
+    "views": 1234,
+}
+
+
+def make_video_id(label: str) -> str:
+    """A well-formed 11-character video ID derived from a readable label"""
+    return base64.urlsafe_b64encode(hashlib.blake2b(label.encode(), digest_size=9).digest()).decode()[:11]
+
+
+def sleeping_info(delay: float, video_info: dict = VIDEO_INFO):
+    """Stand-in for pipeline.get_video_info that sleeps for a fixed delay"""
+    def fetch(api_key, video_id):
+        time.sleep(delay)
+        return video_info
+    return fetch
+
+
+def sleeping_transcript(delay: float, text: str = "stub transcript"):
+    """Stand-in for pipeline.get_video_transcript that sleeps for a fixed delay"""
+    def fetch(video_id):
+        time.sleep(delay)
+        return text
+    return fetch
+
+
+def make_video_info(description_chars: int = 500) -> dict:
+    """yt-info-extract style metadata with a description of the given length"""
+    return dict(VIDEO_INFO, description=("lorem ipsum " * (description_chars // 12 + 1))[:description_chars])
+
+
+def make_transcript_xml(segments: int, segment_chars: int = 40) -> bytes:
+    """A timedtext document with the given number of segments, two seconds apart"""
+    word = ("caption text & more " * (segment_chars // 20 + 1))[:segment_chars]
+    body = "".join(
+        f'<text start="{i * 2}" dur="2">{escape(word)} {i}</text>' for i in range(segments)
+    )
+    return f'<?xml version="1.0" encoding="utf-8" ?><transcript>{body}</transcript>'.encode()
+
+
+class StubUpstreamExtractor(PooledTranscriptExtractor):
+    """
+    Pooled extractor whose Innertube and timedtext requests are answered locally
+    after `latency` seconds each. The shared token bucket is kept, with a rate
+    high enough never to throttle, so its locking cost is still measured.
+    """
+
+    def __init__(self, limiter, xml: bytes, latency: float = 0.0, chunk_size: int = 16384):
+        super().__init__(limiter)
+        self.xml = xml
+        self.latency = latency
+        self.chunk_size = chunk_size
+
+    def call_innertube_api(self, video_id, api_key):
+        self._wait_if_needed()
+        if self.latency:
+            time.sleep(self.latency)
+        track = {"languageCode": "en", "kind": "asr", "baseUrl": "https://stub.invalid/timedtext?lang=en"}
+        return {
+            "playabilityStatus": {"status": "OK"},
+            "captions": {"playerCaptionsTracklistRenderer": {"captionTracks": [track]}},
+        }
+
+    def fetch_transcript_xml(self, url):
+        return b"".join(self.iter_transcript_xml(url)).decode()
+
+    def iter_transcript_xml(self, url, chunk_size=None):
+        self._wait_if_needed()
+        if self.latency:
+            time.sleep(self.latency)
+        chunk_size = chunk_size or self.chunk_size
+        for i in range(0, len(self.xml), chunk_size):
+            yield self.xml[i:i + chunk_size]
+
+
+@contextmanager
+def stub_upstreams(
+    info_latency: float = 0.0,
+    transcript_latency: float = 0.0,
+    segments: int = 1000,
+    segment_chars: int = 40,
+    description_chars: int = 500,
+    pool_size: int = 32,
+):
+    """
+    Route all upstream calls to local stubs, with the persistent cache disabled.
+
+    Args:
+        info_latency: Seconds per metadata request.
+        transcript_latency: Seconds per Innertube and per timedtext request.
+        segments: Transcript length in segments.
+        segment_chars: Characters of text per segment.
+        description_chars: Length of the video description.
+        pool_size: Number of pooled stub extractors.
+    """
+    video_info = make_video_info(description_chars)
+    xml = make_transcript_xml(segments, segment_chars)
+    limiter = TokenBucket(rate=1e9, capacity=1e9)
+
+    def stub_info(video_id):
+        if info_latency:
+            time.sleep(info_latency)
+        return video_info
+
+    with patch.object(google_api, "yt_get_video_info", stub_info), \
+         patch.object(config, "CACHE_ENABLED", False):
+        cache.set_cache(None)
+        extractor_pool.set_extractor_pool(
+            ExtractorPool(pool_size, lambda: StubUpstreamExtractor(limiter, xml, transcript_latency))
+        )
+        try:
+            yield
+        finally:
+            extractor_pool.set_extractor_pool(None)
+            transcript_api.clear_segment_memo()
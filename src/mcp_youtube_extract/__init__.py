@@ -1,22 +1,45 @@
 """
 MCP YouTube Extract - A Model Context Protocol server for YouTube operations
-"""
 
-from .logger import get_logger
-from .server import mcp, main
-from .google_api import get_video_info, format_video_info
-from .transcript_api import get_video_transcript
+Public names are loaded on first access, so importing the package stays cheap:
+the MCP server and the extractor libraries are only imported when used.
+"""
 
-logger = get_logger(__name__)
+from importlib import import_module
 
 __version__ = "0.1.0"
 
-logger.info(f"MCP YouTube Extract package initialized, version: {__version__}")
+# Public name -> submodule that defines it
+_LAZY_ATTRIBUTES = {
+    "mcp": ".server",
+    "main": ".server",
+    "get_video_info": ".google_api",
+    "format_video_info": ".google_api",
+    "get_video_transcript": ".transcript_api",
+    "get_transcript_segments": ".transcript_api",
+    "iter_transcript_segments": ".transcript_api",
+}
 
 __all__ = [
     "mcp",
     "main",
     "get_video_info",
-    "get_video_transcript", 
+    "get_video_transcript",
+    "get_transcript_segments",
+    "iter_transcript_segments",
     "format_video_info",
 ]
+
+
+def __getattr__(name: str):
+    module_name = _LAZY_ATTRIBUTES.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(import_module(module_name, __name__), name)
+    # Cache on the package so later lookups skip __getattr__
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> list[str]:
+    return sorted(set(globals()) | set(__all__))
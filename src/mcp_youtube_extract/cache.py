@@ -0,0 +1,396 @@
+"""
+Persistent on-disk cache for video metadata and transcripts.
+
+Entries are content-addressed by (kind, video_id, language), where kind is
+'info' for metadata, 'segments' for transcripts and 'tracks' for caption track
+lists. They are stored in a SQLite database as JSON text, or as raw bytes for
+values that are bytes, so they survive server restarts, expire after a
+per-entry TTL and are evicted least-recently-used first once the cache grows
+past its byte budget. The total size is kept up to date by triggers, so a write
+costs the same however large the cache is. Bytes values can also be read a
+slice at a time, through SQLite's incremental blob I/O, instead of whole.
+Lookups can also report an entry's age, so that callers can serve a stale entry
+while one of them, claimed across processes, refreshes it.
+"""
+
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable
+
+from . import config
+from .metrics import CACHE_LOOKUPS
+from .logger import get_logger
+
+logger = get_logger(__name__)
+
+# Sentinel returned by DiskCache.get when there is no usable entry.
+# None is a valid cached value (a negative result), so it cannot be used.
+MISS = object()
+
+# Stored in PRAGMA user_version; a database with another version is emptied and recreated.
+# Version 0 is a new file, or one written before versioning (no stored_at or claimed_until);
+# version 2 stored JSON values as BLOBs, which now hold raw bytes values; version 3 had
+# no running size total, so every write summed the sizes of all entries.
+_SCHEMA_VERSION = 4
+_SCHEMA = (
+    """
+    CREATE TABLE entries (
+        key TEXT PRIMARY KEY,
+        kind TEXT NOT NULL,
+        video_id TEXT NOT NULL,
+        language TEXT NOT NULL,
+        value NOT NULL,
+        size INTEGER NOT NULL,
+        stored_at REAL NOT NULL,
+        expires_at REAL NOT NULL,
+        last_access REAL NOT NULL,
+        claimed_until REAL NOT NULL DEFAULT 0
+    )
+    """,
+    "CREATE INDEX entries_last_access ON entries (last_access)",
+    "CREATE INDEX entries_expires_at ON entries (expires_at)",
+    # Total size of all values, one row, maintained by the triggers below
+    "CREATE TABLE usage (total INTEGER NOT NULL)",
+    "INSERT INTO usage (total) VALUES (0)",
+    "CREATE TRIGGER entries_insert AFTER INSERT ON entries BEGIN UPDATE usage SET total = total + NEW.size; END",
+    "CREATE TRIGGER entries_delete AFTER DELETE ON entries BEGIN UPDATE usage SET total = total - OLD.size; END",
+    "CREATE TRIGGER entries_update AFTER UPDATE OF size ON entries"
+    " BEGIN UPDATE usage SET total = total + NEW.size - OLD.size; END",
+)
+# Least-recently-used entries deleted per query while over budget
+_EVICT_BATCH = 64
+
+
+def cache_key(kind: str, video_id: str, language: str = "") -> str:
+    """
+    Build the content address for a cache entry.
+
+    Args:
+        kind: Source kind: 'info', 'segments' or 'tracks'.
+        video_id: The YouTube video ID.
+        language: Language selector, empty when not applicable.
+
+    Returns:
+        A hex SHA-256 digest identifying the entry.
+    """
+    return hashlib.sha256(f"{kind}\0{video_id}\0{language}".encode("utf-8")).hexdigest()
+
+
+class DiskCache:
+    """
+    SQLite-backed cache with per-entry TTLs and LRU eviction by byte budget.
+
+    Safe to share between threads; several processes may also open the same file.
+    """
+
+    def __init__(self, path: str | Path, max_bytes: int, clock: Callable[[], float] = time.time):
+        """
+        Args:
+            path: Location of the SQLite database file.
+            max_bytes: Total size of stored values above which old entries are evicted.
+            clock: Time source, replaceable in tests.
+        """
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False, timeout=30, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._migrate()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def _migrate(self) -> None:
+        """Create the table, or recreate it if it was written with another schema version."""
+        # IMMEDIATE, so that workers opening the same file at once migrate it only once
+        self._conn.execute("BEGIN IMMEDIATE")
+        try:
+            version = self._conn.execute("PRAGMA user_version").fetchone()[0]
+            if version != _SCHEMA_VERSION:
+                if version:
+                    logger.info("Discarding cache entries written with schema version %s", version)
+                self._conn.execute("DROP TABLE IF EXISTS entries")
+                self._conn.execute("DROP TABLE IF EXISTS usage")
+                for statement in _SCHEMA:
+                    self._conn.execute(statement)
+                self._conn.execute(f"PRAGMA user_version = {_SCHEMA_VERSION}")
+            self._conn.execute("COMMIT")
+        except BaseException:
+            self._conn.execute("ROLLBACK")
+            raise
+
+    def get(self, kind: str, video_id: str, language: str = "") -> Any:
+        """
+        Look up an entry, refreshing its LRU position on a hit.
+
+        Returns:
+            The cached value (possibly None for a negative result), or MISS.
+        """
+        entry = self.get_entry(kind, video_id, language)
+        return entry if entry is MISS else entry[0]
+
+    def get_entry(self, kind: str, video_id: str, language: str = "") -> Any:
+        """
+        Look up an entry and how long ago it was stored, refreshing its LRU position on a hit.
+
+        Returns:
+            tuple: (value, age in seconds), the value possibly None for a negative result; or MISS.
+            Values stored as bytes are returned as bytes.
+        """
+        now = self._clock()
+        row = self._find(kind, video_id, language, "value, stored_at", now)
+        if row is MISS:
+            return MISS
+        value = row[0]
+        return value if isinstance(value, bytes) else json.loads(value), now - row[1]
+
+    def get_blob(self, kind: str, video_id: str, language: str = "") -> Any:
+        """
+        Look up an entry like get, but without reading a bytes value.
+
+        Returns:
+            CachedBlob: For a value stored as bytes, which is then read a slice at a time.
+            Otherwise the cached value (possibly None for a negative result), or MISS.
+        """
+        # Only JSON text is selected; a BLOB stays on disk until it is sliced
+        row = self._find(
+            kind, video_id, language,
+            "CASE WHEN typeof(value) = 'blob' THEN NULL ELSE value END, size, stored_at", self._clock(),
+        )
+        if row is MISS:
+            return MISS
+        text, size, stored_at = row
+        if text is None:
+            return CachedBlob(self, cache_key(kind, video_id, language), stored_at, size)
+        return json.loads(text)
+
+    def _find(self, kind: str, video_id: str, language: str, columns: str, now: float) -> Any:
+        """Select columns of a fresh entry and refresh its LRU position, counting the lookup; MISS if absent."""
+        key = cache_key(kind, video_id, language)
+        try:
+            with self._lock:
+                row = self._conn.execute(
+                    f"SELECT {columns}, expires_at FROM entries WHERE key = ?", (key,)
+                ).fetchone()
+                if row is None or row[-1] <= now:
+                    self.misses += 1
+                    CACHE_LOOKUPS.inc(kind=kind, tier="disk", result="miss")
+                    return MISS
+                self._conn.execute("UPDATE entries SET last_access = ? WHERE key = ?", (now, key))
+                self.hits += 1
+                CACHE_LOOKUPS.inc(kind=kind, tier="disk", result="hit")
+        except sqlite3.Error as e:
+            logger.warning("Cache read failed for %s/%s: %s", kind, video_id, e)
+            return MISS
+        return row[:-1]
+
+    def _read_blob(self, key: str, stored_at: float, offset: int, length: int) -> bytes:
+        """
+        Read part of a bytes value through SQLite's incremental blob I/O.
+
+        Raises:
+            LookupError: If the entry was replaced or evicted since it was looked up.
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT rowid FROM entries WHERE key = ? AND stored_at = ?", (key, stored_at)
+            ).fetchone()
+            if row is None:
+                raise LookupError("Cache entry was replaced while it was being read")
+            with self._conn.blobopen("entries", "value", row[0], readonly=True) as blob:
+                blob.seek(offset)
+                return blob.read(length)
+
+    def contains(self, kind: str, video_id: str, language: str = "") -> bool:
+        """
+        Check for a fresh entry without reading it, counting a lookup or refreshing its LRU position.
+
+        Returns:
+            bool: True if get would return a value (possibly None) rather than MISS.
+        """
+        key = cache_key(kind, video_id, language)
+        try:
+            with self._lock:
+                row = self._conn.execute(
+                    "SELECT 1 FROM entries WHERE key = ? AND expires_at > ?", (key, self._clock())
+                ).fetchone()
+        except sqlite3.Error as e:
+            logger.warning("Cache read failed for %s/%s: %s", kind, video_id, e)
+            return False
+        return row is not None
+
+    def claim(self, kind: str, video_id: str, seconds: float, language: str = "") -> bool:
+        """
+        Claim the right to refresh an entry, for all threads and processes sharing the file.
+
+        A claim lasts until the entry is replaced or `seconds` have passed, so a
+        refresh that failed is retried by whoever claims the entry next.
+
+        Returns:
+            bool: True if the caller should refresh the entry; False if it is gone
+            or someone else holds the claim.
+        """
+        key = cache_key(kind, video_id, language)
+        now = self._clock()
+        try:
+            with self._lock:
+                cursor = self._conn.execute(
+                    "UPDATE entries SET claimed_until = ? WHERE key = ? AND claimed_until <= ? AND expires_at > ?",
+                    (now + seconds, key, now, now),
+                )
+        except sqlite3.Error as e:
+            logger.warning("Cache claim failed for %s/%s: %s", kind, video_id, e)
+            return False
+        return cursor.rowcount == 1
+
+    def set(self, kind: str, video_id: str, value: Any, ttl: float, language: str = "") -> None:
+        """
+        Store an entry, then evict old entries if the byte budget is exceeded.
+
+        Args:
+            kind: Source kind: 'info', 'segments' or 'tracks'.
+            video_id: The YouTube video ID.
+            value: JSON-serializable value, or bytes stored as they are; None records a negative result.
+            ttl: Seconds until the entry expires.
+            language: Language selector, empty when not applicable.
+        """
+        key = cache_key(kind, video_id, language)
+        # JSON is stored as TEXT (ASCII, so its length is its size) and bytes as a BLOB
+        data = value if isinstance(value, bytes) else json.dumps(value, default=str)
+        now = self._clock()
+        try:
+            with self._lock:
+                # An upsert rather than INSERT OR REPLACE, whose implicit delete would skip the size trigger
+                self._conn.execute(
+                    "INSERT INTO entries (key, kind, video_id, language, value, size, stored_at, expires_at, last_access)"
+                    " VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)"
+                    " ON CONFLICT (key) DO UPDATE SET value = excluded.value, size = excluded.size,"
+                    " stored_at = excluded.stored_at, expires_at = excluded.expires_at,"
+                    " last_access = excluded.last_access, claimed_until = 0",
+                    (key, kind, video_id, language, data, len(data), now, now + ttl, now),
+                )
+                self._evict(now)
+        except sqlite3.Error as e:
+            logger.warning("Cache write failed for %s/%s: %s", kind, video_id, e)
+
+    def _total(self) -> int:
+        return self._conn.execute("SELECT total FROM usage").fetchone()[0]
+
+    def _evict(self, now: float) -> None:
+        """Drop expired entries, then least-recently-used ones until within budget."""
+        # Both lookups use an index, so a write that evicts nothing stays cheap however large the cache is
+        self._conn.execute("DELETE FROM entries WHERE expires_at <= ?", (now,))
+        total = self._total()
+        while total > self.max_bytes:
+            oldest = self._conn.execute(
+                "SELECT key, size FROM entries ORDER BY last_access LIMIT ?", (_EVICT_BATCH,)
+            ).fetchall()
+            if not oldest:
+                break
+            for key, size in oldest:
+                if total <= self.max_bytes:
+                    break
+                self._conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+                total -= size
+                self.evictions += 1
+                logger.debug("Evicted cache entry %s (%s bytes)", key[:12], size)
+
+    def clear(self) -> None:
+        """Remove all entries."""
+        with self._lock:
+            self._conn.execute("DELETE FROM entries")
+
+    def stats(self) -> dict:
+        """
+        Report hit/miss counters for this process and the current cache size.
+
+        Returns:
+            dict: hits, misses, evictions, entries and bytes.
+        """
+        with self._lock:
+            entries = self._conn.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+            size = self._total()
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "entries": entries,
+            "bytes": size,
+        }
+
+    def close(self) -> None:
+        """Close the underlying database connection."""
+        with self._lock:
+            self._conn.close()
+
+
+class CachedBlob:
+    """
+    A bytes entry in the cache, read on demand.
+
+    Supports len() and slicing like bytes; each slice reads only its own range from
+    the database, so a reader such as TranscriptFile loads the parts it uses and
+    nothing else. The entry is located again on every read, and slicing one that
+    has since been replaced or evicted raises LookupError rather than returning
+    other bytes.
+    """
+
+    def __init__(self, cache: DiskCache, key: str, stored_at: float, size: int):
+        self._cache = cache
+        self._key = key
+        self._stored_at = stored_at
+        self._size = size
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __getitem__(self, item: slice) -> bytes:
+        if not isinstance(item, slice):
+            raise TypeError("CachedBlob only supports slicing")
+        start, stop, step = item.indices(self._size)
+        if step != 1:
+            raise ValueError("CachedBlob slices must be contiguous")
+        if stop <= start:
+            return b""
+        return self._cache._read_blob(self._key, self._stored_at, start, stop - start)
+
+
+_cache: DiskCache | None = None
+_cache_lock = threading.Lock()
+
+
+def get_cache() -> DiskCache | None:
+    """
+    Get the process-wide cache, opening it on first use.
+
+    Returns:
+        The shared DiskCache, or None if caching is disabled via YOUTUBE_CACHE.
+    """
+    global _cache
+    if not config.CACHE_ENABLED:
+        return None
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                path = Path(config.CACHE_DIR).expanduser() / "cache.sqlite3"
+                logger.info("Opening cache at %s (budget %s bytes)", path, config.CACHE_MAX_BYTES)
+                _cache = DiskCache(path, config.CACHE_MAX_BYTES)
+    return _cache
+
+
+def set_cache(cache: DiskCache | None) -> None:
+    """
+    Replace the process-wide cache, e.g. to point it at a temporary directory.
+
+    Args:
+        cache: The cache to use, or None to reopen from configuration on next use.
+    """
+    global _cache
+    with _cache_lock:
+        _cache = cache
@@ -0,0 +1,153 @@
+"""
+Runtime configuration read from environment variables.
+"""
+
+import os
+from pathlib import Path
+
+
+def env_float(name: str, default: float) -> float:
+    """
+    Read a float setting from the environment.
+
+    Args:
+        name: Environment variable name.
+        default: Value used when the variable is unset or empty.
+
+    Returns:
+        The parsed value, or the default.
+    """
+    value = os.getenv(name, "")
+    return float(value) if value.strip() else default
+
+
+def env_int(name: str, default: int) -> int:
+    """
+    Read an integer setting from the environment.
+
+    Args:
+        name: Environment variable name.
+        default: Value used when the variable is unset or empty.
+
+    Returns:
+        The parsed value, or the default.
+    """
+    value = os.getenv(name, "")
+    return int(value) if value.strip() else default
+
+
+def env_bool(name: str, default: bool) -> bool:
+    """
+    Read an on/off setting from the environment.
+
+    Args:
+        name: Environment variable name.
+        default: Value used when the variable is unset or empty.
+
+    Returns:
+        False for '0', 'false', 'no' or 'off' (any case), True for other values.
+    """
+    value = os.getenv(name, "").strip().lower()
+    if not value:
+        return default
+    return value not in ("0", "false", "no", "off")
+
+
+# Seconds to wait for the metadata fetch before giving up on it
+INFO_TIMEOUT = env_float("YOUTUBE_INFO_TIMEOUT", 60.0)
+
+# Seconds to wait for the transcript fetch before giving up on it
+TRANSCRIPT_TIMEOUT = env_float("YOUTUBE_TRANSCRIPT_TIMEOUT", 120.0)
+
+# Worker threads shared by all blocking metadata/transcript fetches
+FETCH_WORKERS = env_int("YOUTUBE_FETCH_WORKERS", 32)
+
+# Upper bound on videos fetched in parallel by the batch tool
+BATCH_CONCURRENCY = env_int("YOUTUBE_BATCH_CONCURRENCY", 8)
+
+# Long-lived transcript extractors shared by all tool calls
+EXTRACTOR_POOL_SIZE = env_int("YOUTUBE_EXTRACTOR_POOL_SIZE", 8)
+HTTP_POOL_MAXSIZE = env_int("YOUTUBE_HTTP_POOL_MAXSIZE", 4)
+
+# Shared token bucket for upstream requests: sustained requests per second and burst size, split evenly between HTTP workers
+RATE_LIMIT = env_float("YOUTUBE_RATE_LIMIT", 2.0)
+RATE_BURST = env_float("YOUTUBE_RATE_BURST", 10.0)
+
+# The same for yt-info-extract metadata lookups, one token per extraction attempt
+INFO_RATE_LIMIT = env_float("YOUTUBE_INFO_RATE_LIMIT", 5.0)
+INFO_RATE_BURST = env_float("YOUTUBE_INFO_RATE_BURST", 20.0)
+
+# Adaptive rate: halved on every throttled (429/5xx) response down to the floor,
+# raised again by the step after every successful one, up to the configured rate
+RATE_FLOOR = env_float("YOUTUBE_RATE_FLOOR", 0.1)
+RATE_STEP = env_float("YOUTUBE_RATE_STEP", 0.05)
+
+# Circuit breaker: consecutive throttled or failed requests that open it, seconds
+# it stays open, and trial requests let through afterwards before it closes again
+BREAKER_THRESHOLD = env_int("YOUTUBE_BREAKER_THRESHOLD", 5)
+BREAKER_RESET = env_float("YOUTUBE_BREAKER_RESET", 30.0)
+BREAKER_PROBES = env_int("YOUTUBE_BREAKER_PROBES", 2)
+
+# Persistent cache for metadata and transcripts
+CACHE_ENABLED = env_bool("YOUTUBE_CACHE", True)
+CACHE_DIR = os.getenv("YOUTUBE_CACHE_DIR", "") or str(Path.home() / ".cache" / "mcp_youtube_extract")
+CACHE_MAX_BYTES = env_int("YOUTUBE_CACHE_MAX_BYTES", 256 * 1024 * 1024)
+
+# Video metadata: seconds view counts and the other fields stay fresh, and seconds
+# an entry is kept; until then a stale entry is served while it is refreshed
+CACHE_VIEWS_TTL = env_float("YOUTUBE_CACHE_VIEWS_TTL", 3600.0)
+CACHE_INFO_TTL = env_float("YOUTUBE_CACHE_INFO_TTL", 6 * 3600.0)
+CACHE_INFO_MAX_AGE = env_float("YOUTUBE_CACHE_INFO_MAX_AGE", 7 * 24 * 3600.0)
+
+# Transcripts rarely change once published; negative results ("no transcript") expire sooner
+CACHE_TRANSCRIPT_TTL = env_float("YOUTUBE_CACHE_TRANSCRIPT_TTL", 365 * 24 * 3600.0)
+CACHE_NEGATIVE_TTL = env_float("YOUTUBE_CACHE_NEGATIVE_TTL", 15 * 60.0)
+
+# Decoded transcripts kept in memory in front of the cache, e.g. while a client pages through one
+SEGMENT_MEMO_SIZE = env_int("YOUTUBE_SEGMENT_MEMO_SIZE", 16)
+
+# Default and largest transcript page for get_yt_transcript_page, in characters
+PAGE_CHUNK_CHARS = env_int("YOUTUBE_PAGE_CHUNK_CHARS", 8000)
+PAGE_MAX_CHARS = env_int("YOUTUBE_PAGE_MAX_CHARS", 100000)
+
+# Most languages get_yt_transcripts fetches in one call
+LANGUAGES_LIMIT = env_int("YOUTUBE_LANGUAGES_LIMIT", 20)
+
+# Default and largest number of matches returned by search_yt_transcript
+SEARCH_MAX_RESULTS = env_int("YOUTUBE_SEARCH_MAX_RESULTS", 20)
+SEARCH_RESULTS_LIMIT = env_int("YOUTUBE_SEARCH_RESULTS_LIMIT", 200)
+
+# Most videos get_yt_playlist_info lists and fetches from one playlist or channel
+PLAYLIST_MAX_VIDEOS = env_int("YOUTUBE_PLAYLIST_MAX_VIDEOS", 200)
+
+# Cross-video search index fed by every fetched transcript; it lives in the cache
+# directory unless YOUTUBE_CORPUS_DIR is set and is off while caching is off
+CORPUS_ENABLED = env_bool("YOUTUBE_CORPUS", True)
+CORPUS_DIR = os.getenv("YOUTUBE_CORPUS_DIR", "")
+# Number of index files of similar size that are merged into one
+CORPUS_MERGE_FACTOR = env_int("YOUTUBE_CORPUS_MERGE_FACTOR", 8)
+# Default and largest number of videos returned by search_yt_corpus
+CORPUS_MAX_RESULTS = env_int("YOUTUBE_CORPUS_MAX_RESULTS", 10)
+CORPUS_RESULTS_LIMIT = env_int("YOUTUBE_CORPUS_RESULTS_LIMIT", 100)
+
+# Largest batch of segments sent in one progress notification by stream_yt_transcript, in characters
+STREAM_BATCH_CHARS = env_int("YOUTUBE_STREAM_BATCH_CHARS", 2000)
+# Parsed segments that may wait for the client; the download pauses while this many are queued
+STREAM_QUEUE_SIZE = env_int("YOUTUBE_STREAM_QUEUE_SIZE", 256)
+
+# Log file rotation, and the queue between request threads and the background log writer
+LOG_MAX_BYTES = env_int("YOUTUBE_LOG_MAX_BYTES", 10 * 1024 * 1024)
+LOG_BACKUPS = env_int("YOUTUBE_LOG_BACKUPS", 3)
+LOG_QUEUE_SIZE = env_int("YOUTUBE_LOG_QUEUE_SIZE", 10000)
+
+# In-process latency histograms and request counters behind the metrics tool and resource
+METRICS_ENABLED = env_bool("YOUTUBE_METRICS", True)
+
+# Transport served by `mcp_youtube_extract` ("stdio", "streamable-http" or "sse") and where HTTP transports listen
+TRANSPORT = os.getenv("YOUTUBE_TRANSPORT", "") or "stdio"
+HOST = os.getenv("YOUTUBE_HOST", "") or "127.0.0.1"
+PORT = env_int("YOUTUBE_PORT", 8000)
+
+# HTTP worker processes sharing the port, and requests each one handles at a time before answering 503
+SERVER_WORKERS = env_int("YOUTUBE_WORKERS", 1)
+MAX_IN_FLIGHT = env_int("YOUTUBE_MAX_IN_FLIGHT", 64)
@@ -0,0 +1,614 @@
+"""
+Cross-video search over every transcript this server has fetched.
+
+Each transcript becomes one document when it is first fetched. Its terms come
+from the per-video search index, so nothing is tokenized twice. The corpus is a
+directory of immutable segment files, LSM style: an add writes a small new file,
+and once merge_factor files of similar size exist they are merged into one, so
+there are only a few files per order of magnitude of documents.
+
+A segment file holds a term table sorted for binary search, a document table
+sorted by key, also for binary search, and, per term, a posting list of
+(document gap, term frequency, first occurrence in ms) triples encoded as
+varints. Files are memory-mapped; a query decodes only the posting lists of its
+own terms and reads only the documents they match, and checking whether a
+transcript is indexed reads a few keys per file, so the corpus can grow far
+beyond RAM. Several server processes can share one directory; writers take
+an exclusive lock on it.
+"""
+
+import heapq
+import math
+import mmap
+import os
+import struct
+import threading
+from array import array
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from contextlib import contextmanager
+from itertools import groupby
+from pathlib import Path
+from typing import Iterable, Iterator
+
+try:
+    import fcntl
+except ImportError:  # Windows: writers are only serialized within one process
+    fcntl = None
+
+from . import config
+from .search_index import SearchIndex, tokenize
+from .segments import SegmentIndex, format_timestamp
+from .metrics import span
+from .logger import get_logger
+
+logger = get_logger(__name__)
+
+MAGIC = b"YTCI"
+VERSION = 1
+# magic, version, flags, documents, terms, total tokens, total transcript segments,
+# then the offsets of the document table, term table and string pool; posting
+# lists start right after the header
+_HEADER = struct.Struct("<4sHHIIQQQQQ")
+# key offset and length in the string pool, tokens, transcript segments
+_DOC = struct.Struct("<IIII")
+# The key and tokens fields of a _DOC entry, for reading one without the rest
+_DOC_KEY = struct.Struct("<II")
+_DOC_TOKENS = struct.Struct("<8xI")
+# term offset and length in the string pool, posting list offset and size, document frequency
+_TERM = struct.Struct("<IIQII")
+_SUFFIX = ".ytc"
+# Flag: the document table is sorted by key. Files written before it was kept
+# sorted lack the flag and have their keys scanned instead.
+_FLAG_SORTED_KEYS = 1
+
+# BM25 term frequency saturation and document length normalization
+_K1 = 1.2
+_B = 0.75
+
+
+def encode_varints(values: Iterable[int], out: bytearray) -> None:
+    """Append non-negative integers to out, 7 bits per byte, low bits first."""
+    for value in values:
+        while value >= 0x80:
+            out.append(value & 0x7F | 0x80)
+            value >>= 7
+        out.append(value)
+
+
+def decode_varints(data: bytes) -> list[int]:
+    """Decode the output of encode_varints."""
+    values = []
+    value = shift = 0
+    for byte in data:
+        if byte & 0x80:
+            value |= (byte & 0x7F) << shift
+            shift += 7
+        else:
+            values.append(value | byte << shift)
+            value = shift = 0
+    return values
+
+
+def document_key(video_id: str, language: str) -> str:
+    """
+    Identify a transcript in the corpus, as the cache does: by video and language selector.
+
+    An exact-language selector ('=en') names the same transcript as the plain one,
+    so it is stored without the '='.
+    """
+    return f"{video_id}\t{language.lstrip('=')}"
+
+
+def _write_segment(path: Path, documents: list[tuple[str, int, int]], postings: Iterable[tuple[bytes, bytes, int]]) -> None:
+    """
+    Write a segment file atomically.
+
+    Args:
+        path: Destination file.
+        documents: (key, tokens, transcript segments) per document, in document id order;
+            in key order unless written for a test of older files.
+        postings: (term, encoded posting list, document frequency), terms in byte order.
+    """
+    tmp = path.with_name(path.name + ".tmp")
+    strings = bytearray()
+    term_table = bytearray()
+    doc_table = bytearray()
+    term_count = 0
+    with open(tmp, "wb") as f:
+        f.write(bytes(_HEADER.size))
+        position = _HEADER.size
+        for term, data, doc_freq in postings:
+            term_table += _TERM.pack(len(strings), len(term), position, len(data), doc_freq)
+            strings += term
+            f.write(data)
+            position += len(data)
+            term_count += 1
+        flags = _FLAG_SORTED_KEYS
+        previous = b""
+        for key, tokens, segments in documents:
+            encoded = key.encode("utf-8")
+            if encoded < previous:
+                flags = 0
+            previous = encoded
+            doc_table += _DOC.pack(len(strings), len(encoded), tokens, segments)
+            strings += encoded
+        f.write(doc_table)
+        f.write(term_table)
+        f.write(strings)
+        f.seek(0)
+        f.write(_HEADER.pack(
+            MAGIC, VERSION, flags, len(documents), term_count,
+            sum(tokens for _, tokens, _ in documents), sum(segments for _, _, segments in documents),
+            position, position + len(doc_table), position + len(doc_table) + len(term_table),
+        ))
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+
+class CorpusSegment:
+    """One immutable, memory-mapped segment file."""
+
+    def __init__(self, path: Path):
+        """
+        Args:
+            path: The segment file.
+
+        Raises:
+            ValueError: If the file is not a segment written by this version.
+        """
+        self.path = path
+        with open(path, "rb") as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if len(self._map) < _HEADER.size:
+            raise ValueError(f"{path} is truncated")
+        (magic, version, self.flags, self.document_count, self.term_count, self.total_tokens,
+         self.total_segments, self._docs, self._terms, self._strings) = _HEADER.unpack_from(self._map)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{path} is not a version {VERSION} corpus segment")
+
+    def _string(self, offset: int, length: int) -> bytes:
+        start = self._strings + offset
+        return self._map[start:start + length]
+
+    def _document(self, doc: int) -> tuple[int, int, int, int]:
+        return _DOC.unpack_from(self._map, self._docs + doc * _DOC.size)
+
+    def key_bytes(self, doc: int) -> bytes:
+        """Key of one document, UTF-8 encoded, read from the file."""
+        offset, length = _DOC_KEY.unpack_from(self._map, self._docs + doc * _DOC.size)
+        start = self._strings + offset
+        return self._map[start:start + length]
+
+    def key(self, doc: int) -> str:
+        """Key of one document, read from the file."""
+        return self.key_bytes(doc).decode("utf-8")
+
+    def length(self, doc: int) -> int:
+        """Length of one document in tokens, read from the file."""
+        return _DOC_TOKENS.unpack_from(self._map, self._docs + doc * _DOC.size)[0]
+
+    def __contains__(self, key: str) -> bool:
+        """Whether a document key is in this file, by binary search over the document table."""
+        encoded = key.encode("utf-8")
+        if not self.flags & _FLAG_SORTED_KEYS:
+            return any(self.key_bytes(doc) == encoded for doc in range(self.document_count))
+        lo, hi = 0, self.document_count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self.key_bytes(mid) < encoded:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo < self.document_count and self.key_bytes(lo) == encoded
+
+    def sorted_keys(self) -> Iterator[tuple[bytes, int]]:
+        """Yield (encoded key, document id) in key order."""
+        docs = range(self.document_count)
+        if not self.flags & _FLAG_SORTED_KEYS:
+            docs = sorted(docs, key=self.key_bytes)
+        for doc in docs:
+            yield self.key_bytes(doc), doc
+
+    def documents(self) -> Iterator[tuple[str, int, int]]:
+        """Yield (key, tokens, transcript segments) in document id order."""
+        for key_offset, key_length, tokens, segments in _DOC.iter_unpack(self._map[self._docs:self._terms]):
+            yield self._string(key_offset, key_length).decode("utf-8"), tokens, segments
+
+    def _term(self, i: int) -> tuple[int, int, int, int, int]:
+        return _TERM.unpack_from(self._map, self._terms + i * _TERM.size)
+
+    def find(self, term: bytes) -> tuple[int, int, int] | None:
+        """
+        Look a term up by binary search over the term table.
+
+        Args:
+            term: The UTF-8 encoded term.
+
+        Returns:
+            tuple: (posting list offset, size, document frequency), or None if absent.
+        """
+        lo, hi = 0, self.term_count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            offset, length, _, _, _ = self._term(mid)
+            if self._string(offset, length) < term:
+                lo = mid + 1
+            else:
+                hi = mid
+        if lo == self.term_count:
+            return None
+        offset, length, postings, size, doc_freq = self._term(lo)
+        if self._string(offset, length) != term:
+            return None
+        return postings, size, doc_freq
+
+    def terms(self) -> Iterator[tuple[bytes, tuple[int, int, int]]]:
+        """Yield (term, find result) for every term, in byte order."""
+        for i in range(self.term_count):
+            offset, length, postings, size, doc_freq = self._term(i)
+            yield self._string(offset, length), (postings, size, doc_freq)
+
+    def postings(self, entry: tuple[int, int, int]) -> Iterator[tuple[int, int, int]]:
+        """
+        Decode one posting list.
+
+        Args:
+            entry: A result of find.
+
+        Yields:
+            (document id, term frequency, first occurrence in ms), by document id.
+        """
+        offset, size, _ = entry
+        values = decode_varints(self._map[offset:offset + size])
+        doc = 0
+        for i in range(0, len(values), 3):
+            doc += values[i]
+            yield doc, values[i + 1], values[i + 2]
+
+
+def _tagged_keys(segment: CorpusSegment, tag: int) -> Iterator[tuple[bytes, int, int]]:
+    for key, doc in segment.sorted_keys():
+        yield key, tag, doc
+
+
+def _tagged_terms(segment: CorpusSegment, tag: int) -> Iterator[tuple[bytes, int, tuple[int, int, int]]]:
+    for term, entry in segment.terms():
+        yield term, tag, entry
+
+
+class Corpus:
+    """
+    On-disk inverted index over many transcripts, one document per transcript.
+
+    Safe to share between threads; several processes may also open the same directory.
+    """
+
+    def __init__(self, directory: str | Path, merge_factor: int = 8):
+        """
+        Args:
+            directory: Where the segment files live; created if missing.
+            merge_factor: How many segment files of similar size are merged into one.
+        """
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.merge_factor = max(2, merge_factor)
+        self._lock = threading.RLock()
+        self._segments: dict[str, CorpusSegment] = {}
+
+    @contextmanager
+    def _writing(self):
+        """Hold the thread lock and, where supported, an exclusive lock on the directory."""
+        with self._lock, open(self.directory / ".lock", "a+b") as lock_file:
+            if fcntl is not None:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                self._refresh()
+                yield
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _refresh(self) -> None:
+        """Pick up segment files written or merged away, e.g. by other processes."""
+        names = sorted(entry.name for entry in os.scandir(self.directory) if entry.name.endswith(_SUFFIX))
+        for name in set(self._segments).difference(names):
+            # Not closed: a concurrent search may still be reading it
+            del self._segments[name]
+        for name in names:
+            if name in self._segments:
+                continue
+            try:
+                segment = CorpusSegment(self.directory / name)
+            except FileNotFoundError:
+                continue  # merged away since the listing
+            except (OSError, ValueError) as e:
+                logger.warning("Skipping corpus segment %s: %s", name, e)
+                continue
+            self._segments[name] = segment
+
+    def _next_path(self) -> Path:
+        generation = max((int(name[:-len(_SUFFIX)]) for name in self._segments), default=0) + 1
+        return self.directory / f"{generation:012d}{_SUFFIX}"
+
+    def _indexed(self, key: str) -> bool:
+        return any(key in segment for segment in self._segments.values())
+
+    def __contains__(self, key: str) -> bool:
+        with self._lock:
+            self._refresh()
+            return self._indexed(key)
+
+    def add(self, video_id: str, language: str, index: SegmentIndex, search_index: SearchIndex) -> bool:
+        """
+        Add a transcript, unless it is already in the corpus.
+
+        Args:
+            video_id: The YouTube video ID.
+            language: Language selector the transcript was fetched with.
+            index: The transcript segments.
+            search_index: The transcript's search index, whose terms are reused.
+
+        Returns:
+            bool: True if the transcript was added.
+        """
+        key = document_key(video_id, language)
+        postings = []
+        for term, (offset, count) in search_index.terms.items():
+            first = index.starts[search_index.token_segments[search_index.positions[offset]]]
+            data = bytearray()
+            encode_varints((0, count, round(first * 1000)), data)
+            postings.append((term.encode("utf-8"), bytes(data), 1))
+        postings.sort()
+
+        with self._writing():
+            if self._indexed(key):
+                return False
+            path = self._next_path()
+            _write_segment(path, [(key, len(search_index.positions), len(index))], postings)
+            self._segments[path.name] = CorpusSegment(path)
+            self._merge_full_tiers()
+        logger.debug("Added %s (%s) to the corpus", video_id, language)
+        return True
+
+    def _tier(self, segment: CorpusSegment) -> int:
+        return int(math.log(max(segment.document_count, 1), self.merge_factor))
+
+    def _merge_full_tiers(self) -> None:
+        """Merge segment files of similar size until no size tier holds merge_factor of them."""
+        while True:
+            tiers: dict[int, list[str]] = {}
+            for name, segment in sorted(self._segments.items()):
+                tiers.setdefault(self._tier(segment), []).append(name)
+            full = [names for _, names in sorted(tiers.items()) if len(names) >= self.merge_factor]
+            if not full:
+                return
+            self._merge(full[0][:self.merge_factor])
+
+    def _merge(self, names: list[str]) -> None:
+        """Merge segment files into one, dropping duplicate documents added by racing processes."""
+        segments = [self._segments[name] for name in names]
+        # Documents in key order, each key once: the first file that has it wins
+        documents = []
+        doc_maps = [array("i", [-1]) * segment.document_count for segment in segments]
+        streams = [_tagged_keys(segment, i) for i, segment in enumerate(segments)]
+        for key, group in groupby(heapq.merge(*streams), key=lambda item: item[0]):
+            _, i, doc = next(group)
+            _, _, tokens, transcript_segments = segments[i]._document(doc)
+            doc_maps[i][doc] = len(documents)
+            documents.append((key.decode("utf-8"), tokens, transcript_segments))
+
+        def merged_postings() -> Iterator[tuple[bytes, bytes, int]]:
+            streams = [_tagged_terms(segment, i) for i, segment in enumerate(segments)]
+            for term, group in groupby(heapq.merge(*streams), key=lambda item: item[0]):
+                # New document ids follow key order, not file order, so each list is sorted again
+                hits = []
+                for _, i, entry in group:
+                    mapping = doc_maps[i]
+                    for doc, tf, first in segments[i].postings(entry):
+                        doc = mapping[doc]
+                        if doc >= 0:
+                            hits.append((doc, tf, first))
+                if not hits:
+                    continue
+                hits.sort()
+                data = bytearray()
+                previous = 0
+                for doc, tf, first in hits:
+                    encode_varints((doc - previous, tf, first), data)
+                    previous = doc
+                yield term, bytes(data), len(hits)
+
+        path = self._next_path()
+        with span("corpus.merge"):
+            _write_segment(path, documents, merged_postings())
+        self._segments[path.name] = CorpusSegment(path)
+        for name in names:
+            del self._segments[name]
+            (self.directory / name).unlink(missing_ok=True)
+        logger.info("Merged %s corpus segments into %s (%s documents)", len(names), path.name, len(documents))
+
+    def search(self, query: str, limit: int = 10, match_all: bool = False) -> tuple[int, list[dict]]:
+        """
+        Rank transcripts by BM25 relevance to the query words.
+
+        Word order and quotes are ignored here; search_yt_transcript matches phrases
+        within one video. A video indexed under several language selectors is
+        returned once, with its best scoring transcript.
+
+        Args:
+            query: Words to look for.
+            limit: Most results to return.
+            match_all: Only count transcripts that contain every word.
+
+        Returns:
+            tuple: (number of matching videos, the best `limit` of them), each
+            with video_id, language, score, matched_terms and the first_match time
+            in seconds with its timestamp.
+        """
+        terms = [term.encode("utf-8") for term in dict.fromkeys(tokenize(query))]
+        if not terms:
+            return 0, []
+        with self._lock:
+            self._refresh()
+            segments = list(self._segments.values())
+        documents = sum(segment.document_count for segment in segments)
+        if not documents:
+            return 0, []
+        average_length = sum(segment.total_tokens for segment in segments) / documents
+
+        entries = [[segment.find(term) for term in terms] for segment in segments]
+        idf = []
+        for j in range(len(terms)):
+            doc_freq = sum(found[j][2] for found in entries if found[j] is not None)
+            idf.append(math.log(1 + (documents - doc_freq + 0.5) / (doc_freq + 0.5)))
+
+        # Best transcript per video: (score, matched terms, first match, document key)
+        best: dict[str, tuple[float, int, int, str]] = {}
+        for segment, found in zip(segments, entries):
+            scores: dict[int, list] = {}
+            for j, entry in enumerate(found):
+                if entry is None:
+                    continue
+                weight = idf[j] * (_K1 + 1)
+                for doc, tf, first in segment.postings(entry):
+                    hit = scores.get(doc)
+                    if hit is None:
+                        # Document lengths are read from the file, once per matching document
+                        norm = _K1 * (1 - _B + _B * segment.length(doc) / average_length)
+                        scores[doc] = [weight * tf / (tf + norm), 1, first, norm]
+                    else:
+                        hit[0] += weight * tf / (tf + hit[3])
+                        hit[1] += 1
+                        hit[2] = min(hit[2], first)
+            for doc, (score, matched, first, _) in scores.items():
+                if match_all and matched < len(terms):
+                    continue
+                # Kept encoded; only the keys returned are decoded
+                key = segment.key_bytes(doc)
+                video_id = key[:key.index(b"\t")]
+                if video_id not in best or best[video_id][0] < score:
+                    best[video_id] = (score, matched, first, key)
+
+        results = []
+        for score, matched, first, key in heapq.nlargest(limit, best.values(), key=lambda hit: hit[0]):
+            video_id, language = key.decode("utf-8").split("\t", 1)
+            results.append({
+                "video_id": video_id,
+                "language": language,
+                "score": round(score, 4),
+                "matched_terms": matched,
+                "first_match": first / 1000,
+                "timestamp": format_timestamp(first / 1000),
+            })
+        return len(best), results
+
+    def stats(self) -> dict:
+        """
+        Report the size of the corpus.
+
+        Returns:
+            dict: videos, transcripts, transcript segments, files and bytes on disk.
+        """
+        with self._lock:
+            self._refresh()
+            segments = list(self._segments.values())
+        # Keys in order across all files: duplicates are adjacent, and so are the transcripts of one video
+        videos = transcripts = 0
+        previous_key = previous_video = None
+        for key, _ in heapq.merge(*(segment.sorted_keys() for segment in segments)):
+            if key == previous_key:
+                continue
+            transcripts += 1
+            video = key.split(b"\t", 1)[0]
+            if video != previous_video:
+                videos += 1
+            previous_key, previous_video = key, video
+        return {
+            "videos": videos,
+            "transcripts": transcripts,
+            "segments": sum(segment.total_segments for segment in segments),
+            "files": len(segments),
+            "bytes": sum(len(segment._map) for segment in segments),
+        }
+
+
+_corpus: Corpus | None = None
+_corpus_lock = threading.Lock()
+_executor: ThreadPoolExecutor | None = None
+_pending: set[Future] = set()
+
+
+def get_corpus() -> Corpus | None:
+    """
+    Get the process-wide corpus, opening it on first use.
+
+    Returns:
+        The shared Corpus, or None if disabled via YOUTUBE_CORPUS or YOUTUBE_CACHE.
+    """
+    global _corpus
+    if not (config.CACHE_ENABLED and config.CORPUS_ENABLED):
+        return None
+    if _corpus is None:
+        with _corpus_lock:
+            if _corpus is None:
+                directory = Path(config.CORPUS_DIR or Path(config.CACHE_DIR) / "corpus").expanduser()
+                logger.info("Opening corpus at %s", directory)
+                _corpus = Corpus(directory, config.CORPUS_MERGE_FACTOR)
+    return _corpus
+
+
+def set_corpus(corpus: Corpus | None) -> None:
+    """
+    Replace the process-wide corpus, e.g. to point it at a temporary directory.
+
+    Args:
+        corpus: The corpus to use, or None to reopen from configuration on next use.
+    """
+    global _corpus
+    with _corpus_lock:
+        _corpus = corpus
+
+
+def _add(corpus: Corpus, video_id: str, language: str, index: SegmentIndex, search_index: SearchIndex) -> None:
+    try:
+        with span("corpus.add"):
+            corpus.add(video_id, language, index, search_index)
+    except Exception as e:
+        logger.warning("Could not add %s to the corpus: %s", video_id, e)
+
+
+def add_transcript(video_id: str, language: str, index: SegmentIndex, search_index: SearchIndex) -> None:
+    """
+    Queue a freshly fetched transcript for the corpus.
+
+    Adds run one at a time on a background thread, so a fetch never waits for a merge.
+
+    Args:
+        video_id: The YouTube video ID.
+        language: Language selector the transcript was fetched with.
+        index: The transcript segments.
+        search_index: The transcript's search index.
+    """
+    global _executor
+    corpus = get_corpus()
+    if corpus is None:
+        return
+    with _corpus_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="yt-corpus")
+        future = _executor.submit(_add, corpus, video_id, language, index, search_index)
+        _pending.add(future)
+    future.add_done_callback(_forget)
+
+
+def _forget(future: Future) -> None:
+    with _corpus_lock:
+        _pending.discard(future)
+
+
+def wait_for_pending(timeout: float | None = None) -> None:
+    """Wait until queued transcripts have been added to the corpus."""
+    with _corpus_lock:
+        pending = list(_pending)
+    wait(pending, timeout)
@@ -0,0 +1,274 @@
+"""
+Process-wide pool of long-lived yt-ts-extract extractors.
+
+Reusing extractors keeps their HTTP sessions, and so their keep-alive
+connections, across tool calls. All pooled extractors share one adaptive token
+bucket instead of each sleeping for a fixed delay before every request, and one
+circuit breaker that stops requests while YouTube is throttling them.
+"""
+
+import queue
+import threading
+from contextlib import contextmanager
+from typing import Callable, Iterator
+
+import requests
+from requests.adapters import HTTPAdapter
+from yt_ts_extract import YouTubeTranscriptExtractor
+
+from . import config
+from .ratelimit import CircuitBreaker, TokenBucket, UpstreamError, get_breaker, get_limiter, is_throttling_status
+from .metrics import UPSTREAM_REQUESTS, UPSTREAM_RETRIES, UPSTREAM_THROTTLED
+from .logger import get_logger
+
+logger = get_logger(__name__)
+
+
+class CountingHTTPAdapter(HTTPAdapter):
+    """HTTPAdapter that counts the requests it actually sends, retries included."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.sent = 0
+
+    def send(self, request, **kwargs):
+        self.sent += 1
+        return super().send(request, **kwargs)
+
+
+def _endpoint(url: str) -> str:
+    """Metric label for an upstream URL."""
+    if "/youtubei/" in url:
+        return "player"
+    if "timedtext" in url:
+        return "timedtext"
+    return "other"
+
+
+class PooledTranscriptExtractor(YouTubeTranscriptExtractor):
+    """
+    YouTubeTranscriptExtractor that rate limits through a shared TokenBucket and
+    keeps a pooled session for Innertube calls, which the base class sends
+    through a throwaway connection.
+
+    Every response status is fed back to the limiter and the circuit breaker:
+    429 and 5xx answers slow the limiter down and raise UpstreamError, and while
+    the breaker is open requests fail with CircuitOpenError before being sent.
+    """
+
+    def __init__(self, limiter: TokenBucket, breaker: CircuitBreaker | None = None, **kwargs):
+        """
+        Args:
+            limiter: Token bucket shared by every pooled extractor.
+            breaker: Circuit breaker shared by every pooled extractor, or None for none.
+            **kwargs: Passed to YouTubeTranscriptExtractor.
+        """
+        super().__init__(min_delay=0, **kwargs)
+        self._limiter = limiter
+        self._breaker = breaker
+        # Innertube requests must not carry the browser headers of self.session
+        self.api_session = requests.Session()
+        self._adapters = []
+        for session in (self.session, self.api_session):
+            adapter = CountingHTTPAdapter(pool_connections=2, pool_maxsize=config.HTTP_POOL_MAXSIZE)
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            self._adapters.append(adapter)
+
+    @property
+    def requests_sent(self) -> int:
+        """Requests actually sent so far, retries included."""
+        return sum(adapter.sent for adapter in self._adapters)
+
+    def _wait_if_needed(self):
+        """Take a token from the shared bucket instead of sleeping a fixed delay."""
+        # Fail fast rather than wait for a token that would only be refused
+        if self._breaker is not None:
+            self._breaker.check()
+        self._limiter.acquire()
+
+    def _admit(self) -> None:
+        if self._breaker is not None:
+            self._breaker.allow()
+
+    def _record(self, endpoint: str, status: int | None) -> None:
+        """
+        Report the outcome of a request to the limiter and the breaker.
+
+        Args:
+            endpoint: Metric label of the request.
+            status: HTTP status of the response, or None if no response arrived.
+
+        Raises:
+            UpstreamError: If the status asks us to back off.
+        """
+        if status is not None and not is_throttling_status(status):
+            self._limiter.on_success()
+            if self._breaker is not None:
+                self._breaker.record_success()
+            return
+        if self._breaker is not None:
+            self._breaker.record_failure()
+        if status is not None:
+            UPSTREAM_THROTTLED.inc(endpoint=endpoint)
+            self._limiter.on_throttle()
+            raise UpstreamError(f"YouTube is throttling {endpoint} requests (HTTP {status})")
+
+    def iter_transcript_xml(self, url: str, chunk_size: int = 16384) -> Iterator[bytes]:
+        """
+        Stream transcript XML from a timedtext URL instead of buffering the whole body.
+
+        Args:
+            url: Timedtext XML URL.
+            chunk_size: Bytes per chunk.
+
+        Yields:
+            bytes: Consecutive pieces of the XML document.
+
+        Raises:
+            UpstreamError: If YouTube throttles the request or the circuit is open.
+            Exception: If the request fails.
+        """
+        self._wait_if_needed()
+        endpoint = _endpoint(url)
+        UPSTREAM_REQUESTS.inc(endpoint=endpoint)
+        self._admit()
+        try:
+            response = self.session.get(url, stream=True, timeout=self.timeout)
+        except requests.RequestException as e:
+            self._record(endpoint, None)
+            raise Exception(f"Failed to fetch transcript XML: {e}")
+        except BaseException:
+            # Whatever went wrong, the admitted call must be reported or a half-open slot stays taken
+            self._record(endpoint, None)
+            raise
+        with response:
+            self._record(endpoint, response.status_code)
+            try:
+                response.raise_for_status()
+                yield from response.iter_content(chunk_size)
+            except requests.RequestException as e:
+                raise Exception(f"Failed to fetch transcript XML: {e}")
+
+    def _request_with_retries(self, method: str, url: str, *, use_session: bool = True, **kwargs):
+        """Send session-less requests through the pooled API session, counting attempts and reporting the outcome."""
+        endpoint = _endpoint(url)
+        sent_before = self.requests_sent
+        self._admit()
+        # A pooled extractor is only used by one thread at a time, so swapping is safe
+        browser_session = self.session
+        if not use_session:
+            self.session = self.api_session
+        try:
+            response = super()._request_with_retries(method, url, use_session=True, **kwargs)
+        except BaseException:
+            # Not only request errors: any exception must report the admitted call,
+            # or a half-open breaker keeps its trial slot forever
+            self._record(endpoint, None)
+            raise
+        finally:
+            self.session = browser_session
+            UPSTREAM_REQUESTS.inc(endpoint=endpoint)
+            retries = self.requests_sent - sent_before - 1
+            if retries > 0:
+                UPSTREAM_RETRIES.inc(retries, endpoint=endpoint)
+        self._record(endpoint, response.status_code)
+        return response
+
+
+class ExtractorPool:
+    """
+    Thread-safe pool of extractors, created on demand up to `size`.
+
+    Callers check an extractor out for the duration of one fetch; when all are in
+    use, further callers wait for one to be returned.
+    """
+
+    def __init__(self, size: int, factory: Callable[[], YouTubeTranscriptExtractor]):
+        """
+        Args:
+            size: Maximum number of extractors.
+            factory: Builds a new extractor.
+        """
+        self.size = max(1, size)
+        self._factory = factory
+        self._idle: queue.LifoQueue = queue.LifoQueue()
+        self._created = 0
+        self._lock = threading.Lock()
+
+    def _checkout(self) -> YouTubeTranscriptExtractor:
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+        with self._lock:
+            create = self._created < self.size
+            if create:
+                self._created += 1
+        if create:
+            try:
+                logger.debug("Creating pooled extractor %s/%s", self._created, self.size)
+                return self._factory()
+            except BaseException:
+                with self._lock:
+                    self._created -= 1
+                raise
+        return self._idle.get()
+
+    @contextmanager
+    def extractor(self) -> Iterator[YouTubeTranscriptExtractor]:
+        """
+        Check out an extractor for exclusive use.
+
+        Yields:
+            An extractor, returned to the pool when the block exits.
+        """
+        extractor = self._checkout()
+        try:
+            yield extractor
+        finally:
+            self._idle.put(extractor)
+
+
+def _build_extractor(limiter: TokenBucket, breaker: CircuitBreaker) -> YouTubeTranscriptExtractor:
+    """Create an extractor with the settings the server has always used."""
+    return PooledTranscriptExtractor(
+        limiter,
+        breaker,
+        timeout=30,
+        max_retries=3,
+        backoff_factor=0.75,
+    )
+
+
+_pool: ExtractorPool | None = None
+_pool_lock = threading.Lock()
+
+
+def get_extractor_pool() -> ExtractorPool:
+    """
+    Get the process-wide extractor pool, creating it on first use.
+
+    Returns:
+        The shared ExtractorPool.
+    """
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                limiter, breaker = get_limiter("transcript"), get_breaker("transcript")
+                logger.info("Creating extractor pool of %s", config.EXTRACTOR_POOL_SIZE)
+                _pool = ExtractorPool(config.EXTRACTOR_POOL_SIZE, lambda: _build_extractor(limiter, breaker))
+    return _pool
+
+
+def set_extractor_pool(pool: ExtractorPool | None) -> None:
+    """
+    Replace the process-wide extractor pool, e.g. with one serving stub extractors.
+
+    Args:
+        pool: The pool to use, or None to rebuild from configuration on next use.
+    """
+    global _pool
+    with _pool_lock:
+        _pool = pool
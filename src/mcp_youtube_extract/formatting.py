@@ -0,0 +1,220 @@
+"""
+Output formats for video information and transcripts.
+
+get_yt_video_info can answer as text (the original layout with section
+headers), as compact JSON, or with metadata only. Clients can select fields and
+cap the transcript length. Each response is written in one pass into a single
+buffer; the transcript is copied at most once, and only up to the budget.
+"""
+
+import io
+import json
+from typing import Iterable
+
+OUTPUT_FORMATS = ("text", "json", "metadata")
+# Metadata fields in output order, with their labels in the text format
+METADATA_FIELDS = {
+    "title": "Title",
+    "channel_name": "Channel",
+    "publication_date": "Published",
+    "views": "Views",
+    "description": "Description",
+}
+TRANSCRIPT_FIELD = "transcript"
+FIELDS = (*METADATA_FIELDS, TRANSCRIPT_FIELD)
+
+VIDEO_NOT_FOUND = "Video not found or unavailable."
+NO_TRANSCRIPT = "No transcript available for this video."
+# Prefixes of the messages get_video_transcript returns instead of a transcript
+_TRANSCRIPT_ERRORS = ("Transcript error:", "Could not retrieve")
+
+
+def parse_fields(fields: str | Iterable[str] | None) -> tuple[str, ...]:
+    """
+    Validate a field selection.
+
+    Args:
+        fields: Comma-separated names such as 'title,views', a list of names, or
+            None for all fields.
+
+    Returns:
+        tuple: The selected fields in output order.
+
+    Raises:
+        ValueError: If a field is unknown or none is selected.
+    """
+    if fields is None:
+        return FIELDS
+    if isinstance(fields, str):
+        fields = fields.split(",")
+    selected = {field.strip() for field in fields} - {""}
+    unknown = selected.difference(FIELDS)
+    if unknown:
+        raise ValueError(f"Unknown field(s) {', '.join(sorted(unknown))}; choose from {', '.join(FIELDS)}")
+    if not selected:
+        raise ValueError("fields must name at least one field")
+    return tuple(field for field in FIELDS if field in selected)
+
+
+def wanted_parts(output_format: str, fields: tuple[str, ...]) -> tuple[bool, bool]:
+    """
+    Decide which fetches a response needs.
+
+    Args:
+        output_format: One of OUTPUT_FORMATS.
+        fields: Output of parse_fields.
+
+    Returns:
+        tuple: (metadata needed, transcript needed).
+
+    Raises:
+        ValueError: If the output format is unknown, or the response would be empty.
+    """
+    if output_format not in OUTPUT_FORMATS:
+        raise ValueError(f"Unknown output_format {output_format!r}; choose from {', '.join(OUTPUT_FORMATS)}")
+    wants_metadata = any(field in METADATA_FIELDS for field in fields)
+    wants_transcript = output_format != "metadata" and TRANSCRIPT_FIELD in fields
+    if not (wants_metadata or wants_transcript):
+        raise ValueError(f"output_format {output_format!r} with fields {', '.join(fields)} leaves nothing to return; "
+                         f"select at least one of {', '.join(METADATA_FIELDS)}")
+    return wants_metadata, wants_transcript
+
+
+def _is_transcript_error(transcript: str | None) -> bool:
+    return transcript is not None and transcript.startswith(_TRANSCRIPT_ERRORS)
+
+
+def _truncate(transcript: str, budget: int | None) -> tuple[str, bool]:
+    """Cut a transcript to at most budget characters, at a word boundary when there is one."""
+    if budget is None or len(transcript) <= budget:
+        return transcript, False
+    cut = transcript.rfind(" ", 0, budget + 1)
+    return transcript[:cut if cut > 0 else budget], True
+
+
+def _format_value(video_info: dict, field: str) -> str:
+    if field == "views":
+        return f"{video_info['views']:,}" if video_info.get("views") else "N/A"
+    return str(video_info.get(field, "N/A"))
+
+
+def _write_metadata_text(out: io.StringIO, video_info: dict | None, fields: Iterable[str]) -> None:
+    if not video_info:
+        out.write(VIDEO_NOT_FOUND)
+        return
+    first = True
+    for field in fields:
+        if field in METADATA_FIELDS:
+            if not first:
+                out.write("\n")
+            first = False
+            out.write(METADATA_FIELDS[field])
+            out.write(": ")
+            out.write(_format_value(video_info, field))
+
+
+def format_metadata(video_info: dict | None, fields: Iterable[str] = FIELDS) -> str:
+    """
+    Format video metadata as 'Label: value' lines.
+
+    Args:
+        video_info: Video information in yt-info-extract format, or None.
+        fields: Fields to include, in output order.
+
+    Returns:
+        str: The lines, or a not-found message.
+    """
+    out = io.StringIO()
+    _write_metadata_text(out, video_info, fields)
+    return out.getvalue()
+
+
+def _write_text(
+    out: io.StringIO, video_info: dict | None, transcript: str | None, fields: tuple[str, ...],
+    with_transcript: bool, budget: int | None,
+) -> None:
+    wants_metadata = any(field in METADATA_FIELDS for field in fields)
+    if wants_metadata:
+        out.write("=== VIDEO INFORMATION ===\n")
+        _write_metadata_text(out, video_info, fields)
+        if with_transcript:
+            out.write("\n\n")
+    if not with_transcript:
+        return
+    out.write("=== TRANSCRIPT ===\n")
+    if _is_transcript_error(transcript):
+        out.write("Transcript issue: ")
+        out.write(transcript)
+    elif not transcript:
+        out.write(NO_TRANSCRIPT)
+    else:
+        text, truncated = _truncate(transcript, budget)
+        out.write(text)
+        if truncated:
+            out.write(f" [... truncated, {len(transcript) - len(text)} more characters]")
+
+
+def _write_json(
+    out: io.StringIO, video_id: str, video_info: dict | None, transcript: str | None, fields: tuple[str, ...],
+    with_transcript: bool, budget: int | None,
+) -> None:
+    def member(key: str, value) -> None:
+        out.write(",")
+        out.write(json.dumps(key))
+        out.write(":")
+        out.write(json.dumps(value, ensure_ascii=False, default=str))
+
+    out.write('{"video_id":')
+    out.write(json.dumps(video_id))
+    if any(field in METADATA_FIELDS for field in fields):
+        if video_info:
+            for field in fields:
+                if field in METADATA_FIELDS:
+                    member(field, video_info.get(field))
+        else:
+            member("error", VIDEO_NOT_FOUND)
+    if with_transcript:
+        if _is_transcript_error(transcript):
+            member("transcript_error", transcript)
+        elif not transcript:
+            member("transcript", None)
+        else:
+            text, truncated = _truncate(transcript, budget)
+            member("transcript", text)
+            if truncated:
+                member("transcript_chars", len(transcript))
+    out.write("}")
+
+
+def render_video(
+    video_id: str,
+    video_info: dict | None,
+    transcript: str | None,
+    output_format: str = "text",
+    fields: tuple[str, ...] = FIELDS,
+    max_transcript_chars: int | None = None,
+) -> str:
+    """
+    Render video information and transcript in one of the output formats.
+
+    Args:
+        video_id (str): The YouTube video ID.
+        video_info (dict): Video information, or None if unavailable.
+        transcript (str): Transcript text or error message, or None if unavailable.
+        output_format (str): 'text', 'json' (compact, one object) or 'metadata' (text without the transcript).
+        fields (tuple): Output of parse_fields.
+        max_transcript_chars (int): Transcript budget; longer transcripts are cut at a word boundary.
+
+    Returns:
+        str: The response.
+
+    Raises:
+        ValueError: If the output format is unknown, or the selection leaves nothing to render.
+    """
+    _, with_transcript = wanted_parts(output_format, fields)
+    out = io.StringIO()
+    if output_format == "json":
+        _write_json(out, video_id, video_info, transcript, fields, with_transcript, max_transcript_chars)
+    else:
+        _write_text(out, video_info, transcript, fields, with_transcript, max_transcript_chars)
+    return out.getvalue()
@@ -1,42 +1,167 @@
 """
 yt-info-extract utilities for fetching YouTube video information.
+
+Cached metadata is fresh for as long as the fields a caller needs are: view
+counts go stale after YOUTUBE_CACHE_VIEWS_TTL, most other fields after
+YOUTUBE_CACHE_INFO_TTL. A stale entry is still returned at once, and one
+background refresh per video (across all workers sharing the cache) replaces it.
 """
 
-from yt_info_extract import get_video_info as yt_get_video_info
+import math
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from typing import Iterable
+
+from . import config
+from .cache import get_cache, DiskCache, MISS
+from .singleflight import in_flight
+from .metrics import span, CACHE_REFRESHES, UPSTREAM_REQUESTS
+from .ratelimit import UpstreamError
+from .formatting import format_metadata
+from .video_id import normalize_video_id
 from .logger import get_logger
 
 logger = get_logger(__name__)
 
+# Fields that do not change after publication; fresh for as long as the entry is kept
+_FIXED_FIELDS = frozenset({"publication_date", "extraction_method"})
+# Threads refreshing stale entries
+_REFRESH_WORKERS = 2
 
-def get_video_info(api_key: str, video_id: str) -> dict | None:
-    """
-    Fetch detailed information about a YouTube video using yt-info-extract.
-    
-    Args:
-        api_key (str): YouTube Data API v3 key (optional with yt-info-extract).
-        video_id (str): The YouTube video ID.
+_refresher: ThreadPoolExecutor | None = None
+_refresh_lock = threading.Lock()
+_pending_refreshes: set[Future] = set()
 
-    Returns:
-        dict: Video information in yt-info-extract format, or None if an error occurs.
-    """
+
+def yt_get_video_info(video_id: str) -> dict | None:
+    """Look up video information with yt-info-extract, importing the library on first use."""
+    # Deferred: yt-info-extract pulls in yt-dlp, pytubefix and the Google API client
+    from .info_extractor import get_video_info
+
+    return get_video_info(video_id)
+
+
+def _fetch_video_info(video_id: str, cache) -> dict | None:
+    """Fetch video information from yt-info-extract and record the outcome in the cache."""
     try:
-        logger.info(f"Fetching video info for: {video_id}")
+        logger.info("Fetching video info for: %s", video_id)
         
         # Use yt-info-extract to get video information
-        video_info = yt_get_video_info(video_id)
+        UPSTREAM_REQUESTS.inc(endpoint="video_info")
+        with span("info.fetch"):
+            video_info = yt_get_video_info(video_id)
         
         if not video_info:
             logger.warning("Video not found.")
+            if cache is not None:
+                cache.set("info", video_id, None, ttl=config.CACHE_NEGATIVE_TTL)
             return None
 
-        logger.info(f"Successfully fetched video: '{video_info.get('title', 'Unknown')}'")
+        logger.info("Successfully fetched video: '%s'", video_info.get('title', 'Unknown'))
+        if cache is not None:
+            cache.set("info", video_id, video_info, ttl=config.CACHE_INFO_MAX_AGE)
         return video_info
 
+    except UpstreamError:
+        # Not "video not found": let the caller say that YouTube is throttling
+        raise
     except Exception as e:
-        logger.error(f"An error occurred: {e}")
+        logger.error("An error occurred: %s", e)
         return None
 
 
+def field_ttl(field: str) -> float:
+    """Seconds a cached metadata field stays fresh."""
+    if field == "views":
+        return config.CACHE_VIEWS_TTL
+    if field in _FIXED_FIELDS:
+        return config.CACHE_INFO_MAX_AGE
+    return config.CACHE_INFO_TTL
+
+
+def _refresh_video_info(video_id: str, cache: DiskCache) -> None:
+    """Fetch video information again and replace a stale cache entry, keeping it if the fetch fails."""
+    try:
+        logger.info("Refreshing stale video info for: %s", video_id)
+        UPSTREAM_REQUESTS.inc(endpoint="video_info")
+        with span("info.refresh"):
+            video_info = yt_get_video_info(video_id)
+    except Exception as e:
+        video_info = None
+        logger.warning("Could not refresh video info for %s: %s", video_id, e)
+    if not video_info:
+        # More likely a failed lookup than a deleted video: serve the stale entry
+        # until the claim lapses and a later lookup tries again
+        CACHE_REFRESHES.inc(kind="info", outcome="error")
+        return
+    cache.set("info", video_id, video_info, ttl=config.CACHE_INFO_MAX_AGE)
+    CACHE_REFRESHES.inc(kind="info", outcome="ok")
+
+
+def _refresh_in_background(video_id: str, cache: DiskCache) -> None:
+    """Queue a refresh of a stale entry, unless another thread or worker is already refreshing it."""
+    global _refresher
+    # The claim lasts as long as a fetch may, so a lost refresh is retried after that
+    if not cache.claim("info", video_id, config.INFO_TIMEOUT):
+        return
+    with _refresh_lock:
+        if _refresher is None:
+            _refresher = ThreadPoolExecutor(max_workers=_REFRESH_WORKERS, thread_name_prefix="yt-refresh")
+        future = _refresher.submit(_refresh_video_info, video_id, cache)
+        _pending_refreshes.add(future)
+    future.add_done_callback(_forget_refresh)
+
+
+def _forget_refresh(future: Future) -> None:
+    with _refresh_lock:
+        _pending_refreshes.discard(future)
+
+
+def wait_for_refreshes(timeout: float | None = None) -> None:
+    """Wait until queued background refreshes have finished."""
+    with _refresh_lock:
+        pending = list(_pending_refreshes)
+    wait(pending, timeout)
+
+
+def get_video_info(api_key: str, video_id: str, fields: Iterable[str] | None = None) -> dict | None:
+    """
+    Fetch detailed information about a YouTube video using yt-info-extract.
+    Results, including "not found", are served from the persistent cache. A cached
+    entry whose fields have gone stale is returned as well and refreshed in the
+    background. Concurrent calls for an uncached video share a single upstream fetch.
+    
+    Args:
+        api_key (str): YouTube Data API v3 key (optional with yt-info-extract).
+        video_id (str): The YouTube video ID or URL.
+        fields: Fields the caller needs, which decide when a cached entry is stale;
+            defaults to all fields of the entry.
+
+    Returns:
+        dict: Video information in yt-info-extract format, or None if an error occurs.
+
+    Raises:
+        InvalidVideoIdError: If video_id is not a video ID or URL; no request is made.
+        UpstreamError: If YouTube is throttling metadata lookups, so that callers
+            can report it instead of "not found".
+    """
+    video_id = normalize_video_id(video_id)
+    cache = get_cache()
+    if cache is not None:
+        entry = cache.get_entry("info", video_id)
+        if entry is not MISS:
+            video_info, age = entry
+            # Negative results simply expire; there is nothing to keep serving
+            if video_info is None or age < min(map(field_ttl, fields or video_info), default=math.inf):
+                logger.info("Cache hit for video info: %s", video_id)
+            else:
+                logger.info("Serving stale video info for %s (%.0f s old)", video_id, age)
+                _refresh_in_background(video_id, cache)
+            return video_info
+
+    return in_flight.do(("info", video_id), _fetch_video_info, video_id, cache)
+
+
 def format_video_info(video_info: dict | None) -> str:
     """Format video information into a readable string."""
     if not video_info:
@@ -44,13 +169,6 @@ def format_video_info(video_info: dict | None) -> str:
         return "Video not found or unavailable."
     
     # yt-info-extract returns data in different format than Google API
-    result = []
-    result.append(f"Title: {video_info.get('title', 'N/A')}")
-    result.append(f"Channel: {video_info.get('channel_name', 'N/A')}")
-    result.append(f"Published: {video_info.get('publication_date', 'N/A')}")
-    result.append(f"Views: {video_info.get('views', 'N/A'):,}" if video_info.get('views') else "Views: N/A")
-    result.append(f"Description: {video_info.get('description', 'N/A')}")
-    
-    formatted_info = "\n".join(result)
-    logger.debug(f"Formatted video info: {len(formatted_info)} characters")
+    formatted_info = format_metadata(video_info)
+    logger.debug("Formatted video info: %s characters", len(formatted_info))
     return formatted_info
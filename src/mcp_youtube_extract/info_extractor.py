@@ -0,0 +1,283 @@
+"""
+Video information lookups that back off when YouTube throttles.
+
+yt-info-extract walks every strategy (Data API, yt-dlp, pytubefix) with several
+retries each, so a throttled lookup turns into many more requests and a slow
+failure, and its strategies log every error and return None, which hides a
+throttled answer behind "not found". This extractor runs the same strategies in
+the same order, calling the libraries yt-info-extract installs directly rather
+than through its private methods. It takes a token from a shared adaptive
+limiter before every attempt and reports each outcome to a shared circuit
+breaker; on the first throttled answer it stops, instead of moving on to the
+next attempt or strategy.
+"""
+
+import importlib.util
+import os
+import re
+import time
+from datetime import datetime
+
+import yt_dlp
+
+from .ratelimit import CircuitBreaker, TokenBucket, UpstreamError, get_breaker, get_limiter, is_throttling_status
+from .metrics import UPSTREAM_THROTTLED
+from .logger import get_logger
+
+logger = get_logger(__name__)
+
+# yt-dlp and urllib put the status in the message, e.g. "HTTP Error 429: Too Many Requests"
+_HTTP_ERROR = re.compile(r"HTTP Error (\d{3})")
+# yt-dlp's wording when YouTube answers a throttled client with a bot check
+_BOT_CHECK = "confirm you're not a bot"
+
+
+def throttling_status(error: Exception) -> int | None:
+    """
+    Find the HTTP status behind an extraction error if it asks us to back off.
+
+    Args:
+        error: Exception raised by one of the yt-info-extract strategies.
+
+    Returns:
+        The 429 or 5xx status, 429 for a bot check, or None for other errors.
+    """
+    # urllib's HTTPError.code, googleapiclient's HttpError.resp.status, requests' response.status_code
+    candidates = [
+        getattr(error, "code", None),
+        getattr(error, "status", None),
+        getattr(getattr(error, "resp", None), "status", None),
+        getattr(getattr(error, "response", None), "status_code", None),
+    ]
+    match = _HTTP_ERROR.search(str(error))
+    if match:
+        candidates.append(match.group(1))
+    for candidate in candidates:
+        try:
+            status = int(candidate)
+        except (TypeError, ValueError):
+            continue
+        if is_throttling_status(status):
+            return status
+    if _BOT_CHECK in str(error):
+        return 429
+    return None
+
+
+class GuardedVideoInfoExtractor:
+    """Looks videos up like yt-info-extract, with every attempt going through a shared limiter and circuit breaker."""
+
+    STRATEGIES = ("api", "yt_dlp", "pytubefix")
+
+    def __init__(
+        self,
+        limiter: TokenBucket,
+        breaker: CircuitBreaker,
+        *,
+        api_key: str | None = None,
+        strategy: str = "auto",
+        max_retries: int = 3,
+        backoff_factor: float = 0.75,
+    ):
+        """
+        Args:
+            limiter: Token bucket shared by all metadata lookups.
+            breaker: Circuit breaker shared by all metadata lookups.
+            api_key: YouTube Data API v3 key; defaults to YOUTUBE_API_KEY. Without one the Data API is skipped.
+            strategy: "auto" to try the Data API, yt-dlp and pytubefix in turn, or one of them.
+            max_retries: Attempts per strategy for errors other than throttling.
+            backoff_factor: Base of the exponential delay between attempts.
+
+        Raises:
+            ValueError: If the strategy is unknown.
+        """
+        if strategy != "auto" and strategy not in self.STRATEGIES:
+            raise ValueError(f"Invalid strategy. Must be one of: {['auto', *self.STRATEGIES]}")
+        self._limiter = limiter
+        self._breaker = breaker
+        self.strategy = strategy
+        self.max_retries = max(1, max_retries)
+        self.backoff_factor = backoff_factor
+        self.youtube_service = None
+        api_key = api_key or os.environ.get("YOUTUBE_API_KEY")
+        if api_key:
+            try:
+                from googleapiclient.discovery import build
+
+                self.youtube_service = build("youtube", "v3", developerKey=api_key)
+            except Exception as e:
+                logger.warning("Failed to initialize YouTube API service: %s", e)
+
+    def get_video_info(self, video_id: str) -> dict | None:
+        """
+        Look a video up, trying each strategy in turn until one finds it.
+
+        Args:
+            video_id: YouTube video ID.
+
+        Returns:
+            Video information in yt-info-extract format, or None if not found.
+
+        Raises:
+            UpstreamError: If YouTube throttled a lookup (CircuitOpenError while the breaker is open).
+        """
+        if self.strategy != "auto":
+            strategies = [self.strategy]
+        else:
+            # The Data API needs a key and pytubefix is optional
+            available = {
+                "api": self.youtube_service is not None,
+                "yt_dlp": True,
+                "pytubefix": importlib.util.find_spec("pytubefix") is not None,
+            }
+            strategies = [strategy for strategy in self.STRATEGIES if available[strategy]]
+        for strategy in strategies:
+            logger.info("Attempting extraction with strategy: %s", strategy)
+            result = self._extract_with_retry(video_id, strategy)
+            if result:
+                logger.info("Successfully extracted info for video %s using %s", video_id, result.get("extraction_method"))
+                return result
+        logger.error("Failed to extract video information for %s", video_id)
+        return None
+
+    def _get_video_info_api(self, video_id: str) -> dict | None:
+        """
+        Look a video up with the YouTube Data API v3.
+
+        Returns:
+            Video information, or None if there is no API key or no such video.
+
+        Raises:
+            googleapiclient.errors.HttpError: If the request failed, e.g. with 429 when throttled.
+        """
+        if not self.youtube_service:
+            logger.error("YouTube API service not available")
+            return None
+        response = self.youtube_service.videos().list(part="snippet,statistics", id=video_id).execute()
+        if not response.get("items"):
+            logger.warning("No video found with ID: %s", video_id)
+            return None
+        snippet = response["items"][0].get("snippet", {})
+        statistics = response["items"][0].get("statistics", {})
+        return {
+            "title": snippet.get("title"),
+            "description": snippet.get("description"),
+            "channel_name": snippet.get("channelTitle"),
+            "publication_date": snippet.get("publishedAt"),
+            "views": int(statistics["viewCount"]) if statistics.get("viewCount") else None,
+            "extraction_method": "youtube_api",
+        }
+
+    def _get_video_info_yt_dlp(self, video_id: str) -> dict | None:
+        """
+        Look a video up with yt-dlp.
+
+        Returns:
+            Video information.
+
+        Raises:
+            yt_dlp.utils.DownloadError: If the page could not be read, including when YouTube throttles.
+        """
+        with yt_dlp.YoutubeDL({"quiet": True, "no_warnings": True}) as ydl:
+            info = ydl.sanitize_info(ydl.extract_info(f"https://www.youtube.com/watch?v={video_id}", download=False))
+        upload_date = info.get("upload_date")
+        return {
+            "title": info.get("title"),
+            "description": info.get("description"),
+            "channel_name": info.get("channel") or info.get("uploader"),
+            "publication_date": datetime.strptime(upload_date, "%Y%m%d").isoformat() if upload_date else None,
+            "views": info.get("view_count"),
+            "extraction_method": "yt_dlp",
+        }
+
+    def _get_video_info_pytubefix(self, video_id: str) -> dict | None:
+        """
+        Look a video up with pytubefix, if it is installed.
+
+        Returns:
+            Video information, or None without pytubefix.
+
+        Raises:
+            Exception: Whatever pytubefix raises when the page could not be read.
+        """
+        try:
+            from pytubefix import YouTube
+        except ImportError:
+            logger.error("pytubefix is not available")
+            return None
+        yt = YouTube(f"https://www.youtube.com/watch?v={video_id}")
+        return {
+            "title": yt.title,
+            "description": yt.description,
+            "channel_name": yt.author,
+            "publication_date": yt.publish_date.isoformat() if yt.publish_date else None,
+            "views": yt.views,
+            "extraction_method": "pytubefix",
+        }
+
+    def _extract_with_retry(self, video_id: str, strategy: str) -> dict | None:
+        """
+        Run one strategy with retries, stopping early when YouTube throttles.
+
+        Args:
+            video_id: YouTube video ID.
+            strategy: "api", "yt_dlp" or "pytubefix".
+
+        Returns:
+            Video information, or None if this strategy found nothing.
+
+        Raises:
+            UpstreamError: If YouTube throttled the attempt (CircuitOpenError while the breaker is open).
+        """
+        extract = {
+            "api": self._get_video_info_api,
+            "yt_dlp": self._get_video_info_yt_dlp,
+            "pytubefix": self._get_video_info_pytubefix,
+        }[strategy]
+        for attempt in range(self.max_retries):
+            self._breaker.check()
+            self._limiter.acquire()
+            self._breaker.allow()
+            try:
+                result = extract(video_id)
+            except Exception as e:
+                status = throttling_status(e)
+                if status is not None:
+                    UPSTREAM_THROTTLED.inc(endpoint="video_info")
+                    self._limiter.on_throttle()
+                    self._breaker.record_failure()
+                    raise UpstreamError(f"YouTube is throttling video info requests (HTTP {status})") from e
+                logger.warning("Attempt %s failed with %s: %s", attempt + 1, strategy, e)
+                result = None
+            except BaseException:
+                # Report the admitted call even when interrupted, so a half-open slot is not kept
+                self._breaker.record_failure()
+                raise
+            # Anything but throttling means YouTube answered
+            self._limiter.on_success()
+            self._breaker.record_success()
+            if result:
+                return result
+            if attempt < self.max_retries - 1:
+                # Same backoff as yt-info-extract
+                delay = self.backoff_factor ** attempt
+                logger.info("Retrying in %.2f seconds...", delay)
+                time.sleep(delay)
+        return None
+
+
+def get_video_info(video_id: str) -> dict | None:
+    """
+    Look up video information with the shared 'info' limiter and breaker.
+
+    Args:
+        video_id: YouTube video ID.
+
+    Returns:
+        Video information in yt-info-extract format, or None if not found.
+
+    Raises:
+        UpstreamError: If YouTube throttled the lookup or its circuit is open.
+    """
+    extractor = GuardedVideoInfoExtractor(get_limiter("info"), get_breaker("info"))
+    return extractor.get_video_info(video_id)
@@ -1,15 +1,25 @@
 """
 Centralized logger - provides consistent logging across all modules
+
+Log calls only put records on a queue; a background thread formats them and
+writes them to the rotating log file and the console, flushing once per batch
+rather than once per record, so tool calls never wait on disk I/O. The log file
+and writer thread are set up when the first record is logged, not on import.
 """
 
+import atexit
 import logging
+import queue
+import threading
+from logging.handlers import QueueHandler, RotatingFileHandler
 from pathlib import Path
 from typing import Optional, Dict, Any
 
-# Create logs directory if it doesn't exist
+from . import config
+
+# Log directory, created when the first record is written
 # Go up to project root: src/mcp_youtube_extract/logger.py -> src/mcp_youtube_extract -> src -> project_root (mcp_youtube_extract)
 log_dir = Path(__file__).parent.parent.parent / "logs"
-log_dir.mkdir(exist_ok=True)
 log_file = log_dir / "mcp_youtube_extract.log"
 
 # Define a formatter that includes filename and line number
@@ -25,22 +35,192 @@ DEBUG_FORMATTER = logging.Formatter(
 # Root logger for the package
 ROOT_LOGGER_NAME = "mcp_youtube_extract"
 
+# Most records handed to the handlers between two flushes
+WRITE_BATCH_SIZE = 256
+
+
+class BatchingRotatingFileHandler(RotatingFileHandler):
+    """
+    RotatingFileHandler that leaves flushing to its writer.
+
+    The stock handler flushes after every record; here records collect in the file
+    buffer until flush_batch is called, once per batch of records.
+    """
+
+    def flush(self) -> None:
+        """Called after each record by StreamHandler.emit; deliberately deferred."""
+
+    def flush_batch(self) -> None:
+        """Write buffered records to disk."""
+        super().flush()
+
+    def close(self) -> None:
+        self.flush_batch()
+        super().close()
+
+
+class DroppingQueueHandler(QueueHandler):
+    """
+    QueueHandler that counts and drops records when the queue is full instead of blocking.
+
+    Records are queued as they are, so the message is formatted on the writer
+    thread rather than by the caller. Log arguments must not be mutated after the
+    call, which holds for the strings, numbers and exceptions logged here.
+    """
+
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+class BackgroundLogWriter:
+    """
+    Drains a queue of log records on a daemon thread.
+
+    Records are taken in batches of up to batch_size: each record goes to every
+    handler whose level admits it, then every handler is flushed once.
+    """
+
+    _STOP = object()
+
+    def __init__(self, log_queue: queue.Queue, handlers: list[logging.Handler], batch_size: int = WRITE_BATCH_SIZE):
+        """
+        Args:
+            log_queue: Queue filled by a DroppingQueueHandler.
+            handlers: Handlers that format and write the records.
+            batch_size: Most records written between two flushes.
+        """
+        self.queue = log_queue
+        self.handlers = handlers
+        self.batch_size = batch_size
+        self._thread: threading.Thread | None = None
+        self._lock = threading.Lock()
+
+    def start(self) -> None:
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="log-writer", daemon=True)
+                self._thread.start()
+
+    def stop(self, timeout: float = 5.0) -> None:
+        """Write out every queued record, then stop the writer thread."""
+        with self._lock:
+            thread, self._thread = self._thread, None
+        if thread is None:
+            return
+        # Blocking put: the stop marker must not be dropped on a full queue
+        self.queue.put(self._STOP)
+        thread.join(timeout)
+
+    def _run(self) -> None:
+        while True:
+            batch = [self.queue.get()]
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self.queue.get_nowait())
+                except queue.Empty:
+                    break
+            stopping = self._write(batch)
+            if stopping:
+                return
+
+    def _write(self, batch: list) -> bool:
+        stopping = False
+        for record in batch:
+            if record is self._STOP:
+                stopping = True
+                continue
+            for handler in self.handlers:
+                if record.levelno >= handler.level:
+                    handler.handle(record)
+        for handler in self.handlers:
+            flush = getattr(handler, "flush_batch", handler.flush)
+            try:
+                flush()
+            except (OSError, ValueError):
+                # The stream was closed under us, e.g. stderr during interpreter shutdown
+                pass
+        return stopping
+
+
+# Background writer, started by configure_logging
+writer: BackgroundLogWriter | None = None
+_setup_lock = threading.Lock()
+
+
+def configure_logging() -> BackgroundLogWriter:
+    """
+    Create the log directory, open the log file and start the background writer.
+
+    Runs once; it is triggered by the first record that reaches the package root
+    logger, so importing the package does not touch the filesystem.
+
+    Returns:
+        The running BackgroundLogWriter.
+    """
+    global writer
+    with _setup_lock:
+        if writer is not None:
+            return writer
+
+        log_dir.mkdir(exist_ok=True)
+
+        # File handler, rotated by size
+        file_handler = BatchingRotatingFileHandler(
+            log_file, maxBytes=config.LOG_MAX_BYTES, backupCount=config.LOG_BACKUPS
+        )
+        file_handler.setFormatter(FORMATTER)
+
+        # Console handler - only show warnings and errors by default
+        console_handler = logging.StreamHandler()
+        console_handler.setFormatter(FORMATTER)
+        console_handler.setLevel(logging.ERROR)
+
+        log_queue = queue.Queue(maxsize=config.LOG_QUEUE_SIZE)
+        started = BackgroundLogWriter(log_queue, [file_handler, console_handler])
+        started.start()
+        # Registered after logging's own shutdown hook, so it runs first and the
+        # file handler is still open while the queue drains
+        atexit.register(started.stop)
+
+        # Swap in a new list rather than mutating the one callHandlers may be iterating
+        root_logger.handlers = [DroppingQueueHandler(log_queue)]
+        writer = started
+        return writer
+
+
+class _DeferredSetupHandler(logging.Handler):
+    """Placeholder on the root logger that configures logging when the first record arrives."""
+
+    def handle(self, record: logging.LogRecord) -> bool:
+        configure_logging()
+        for handler in root_logger.handlers:
+            if handler is not self and record.levelno >= handler.level:
+                handler.handle(record)
+        return True
+
+    def emit(self, record: logging.LogRecord) -> None:
+        self.handle(record)
+
+
 # Configure root logger once
 root_logger = logging.getLogger(ROOT_LOGGER_NAME)
 root_logger.setLevel(logging.INFO)
+# Records still propagate, as they always have, so host applications and test
+# capture see them; only this logger's own handler is queued
 
 # Prevent adding handlers multiple times
 if not root_logger.handlers:
-    # File handler
-    file_handler = logging.FileHandler(log_file)
-    file_handler.setFormatter(FORMATTER)
-    root_logger.addHandler(file_handler)
-    
-    # Console handler - only show warnings and errors by default
-    console_handler = logging.StreamHandler()
-    console_handler.setFormatter(FORMATTER)
-    console_handler.setLevel(logging.ERROR)
-    root_logger.addHandler(console_handler)
+    root_logger.addHandler(_DeferredSetupHandler())
 
 
 def get_logger(module_name: str) -> logging.Logger:
@@ -69,7 +249,7 @@ def set_log_level(level: int) -> None:
     root_logger.setLevel(level)
     
     # Update file handler level
-    for handler in root_logger.handlers:
+    for handler in configure_logging().handlers:
         if isinstance(handler, logging.FileHandler):
             handler.setLevel(level)
             # If DEBUG level, use more detailed formatter
@@ -89,7 +269,7 @@ def log_dict(logger_instance: logging.Logger, level: int, message: str, data: Di
         message: Message to include
         data: Dictionary to log
     """
-    logger_instance.log(level, f"{message}: {data}")
+    logger_instance.log(level, "%s: %s", message, data)
 
 
 def log_exception(logger_instance: logging.Logger, message: str, exc_info: Optional[bool] = True) -> None:
@@ -101,4 +281,4 @@ def log_exception(logger_instance: logging.Logger, message: str, exc_info: Optio
         message: Message to include
         exc_info: Whether to include exception info (defaults to True)
     """
-    logger_instance.exception(message, exc_info=exc_info) 
+    logger_instance.exception(message, exc_info=exc_info)
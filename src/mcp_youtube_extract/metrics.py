@@ -0,0 +1,241 @@
+"""
+Lightweight in-process metrics: counters, latency histograms and timing spans.
+
+Spans time one stage of a tool call, record it in the stage histogram and, at
+DEBUG level, log it under its parent spans (e.g. 'tool.get_yt_video_info/
+transcript.download'). Aggregates are exported as a dict for the metrics tool
+and in the Prometheus text exposition format.
+"""
+
+import logging
+import threading
+import time
+from bisect import bisect_left
+from contextvars import ContextVar
+
+from . import config
+from .logger import get_logger
+
+logger = get_logger(__name__)
+
+PREFIX = "mcp_youtube_"
+
+# Upper bounds in seconds, from fast cache hits to slow upstream calls
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+
+def _label_key(labels: dict) -> tuple:
+    return tuple(sorted(labels.items()))
+
+
+def _format_labels(key: tuple, extra: str = "") -> str:
+    parts = [f'{name}="{str(value)}"' for name, value in key]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+class Counter:
+    """Monotonic counter, one value per label combination."""
+
+    def __init__(self, name: str, help: str):
+        self.name = name
+        self.help = help
+        self._values: dict[tuple, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1, **labels) -> None:
+        if not config.METRICS_ENABLED:
+            return
+        key = _label_key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels) -> float:
+        """Current value for one label combination."""
+        with self._lock:
+            return self._values.get(_label_key(labels), 0)
+
+    def snapshot(self) -> list[dict]:
+        with self._lock:
+            return [{"labels": dict(key), "value": value} for key, value in sorted(self._values.items())]
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {PREFIX}{self.name} {self.help}", f"# TYPE {PREFIX}{self.name} counter"]
+        with self._lock:
+            for key, value in sorted(self._values.items()):
+                lines.append(f"{PREFIX}{self.name}{_format_labels(key)} {value:g}")
+        return lines
+
+    def reset(self) -> None:
+        with self._lock:
+            self._values.clear()
+
+
+class Histogram:
+    """Bucketed distribution of observed values, one series per label combination."""
+
+    def __init__(self, name: str, help: str, buckets: tuple = LATENCY_BUCKETS):
+        self.name = name
+        self.help = help
+        self.buckets = tuple(buckets)
+        # Per series: [per-bucket counts (last one is +Inf), sum]
+        self._series: dict[tuple, list] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels) -> None:
+        if not config.METRICS_ENABLED:
+            return
+        key = _label_key(labels)
+        slot = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [[0] * (len(self.buckets) + 1), 0.0]
+            series[0][slot] += 1
+            series[1] += value
+
+    def count(self, **labels) -> int:
+        """Number of observations for one label combination."""
+        with self._lock:
+            series = self._series.get(_label_key(labels))
+            return sum(series[0]) if series else 0
+
+    def _quantile(self, counts: list[int], total: int, q: float) -> float:
+        """Upper bound of the bucket holding the q-th observation."""
+        rank = q * total
+        seen = 0
+        for bound, n in zip(self.buckets, counts):
+            seen += n
+            if seen >= rank:
+                return bound
+        return float("inf")
+
+    def snapshot(self) -> list[dict]:
+        rows = []
+        with self._lock:
+            items = [(key, list(counts), total) for key, (counts, total) in sorted(self._series.items())]
+        for key, counts, total in items:
+            n = sum(counts)
+            rows.append({
+                "labels": dict(key),
+                "count": n,
+                "sum": total,
+                "mean": total / n if n else 0.0,
+                "p50": self._quantile(counts, n, 0.5),
+                "p90": self._quantile(counts, n, 0.9),
+                "p99": self._quantile(counts, n, 0.99),
+            })
+        return rows
+
+    def render(self) -> list[str]:
+        name = PREFIX + self.name
+        lines = [f"# HELP {name} {self.help}", f"# TYPE {name} histogram"]
+        with self._lock:
+            items = [(key, list(counts), total) for key, (counts, total) in sorted(self._series.items())]
+        for key, counts, total in items:
+            cumulative = 0
+            for bound, n in zip(self.buckets, counts):
+                cumulative += n
+                le = 'le="%g"' % bound
+                lines.append(f"{name}_bucket{_format_labels(key, le)} {cumulative}")
+            cumulative += counts[-1]
+            le = 'le="+Inf"'
+            lines.append(f"{name}_bucket{_format_labels(key, le)} {cumulative}")
+            lines.append(f"{name}_sum{_format_labels(key)} {total:g}")
+            lines.append(f"{name}_count{_format_labels(key)} {cumulative}")
+        return lines
+
+    def reset(self) -> None:
+        with self._lock:
+            self._series.clear()
+
+
+STAGE_SECONDS = Histogram("stage_seconds", "Time spent in each stage of a tool call, by stage and outcome.")
+UPSTREAM_REQUESTS = Counter("upstream_requests_total", "Requests to YouTube, by endpoint; retries not included.")
+UPSTREAM_RETRIES = Counter("upstream_retries_total", "Repeated attempts after a failed request to YouTube, by endpoint.")
+CACHE_LOOKUPS = Counter("cache_lookups_total", "Cache lookups by kind, tier (memory or disk) and result.")
+CACHE_REFRESHES = Counter("cache_refreshes_total", "Stale cache entries refreshed in the background, by kind and outcome.")
+COALESCED_CALLS = Counter("coalesced_calls_total", "Callers served by another caller's in-flight fetch, by kind.")
+RATE_LIMIT_WAIT = Histogram("rate_limit_wait_seconds", "Time spent waiting for the upstream rate limiter.")
+UPSTREAM_THROTTLED = Counter("upstream_throttled_total", "Requests to YouTube answered with throttling (429 or 5xx), by endpoint.")
+CIRCUIT_REJECTED = Counter("circuit_rejected_total", "Calls failed without contacting YouTube because a circuit was open, by upstream.")
+
+_METRICS = (
+    STAGE_SECONDS, UPSTREAM_REQUESTS, UPSTREAM_RETRIES, CACHE_LOOKUPS, CACHE_REFRESHES, COALESCED_CALLS, RATE_LIMIT_WAIT,
+    UPSTREAM_THROTTLED, CIRCUIT_REJECTED,
+)
+
+_current_span: ContextVar[str | None] = ContextVar("current_span", default=None)
+
+
+class Span:
+    """
+    Times a stage of a tool call as a context manager.
+
+    Records the duration in the stage histogram, labelled with the stage and with
+    outcome 'ok' or 'error' depending on whether the block raised.
+    """
+
+    __slots__ = ("stage", "_start", "_token")
+
+    def __init__(self, stage: str):
+        self.stage = stage
+
+    def __enter__(self) -> "Span":
+        parent = _current_span.get()
+        self._token = _current_span.set(self.stage if parent is None else f"{parent}/{self.stage}")
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        elapsed = time.perf_counter() - self._start
+        path = _current_span.get()
+        _current_span.reset(self._token)
+        outcome = "ok" if exc_type is None else "error"
+        STAGE_SECONDS.observe(elapsed, stage=self.stage, outcome=outcome)
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Span %s took %.2f ms (%s)", path, elapsed * 1000, outcome)
+
+
+def span(stage: str) -> Span:
+    """
+    Time a stage of a tool call.
+
+    Args:
+        stage: Stage name, e.g. 'transcript.download'.
+
+    Returns:
+        Span: Context manager timing the block.
+    """
+    return Span(stage)
+
+
+def snapshot() -> dict:
+    """
+    Current aggregates of every metric.
+
+    Returns:
+        dict: Metric name to a list of series; counters carry 'value', histograms
+        carry count, sum, mean and bucket-based p50/p90/p99 estimates in seconds.
+    """
+    return {metric.name: metric.snapshot() for metric in _METRICS}
+
+
+def render_prometheus() -> str:
+    """
+    Render every metric in the Prometheus text exposition format.
+
+    Returns:
+        str: The exposition text, ending with a newline.
+    """
+    lines = []
+    for metric in _METRICS:
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+
+def reset_metrics() -> None:
+    """Clear every counter and histogram."""
+    for metric in _METRICS:
+        metric.reset()
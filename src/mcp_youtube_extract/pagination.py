@@ -0,0 +1,121 @@
+"""
+Cursor-based pagination over cached transcripts.
+
+A cursor records the video, the language selector and the index of the next
+segment, so every page after the first is cut from the cached transcript
+instead of being fetched again. Only the blocks of the cached transcript that
+hold a page are decompressed.
+"""
+
+import base64
+import json
+
+from .segments import SegmentIndex
+from .transcript_file import TranscriptFile
+from .logger import get_logger
+
+logger = get_logger(__name__)
+
+# Rough size of a token, used when chunk sizes are given in tokens
+CHARS_PER_TOKEN = 4
+
+
+def encode_cursor(video_id: str, language: str, position: int) -> str:
+    """
+    Build an opaque cursor pointing at a segment.
+
+    Args:
+        video_id: The YouTube video ID.
+        language: Language selector the transcript was fetched with.
+        position: Index of the first segment of the next page.
+
+    Returns:
+        str: URL-safe cursor string.
+    """
+    payload = json.dumps({"v": video_id, "l": language, "s": position}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[str, str, int]:
+    """
+    Read a cursor built by encode_cursor.
+
+    Args:
+        cursor: The cursor string.
+
+    Returns:
+        tuple: (video_id, language, position).
+
+    Raises:
+        ValueError: If the cursor is malformed.
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        data = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        position = int(data["s"])
+        if position < 0:
+            raise ValueError("negative position")
+        return str(data["v"]), str(data["l"]), position
+    except Exception as e:
+        raise ValueError(f"Invalid transcript cursor: {e}") from e
+
+
+def chunk_chars(chunk_size: int, unit: str) -> int:
+    """
+    Convert a chunk size to a character budget.
+
+    Args:
+        chunk_size: Size of a page in `unit`.
+        unit: 'chars' or 'tokens'.
+
+    Returns:
+        int: The character budget.
+
+    Raises:
+        ValueError: For an unknown unit or a non-positive size.
+    """
+    if chunk_size <= 0:
+        raise ValueError("chunk_size must be positive")
+    if unit == "chars":
+        return chunk_size
+    if unit == "tokens":
+        return chunk_size * CHARS_PER_TOKEN
+    raise ValueError(f"Unknown chunk unit '{unit}', expected 'chars' or 'tokens'")
+
+
+def build_page(
+    video_id: str, language: str, index: SegmentIndex | TranscriptFile, position: int, max_chars: int
+) -> dict:
+    """
+    Cut one page out of a transcript, ending on a segment boundary.
+
+    Only the page text is copied out of the index, so the size of the response
+    is bounded by max_chars rather than by the transcript length. From a
+    TranscriptFile only the blocks holding the page are decompressed.
+
+    Args:
+        video_id: The YouTube video ID.
+        language: Language selector the transcript was fetched with.
+        index: The transcript segments, decoded or still in the container format.
+        position: Index of the first segment on the page.
+        max_chars: Character budget for the page text.
+
+    Returns:
+        dict: text, start and end times, first and last segment indices,
+        total_segments and next_cursor (None on the last page).
+    """
+    total = len(index)
+    position = min(position, total)
+    end = index.chunk_end(position, max_chars)
+    page = {
+        "video_id": video_id,
+        "text": index.text_between(position, end),
+        "start": index.segment(position)["start"] if position < end else None,
+        "end": index.segment(end - 1)["end"] if position < end else None,
+        "first_segment": position,
+        "last_segment": end - 1,
+        "total_segments": total,
+        "next_cursor": encode_cursor(video_id, language, end) if end < total else None,
+    }
+    logger.debug("Built page for %s: segments %s-%s of %s", video_id, position, end - 1, total)
+    return page
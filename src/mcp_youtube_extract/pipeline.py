@@ -0,0 +1,646 @@
+"""
+Async orchestration for fetching video information and transcripts concurrently.
+"""
+
+import asyncio
+import concurrent.futures
+import contextvars
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Awaitable, Callable
+
+from . import config, corpus
+from .youtube import (
+    get_video_info,
+    get_video_transcript,
+    get_transcript_reader,
+    iter_transcript_segments,
+    search_transcript,
+    plan_transcripts,
+    download_transcript,
+)
+from .formatting import FIELDS, METADATA_FIELDS, TRANSCRIPT_FIELD, render_video, wanted_parts
+from .segments import format_timestamp
+from .video_id import InvalidVideoIdError, normalize_video_id
+from .metrics import span
+from .pagination import build_page, chunk_chars, decode_cursor
+from .logger import get_logger
+
+logger = get_logger(__name__)
+
+# Marks the end of a streamed transcript on the hand-off queue
+_STREAM_DONE = object()
+# Seconds a streaming worker waits for room in a full queue before checking whether the stream was abandoned
+_HAND_OFF_POLL = 0.1
+
+_executor: ThreadPoolExecutor | None = None
+_executor_lock = threading.Lock()
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    """Get the worker pool for blocking fetches, sized independently of asyncio's default."""
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(
+                    max_workers=config.FETCH_WORKERS, thread_name_prefix="yt-fetch"
+                )
+    return _executor
+
+
+async def run_blocking(func, *args):
+    """
+    Run a blocking function in the fetch worker pool.
+
+    Args:
+        func: The function to call.
+        *args: Positional arguments for func.
+
+    Returns:
+        Whatever func returns.
+    """
+    context = contextvars.copy_context()
+    return await asyncio.get_running_loop().run_in_executor(_get_executor(), context.run, func, *args)
+
+
+async def _fetch_info(api_key: str, video_id: str, timeout: float, fields: tuple[str, ...] | None = None) -> dict | None:
+    """Run the blocking metadata fetch in a worker thread, bounded by its own timeout."""
+    args = (api_key, video_id) if fields is None else (api_key, video_id, fields)
+    try:
+        with span("pipeline.info"):
+            return await asyncio.wait_for(run_blocking(get_video_info, *args), timeout)
+    except TimeoutError:
+        logger.warning("Video info fetch for %s timed out after %gs", video_id, timeout)
+        return None
+
+
+async def _fetch_transcript(video_id: str, timeout: float) -> str | None:
+    """Run the blocking transcript fetch in a worker thread, bounded by its own timeout."""
+    try:
+        with span("pipeline.transcript"):
+            return await asyncio.wait_for(run_blocking(get_video_transcript, video_id), timeout)
+    except TimeoutError:
+        logger.warning("Transcript fetch for %s timed out after %gs", video_id, timeout)
+        return f"Could not retrieve transcript: timed out after {timeout:g}s"
+
+
+async def fetch_video_info_and_transcript(
+    api_key: str,
+    video_id: str,
+    info_timeout: float | None = None,
+    transcript_timeout: float | None = None,
+    info_fields: tuple[str, ...] | None = None,
+) -> tuple[dict | None, str | None]:
+    """
+    Fetch video metadata and transcript at the same time.
+
+    Each fetch has its own timeout; a fetch that times out is reported the same
+    way as one that failed. If the caller is cancelled, both fetches are cancelled.
+
+    Args:
+        api_key (str): YouTube Data API v3 key (optional with yt-info-extract).
+        video_id (str): The YouTube video ID.
+        info_timeout (float): Seconds to wait for metadata, defaults to YOUTUBE_INFO_TIMEOUT.
+        transcript_timeout (float): Seconds to wait for the transcript, defaults to YOUTUBE_TRANSCRIPT_TIMEOUT.
+        info_fields (tuple): Metadata fields the caller needs, which decide when cached metadata is stale.
+
+    Returns:
+        tuple: (video_info, transcript) as returned by get_video_info and get_video_transcript.
+    """
+    info_timeout = config.INFO_TIMEOUT if info_timeout is None else info_timeout
+    transcript_timeout = config.TRANSCRIPT_TIMEOUT if transcript_timeout is None else transcript_timeout
+
+    info_task = asyncio.create_task(_fetch_info(api_key, video_id, info_timeout, info_fields))
+    transcript_task = asyncio.create_task(_fetch_transcript(video_id, transcript_timeout))
+    try:
+        video_info, transcript = await asyncio.gather(info_task, transcript_task)
+    except BaseException:
+        info_task.cancel()
+        transcript_task.cancel()
+        raise
+    return video_info, transcript
+
+
+def format_video_report(
+    video_id: str,
+    video_info: dict | None,
+    transcript: str | None,
+    output_format: str = "text",
+    fields: tuple[str, ...] = FIELDS,
+    max_transcript_chars: int | None = None,
+) -> str:
+    """
+    Format video information and transcript into the get_yt_video_info response.
+
+    Args:
+        video_id (str): The YouTube video ID.
+        video_info (dict): Video information, or None if unavailable.
+        transcript (str): Transcript text or error message, or None if unavailable.
+        output_format (str): 'text', 'json' or 'metadata', see formatting.render_video.
+        fields (tuple): Fields to include, as returned by formatting.parse_fields.
+        max_transcript_chars (int): Transcript budget in characters, or None for the whole transcript.
+
+    Returns:
+        str: The formatted response text.
+    """
+    _, with_transcript = wanted_parts(output_format, fields)
+    if with_transcript:
+        if transcript and transcript.startswith(("Transcript error:", "Could not retrieve")):
+            logger.warning("Transcript issue for video %s: %s", video_id, transcript)
+        elif transcript:
+            logger.info("Successfully processed video %s with transcript", video_id)
+        else:
+            logger.warning("Video %s processed but no transcript available", video_id)
+
+    final_result = render_video(video_id, video_info, transcript, output_format, fields, max_transcript_chars)
+    logger.debug("Tool execution completed for video %s, result length: %s characters", video_id, len(final_result))
+    return final_result
+
+
+def _info_fields(fields: tuple[str, ...]) -> tuple[str, ...] | None:
+    """Metadata fields that decide staleness, or None when all of them are shown."""
+    info_fields = tuple(field for field in fields if field in METADATA_FIELDS)
+    return None if len(info_fields) == len(METADATA_FIELDS) else info_fields
+
+
+async def collect_video_metadata(
+    api_key: str,
+    video_id: str,
+    output_format: str = "text",
+    fields: tuple[str, ...] = tuple(METADATA_FIELDS),
+) -> str:
+    """
+    Fetch and format the metadata of one video, without touching its transcript.
+
+    Args:
+        api_key (str): YouTube Data API v3 key (optional with yt-info-extract).
+        video_id (str): The YouTube video ID.
+        output_format (str): 'text', 'json' or 'metadata', see formatting.render_video.
+        fields (tuple): Metadata fields to include; a transcript field is ignored.
+
+    Returns:
+        str: The formatted response text.
+
+    Raises:
+        ValueError: If the output format is unknown or no metadata field is selected.
+    """
+    fields = tuple(field for field in fields if field in METADATA_FIELDS)
+    wanted_parts(output_format, fields)
+    logger.info("Fetching metadata for video: %s", video_id)
+    video_info = await _fetch_info(api_key, video_id, config.INFO_TIMEOUT, _info_fields(fields))
+    with span("pipeline.format"):
+        return format_video_report(video_id, video_info, None, output_format, fields)
+
+
+async def collect_transcript(video_id: str, output_format: str = "text", max_transcript_chars: int | None = None) -> str:
+    """
+    Fetch and format the transcript of one video, without looking up its metadata.
+
+    Args:
+        video_id (str): The YouTube video ID.
+        output_format (str): 'text' or 'json', see formatting.render_video.
+        max_transcript_chars (int): Transcript budget in characters, or None for the whole transcript.
+
+    Returns:
+        str: The formatted response text.
+    """
+    logger.info("Fetching transcript for video: %s", video_id)
+    transcript = await _fetch_transcript(video_id, config.TRANSCRIPT_TIMEOUT)
+    with span("pipeline.format"):
+        return format_video_report(video_id, None, transcript, output_format, (TRANSCRIPT_FIELD,), max_transcript_chars)
+
+
+async def collect_video_info(
+    api_key: str,
+    video_id: str,
+    output_format: str = "text",
+    fields: tuple[str, ...] = FIELDS,
+    max_transcript_chars: int | None = None,
+) -> str:
+    """
+    Fetch and format video information and transcript for one video.
+
+    Only the parts the response shows are fetched: a response without the
+    transcript is collect_video_metadata, one without metadata fields is
+    collect_transcript, and only a response with both runs the two fetches
+    side by side.
+
+    Args:
+        api_key (str): YouTube Data API v3 key (optional with yt-info-extract).
+        video_id (str): The YouTube video ID.
+        output_format (str): 'text', 'json' or 'metadata', see formatting.render_video.
+        fields (tuple): Fields to include, as returned by formatting.parse_fields.
+        max_transcript_chars (int): Transcript budget in characters, or None for the whole transcript.
+
+    Returns:
+        str: The formatted response text.
+
+    Raises:
+        ValueError: If the output format is unknown.
+    """
+    with_info, with_transcript = wanted_parts(output_format, fields)
+    if not with_transcript:
+        return await collect_video_metadata(api_key, video_id, output_format, fields)
+    if not with_info:
+        return await collect_transcript(video_id, output_format, max_transcript_chars)
+
+    logger.info("Processing video: %s", video_id)
+    video_info, transcript = await fetch_video_info_and_transcript(api_key, video_id, info_fields=_info_fields(fields))
+    with span("pipeline.format"):
+        return format_video_report(video_id, video_info, transcript, output_format, fields, max_transcript_chars)
+
+
+async def collect_videos_info(api_key: str, video_ids: list[str], max_concurrency: int | None = None) -> list[dict]:
+    """
+    Fetch and format video information and transcripts for many videos.
+
+    IDs and URLs are normalized first, so a video given several ways is fetched
+    once, and an invalid one gets its error without any request. At most
+    max_concurrency videos are in flight at a time, and a failure for one video is
+    reported in its entry without aborting the rest of the batch.
+
+    Args:
+        api_key (str): YouTube Data API v3 key (optional with yt-info-extract).
+        video_ids (list): The YouTube video IDs or video URLs.
+        max_concurrency (int): Videos fetched in parallel, capped at YOUTUBE_BATCH_CONCURRENCY.
+
+    Returns:
+        list: One dict per input, in input order, with keys video_id (the normalized ID,
+            or the input if it is invalid), result and error.
+    """
+    limit = config.BATCH_CONCURRENCY if max_concurrency is None else min(max_concurrency, config.BATCH_CONCURRENCY)
+    limit = max(1, limit)
+    canonical = {}
+    invalid = {}
+    for video_id in video_ids:
+        try:
+            canonical[video_id] = normalize_video_id(video_id)
+        except InvalidVideoIdError as e:
+            invalid[video_id] = {"video_id": video_id, "result": None, "error": str(e)}
+    unique_ids = list(dict.fromkeys(canonical.values()))
+    logger.info("Processing batch of %s videos (%s unique), concurrency %s", len(video_ids), len(unique_ids), limit)
+    semaphore = asyncio.Semaphore(limit)
+
+    async def process(video_id: str) -> dict:
+        async with semaphore:
+            try:
+                result = await collect_video_info(api_key, video_id)
+                return {"video_id": video_id, "result": result, "error": None}
+            except Exception as e:
+                logger.error("Error processing video %s in batch: %s", video_id, e, exc_info=True)
+                return {"video_id": video_id, "result": None, "error": str(e)}
+
+    outcomes = await asyncio.gather(*(process(video_id) for video_id in unique_ids))
+    by_id = dict(zip(unique_ids, outcomes))
+    return [invalid[video_id] if video_id in invalid else by_id[canonical[video_id]] for video_id in video_ids]
+
+
+async def collect_transcript_segments(video_id: str, start: float | None = None, end: float | None = None) -> str:
+    """
+    Fetch a transcript and format the segments inside a time window with timestamps.
+
+    Args:
+        video_id (str): The YouTube video ID.
+        start (float): Window start in seconds, or None for the beginning.
+        end (float): Window end in seconds, or None for the end.
+
+    Returns:
+        str: One '[MM:SS] text' line per segment, or a message explaining why there are none.
+    """
+    def read_window() -> str:
+        # In the worker thread too: a cached transcript is read from disk as its blocks are needed
+        index = get_transcript_reader(video_id)
+        if index is None:
+            return "No transcript available for this video."
+        indices = index.time_range(start, end)
+        logger.info("Serving %s of %s segments for %s", len(indices), len(index), video_id)
+        if not indices:
+            window_start = format_timestamp(start) if start is not None else "the start"
+            window_end = format_timestamp(end) if end is not None else "the end"
+            return f"No transcript segments between {window_start} and {window_end}."
+        return "\n".join(index.iter_timestamped(indices))
+
+    timeout = config.TRANSCRIPT_TIMEOUT
+    try:
+        return await asyncio.wait_for(run_blocking(read_window), timeout)
+    except TimeoutError:
+        logger.warning("Transcript fetch for %s timed out after %gs", video_id, timeout)
+        return f"Could not retrieve transcript: timed out after {timeout:g}s"
+    except Exception as e:
+        logger.error("Could not retrieve transcript: %s", e)
+        return f"Could not retrieve transcript: {e}"
+
+
+async def collect_transcript_page(
+    video_id: str,
+    cursor: str | None = None,
+    chunk_size: int | None = None,
+    unit: str = "chars",
+    languages: list[str] | None = None,
+) -> dict:
+    """
+    Fetch one page of a transcript.
+
+    The first page fetches (or loads from cache) the transcript; later pages are
+    cut from the cached copy named by the cursor.
+
+    Args:
+        video_id (str): The YouTube video ID.
+        cursor (str): next_cursor from the previous page, or None for the first page.
+        chunk_size (int): Page size in `unit`, defaults to YOUTUBE_PAGE_CHUNK_CHARS characters.
+        unit (str): 'chars' or 'tokens' (approximated as 4 characters each).
+        languages (list): Preferred language codes for the first page.
+
+    Returns:
+        dict: The page as built by pagination.build_page, or a dict with an 'error' key.
+    """
+    languages = languages or ['en']
+    position = 0
+    if cursor:
+        try:
+            cursor_video_id, cache_language, position = decode_cursor(cursor)
+        except ValueError as e:
+            return {"video_id": video_id, "error": str(e)}
+        if cursor_video_id != video_id:
+            return {"video_id": video_id, "error": f"Cursor belongs to video {cursor_video_id}"}
+        languages = cache_language.split(",")
+
+    if chunk_size is None:
+        max_chars = config.PAGE_CHUNK_CHARS
+    else:
+        try:
+            max_chars = chunk_chars(chunk_size, unit)
+        except ValueError as e:
+            return {"video_id": video_id, "error": str(e)}
+    max_chars = min(max_chars, config.PAGE_MAX_CHARS)
+
+    def read_page() -> dict:
+        # In the worker thread too: a cached transcript is read from disk as its blocks are needed
+        index = get_transcript_reader(video_id, languages)
+        if index is None:
+            return {"video_id": video_id, "error": "No transcript available for this video."}
+        return build_page(video_id, ",".join(languages), index, position, max_chars)
+
+    timeout = config.TRANSCRIPT_TIMEOUT
+    try:
+        return await asyncio.wait_for(run_blocking(read_page), timeout)
+    except TimeoutError:
+        logger.warning("Transcript fetch for %s timed out after %gs", video_id, timeout)
+        return {"video_id": video_id, "error": f"Could not retrieve transcript: timed out after {timeout:g}s"}
+    except Exception as e:
+        logger.error("Could not retrieve transcript: %s", e)
+        return {"video_id": video_id, "error": f"Could not retrieve transcript: {e}"}
+
+
+async def collect_transcript_search(
+    video_id: str,
+    query: str,
+    max_results: int | None = None,
+    languages: list[str] | None = None,
+) -> dict:
+    """
+    Search a transcript for words and phrases.
+
+    The transcript and its search index come from the cache when present, so a
+    repeat search neither fetches nor tokenizes anything.
+
+    Args:
+        video_id (str): The YouTube video ID.
+        query (str): Words that must all occur in a segment, and "quoted phrases".
+        max_results (int): Most matches to return, defaults to YOUTUBE_SEARCH_MAX_RESULTS.
+        languages (list): Preferred language codes.
+
+    Returns:
+        dict: video_id, query, total_matches and the first matches, each with start,
+        end, timestamp and text; or a dict with an 'error' key.
+    """
+    languages = languages or ['en']
+    if max_results is None:
+        max_results = config.SEARCH_MAX_RESULTS
+    if max_results < 1:
+        return {"video_id": video_id, "error": "max_results must be at least 1"}
+    max_results = min(max_results, config.SEARCH_RESULTS_LIMIT)
+
+    timeout = config.TRANSCRIPT_TIMEOUT
+    try:
+        found = await asyncio.wait_for(run_blocking(search_transcript, video_id, query, languages), timeout)
+    except TimeoutError:
+        logger.warning("Transcript fetch for %s timed out after %gs", video_id, timeout)
+        return {"video_id": video_id, "error": f"Could not retrieve transcript: timed out after {timeout:g}s"}
+    except Exception as e:
+        logger.error("Could not retrieve transcript: %s", e)
+        return {"video_id": video_id, "error": f"Could not retrieve transcript: {e}"}
+
+    if found is None:
+        return {"video_id": video_id, "error": "No transcript available for this video."}
+    index, hits = found
+    matches = []
+    for first, last in hits[:max_results]:
+        start = index.starts[first]
+        matches.append({
+            "start": start,
+            "end": index.starts[last] + index.durations[last],
+            "timestamp": format_timestamp(start),
+            "text": index.text_between(first, last + 1),
+        })
+    return {"video_id": video_id, "query": query, "total_matches": len(hits), "matches": matches}
+
+
+async def collect_transcripts(video_id: str, languages: list[str]) -> dict:
+    """
+    Fetch a video's transcript in each of several languages.
+
+    The caption tracks are listed once, with one upstream request however many
+    languages are asked for, and the missing tracks are downloaded in parallel.
+    Each language is cached separately.
+
+    Args:
+        video_id (str): The YouTube video ID.
+        languages (list): Language codes, matched exactly.
+
+    Returns:
+        dict: video_id, transcripts (language -> text, in request order), unavailable
+        (languages the video has no captions in), errors (language -> message for failed
+        downloads) and available_languages (None if the tracks were not looked up); or a
+        dict with an 'error' key.
+    """
+    languages = list(dict.fromkeys(languages))
+    if not languages:
+        return {"video_id": video_id, "error": "languages must name at least one language"}
+    if len(languages) > config.LANGUAGES_LIMIT:
+        return {"video_id": video_id, "error": f"At most {config.LANGUAGES_LIMIT} languages can be requested at once"}
+
+    timeout = config.TRANSCRIPT_TIMEOUT
+    try:
+        with span("pipeline.track_list"):
+            plan = await asyncio.wait_for(run_blocking(plan_transcripts, video_id, languages), timeout)
+    except TimeoutError:
+        logger.warning("Track list for %s timed out after %gs", video_id, timeout)
+        return {"video_id": video_id, "error": f"Could not list transcripts: timed out after {timeout:g}s"}
+    except Exception as e:
+        logger.error("Could not list transcripts: %s", e)
+        return {"video_id": video_id, "error": f"Could not list transcripts: {e}"}
+
+    async def download(language: str, track: dict):
+        with span("pipeline.transcript"):
+            return await asyncio.wait_for(run_blocking(download_transcript, video_id, language, track), timeout)
+
+    downloads = plan["downloads"]
+    outcomes = await asyncio.gather(*(download(language, track) for language, track in downloads.items()), return_exceptions=True)
+    indexes = dict(plan["found"])
+    unavailable = list(plan["unavailable"])
+    errors = {}
+    for language, outcome in zip(downloads, outcomes):
+        if isinstance(outcome, TimeoutError):
+            errors[language] = f"timed out after {timeout:g}s"
+        elif isinstance(outcome, Exception):
+            logger.error("Could not download %s transcript of %s: %s", language, video_id, outcome)
+            errors[language] = str(outcome)
+        elif outcome is None:
+            unavailable.append(language)
+        else:
+            indexes[language] = outcome
+    logger.info("Transcripts of %s: %s cached, %s downloaded, %s unavailable, %s failed",
+                video_id, len(plan["found"]), len(downloads) - len(errors), len(unavailable), len(errors))
+    return {
+        "video_id": video_id,
+        "transcripts": {language: indexes[language].text for language in languages if language in indexes},
+        "unavailable": [language for language in languages if language in unavailable],
+        "errors": errors,
+        "available_languages": plan["available"],
+    }
+
+
+async def collect_corpus_search(query: str, max_results: int | None = None, match_all: bool = False) -> dict:
+    """
+    Rank every transcript fetched so far by relevance to a query.
+
+    Args:
+        query (str): Words to look for.
+        max_results (int): Most videos to return, defaults to YOUTUBE_CORPUS_MAX_RESULTS.
+        match_all (bool): Only return videos whose transcript contains every word.
+
+    Returns:
+        dict: query, videos_indexed, total_matches and the best results, each with
+        video_id, language, score, matched_terms, first_match and timestamp; or a
+        dict with an 'error' key.
+    """
+    if max_results is None:
+        max_results = config.CORPUS_MAX_RESULTS
+    if max_results < 1:
+        return {"query": query, "error": "max_results must be at least 1"}
+    max_results = min(max_results, config.CORPUS_RESULTS_LIMIT)
+
+    index = corpus.get_corpus()
+    if index is None:
+        return {"query": query, "error": "Corpus search needs the cache; it is disabled by YOUTUBE_CACHE or YOUTUBE_CORPUS."}
+    with span("corpus.search"):
+        total, results = await run_blocking(index.search, query, max_results, match_all)
+    stats = await run_blocking(index.stats)
+    logger.info("Corpus search for %r matched %s of %s videos", query, total, stats["videos"])
+    return {"query": query, "videos_indexed": stats["videos"], "total_matches": total, "results": results}
+
+
+async def stream_transcript(
+    video_id: str,
+    report: Callable[[int, str], Awaitable[None]],
+    batch_chars: int | None = None,
+) -> str:
+    """
+    Fetch a transcript, reporting segments while it is still downloading.
+
+    Segments are parsed in a worker thread and handed to the event loop one at a
+    time. They are reported in '[MM:SS] text' batches: a batch is sent as soon as
+    no further segment is waiting, or once it reaches batch_chars, so the first
+    segment goes out as soon as it is parsed. At most YOUTUBE_STREAM_QUEUE_SIZE
+    segments wait in between; when the client is slower than the download, the
+    worker waits for room instead of parsing ahead.
+
+    Args:
+        video_id (str): The YouTube video ID.
+        report: Coroutine called with (segments so far, batch text).
+        batch_chars (int): Largest batch to send, defaults to YOUTUBE_STREAM_BATCH_CHARS.
+
+    Returns:
+        str: The full transcript text, or a message explaining why there is none.
+    """
+    batch_chars = config.STREAM_BATCH_CHARS if batch_chars is None else batch_chars
+    timeout = config.TRANSCRIPT_TIMEOUT
+    loop = asyncio.get_running_loop()
+    queue: asyncio.Queue = asyncio.Queue(maxsize=max(1, config.STREAM_QUEUE_SIZE))
+    stop = threading.Event()
+
+    def hand_off(item) -> None:
+        if stop.is_set():
+            return
+        put = queue.put(item)
+        try:
+            waiting = asyncio.run_coroutine_threadsafe(put, loop)
+        except RuntimeError:
+            # The event loop is gone; nobody is listening any more
+            put.close()
+            stop.set()
+            return
+        # Wait for room in the queue, but give up once the consumer has stopped reading
+        while not stop.is_set():
+            try:
+                waiting.result(_HAND_OFF_POLL)
+                return
+            except TimeoutError:
+                continue
+            except concurrent.futures.CancelledError:
+                break
+        waiting.cancel()
+
+    def produce() -> None:
+        segments = iter_transcript_segments(video_id)
+        try:
+            for segment in segments:
+                if stop.is_set():
+                    break
+                hand_off(segment)
+        except Exception as e:
+            hand_off(e)
+        finally:
+            segments.close()
+            hand_off(_STREAM_DONE)
+
+    producer = asyncio.ensure_future(run_blocking(produce))
+    texts = []
+    batch = []
+    batch_len = 0
+    try:
+        while True:
+            item = await asyncio.wait_for(queue.get(), timeout)
+            if item is _STREAM_DONE:
+                break
+            if isinstance(item, Exception):
+                raise item
+            texts.append(item["text"])
+            line = f"[{format_timestamp(item['start'])}] {item['text']}"
+            batch.append(line)
+            batch_len += len(line) + 1
+            if batch_len >= batch_chars or queue.empty():
+                await report(len(texts), "\n".join(batch))
+                batch = []
+                batch_len = 0
+        if batch:
+            await report(len(texts), "\n".join(batch))
+        await producer
+    except TimeoutError:
+        logger.warning("Transcript stream for %s stalled for %gs", video_id, timeout)
+        return f"Could not retrieve transcript: timed out after {timeout:g}s"
+    except Exception as e:
+        logger.error("Could not retrieve transcript: %s", e)
+        return f"Could not retrieve transcript: {e}"
+    finally:
+        stop.set()
+        # After an error or timeout nothing waits for the worker thread, which stops at its next segment
+        if not producer.done():
+            producer.cancel()
+
+    logger.info("Streamed %s segments for %s", len(texts), video_id)
+    if not texts:
+        return "No transcript available for this video."
+    return " ".join(texts)
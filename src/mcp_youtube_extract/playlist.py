@@ -0,0 +1,254 @@
+"""
+Playlist and channel expansion with pipelined fetching.
+
+A VideoListSource pages through the videos of a playlist or channel. The listing
+runs in a worker thread and hands video IDs over a bounded queue to a pool of
+fetchers, so metadata and transcripts for the first videos are being fetched
+while later pages are still being listed, and listing never runs far ahead of
+fetching. Results are reported as they finish.
+
+The default source uses yt-dlp, imported on first use; tests and benchmarks
+install a StaticVideoListSource with set_video_list_source.
+"""
+
+import asyncio
+import concurrent.futures
+import threading
+import time
+from abc import ABC, abstractmethod
+from typing import Awaitable, Callable, Iterator
+
+from . import config
+from .pipeline import collect_video_info, run_blocking
+from .metrics import span
+from .logger import get_logger
+
+logger = get_logger(__name__)
+
+# Marks the end of the listing for each fetcher
+_LISTING_DONE = object()
+
+
+class VideoListSource(ABC):
+    """Lists the videos of a playlist or channel."""
+
+    @abstractmethod
+    def iter_videos(self, identifier: str) -> Iterator[dict]:
+        """
+        Yield the videos in listing order, fetching further pages as needed.
+
+        Args:
+            identifier: Playlist or channel ID, @handle or URL.
+
+        Yields:
+            dict: video_id and title (None if unknown) per video.
+
+        Raises:
+            Exception: If the list could not be retrieved.
+        """
+
+
+class YtDlpVideoListSource(VideoListSource):
+    """Lists videos with yt-dlp's flat playlist extraction, one YouTube page at a time."""
+
+    def __init__(self, timeout: float | None = None):
+        """
+        Args:
+            timeout: Socket timeout for listing requests, defaults to YOUTUBE_INFO_TIMEOUT.
+        """
+        self.timeout = config.INFO_TIMEOUT if timeout is None else timeout
+
+    @staticmethod
+    def resolve_url(identifier: str) -> str:
+        """
+        Turn a playlist or channel identifier into the URL yt-dlp should list.
+
+        Args:
+            identifier: URL, @handle, channel ID (UC...) or playlist ID.
+
+        Returns:
+            str: The URL; channels resolve to their Videos tab.
+        """
+        identifier = identifier.strip()
+        if identifier.startswith(("http://", "https://")):
+            return identifier
+        if identifier.startswith("@"):
+            return f"https://www.youtube.com/{identifier}/videos"
+        if identifier.startswith("UC") and len(identifier) == 24:
+            return f"https://www.youtube.com/channel/{identifier}/videos"
+        return f"https://www.youtube.com/playlist?list={identifier}"
+
+    def iter_videos(self, identifier: str) -> Iterator[dict]:
+        import yt_dlp
+
+        options = {
+            "extract_flat": "in_playlist",
+            "lazy_playlist": True,
+            "quiet": True,
+            "no_warnings": True,
+            "socket_timeout": self.timeout,
+        }
+        with yt_dlp.YoutubeDL(options) as ydl:
+            # process=False leaves the entries as a generator that requests continuation pages on demand
+            listing = ydl.extract_info(self.resolve_url(identifier), download=False, process=False)
+            if listing.get("_type") not in ("playlist", "multi_video"):
+                raise ValueError(f"{identifier} is not a playlist or channel")
+            for entry in listing.get("entries") or ():
+                # Channel home pages also list their tabs; only videos are wanted
+                if entry and entry.get("ie_key", "Youtube") == "Youtube" and entry.get("id"):
+                    yield {"video_id": entry["id"], "title": entry.get("title")}
+
+
+class StaticVideoListSource(VideoListSource):
+    """Serves fixed video lists in pages, optionally with a delay per page like a real listing."""
+
+    def __init__(self, lists: dict[str, list[str]], page_size: int = 100, page_delay: float = 0.0):
+        """
+        Args:
+            lists: Video IDs per playlist or channel identifier.
+            page_size: Videos per page.
+            page_delay: Seconds to wait before each page.
+        """
+        self.lists = lists
+        self.page_size = page_size
+        self.page_delay = page_delay
+        self.pages_served = 0
+
+    def iter_videos(self, identifier: str) -> Iterator[dict]:
+        if identifier not in self.lists:
+            raise ValueError(f"Unknown playlist or channel: {identifier}")
+        video_ids = self.lists[identifier]
+        for start in range(0, len(video_ids), self.page_size):
+            if self.page_delay:
+                time.sleep(self.page_delay)
+            self.pages_served += 1
+            for video_id in video_ids[start:start + self.page_size]:
+                yield {"video_id": video_id, "title": None}
+
+
+_source: VideoListSource | None = None
+_source_lock = threading.Lock()
+
+
+def get_video_list_source() -> VideoListSource:
+    """Get the process-wide video list source, yt-dlp unless replaced."""
+    global _source
+    if _source is None:
+        with _source_lock:
+            if _source is None:
+                _source = YtDlpVideoListSource()
+    return _source
+
+
+def set_video_list_source(source: VideoListSource | None) -> None:
+    """
+    Replace the process-wide video list source, e.g. with a StaticVideoListSource in tests.
+
+    Args:
+        source: The source to use, or None to go back to yt-dlp.
+    """
+    global _source
+    with _source_lock:
+        _source = source
+
+
+async def collect_playlist_info(
+    api_key: str,
+    identifier: str,
+    report: Callable[[int, dict], Awaitable[None]],
+    max_videos: int | None = None,
+    max_concurrency: int | None = None,
+) -> dict:
+    """
+    List a playlist or channel and fetch video information and transcripts for its videos.
+
+    Listing and fetching overlap: each video is fetched as soon as it is listed,
+    with at most max_concurrency fetches in flight, and reported when it finishes.
+
+    Args:
+        api_key (str): YouTube Data API v3 key (optional with yt-info-extract).
+        identifier (str): Playlist or channel ID, @handle or URL.
+        report: Coroutine called with (videos finished so far, entry) as each video finishes.
+        max_videos (int): Most videos to process, defaults to and is capped at YOUTUBE_PLAYLIST_MAX_VIDEOS.
+        max_concurrency (int): Videos fetched in parallel, capped at YOUTUBE_BATCH_CONCURRENCY.
+
+    Returns:
+        dict: playlist, videos (number processed), results in listing order, each with
+        position, video_id, title, result and error, and error if the listing failed.
+    """
+    max_videos = config.PLAYLIST_MAX_VIDEOS if max_videos is None else min(max_videos, config.PLAYLIST_MAX_VIDEOS)
+    limit = config.BATCH_CONCURRENCY if max_concurrency is None else min(max_concurrency, config.BATCH_CONCURRENCY)
+    limit = max(1, limit)
+    source = get_video_list_source()
+    loop = asyncio.get_running_loop()
+    # Bounded, so the listing stays only a little ahead of the fetchers
+    listed: asyncio.Queue = asyncio.Queue(maxsize=limit)
+    stop = threading.Event()
+    listing_error: list[Exception] = []
+
+    def hand_off(item) -> bool:
+        """Queue an item for the fetchers, waiting while the queue is full; False once stopped."""
+        future = asyncio.run_coroutine_threadsafe(listed.put(item), loop)
+        while not stop.is_set():
+            try:
+                future.result(timeout=0.1)
+                return True
+            except concurrent.futures.TimeoutError:
+                continue
+        future.cancel()
+        return False
+
+    def list_videos() -> None:
+        videos = source.iter_videos(identifier)
+        position = 0
+        try:
+            with span("playlist.list"):
+                for entry in videos:
+                    if position >= max_videos or not hand_off((position, entry)):
+                        break
+                    position += 1
+        except Exception as e:
+            logger.error("Could not list %s after %s videos: %s", identifier, position, e)
+            listing_error.append(e)
+        finally:
+            videos.close()
+            for _ in range(limit):
+                if not hand_off(_LISTING_DONE):
+                    break
+
+    results = []
+
+    async def fetch() -> None:
+        while True:
+            item = await listed.get()
+            if item is _LISTING_DONE:
+                return
+            position, entry = item
+            video_id = entry["video_id"]
+            try:
+                result = await collect_video_info(api_key, video_id)
+                outcome = {"position": position, **entry, "result": result, "error": None}
+            except Exception as e:
+                logger.error("Error processing video %s in %s: %s", video_id, identifier, e, exc_info=True)
+                outcome = {"position": position, **entry, "result": None, "error": str(e)}
+            results.append(outcome)
+            await report(len(results), outcome)
+
+    logger.info("Expanding %s (up to %s videos, concurrency %s)", identifier, max_videos, limit)
+    lister = asyncio.ensure_future(run_blocking(list_videos))
+    fetchers = [asyncio.ensure_future(fetch()) for _ in range(limit)]
+    try:
+        # Each fetch has its own timeouts, and listing requests time out in the source
+        await asyncio.gather(*fetchers)
+    finally:
+        stop.set()
+        for fetcher in fetchers:
+            fetcher.cancel()
+        await lister
+
+    results.sort(key=lambda outcome: outcome["position"])
+    summary = {"playlist": identifier, "videos": len(results), "results": results, "error": None}
+    if listing_error:
+        summary["error"] = f"Could not list all videos: {listing_error[0]}"
+    logger.info("Expanded %s into %s videos", identifier, len(results))
+    return summary
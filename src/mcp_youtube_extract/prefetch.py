@@ -0,0 +1,222 @@
+"""
+Cache warm-up: fetch metadata and transcripts for a list of videos ahead of time.
+
+Run as `mcp_youtube_extract prefetch IDS_FILE` (or `-` for stdin). Videos are
+fetched through the same code paths as the tools, so everything lands in the
+persistent cache, the search indexes and the corpus, and the first live request
+for one of them is a cache hit. Videos already in the cache are skipped, so an
+interrupted run resumes where it stopped when started again.
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+from typing import Iterable, TextIO
+
+from . import config, corpus
+from .cache import DiskCache, get_cache
+from .pipeline import fetch_video_info_and_transcript, run_blocking
+from .video_id import InvalidVideoIdError, normalize_video_id
+from .logger import get_logger
+
+logger = get_logger(__name__)
+
+# Language selector the tools fetch and cache transcripts with
+_LANGUAGE = "en"
+
+
+def read_video_ids(lines: Iterable[str], invalid: list[str] | None = None) -> list[str]:
+    """
+    Read video IDs or URLs separated by whitespace or newlines, skipping '#' comments and repeats.
+
+    Args:
+        lines: Lines of the input file.
+        invalid: If given, entries that are not a video ID or URL are appended to it.
+
+    Returns:
+        list: The normalized video IDs, in input order.
+    """
+    video_ids = []
+    for line in lines:
+        for entry in line.split("#", 1)[0].split():
+            try:
+                video_ids.append(normalize_video_id(entry))
+            except InvalidVideoIdError:
+                if invalid is not None:
+                    invalid.append(entry)
+    return list(dict.fromkeys(video_ids))
+
+
+def is_cached(cache: DiskCache, video_id: str) -> bool:
+    """Whether both the metadata and the transcript (or their absence) are cached and fresh."""
+    return cache.contains("info", video_id) and cache.contains("segments", video_id, _LANGUAGE)
+
+
+def _format_duration(seconds: float) -> str:
+    minutes, seconds = divmod(int(seconds), 60)
+    hours, minutes = divmod(minutes, 60)
+    return f"{hours}h{minutes:02d}m" if hours else f"{minutes}m{seconds:02d}s"
+
+
+class Progress:
+    """Counts outcomes and prints a progress line at most every `interval` seconds."""
+
+    def __init__(self, total: int, stream: TextIO, interval: float = 5.0, clock=time.monotonic):
+        """
+        Args:
+            total: Number of videos to process.
+            stream: Where progress lines go.
+            interval: Seconds between progress lines; 0 prints one per video.
+            clock: Time source, for tests.
+        """
+        self.total = total
+        self.stream = stream
+        self.interval = interval
+        self.clock = clock
+        self.started = clock()
+        self.last_report = self.started
+        self.counts = {"fetched": 0, "cached": 0, "failed": 0}
+
+    @property
+    def done(self) -> int:
+        return sum(self.counts.values())
+
+    def record(self, outcome: str) -> None:
+        """Count one video as 'fetched', 'cached' or 'failed', and report if it is time to."""
+        self.counts[outcome] += 1
+        now = self.clock()
+        if now - self.last_report >= self.interval:
+            self.last_report = now
+            self.report()
+
+    def summary(self) -> dict:
+        """
+        Returns:
+            dict: total, done, the count per outcome, seconds elapsed and fetches per second.
+        """
+        elapsed = self.clock() - self.started
+        fetches = self.counts["fetched"] + self.counts["failed"]
+        return {
+            "total": self.total,
+            "done": self.done,
+            **self.counts,
+            "seconds": round(elapsed, 3),
+            "videos_per_second": round(fetches / elapsed, 3) if elapsed > 0 else 0.0,
+        }
+
+    def report(self) -> None:
+        """Print one progress line."""
+        summary = self.summary()
+        line = (
+            f"prefetch: {self.done}/{self.total} ({self.done / max(self.total, 1):.1%})  "
+            f"fetched {self.counts['fetched']}  cached {self.counts['cached']}  failed {self.counts['failed']}  "
+            f"{summary['videos_per_second']:.2f} videos/s"
+        )
+        remaining = self.total - self.done
+        if remaining and summary["videos_per_second"] > 0:
+            line += f"  ETA {_format_duration(remaining / summary['videos_per_second'])}"
+        print(line, file=self.stream, flush=True)
+
+
+async def prefetch(api_key: str, video_ids: list[str], concurrency: int, progress: Progress) -> None:
+    """
+    Fetch every video that is not cached yet, at most `concurrency` at a time.
+
+    Args:
+        api_key (str): YouTube Data API v3 key (optional with yt-info-extract).
+        video_ids (list): The video IDs, fetched in this order.
+        concurrency (int): Videos fetched in parallel.
+        progress (Progress): Receives the outcome of every video.
+    """
+    cache = get_cache()
+    pending = iter(video_ids)
+
+    async def worker() -> None:
+        # Workers pull from one iterator, so a long list never becomes a long list of tasks
+        for video_id in pending:
+            # SQLite lookups block, so they run in the fetch pool like the rest of the cache I/O
+            if await run_blocking(is_cached, cache, video_id):
+                progress.record("cached")
+                continue
+            try:
+                await fetch_video_info_and_transcript(api_key, video_id)
+            except Exception as e:
+                logger.warning("Prefetch of %s failed: %s", video_id, e)
+            # Whatever was not cached, e.g. after a timeout or throttling, is retried by the next run
+            progress.record("fetched" if await run_blocking(is_cached, cache, video_id) else "failed")
+
+    await asyncio.gather(*(worker() for _ in range(max(1, concurrency))))
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    """
+    Parse the prefetch subcommand's options.
+
+    Args:
+        argv: Arguments after 'prefetch'.
+
+    Returns:
+        The parsed options
+    """
+    parser = argparse.ArgumentParser(
+        prog="mcp_youtube_extract prefetch",
+        description="Fill the cache with metadata and transcripts for a list of videos. "
+                    "Videos already cached are skipped, so an interrupted run can simply be restarted.",
+    )
+    parser.add_argument("ids", help="file with video IDs or URLs, one per line or whitespace separated; '-' reads stdin")
+    parser.add_argument(
+        "--concurrency", type=int, default=config.BATCH_CONCURRENCY, help="videos fetched in parallel (default: %(default)s)"
+    )
+    parser.add_argument(
+        "--progress-interval", type=float, default=5.0, help="seconds between progress lines on stderr (default: %(default)s)"
+    )
+    args = parser.parse_args(argv)
+    if args.concurrency < 1:
+        parser.error("--concurrency must be at least 1")
+    return args
+
+
+def main(argv: list[str] | None = None) -> int:
+    """
+    Run the prefetch subcommand.
+
+    Args:
+        argv: Arguments after 'prefetch', defaults to sys.argv.
+
+    Returns:
+        int: Exit status; 1 if some videos could not be fetched or some entries are invalid,
+            2 if the cache is disabled or the IDs file cannot be read, 130 if interrupted.
+    """
+    args = parse_args(argv)
+    if get_cache() is None:
+        print("prefetch: the cache is disabled (YOUTUBE_CACHE=0); there is nothing to fill", file=sys.stderr)
+        return 2
+    invalid = []
+    if args.ids == "-":
+        video_ids = read_video_ids(sys.stdin, invalid)
+    else:
+        try:
+            with open(args.ids, encoding="utf-8") as f:
+                video_ids = read_video_ids(f, invalid)
+        except (OSError, UnicodeDecodeError) as e:
+            print(f"prefetch: cannot read {args.ids}: {e}", file=sys.stderr)
+            return 2
+    if invalid:
+        print(f"prefetch: skipping {len(invalid)} entries that are not video IDs or URLs, e.g. {invalid[0]!r}", file=sys.stderr)
+
+    progress = Progress(len(video_ids), sys.stderr, args.progress_interval)
+    logger.info("Prefetching %s videos with concurrency %s", len(video_ids), args.concurrency)
+    api_key = os.getenv("YOUTUBE_API_KEY", "")
+    try:
+        asyncio.run(prefetch(api_key, video_ids, args.concurrency, progress))
+    except KeyboardInterrupt:
+        progress.report()
+        print("prefetch: interrupted; run the same command again to resume", file=sys.stderr)
+        return 130
+    finally:
+        corpus.wait_for_pending()
+    progress.report()
+    logger.info("Prefetch finished: %s", progress.summary())
+    return 1 if progress.counts["failed"] or invalid else 0
@@ -0,0 +1,291 @@
+"""
+Rate limiting and circuit breaking for upstream YouTube requests shared by all tool calls.
+"""
+
+import threading
+import time
+from typing import Callable
+
+from . import config
+from .metrics import CIRCUIT_REJECTED, RATE_LIMIT_WAIT
+from .logger import get_logger
+
+logger = get_logger(__name__)
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket.
+
+    Tokens refill continuously at `rate` per second up to `capacity`, so bursts of
+    up to `capacity` requests go out immediately and sustained load is held to `rate`.
+
+    With a `min_rate` below `rate` the bucket adapts to upstream feedback (AIMD):
+    on_throttle halves the rate, down to `min_rate`, and on_success raises it by
+    `step`, back up to the configured rate.
+    """
+
+    def __init__(
+        self,
+        rate: float,
+        capacity: float,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep,
+        min_rate: float | None = None,
+        step: float = 0.0,
+    ):
+        """
+        Args:
+            rate: Tokens added per second.
+            capacity: Maximum tokens held, i.e. the largest burst allowed.
+            clock: Monotonic time source, replaceable in tests.
+            sleep: Sleep function, replaceable in tests.
+            min_rate: Lowest rate throttling can push the bucket to; defaults to `rate`, i.e. not adaptive.
+            step: Rate added back after each successful request.
+        """
+        self.rate = float(rate)
+        self.max_rate = self.rate
+        self.min_rate = self.rate if min_rate is None else min(float(min_rate), self.rate)
+        self.step = float(step)
+        self.capacity = float(capacity)
+        self._clock = clock
+        self._sleep = sleep
+        self._tokens = self.capacity
+        self._updated = clock()
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float) -> None:
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def acquire(self, tokens: float = 1.0) -> float:
+        """
+        Take tokens, sleeping until they are available.
+
+        Tokens are reserved before sleeping, so concurrent callers queue up behind
+        each other instead of all waking at once.
+
+        Args:
+            tokens: Number of tokens to take.
+
+        Returns:
+            float: Seconds spent waiting.
+        """
+        with self._lock:
+            self._refill(self._clock())
+            self._tokens -= tokens
+            wait = -self._tokens / self.rate if self._tokens < 0 else 0.0
+        RATE_LIMIT_WAIT.observe(wait)
+        if wait > 0:
+            logger.debug("Rate limiting: waiting %.2f seconds", wait)
+            self._sleep(wait)
+        return wait
+
+    def on_success(self) -> None:
+        """Additive increase: a request went through, so allow `step` more requests per second."""
+        if self.rate >= self.max_rate:
+            return
+        with self._lock:
+            self._refill(self._clock())
+            self.rate = min(self.max_rate, self.rate + self.step)
+
+    def on_throttle(self) -> None:
+        """Multiplicative decrease: halve the rate and drop saved-up tokens so no burst follows."""
+        with self._lock:
+            self._refill(self._clock())
+            if self.rate > self.min_rate:
+                self.rate = max(self.min_rate, self.rate / 2)
+                logger.warning("Upstream throttling: rate lowered to %.2f requests/s", self.rate)
+            self._tokens = min(self._tokens, 0.0)
+
+
+def is_throttling_status(status: int) -> bool:
+    """Whether an HTTP status means YouTube wants us to back off: 429 or any 5xx."""
+    return status == 429 or 500 <= status < 600
+
+
+class UpstreamError(Exception):
+    """YouTube is throttling or failing; retrying straight away would only add load."""
+
+
+class CircuitOpenError(UpstreamError):
+    """Raised instead of contacting YouTube while a circuit breaker is open."""
+
+
+class CircuitBreaker:
+    """
+    Thread-safe circuit breaker for one upstream service.
+
+    Closed, calls go through and consecutive failures are counted; after
+    `failure_threshold` of them the circuit opens and calls fail immediately with
+    CircuitOpenError. After `reset_timeout` seconds it turns half-open and lets
+    `probes` trial calls through: it closes once they all succeed and opens again
+    as soon as one fails.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(
+        self,
+        name: str,
+        failure_threshold: int,
+        reset_timeout: float,
+        probes: int = 1,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        """
+        Args:
+            name: Upstream name used in messages and metrics, e.g. 'transcript'.
+            failure_threshold: Consecutive failures that open the circuit.
+            reset_timeout: Seconds the circuit stays open before probing.
+            probes: Trial calls allowed while half-open.
+            clock: Monotonic time source, replaceable in tests.
+        """
+        self.name = name
+        self.failure_threshold = max(1, failure_threshold)
+        self.reset_timeout = float(reset_timeout)
+        self.probes = max(1, probes)
+        self._clock = clock
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        """Close the circuit and forget past failures."""
+        with self._lock:
+            self._state = self.CLOSED
+            self._failures = 0
+            self._opened_at = 0.0
+            self._probes_started = 0
+            self._probes_passed = 0
+
+    @property
+    def state(self) -> str:
+        """'closed', 'open' or 'half_open'."""
+        with self._lock:
+            self._update(self._clock())
+            return self._state
+
+    def _update(self, now: float) -> None:
+        if self._state == self.OPEN and now - self._opened_at >= self.reset_timeout:
+            logger.info("Circuit %s half-open: letting %s trial request(s) through", self.name, self.probes)
+            self._state = self.HALF_OPEN
+            self._probes_started = 0
+            self._probes_passed = 0
+
+    def _reject(self, now: float) -> None:
+        CIRCUIT_REJECTED.inc(upstream=self.name)
+        retry_in = max(0.0, self._opened_at + self.reset_timeout - now)
+        raise CircuitOpenError(
+            f"YouTube {self.name} requests are paused after repeated throttled or failed requests; "
+            f"try again in {retry_in:.0f}s"
+        )
+
+    def check(self) -> None:
+        """
+        Fail fast without taking a trial slot, e.g. before waiting for the rate limiter.
+
+        Raises:
+            CircuitOpenError: If the circuit is open.
+        """
+        with self._lock:
+            now = self._clock()
+            self._update(now)
+            if self._state == self.OPEN:
+                self._reject(now)
+
+    def allow(self) -> None:
+        """
+        Admit one call, which must then be reported with record_success or record_failure.
+
+        Raises:
+            CircuitOpenError: If the circuit is open, or half-open with every trial slot taken.
+        """
+        with self._lock:
+            now = self._clock()
+            self._update(now)
+            if self._state == self.OPEN:
+                self._reject(now)
+            if self._state == self.HALF_OPEN:
+                if self._probes_started >= self.probes:
+                    self._reject(now)
+                self._probes_started += 1
+
+    def record_success(self) -> None:
+        """Report a call that YouTube answered normally."""
+        with self._lock:
+            self._failures = 0
+            if self._state == self.HALF_OPEN:
+                self._probes_passed += 1
+                if self._probes_passed >= self.probes:
+                    logger.info("Circuit %s closed: trial requests succeeded", self.name)
+                    self._state = self.CLOSED
+
+    def record_failure(self) -> None:
+        """Report a throttled or failed call."""
+        with self._lock:
+            self._failures += 1
+            if self._state == self.HALF_OPEN or (self._state == self.CLOSED and self._failures >= self.failure_threshold):
+                logger.warning("Circuit %s open for %gs after %s failure(s)", self.name, self.reset_timeout, self._failures)
+                self._state = self.OPEN
+                self._opened_at = self._clock()
+
+
+# Configured (rate, burst) for each upstream, split evenly between HTTP workers
+_RATES = {
+    "transcript": lambda: (config.RATE_LIMIT, config.RATE_BURST),
+    "info": lambda: (config.INFO_RATE_LIMIT, config.INFO_RATE_BURST),
+}
+
+_limiters: dict[str, TokenBucket] = {}
+_breakers: dict[str, CircuitBreaker] = {}
+_upstreams_lock = threading.Lock()
+
+
+def get_limiter(upstream: str) -> TokenBucket:
+    """
+    Get the process-wide adaptive rate limiter for an upstream, creating it on first use.
+
+    Args:
+        upstream: 'transcript' (yt-ts-extract) or 'info' (yt-info-extract).
+
+    Returns:
+        The shared TokenBucket.
+    """
+    with _upstreams_lock:
+        limiter = _limiters.get(upstream)
+        if limiter is None:
+            rate, burst = _RATES[upstream]()
+            # The configured rate is for the whole server, so HTTP workers split it
+            workers = max(1, config.SERVER_WORKERS)
+            rate, burst = rate / workers, max(1.0, burst / workers)
+            logger.info("Rate limiting %s requests to %g req/s, burst %g", upstream, rate, burst)
+            limiter = _limiters[upstream] = TokenBucket(rate, burst, min_rate=config.RATE_FLOOR, step=config.RATE_STEP)
+        return limiter
+
+
+def get_breaker(upstream: str) -> CircuitBreaker:
+    """
+    Get the process-wide circuit breaker for an upstream, creating it on first use.
+
+    Args:
+        upstream: 'transcript' (yt-ts-extract) or 'info' (yt-info-extract).
+
+    Returns:
+        The shared CircuitBreaker.
+    """
+    with _upstreams_lock:
+        breaker = _breakers.get(upstream)
+        if breaker is None:
+            breaker = _breakers[upstream] = CircuitBreaker(
+                upstream, config.BREAKER_THRESHOLD, config.BREAKER_RESET, config.BREAKER_PROBES
+            )
+        return breaker
+
+
+def reset_upstreams() -> None:
+    """Drop the shared limiters and breakers so they are rebuilt from configuration on next use."""
+    with _upstreams_lock:
+        _limiters.clear()
+        _breakers.clear()
@@ -0,0 +1,206 @@
+"""
+Inverted index over the segments of one transcript, for keyword and phrase search.
+
+A transcript is tokenized once, when it is fetched. For every term the index
+keeps the sorted positions of its occurrences in the transcript's token stream,
+plus the position of the first token of every segment. A phrase is then a run of
+consecutive positions, which may cross a segment boundary, and any position maps
+back to its segment by binary search.
+"""
+
+import re
+from array import array
+from bisect import bisect_left
+from itertools import chain, pairwise, repeat
+
+from .segments import SegmentIndex
+
+_TOKEN = re.compile(r"\w+")
+_QUOTED = re.compile(r'"([^"]*)"')
+
+
+def tokenize(text: str) -> list[str]:
+    """
+    Split text into case-folded word tokens.
+
+    Args:
+        text: Transcript or query text.
+
+    Returns:
+        list: The tokens, in order.
+    """
+    return _TOKEN.findall(text.casefold())
+
+
+def parse_query(query: str) -> list[list[str]]:
+    """
+    Split a query into clauses: each "quoted phrase" is one clause, every other word another.
+
+    Args:
+        query: The search query.
+
+    Returns:
+        list: Token lists, one per clause; empty if the query has no words.
+    """
+    clauses = [tokenize(phrase) for phrase in _QUOTED.findall(query)]
+    clauses.extend([token] for token in tokenize(_QUOTED.sub(" ", query)))
+    return [clause for clause in clauses if clause]
+
+
+def _contains(positions: array, position: int) -> bool:
+    i = bisect_left(positions, position)
+    return i < len(positions) and positions[i] == position
+
+
+class SearchIndex:
+    """
+    Term positions for one transcript.
+
+    The positions of all terms are stored back to back in one array; `terms` maps
+    each term to the (offset, count) of its slice. `token_segments` is derived from
+    `segment_starts` and maps each position straight to its segment.
+    """
+
+    __slots__ = ("terms", "positions", "segment_starts", "token_segments")
+
+    def __init__(self, terms: dict[str, tuple[int, int]], positions: array, segment_starts: array):
+        self.terms = terms
+        self.positions = positions
+        self.segment_starts = segment_starts
+        self.token_segments = array('I', chain.from_iterable(
+            repeat(segment, end - start) for segment, (start, end) in enumerate(pairwise(segment_starts))
+        ))
+
+    @classmethod
+    def build(cls, index: SegmentIndex) -> "SearchIndex":
+        """
+        Tokenize every segment of a transcript.
+
+        Args:
+            index: The transcript segments.
+
+        Returns:
+            SearchIndex: The inverted index.
+        """
+        postings: dict[str, list[int]] = {}
+        segment_starts = array('I')
+        position = 0
+        for i in range(len(index)):
+            segment_starts.append(position)
+            for term in tokenize(index.segment_text(i)):
+                postings.setdefault(term, []).append(position)
+                position += 1
+        segment_starts.append(position)
+
+        terms = {}
+        positions = array('I')
+        for term, occurrences in postings.items():
+            terms[term] = (len(positions), len(occurrences))
+            positions.extend(occurrences)
+        return cls(terms, positions, segment_starts)
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "SearchIndex":
+        """Rebuild an index from the output of to_dict."""
+        terms = dict(zip(data["terms"], zip(data["offsets"], data["counts"])))
+        return cls(terms, array('I', data["positions"]), array('I', data["segment_starts"]))
+
+    def to_dict(self) -> dict:
+        """
+        Convert to a JSON-serializable dict.
+
+        Returns:
+            dict: terms with the offsets and counts of their positions, the positions and segment_starts.
+        """
+        slices = list(self.terms.values())
+        return {
+            "terms": list(self.terms),
+            "offsets": [offset for offset, _ in slices],
+            "counts": [count for _, count in slices],
+            "positions": self.positions.tolist(),
+            "segment_starts": self.segment_starts.tolist(),
+        }
+
+    def term_positions(self, term: str) -> array:
+        """Sorted token positions of a term; empty if it does not occur."""
+        offset, count = self.terms.get(term, (0, 0))
+        return self.positions[offset:offset + count]
+
+    def segment_of(self, position: int) -> int:
+        """Index of the segment holding a token position."""
+        return self.token_segments[position]
+
+    def phrase_positions(self, tokens: list[str]) -> list[int]:
+        """
+        Find every occurrence of consecutive tokens.
+
+        The rarest token is scanned and the others are checked by binary search,
+        so the cost depends on how rare the phrase is, not on the transcript length.
+
+        Args:
+            tokens: The phrase, tokenized.
+
+        Returns:
+            list: Position of the first token of each occurrence, ascending.
+        """
+        lists = [self.term_positions(token) for token in tokens]
+        if len(lists) == 1:
+            return lists[0].tolist()
+        if not all(lists):
+            return []
+        anchor = min(range(len(tokens)), key=lambda k: len(lists[k]))
+        others = [k for k in range(len(tokens)) if k != anchor]
+        found = []
+        for position in lists[anchor]:
+            first = position - anchor
+            if first >= 0 and all(_contains(lists[k], first + k) for k in others):
+                found.append(first)
+        return found
+
+    def search(self, query: str) -> list[tuple[int, int]]:
+        """
+        Find the segments matching a query.
+
+        Every clause must match: a bare word anywhere in the segment, a quoted
+        phrase starting in it. A phrase that runs on into the following segments
+        extends the hit to cover them.
+
+        Args:
+            query: Words and "quoted phrases".
+
+        Returns:
+            list: (first_segment, last_segment) per hit, in transcript order.
+        """
+        clauses = parse_query(query)
+        if not clauses:
+            return []
+        token_segments = self.token_segments
+        matches = []
+        for tokens in clauses:
+            found = self.phrase_positions(tokens)
+            if len(tokens) == 1:
+                # Common words occur thousands of times; keep this loop in C
+                segments = list(map(token_segments.__getitem__, found))
+                hits = dict(zip(segments, segments))
+            else:
+                hits = {}
+                for first in found:
+                    segment = token_segments[first]
+                    last = token_segments[first + len(tokens) - 1]
+                    if hits.get(segment, -1) < last:
+                        hits[segment] = last
+            if not hits:
+                return []
+            matches.append(hits)
+        if len(matches) == 1:
+            # Positions ascend, so the hits are already in transcript order
+            return list(matches[0].items())
+        common = matches[0].keys()
+        for hits in sorted(matches[1:], key=len):
+            common = common & hits.keys()
+        common = sorted(common)
+        # Only phrases can run on past the segment they start in
+        phrases = [hits for tokens, hits in zip(clauses, matches) if len(tokens) > 1]
+        if not phrases:
+            return list(zip(common, common))
+        return [(segment, max(hits[segment] for hits in phrases)) for segment in common]
@@ -0,0 +1,213 @@
+"""
+Compact, time-indexed storage for transcript segments.
+"""
+
+from array import array
+from bisect import bisect_left, bisect_right
+from typing import Iterable, Iterator
+
+
+def format_timestamp(seconds: float) -> str:
+    """
+    Format seconds as MM:SS, or HH:MM:SS from one hour on.
+
+    Args:
+        seconds: Time offset in seconds.
+
+    Returns:
+        str: The formatted timestamp.
+    """
+    total = int(seconds)
+    hours, rest = divmod(total, 3600)
+    minutes, secs = divmod(rest, 60)
+    if hours:
+        return f"{hours:02d}:{minutes:02d}:{secs:02d}"
+    return f"{minutes:02d}:{secs:02d}"
+
+
+class SegmentIndex:
+    """
+    Transcript segments stored as parallel arrays sorted by start time.
+
+    All segment texts live in one string joined by single spaces, which is also the
+    plain transcript text. Segment i spans text[offsets[i]:offsets[i + 1] - 1], so
+    there is one more offset than there are segments.
+    """
+
+    __slots__ = ("starts", "durations", "offsets", "text")
+
+    def __init__(self, starts: array, durations: array, offsets: array, text: str):
+        self.starts = starts
+        self.durations = durations
+        self.offsets = offsets
+        self.text = text
+
+    @classmethod
+    def from_segments(cls, segments: Iterable[dict | str]) -> "SegmentIndex":
+        """
+        Build an index from yt-ts-extract segments.
+
+        Args:
+            segments: Dicts with 'text', 'start' and 'duration' keys; bare strings
+                are accepted and treated as starting at 0.
+
+        Returns:
+            SegmentIndex: The index, sorted by start time.
+        """
+        builder = SegmentIndexBuilder()
+        for segment in segments:
+            builder.add(segment)
+        return builder.build()
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "SegmentIndex":
+        """Rebuild an index from the output of to_dict."""
+        return cls(array('d', data["starts"]), array('d', data["durations"]), array('q', data["offsets"]), data["text"])
+
+    def to_dict(self) -> dict:
+        """
+        Convert to a JSON-serializable dict.
+
+        Returns:
+            dict: starts, durations, offsets and text.
+        """
+        return {
+            "starts": self.starts.tolist(),
+            "durations": self.durations.tolist(),
+            "offsets": self.offsets.tolist(),
+            "text": self.text,
+        }
+
+    def __len__(self) -> int:
+        return len(self.starts)
+
+    def segment_text(self, i: int) -> str:
+        """Text of segment i."""
+        return self.text[self.offsets[i]:self.offsets[i + 1] - 1]
+
+    def segment(self, i: int) -> dict:
+        """Segment i in yt-ts-extract form: text, start, duration and end."""
+        start = self.starts[i]
+        duration = self.durations[i]
+        return {"text": self.segment_text(i), "start": start, "duration": duration, "end": start + duration}
+
+    def time_range(self, start: float | None = None, end: float | None = None) -> range:
+        """
+        Find the segments that overlap a time window in O(log n).
+
+        Args:
+            start: Window start in seconds; None means the beginning.
+            end: Window end in seconds (exclusive); None means the end.
+
+        Returns:
+            range: Indices of segments starting inside [start, end), plus the segment
+            already playing at `start`.
+        """
+        lo = 0
+        if start is not None:
+            lo = bisect_left(self.starts, start)
+            if lo > 0 and self.starts[lo - 1] + self.durations[lo - 1] > start:
+                lo -= 1
+        hi = len(self) if end is None else bisect_left(self.starts, end, lo)
+        return range(lo, max(lo, hi))
+
+    def text_between(self, lo: int, hi: int) -> str:
+        """Plain text of segments lo..hi-1, joined by spaces."""
+        if hi <= lo:
+            return ""
+        return self.text[self.offsets[lo]:self.offsets[hi] - 1]
+
+    def chunk_end(self, lo: int, max_chars: int) -> int:
+        """
+        Find where a chunk starting at segment lo must end to stay within max_chars.
+
+        Chunks always end on a segment boundary and hold at least one segment, even
+        if that segment alone is longer than max_chars.
+
+        Args:
+            lo: Index of the first segment in the chunk.
+            max_chars: Character budget for the chunk text.
+
+        Returns:
+            int: Index one past the last segment in the chunk.
+        """
+        if lo >= len(self):
+            return lo
+        # text_between(lo, hi) is offsets[hi] - 1 - offsets[lo] characters long
+        hi = bisect_right(self.offsets, self.offsets[lo] + max_chars + 1, lo + 1) - 1
+        return min(len(self), max(hi, lo + 1))
+
+    def iter_timestamped(self, indices: range) -> Iterator[str]:
+        """
+        Yield '[MM:SS] text' lines for the given segments.
+
+        Args:
+            indices: Segment indices, e.g. from time_range.
+
+        Yields:
+            str: One line per segment.
+        """
+        for i in indices:
+            yield f"[{format_timestamp(self.starts[i])}] {self.segment_text(i)}"
+
+
+class SegmentIndexBuilder:
+    """
+    Collects segments one at a time into the arrays of a SegmentIndex.
+
+    Each segment is kept as two floats and a reference to its text rather than as
+    a dict, so a transcript can be indexed while it streams in.
+    """
+
+    __slots__ = ("starts", "durations", "texts", "_in_order")
+
+    def __init__(self):
+        self.starts = array('d')
+        self.durations = array('d')
+        self.texts: list[str] = []
+        self._in_order = True
+
+    def __len__(self) -> int:
+        return len(self.starts)
+
+    def add(self, segment: dict | str) -> None:
+        """
+        Add one yt-ts-extract segment.
+
+        Args:
+            segment: Dict with 'text', 'start' and 'duration' keys; a bare string is
+                treated as starting at 0, and anything else is ignored.
+        """
+        if isinstance(segment, dict) and 'text' in segment:
+            start, duration, text = float(segment.get('start', 0)), float(segment.get('duration', 0)), segment['text']
+        elif isinstance(segment, str):
+            start, duration, text = 0.0, 0.0, segment
+        else:
+            return
+        if self.starts and start < self.starts[-1]:
+            self._in_order = False
+        self.starts.append(start)
+        self.durations.append(duration)
+        self.texts.append(text)
+
+    def build(self) -> SegmentIndex:
+        """
+        Finish the index.
+
+        Returns:
+            SegmentIndex: The segments added so far, sorted by start time.
+        """
+        starts, durations, texts = self.starts, self.durations, self.texts
+        if not self._in_order:
+            # Stable, like sorting the segments themselves
+            order = sorted(range(len(starts)), key=starts.__getitem__)
+            starts = array('d', (starts[i] for i in order))
+            durations = array('d', (durations[i] for i in order))
+            texts = [texts[i] for i in order]
+        offsets = array('q')
+        position = 0
+        for text in texts:
+            offsets.append(position)
+            position += len(text) + 1
+        offsets.append(position)
+        return SegmentIndex(starts, durations, offsets, " ".join(texts))
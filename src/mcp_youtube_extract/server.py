@@ -4,9 +4,27 @@ YouTube MCP Server
 A simple MCP server that fetches YouTube video information and transcripts.
 """
 
+import argparse
 import os
-from mcp.server.fastmcp import FastMCP
-from .youtube import get_video_info, get_video_transcript, format_video_info
+import sys
+from mcp.server.fastmcp import FastMCP, Context
+from .pipeline import (
+    collect_video_info,
+    collect_video_metadata,
+    collect_transcript,
+    collect_videos_info,
+    collect_transcript_segments,
+    collect_transcript_page,
+    collect_transcripts,
+    collect_transcript_search,
+    collect_corpus_search,
+    stream_transcript,
+)
+from .playlist import collect_playlist_info
+from .formatting import METADATA_FIELDS, TRANSCRIPT_FIELD, parse_fields, wanted_parts
+from .video_id import InvalidVideoIdError, normalize_video_id
+from . import config
+from .metrics import span, snapshot, render_prometheus
 from .logger import get_logger
 
 logger = get_logger(__name__)
@@ -15,61 +33,484 @@ logger = get_logger(__name__)
 mcp = FastMCP("YouTube Video Analyzer")
 
 @mcp.tool()
-def get_yt_video_info(video_id: str) -> str:
+async def get_yt_video_info(
+    video_id: str,
+    output_format: str = "text",
+    fields: str | None = None,
+    max_transcript_chars: int | None = None,
+) -> str:
     """
     Fetch YouTube video information and transcript.
     
     Args:
-        video_id: The YouTube video ID (e.g., 'dQw4w9WgXcQ' from https://youtube.com/watch?v=dQw4w9WgXcQ)
+        video_id: The YouTube video ID or video URL (e.g., 'dQw4w9WgXcQ', https://youtube.com/watch?v=dQw4w9WgXcQ or https://youtu.be/dQw4w9WgXcQ)
+        output_format: 'text' (sections with headers), 'json' (one compact JSON object) or 'metadata' (text without the transcript)
+        fields: Comma-separated fields to include, from title, channel_name, publication_date, views, description and transcript; all by default
+        max_transcript_chars: Longest transcript to return; longer ones are cut at a word boundary
     
     Returns:
         A formatted string containing video information and transcript
     """
-    logger.info(f"MCP tool called: get_yt_video_info with video_id: {video_id}")
+    logger.info("MCP tool called: get_yt_video_info with video_id: %s", video_id)
     
     # yt-info-extract doesn't require API key, but keep API key optional for compatibility
     api_key = os.getenv("YOUTUBE_API_KEY", "")
     
-    result = []
+    try:
+        video_id = normalize_video_id(video_id)
+        selected = parse_fields(fields)
+        wanted_parts(output_format, selected)
+        if max_transcript_chars is not None and max_transcript_chars < 0:
+            raise ValueError("max_transcript_chars must not be negative")
+    except ValueError as e:
+        return f"Error: {e}"
+
+    try:
+        # Metadata and transcript are fetched concurrently, or only one of them
+        # through the get_yt_video_metadata / get_yt_transcript paths
+        with span("tool.get_yt_video_info"):
+            return await collect_video_info(api_key, video_id, output_format, selected, max_transcript_chars)
+        
+    except Exception as e:
+        logger.error("Error processing video %s: %s", video_id, e, exc_info=True)
+        return f"Error processing video {video_id}: {str(e)}"
+
+@mcp.tool()
+async def get_yt_video_metadata(video_id: str, output_format: str = "text", fields: str | None = None) -> str:
+    """
+    Fetch YouTube video information without the transcript.
     
+    Args:
+        video_id: The YouTube video ID or video URL
+        output_format: 'text' (lines under a header) or 'json' (one compact JSON object)
+        fields: Comma-separated fields to include, from title, channel_name, publication_date, views and description; all by default
+    
+    Returns:
+        A formatted string containing the video information
+    """
+    logger.info("MCP tool called: get_yt_video_metadata with video_id: %s", video_id)
+    
+    api_key = os.getenv("YOUTUBE_API_KEY", "")
+    
+    try:
+        video_id = normalize_video_id(video_id)
+        selected = parse_fields(fields) if fields is not None else tuple(METADATA_FIELDS)
+        if TRANSCRIPT_FIELD in selected:
+            raise ValueError("use get_yt_transcript or get_yt_video_info for the transcript")
+        if output_format not in ("text", "json"):
+            raise ValueError(f"Unknown output_format {output_format!r}; choose from text, json")
+    except ValueError as e:
+        return f"Error: {e}"
+
     try:
-        # Get video information
-        logger.info(f"Processing video: {video_id}")
-        video_info = get_video_info(api_key, video_id)
-        result.append("=== VIDEO INFORMATION ===")
-        result.append(format_video_info(video_info))
-        result.append("")
+        with span("tool.get_yt_video_metadata"):
+            return await collect_video_metadata(api_key, video_id, output_format, selected)
         
-        # Get transcript
-        transcript = get_video_transcript(video_id)
-        result.append("=== TRANSCRIPT ===")
-        if transcript and not transcript.startswith("Transcript error:") and not transcript.startswith("Could not retrieve"):
-            result.append(transcript)
-            logger.info(f"Successfully processed video {video_id} with transcript")
-        else:
-            if transcript and (transcript.startswith("Transcript error:") or transcript.startswith("Could not retrieve")):
-                result.append(f"Transcript issue: {transcript}")
-                logger.warning(f"Transcript issue for video {video_id}: {transcript}")
-            else:
-                result.append("No transcript available for this video.")
-                logger.warning(f"Video {video_id} processed but no transcript available")
+    except Exception as e:
+        logger.error("Error fetching metadata for video %s: %s", video_id, e, exc_info=True)
+        return f"Error processing video {video_id}: {str(e)}"
+
+@mcp.tool()
+async def get_yt_transcript(video_id: str, output_format: str = "text", max_transcript_chars: int | None = None) -> str:
+    """
+    Fetch the transcript of a YouTube video without its metadata.
+    
+    Args:
+        video_id: The YouTube video ID or video URL
+        output_format: 'text' (transcript under a header) or 'json' (one compact JSON object)
+        max_transcript_chars: Longest transcript to return; longer ones are cut at a word boundary
+    
+    Returns:
+        A formatted string containing the transcript
+    """
+    logger.info("MCP tool called: get_yt_transcript with video_id: %s", video_id)
+    
+    if output_format not in ("text", "json"):
+        return f"Error: Unknown output_format {output_format!r}; choose from text, json"
+    if max_transcript_chars is not None and max_transcript_chars < 0:
+        return "Error: max_transcript_chars must not be negative"
+
+    try:
+        video_id = normalize_video_id(video_id)
+    except InvalidVideoIdError as e:
+        return f"Error: {e}"
+
+    try:
+        with span("tool.get_yt_transcript"):
+            return await collect_transcript(video_id, output_format, max_transcript_chars)
+        
+    except Exception as e:
+        logger.error("Error fetching transcript for video %s: %s", video_id, e, exc_info=True)
+        return f"Error processing video {video_id}: {str(e)}"
+
+@mcp.tool()
+async def get_yt_videos_info(video_ids: list[str], max_concurrency: int | None = None) -> list[dict]:
+    """
+    Fetch YouTube video information and transcripts for several videos at once.
+    
+    Args:
+        video_ids: The YouTube video IDs or video URLs; repeated videos are fetched once
+        max_concurrency: How many videos to fetch in parallel (capped by the server)
+    
+    Returns:
+        One entry per video ID, in input order, with the formatted result or an error message
+    """
+    logger.info("MCP tool called: get_yt_videos_info with %s video_ids", len(video_ids))
+    
+    api_key = os.getenv("YOUTUBE_API_KEY", "")
+    with span("tool.get_yt_videos_info"):
+        return await collect_videos_info(api_key, video_ids, max_concurrency)
+
+@mcp.tool()
+async def get_yt_playlist_info(
+    playlist: str,
+    ctx: Context,
+    max_videos: int | None = None,
+    max_concurrency: int | None = None,
+) -> dict:
+    """
+    Fetch information and transcripts for the videos of a YouTube playlist or channel.
+    
+    Videos are fetched while the rest of the list is still being paged through.
+    Each video is sent as a progress notification as soon as it finishes; the
+    complete results are returned at the end, in playlist order.
+    
+    Args:
+        playlist: Playlist ID or URL, channel ID (UC...), @handle or channel URL
+        max_videos: Most videos to process (default 200, capped by the server)
+        max_concurrency: Videos fetched in parallel (default 8, capped by the server)
+    
+    Returns:
+        The number of videos processed and one entry per video with its position, video_id, title, result and error; error is set if the list could not be read to the end
+    """
+    logger.info("MCP tool called: get_yt_playlist_info with playlist: %s, max_videos: %s", playlist, max_videos)
+    
+    api_key = os.getenv("YOUTUBE_API_KEY", "")
+    
+    async def report(videos_done: int, entry: dict) -> None:
+        text = entry["result"] if entry["error"] is None else f"Error: {entry['error']}"
+        await ctx.report_progress(videos_done, None, f"[{entry['position'] + 1}] {entry['video_id']}\n{text}")
+    
+    try:
+        with span("tool.get_yt_playlist_info"):
+            return await collect_playlist_info(api_key, playlist, report, max_videos, max_concurrency)
+        
+    except Exception as e:
+        logger.error("Error processing playlist %s: %s", playlist, e, exc_info=True)
+        return {"playlist": playlist, "videos": 0, "results": [], "error": f"Error processing playlist {playlist}: {str(e)}"}
+
+@mcp.tool()
+async def get_yt_transcript_segments(video_id: str, start: float | None = None, end: float | None = None) -> str:
+    """
+    Fetch timestamped transcript segments for a YouTube video, optionally only a time window.
+    
+    Args:
+        video_id: The YouTube video ID or video URL (e.g., 'dQw4w9WgXcQ')
+        start: Window start in seconds; omit to start at the beginning
+        end: Window end in seconds; omit to run to the end of the video
+    
+    Returns:
+        One "[MM:SS] text" line per segment in the window
+    """
+    logger.info("MCP tool called: get_yt_transcript_segments with video_id: %s, start: %s, end: %s", video_id, start, end)
+    
+    try:
+        video_id = normalize_video_id(video_id)
+    except InvalidVideoIdError as e:
+        return f"Error: {e}"
+
+    try:
+        with span("tool.get_yt_transcript_segments"):
+            return await collect_transcript_segments(video_id, start, end)
+        
+    except Exception as e:
+        logger.error("Error processing video %s: %s", video_id, e, exc_info=True)
+        return f"Error processing video {video_id}: {str(e)}"
+
+@mcp.tool()
+async def get_yt_transcripts(video_id: str, languages: list[str]) -> dict:
+    """
+    Fetch the transcript of a YouTube video in several languages at once, e.g. for translation work.
+    
+    Each language is matched exactly; there is no fallback to another language.
+    
+    Args:
+        video_id: The YouTube video ID or video URL (e.g., 'dQw4w9WgXcQ')
+        languages: Language codes, e.g. ['en', 'de', 'ja']
+    
+    Returns:
+        The transcript text per language, the requested languages the video has no captions in, download errors per language, and all caption languages of the video when they were looked up
+    """
+    logger.info("MCP tool called: get_yt_transcripts with video_id: %s, languages: %s", video_id, languages)
+    
+    try:
+        video_id = normalize_video_id(video_id)
+    except InvalidVideoIdError as e:
+        return {"video_id": video_id, "error": str(e)}
+
+    try:
+        with span("tool.get_yt_transcripts"):
+            return await collect_transcripts(video_id, languages)
         
-        final_result = "\n".join(result)
-        logger.debug(f"Tool execution completed for video {video_id}, result length: {len(final_result)} characters")
-        return final_result
+    except Exception as e:
+        logger.error("Error processing video %s: %s", video_id, e, exc_info=True)
+        return {"video_id": video_id, "error": f"Error processing video {video_id}: {str(e)}"}
+
+@mcp.tool()
+async def get_yt_transcript_page(
+    video_id: str,
+    cursor: str | None = None,
+    chunk_size: int | None = None,
+    unit: str = "chars",
+) -> dict:
+    """
+    Fetch a YouTube transcript one page at a time.
+    
+    Pages end on segment boundaries. Pass the returned next_cursor to get the
+    following page; later pages are served from the cache without refetching.
+    
+    Args:
+        video_id: The YouTube video ID or video URL (e.g., 'dQw4w9WgXcQ')
+        cursor: next_cursor from the previous page; omit for the first page
+        chunk_size: Page size in `unit` (default 8000 characters, capped by the server)
+        unit: "chars" or "tokens" (approximated as 4 characters each)
+    
+    Returns:
+        The page text with its time span, segment positions and next_cursor (null on the last page)
+    """
+    logger.info("MCP tool called: get_yt_transcript_page with video_id: %s, cursor: %s", video_id, cursor)
+    
+    try:
+        video_id = normalize_video_id(video_id)
+    except InvalidVideoIdError as e:
+        return {"video_id": video_id, "error": str(e)}
+
+    try:
+        with span("tool.get_yt_transcript_page"):
+            return await collect_transcript_page(video_id, cursor, chunk_size, unit)
+        
+    except Exception as e:
+        logger.error("Error processing video %s: %s", video_id, e, exc_info=True)
+        return {"video_id": video_id, "error": f"Error processing video {video_id}: {str(e)}"}
+
+@mcp.tool()
+async def search_yt_transcript(video_id: str, query: str, max_results: int | None = None) -> dict:
+    """
+    Find where words or phrases are said in a YouTube video.
+    
+    Every word in the query must occur in a matching segment; wrap words in double
+    quotes to match them as a phrase, which may run across segment boundaries.
+    Matching ignores case and punctuation.
+    
+    Args:
+        video_id: The YouTube video ID or video URL (e.g., 'dQw4w9WgXcQ')
+        query: Words and "quoted phrases" to look for
+        max_results: Most matches to return (default 20, capped by the server)
+    
+    Returns:
+        The total number of matches and the first ones in transcript order, each with its start and end in seconds, a timestamp and the segment text
+    """
+    logger.info("MCP tool called: search_yt_transcript with video_id: %s, query: %r", video_id, query)
+    
+    try:
+        video_id = normalize_video_id(video_id)
+    except InvalidVideoIdError as e:
+        return {"video_id": video_id, "error": str(e)}
+
+    try:
+        with span("tool.search_yt_transcript"):
+            return await collect_transcript_search(video_id, query, max_results)
+        
+    except Exception as e:
+        logger.error("Error processing video %s: %s", video_id, e, exc_info=True)
+        return {"video_id": video_id, "error": f"Error processing video {video_id}: {str(e)}"}
+
+@mcp.tool()
+async def search_yt_corpus(query: str, max_results: int | None = None, match_all: bool = False) -> dict:
+    """
+    Find which of the videos fetched so far talk about something.
+    
+    Every transcript this server has fetched is indexed. Videos are ranked by how
+    often and how prominently the query words occur (BM25); word order is ignored.
+    Use search_yt_transcript to find exact phrases within one of the videos.
+    
+    Args:
+        query: Words to look for
+        max_results: Most videos to return (default 10, capped by the server)
+        match_all: Only return videos whose transcript contains every word
+    
+    Returns:
+        The number of matching videos and the best ones, each with its score, how many query words it contains and when the first one is said
+    """
+    logger.info("MCP tool called: search_yt_corpus with query: %r", query)
+    
+    try:
+        with span("tool.search_yt_corpus"):
+            return await collect_corpus_search(query, max_results, match_all)
+        
+    except Exception as e:
+        logger.error("Error searching the corpus: %s", e, exc_info=True)
+        return {"query": query, "error": f"Error searching the corpus: {str(e)}"}
+
+@mcp.tool()
+async def stream_yt_transcript(video_id: str, ctx: Context) -> str:
+    """
+    Fetch a YouTube transcript, streaming it while it downloads.
+    
+    Batches of "[MM:SS] text" lines are sent as progress notifications as soon as
+    they are parsed; the complete transcript is returned at the end.
+    
+    Args:
+        video_id: The YouTube video ID or video URL (e.g., 'dQw4w9WgXcQ')
+    
+    Returns:
+        The full transcript text
+    """
+    logger.info("MCP tool called: stream_yt_transcript with video_id: %s", video_id)
+    
+    async def report(segments_done: int, text: str) -> None:
+        await ctx.report_progress(segments_done, None, text)
+    
+    try:
+        video_id = normalize_video_id(video_id)
+    except InvalidVideoIdError as e:
+        return f"Error: {e}"
+
+    try:
+        with span("tool.stream_yt_transcript"):
+            return await stream_transcript(video_id, report)
         
     except Exception as e:
-        logger.error(f"Error processing video {video_id}: {e}", exc_info=True)
+        logger.error("Error processing video %s: %s", video_id, e, exc_info=True)
         return f"Error processing video {video_id}: {str(e)}"
 
-def main():
-    """Main entry point for the MCP server."""
-    logger.info("Starting YouTube MCP Server")
+@mcp.tool()
+async def get_yt_metrics() -> dict:
+    """
+    Report server latency and request metrics collected since startup.
+    
+    Returns:
+        Per-stage latency histograms (count, mean and p50/p90/p99 in seconds) and
+        counters for upstream requests, retries, cache lookups and coalesced calls
+    """
+    logger.info("MCP tool called: get_yt_metrics")
+    return snapshot()
+
+@mcp.resource("metrics://prometheus", name="metrics", mime_type="text/plain")
+def prometheus_metrics() -> str:
+    """Server metrics in the Prometheus text exposition format."""
+    return render_prometheus()
+
+TRANSPORTS = ("stdio", "streamable-http", "sse")
+LOOPBACK_HOSTS = ("127.0.0.1", "localhost", "::1")
+
+def create_app():
+    """
+    Build the ASGI app served by one HTTP worker process.
+    
+    uvicorn calls this in every worker, which reads the transport, host and worker
+    count that run_http exported to the environment.
+    
+    Returns:
+        The Starlette app for the configured transport
+    """
+    if config.SERVER_WORKERS > 1:
+        # Any worker may receive any request, so no MCP session may live in just one of them
+        mcp.settings.stateless_http = True
+    if config.HOST not in LOOPBACK_HOSTS:
+        # FastMCP only restricts Host headers to loopback names; other interfaces serve remote clients
+        mcp.settings.transport_security = None
+    logger.info("Worker %s serving %s (%s workers)", os.getpid(), config.TRANSPORT, config.SERVER_WORKERS)
+    if config.TRANSPORT == "sse":
+        return mcp.sse_app()
+    return mcp.streamable_http_app()
+
+def run_http(transport: str, host: str, port: int, workers: int, max_in_flight: int, app_factory: str | None = None):
+    """
+    Serve an HTTP transport from one or more worker processes sharing the port.
+    
+    Workers share the on-disk cache, so a transcript fetched by one is served by all.
+    
+    Args:
+        transport: "streamable-http", or "sse" with a single worker
+        host: Interface to listen on
+        port: TCP port to listen on
+        workers: Number of worker processes
+        max_in_flight: Concurrent requests per worker before new ones get 503
+        app_factory: "module:function" building the app, defaults to create_app
+    """
+    import uvicorn
+    
+    settings = {
+        "YOUTUBE_TRANSPORT": transport,
+        "YOUTUBE_HOST": host,
+        "YOUTUBE_PORT": str(port),
+        "YOUTUBE_WORKERS": str(workers),
+        "YOUTUBE_MAX_IN_FLIGHT": str(max_in_flight),
+    }
+    # Worker processes are spawned fresh and read their configuration from the environment
+    os.environ.update(settings)
+    config.TRANSPORT, config.HOST, config.PORT = transport, host, port
+    config.SERVER_WORKERS, config.MAX_IN_FLIGHT = workers, max_in_flight
+    
+    logger.info("Serving %s on %s:%s with %s workers, %s requests in flight each", transport, host, port, workers, max_in_flight)
+    uvicorn.run(
+        app_factory or f"{__name__}:create_app",
+        factory=True,
+        host=host,
+        port=port,
+        workers=workers,
+        limit_concurrency=max_in_flight,
+    )
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    """
+    Parse command line options; defaults come from the YOUTUBE_* environment variables.
+    
+    Args:
+        argv: Arguments without the program name, defaults to sys.argv
+    
+    Returns:
+        The parsed options
+    """
+    parser = argparse.ArgumentParser(
+        prog="mcp_youtube_extract",
+        description="YouTube MCP Server",
+        epilog="Run 'mcp_youtube_extract prefetch --help' to fill the cache from a list of video IDs.",
+    )
+    parser.add_argument("--transport", choices=TRANSPORTS, default=config.TRANSPORT, help="MCP transport (default: %(default)s)")
+    parser.add_argument("--host", default=config.HOST, help="HTTP interface to listen on (default: %(default)s)")
+    parser.add_argument("--port", type=int, default=config.PORT, help="HTTP port (default: %(default)s)")
+    parser.add_argument("--workers", type=int, default=config.SERVER_WORKERS, help="HTTP worker processes (default: %(default)s)")
+    parser.add_argument(
+        "--max-in-flight", type=int, default=config.MAX_IN_FLIGHT, help="concurrent requests per HTTP worker (default: %(default)s)"
+    )
+    args = parser.parse_args(argv)
+    if args.workers < 1 or args.max_in_flight < 1:
+        parser.error("--workers and --max-in-flight must be at least 1")
+    if args.transport == "sse" and args.workers > 1:
+        parser.error("the sse transport keeps each session in one worker; use streamable-http for several workers")
+    return args
+
+def main(argv: list[str] | None = None):
+    """Main entry point for the MCP server, and for the prefetch subcommand."""
+    if argv is None:
+        argv = sys.argv[1:]
+    if argv[:1] == ["prefetch"]:
+        from .prefetch import main as prefetch_main
+
+        return prefetch_main(argv[1:])
+    args = parse_args(argv)
+    logger.info("Starting YouTube MCP Server (%s transport)", args.transport)
     try:
-        mcp.run()
+        if args.transport == "stdio":
+            config.SERVER_WORKERS = 1
+            mcp.run()
+        else:
+            run_http(args.transport, args.host, args.port, args.workers, args.max_in_flight)
     except Exception as e:
-        logger.error(f"Server error: {e}", exc_info=True)
+        logger.error("Server error: %s", e, exc_info=True)
         raise
 
 if __name__ == "__main__":
-    main()
+    sys.exit(main())
@@ -0,0 +1,98 @@
+"""
+In-flight request coalescing (single-flight) for upstream fetches.
+
+When several callers ask for the same key at the same time, only the first runs
+the fetch; the others wait for it and receive the same result or exception.
+"""
+
+import threading
+from typing import Any, Callable, Hashable
+
+from .metrics import COALESCED_CALLS
+from .logger import get_logger
+
+logger = get_logger(__name__)
+
+
+class _Call:
+    """One in-flight execution and the callers waiting on it."""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: BaseException | None = None
+        self.waiters = 0
+
+
+class SingleFlight:
+    """Thread-safe de-duplication of concurrent calls that share a key."""
+
+    def __init__(self):
+        self._calls: dict[Hashable, _Call] = {}
+        self._lock = threading.Lock()
+        self.executions = 0
+        self.coalesced = 0
+
+    def do(self, key: Hashable, func: Callable[..., Any], *args: Any) -> Any:
+        """
+        Call func(*args), unless a call for the same key is already running.
+
+        Args:
+            key: Identifies equivalent calls, e.g. ('info', video_id).
+            func: The fetch to run.
+            *args: Positional arguments for func.
+
+        Returns:
+            The result of the call that ran for this key.
+
+        Raises:
+            Whatever exception the call that ran for this key raised.
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            if call is not None:
+                call.waiters += 1
+                self.coalesced += 1
+                leader = False
+            else:
+                call = self._calls[key] = _Call()
+                self.executions += 1
+                leader = True
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = func(*args)
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+            if call.waiters:
+                COALESCED_CALLS.inc(call.waiters, kind=key[0] if isinstance(key, tuple) else "other")
+                logger.info("Coalesced %s concurrent caller(s) onto fetch for %s", call.waiters, key)
+
+    def stats(self) -> dict:
+        """
+        Report how many fetches ran and how many callers shared another's fetch.
+
+        Returns:
+            dict: executions, coalesced and in_flight counts.
+        """
+        with self._lock:
+            return {
+                "executions": self.executions,
+                "coalesced": self.coalesced,
+                "in_flight": len(self._calls),
+            }
+
+
+# Shared by get_video_info and get_video_transcript; keys start with the source kind
+in_flight = SingleFlight()
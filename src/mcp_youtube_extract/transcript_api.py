@@ -2,102 +2,536 @@
 YouTube transcript API utilities for fetching video transcripts using yt-ts-extract.
 """
 
-from yt_ts_extract import (
-    get_transcript,
-    get_transcript_text,
-    get_available_languages,
-    YouTubeTranscriptExtractor,
-)
+import threading
+from collections import OrderedDict
+from typing import Iterable, Iterator, Sequence
+
+from . import config, corpus
+from .cache import get_cache, MISS
+from .singleflight import in_flight
+from .metrics import span, CACHE_LOOKUPS
+from .segments import SegmentIndex, SegmentIndexBuilder
+from .search_index import SearchIndex
+from .transcript_file import TranscriptFile, encode_transcript
+from .transcript_xml import iter_segments
+from .video_id import normalize_video_id
 from .logger import get_logger
 
 logger = get_logger(__name__)
 
+# Recently used segment and search indexes, kept decoded in memory in front of the disk cache
+_recent_indexes: OrderedDict[tuple[str, str], SegmentIndex] = OrderedDict()
+_recent_search_indexes: OrderedDict[tuple[str, str], SearchIndex] = OrderedDict()
+_recent_lock = threading.Lock()
+
+# Preferred languages when a caller names none
+DEFAULT_LANGUAGES = ("en",)
+
+
+def _remember(memo: OrderedDict, video_id: str, cache_language: str, value) -> None:
+    with _recent_lock:
+        memo[(video_id, cache_language)] = value
+        memo.move_to_end((video_id, cache_language))
+        while len(memo) > config.SEGMENT_MEMO_SIZE:
+            memo.popitem(last=False)
+
+
+def _recall(memo: OrderedDict, video_id: str, cache_language: str):
+    with _recent_lock:
+        value = memo.get((video_id, cache_language))
+        if value is not None:
+            memo.move_to_end((video_id, cache_language))
+        return value
+
+
+def _extractor_pool():
+    """The shared extractor pool; yt-ts-extract and requests are imported on first use."""
+    from .extractor_pool import get_extractor_pool
+
+    return get_extractor_pool()
+
 
-def get_video_transcript(video_id: str, languages=['en']) -> str | None:
+def clear_segment_memo() -> None:
+    """Forget the decoded segment and search indexes kept in memory."""
+    with _recent_lock:
+        _recent_indexes.clear()
+        _recent_search_indexes.clear()
+
+
+def select_caption_track(tracks: list[dict], languages: list[str], fallback: bool = True) -> dict | None:
     """
-    Fetch the transcript for a YouTube video with fallback logic.
-    Priority: 1. Auto-generated, 2. English, 3. First available.
-    
-    This uses yt-ts-extract which provides robust transcript extraction.
+    Pick the caption track to download.
+    Priority: 1. Auto-generated in a preferred language, 2. Any track in a preferred
+    language, 3. First available. Preferred languages are tried in order.
 
     Args:
+        tracks (list): Caption tracks from the Innertube player response.
+        languages (list): Preferred language codes, most preferred first.
+        fallback (bool): Whether to fall back to the first track when none is in a preferred language.
+
+    Returns:
+        dict: The selected track, or None if there is no suitable track.
+    """
+    for lang in languages:
+        for track in tracks:
+            if track.get("languageCode") == lang and track.get("kind") == "asr":
+                return track
+    for lang in languages:
+        for track in tracks:
+            if track.get("languageCode") == lang:
+                return track
+    return tracks[0] if tracks and fallback else None
+
+
+def _list_tracks(extractor, video_id: str) -> list[dict]:
+    """
+    Fetch the caption track list of a video with one upstream request.
+
+    Args:
+        extractor: The YouTubeTranscriptExtractor to issue requests with.
         video_id (str): The ID of the YouTube video.
-        languages (list): A list of language codes to try for the English fallback.
 
     Returns:
-        str: The video transcript text, or None if not found.
+        list: The caption tracks, empty if the video has no transcript.
     """
+    with span("transcript.track_list"):
+        api_key = extractor.get_api_key_from_homepage()
+        player_data = extractor.call_innertube_api(video_id, api_key)
+
     try:
-        logger.info(f"Fetching transcript for video: {video_id}")
-        
-        # Create extractor with reasonable defaults
-        extractor = YouTubeTranscriptExtractor(
-            timeout=30,
-            max_retries=3,
-            backoff_factor=0.75,
-            min_delay=2.0
-        )
-        
-        # First, try to get available languages to understand what's available
-        try:
-            available_langs = get_available_languages(video_id)
-            logger.info(f"Available languages: {[lang['code'] for lang in available_langs]}")
-        except Exception as e:
-            logger.info(f"Could not get available languages: {e}")
-            available_langs = []
-
-        # Try to get transcript in preferred language first
-        transcript = None
-        for lang in languages:
-            try:
-                logger.info(f"Trying to get transcript in language: {lang}")
-                transcript = extractor.get_transcript(video_id, language=lang)
-                if transcript:
-                    logger.info(f"Successfully got transcript in language: {lang}")
-                    break
-            except Exception as e:
-                logger.info(f"Failed to get transcript in {lang}: {e}")
-                continue
-        
-        # If no transcript found in preferred languages, try to get any available
-        if not transcript:
-            logger.info("No transcript found in preferred languages, trying any available...")
-            try:
-                transcript = get_transcript(video_id)
-                if transcript:
-                    logger.info("Found transcript in any available language")
-            except Exception as e:
-                logger.info(f"Failed to get any transcript: {e}")
-        
-        # If still no transcript, try the simple text function as last resort
-        if not transcript:
-            logger.info("Trying simple transcript text extraction...")
-            try:
-                text = get_transcript_text(video_id)
-                if text:
-                    logger.info("Successfully got transcript text")
-                    return text
-            except Exception as e:
-                logger.info(f"Failed to get transcript text: {e}")
-        
-        # If we have transcript segments, convert to text
-        if transcript:
-            # Convert segments to plain text
-            text_parts = []
-            for segment in transcript:
-                if isinstance(segment, dict) and 'text' in segment:
-                    text_parts.append(segment['text'])
-                elif isinstance(segment, str):
-                    text_parts.append(segment)
-            
-            if text_parts:
-                formatted_transcript = ' '.join(text_parts)
-                logger.info(f"Transcript formatted successfully: {len(formatted_transcript)} characters")
-                return formatted_transcript
-        
-        logger.warning("No transcripts available for this video.")
+        tracks = extractor.extract_caption_tracks(player_data)
+    except Exception as e:
+        # Raised for unplayable videos and videos without captions
+        logger.info("No caption tracks for %s: %s", video_id, e)
+        return []
+
+    logger.info("Available languages: %s", [track.get('languageCode') for track in tracks])
+    return tracks
+
+
+def _plan_track(extractor, video_id: str, languages: list[str]) -> dict | None:
+    """
+    Fetch the caption track list once and pick the track to download.
+
+    Args:
+        extractor: The YouTubeTranscriptExtractor to issue requests with.
+        video_id (str): The ID of the YouTube video.
+        languages (list): Preferred language codes.
+
+    Returns:
+        dict: The selected caption track, or None if the video has no transcript.
+    """
+    track = select_caption_track(_list_tracks(extractor, video_id), languages)
+    if track is not None:
+        kind = "auto-generated" if track.get("kind") == "asr" else "manual"
+        logger.info("Selected %s track in language: %s", kind, track.get('languageCode'))
+    return track
+
+
+def _iter_track_xml(extractor, track: dict) -> Iterable[bytes | str]:
+    """Download a caption track, streamed when the extractor supports it."""
+    stream = getattr(extractor, "iter_transcript_xml", None)
+    if stream is not None:
+        return stream(track["baseUrl"])
+    return [extractor.fetch_transcript_xml(track["baseUrl"])]
+
+
+def _lookup_file(video_id: str, cache, cache_language: str):
+    """
+    Find a transcript in memory or in the disk cache without decoding it.
+
+    Returns the SegmentIndex kept in memory, a TranscriptFile reading the cached
+    bytes on demand, None for a cached "no transcript", or MISS if absent.
+    """
+    if cache is None:
+        return MISS
+    index = _recall(_recent_indexes, video_id, cache_language)
+    if index is not None:
+        CACHE_LOOKUPS.inc(kind="segments", tier="memory", result="hit")
+        logger.debug("Memory hit for transcript: %s", video_id)
+        return index
+    cached = cache.get_blob("segments", video_id, cache_language)
+    if cached is MISS:
+        return MISS
+    logger.info("Cache hit for transcript: %s", video_id)
+    return None if cached is None else TranscriptFile(cached)
+
+
+def _lookup_index(video_id: str, cache, cache_language: str):
+    """Find a transcript in memory or in the disk cache; returns MISS if absent."""
+    index = _lookup_file(video_id, cache, cache_language)
+    if isinstance(index, TranscriptFile):
+        index = index.to_index()
+        _remember(_recent_indexes, video_id, cache_language, index)
+    return index
+
+
+def _store_index(
+    video_id: str, cache, cache_language: str, index: SegmentIndex | None, language: str | None = None
+) -> None:
+    """Record a fetched transcript, or its absence, in the cache; the corpus labels it with language or cache_language."""
+    if cache is None:
+        return
+    if index is None:
+        cache.set("segments", video_id, None, ttl=config.CACHE_NEGATIVE_TTL, language=cache_language)
+        return
+    cache.set("segments", video_id, encode_transcript(index), ttl=config.CACHE_TRANSCRIPT_TTL, language=cache_language)
+    _remember(_recent_indexes, video_id, cache_language, index)
+    # Tokenize while the transcript is fresh, so searches never have to
+    search_index = SearchIndex.build(index)
+    _store_search_index(video_id, cache, cache_language, search_index)
+    corpus.add_transcript(video_id, language or cache_language, index, search_index)
+
+
+def _store_search_index(video_id: str, cache, cache_language: str, search_index: SearchIndex) -> None:
+    """Keep a transcript's search index next to its segments in the cache."""
+    cache.set("search_index", video_id, search_index.to_dict(), ttl=config.CACHE_TRANSCRIPT_TTL, language=cache_language)
+    _remember(_recent_search_indexes, video_id, cache_language, search_index)
+
+
+def _fetch_segment_index(video_id: str, languages: list[str], cache, cache_language: str) -> SegmentIndex | None:
+    """Fetch transcript segments upstream, index them and record the outcome in the cache."""
+    logger.info("Fetching transcript for video: %s", video_id)
+
+    # Borrow a long-lived extractor so its connections and rate limit state are reused
+    with _extractor_pool().extractor() as extractor:
+        # Extractors that count what they send report the requests this fetch really made, retries included
+        sent_before = getattr(extractor, "requests_sent", None)
+        track = _plan_track(extractor, video_id, languages)
+        index = None
+        if track is not None:
+            with span("transcript.download"):
+                index = SegmentIndex.from_segments(iter_segments(_iter_track_xml(extractor, track)))
+        if sent_before is not None:
+            logger.info("Transcript fetch for %s made %s upstream request(s)", video_id, extractor.requests_sent - sent_before)
+
+    if index is not None and not len(index):
+        index = None
+    if index is not None:
+        logger.info("Transcript indexed: %s segments, %s characters", len(index), len(index.text))
+    _store_index(video_id, cache, cache_language, index)
+    return index
+
+
+def get_transcript_segments(video_id: str, languages: Sequence[str] = DEFAULT_LANGUAGES) -> SegmentIndex | None:
+    """
+    Fetch the timestamped transcript segments for a YouTube video.
+
+    Uses the same track selection, cache and request coalescing as
+    get_video_transcript. While caching is enabled, recently used transcripts are
+    also kept decoded in memory, so paging through one does not re-read it.
+
+    Args:
+        video_id (str): The ID or URL of the YouTube video.
+        languages (list): Preferred language codes, most preferred first; defaults to English.
+
+    Returns:
+        SegmentIndex: The segments sorted by start time, or None if the video has no transcript.
+
+    Raises:
+        InvalidVideoIdError: If video_id is not a video ID or URL; no request is made.
+        Exception: If the transcript could not be retrieved.
+    """
+    video_id = normalize_video_id(video_id)
+    cache = get_cache()
+    cache_language = ",".join(languages)
+    index = _lookup_index(video_id, cache, cache_language)
+    if index is not MISS:
+        return index
+
+    return in_flight.do(
+        ("segments", video_id, cache_language),
+        _fetch_segment_index, video_id, languages, cache, cache_language,
+    )
+
+
+def get_transcript_reader(
+    video_id: str, languages: Sequence[str] = DEFAULT_LANGUAGES
+) -> SegmentIndex | TranscriptFile | None:
+    """
+    Fetch a transcript for reading parts of it, such as a page or a time window.
+
+    Like get_transcript_segments, but a transcript found in the disk cache is
+    returned as a TranscriptFile over the cache entry instead of being decoded,
+    so reading a few segments reads and decompresses only the blocks that hold them. Both
+    types offer segment, time_range, text_between, chunk_end and iter_timestamped.
+
+    Args:
+        video_id (str): The ID or URL of the YouTube video.
+        languages (list): Preferred language codes, most preferred first; defaults to English.
+
+    Returns:
+        SegmentIndex | TranscriptFile: The segments sorted by start time, or None if
+        the video has no transcript.
+
+    Raises:
+        InvalidVideoIdError: If video_id is not a video ID or URL; no request is made.
+        Exception: If the transcript could not be retrieved.
+    """
+    video_id = normalize_video_id(video_id)
+    cache = get_cache()
+    cache_language = ",".join(languages)
+    index = _lookup_file(video_id, cache, cache_language)
+    if index is not MISS:
+        return index
+
+    return in_flight.do(
+        ("segments", video_id, cache_language),
+        _fetch_segment_index, video_id, languages, cache, cache_language,
+    )
+
+
+def _exact_key(language: str) -> str:
+    """
+    Cache language for a transcript in exactly one language.
+
+    Kept apart from preference lists: get_transcript_segments(video_id, ['fr'])
+    falls back to another language when there is no French track, and caches that
+    under 'fr'.
+    """
+    return f"={language}"
+
+
+def plan_transcripts(video_id: str, languages: list[str]) -> dict:
+    """
+    Find transcripts in several languages, listing the caption tracks at most once.
+
+    Languages are matched exactly, without falling back to another language. The
+    track list is cached as well, so languages known to be unavailable cost no
+    request until it expires.
+
+    Args:
+        video_id (str): The ID or URL of the YouTube video.
+        languages (list): Language codes wanted.
+
+    Returns:
+        dict: found (language -> SegmentIndex from the cache), downloads (language ->
+        caption track still to fetch with download_transcript), unavailable (languages
+        without a track) and available (the video's caption languages, None if the
+        tracks were not looked up).
+
+    Raises:
+        InvalidVideoIdError: If video_id is not a video ID or URL; no request is made.
+        Exception: If the track list could not be retrieved.
+    """
+    video_id = normalize_video_id(video_id)
+    cache = get_cache()
+    plan = {"found": {}, "downloads": {}, "unavailable": [], "available": None}
+    missing = []
+    for language in dict.fromkeys(languages):
+        index = _lookup_index(video_id, cache, _exact_key(language))
+        if index is MISS:
+            missing.append(language)
+        elif index is None:
+            plan["unavailable"].append(language)
+        else:
+            plan["found"][language] = index
+
+    available = MISS if cache is None else cache.get("tracks", video_id)
+    if available is not MISS:
+        plan["available"] = available
+        plan["unavailable"] += [language for language in missing if language not in available]
+        missing = [language for language in missing if language in available]
+    if not missing:
+        return plan
+
+    with _extractor_pool().extractor() as extractor:
+        tracks = _list_tracks(extractor, video_id)
+    plan["available"] = sorted({track.get("languageCode") for track in tracks if track.get("languageCode")})
+    if cache is not None:
+        cache.set("tracks", video_id, plan["available"], ttl=config.CACHE_NEGATIVE_TTL)
+    for language in missing:
+        track = select_caption_track(tracks, [language], fallback=False)
+        if track is None:
+            plan["unavailable"].append(language)
+        else:
+            plan["downloads"][language] = track
+    return plan
+
+
+def _download_transcript(video_id: str, language: str, track: dict, cache) -> SegmentIndex | None:
+    """Download one caption track, index it and cache it under its language."""
+    with _extractor_pool().extractor() as extractor:
+        with span("transcript.download"):
+            index = SegmentIndex.from_segments(iter_segments(_iter_track_xml(extractor, track)))
+    if not len(index):
+        index = None
+    _store_index(video_id, cache, _exact_key(language), index, language=language)
+    return index
+
+
+def download_transcript(video_id: str, language: str, track: dict) -> SegmentIndex | None:
+    """
+    Download a caption track found by plan_transcripts; one download per track at a time.
+
+    Args:
+        video_id (str): The ID or URL of the YouTube video.
+        language (str): The track's language code.
+        track (dict): The caption track.
+
+    Returns:
+        SegmentIndex: The segments sorted by start time, or None if the track is empty.
+
+    Raises:
+        InvalidVideoIdError: If video_id is not a video ID or URL; no request is made.
+        Exception: If the track could not be downloaded.
+    """
+    video_id = normalize_video_id(video_id)
+    cache = get_cache()
+    return in_flight.do(
+        ("segments", video_id, _exact_key(language)),
+        _download_transcript, video_id, language, track, cache,
+    )
+
+
+def iter_transcript_segments(video_id: str, languages: Sequence[str] = DEFAULT_LANGUAGES) -> Iterator[dict]:
+    """
+    Yield transcript segments as they are downloaded and parsed.
+
+    The first segment is available as soon as its XML arrives instead of after the
+    whole transcript. Cached transcripts are replayed from the cache one block at a
+    time, and a stream that runs to the end is cached like a regular fetch. Segments
+    are indexed as they pass, so the stream holds no list of segment dicts.
+
+    Args:
+        video_id (str): The ID or URL of the YouTube video.
+        languages (list): Preferred language codes, most preferred first; defaults to English.
+
+    Yields:
+        dict: Segments with text, start, duration and end; nothing if the video has no transcript.
+
+    Raises:
+        InvalidVideoIdError: If video_id is not a video ID or URL; no request is made.
+        Exception: If the transcript could not be retrieved.
+    """
+    video_id = normalize_video_id(video_id)
+    cache = get_cache()
+    cache_language = ",".join(languages)
+    index = _lookup_file(video_id, cache, cache_language)
+    if index is not MISS:
+        if index is not None:
+            yield from (index.segment(i) for i in range(len(index)))
+        return
+
+    logger.info("Streaming transcript for video: %s", video_id)
+    # Index segments as they pass instead of keeping them, so the cache entry is ready at the end
+    builder = SegmentIndexBuilder()
+    with _extractor_pool().extractor() as extractor:
+        track = _plan_track(extractor, video_id, languages)
+        if track is not None:
+            for segment in iter_segments(_iter_track_xml(extractor, track)):
+                builder.add(segment)
+                yield segment
+
+    logger.info("Streamed %s segments for %s", len(builder), video_id)
+    _store_index(video_id, cache, cache_language, builder.build() if len(builder) else None)
+
+
+def get_search_index(video_id: str, languages: Sequence[str] = DEFAULT_LANGUAGES) -> tuple[SegmentIndex, SearchIndex] | None:
+    """
+    Get a transcript together with its search index.
+
+    The index is built when the transcript is fetched and cached next to it, so
+    this only tokenizes the transcript if that copy is missing, e.g. because
+    caching is disabled.
+
+    Args:
+        video_id (str): The ID or URL of the YouTube video.
+        languages (list): Preferred language codes, most preferred first; defaults to English.
+
+    Returns:
+        tuple: (segments, search index), or None if the video has no transcript.
+
+    Raises:
+        InvalidVideoIdError: If video_id is not a video ID or URL; no request is made.
+        Exception: If the transcript could not be retrieved.
+    """
+    video_id = normalize_video_id(video_id)
+    index = get_transcript_segments(video_id, languages)
+    if index is None:
         return None
 
+    cache = get_cache()
+    cache_language = ",".join(languages)
+    if cache is None:
+        return index, SearchIndex.build(index)
+    search_index = _recall(_recent_search_indexes, video_id, cache_language)
+    if search_index is not None:
+        CACHE_LOOKUPS.inc(kind="search_index", tier="memory", result="hit")
+        return index, search_index
+    cached = cache.get("search_index", video_id, cache_language)
+    if cached is not MISS and cached is not None:
+        search_index = SearchIndex.from_dict(cached)
+        _remember(_recent_search_indexes, video_id, cache_language, search_index)
+    else:
+        logger.info("Building search index for %s", video_id)
+        search_index = SearchIndex.build(index)
+        _store_search_index(video_id, cache, cache_language, search_index)
+        # Also catches up transcripts cached before the corpus existed
+        corpus.add_transcript(video_id, cache_language, index, search_index)
+    return index, search_index
+
+
+def search_transcript(video_id: str, query: str, languages: Sequence[str] = DEFAULT_LANGUAGES) -> tuple[SegmentIndex, list[tuple[int, int]]] | None:
+    """
+    Find where words or phrases are said in a video.
+
+    Args:
+        video_id (str): The ID or URL of the YouTube video.
+        query (str): Words, all of which must occur in a segment, and "quoted phrases".
+        languages (list): Preferred language codes, most preferred first; defaults to English.
+
+    Returns:
+        tuple: (segments, hits) where each hit is a (first_segment, last_segment)
+        pair in transcript order, or None if the video has no transcript.
+
+    Raises:
+        InvalidVideoIdError: If video_id is not a video ID or URL; no request is made.
+        Exception: If the transcript could not be retrieved.
+    """
+    video_id = normalize_video_id(video_id)
+    found = get_search_index(video_id, languages)
+    if found is None:
+        return None
+    index, search_index = found
+    with span("transcript.search"):
+        hits = search_index.search(query)
+    logger.info("Search for %r in %s found %s segment(s)", query, video_id, len(hits))
+    return index, hits
+
+
+def get_video_transcript(video_id: str, languages: Sequence[str] = DEFAULT_LANGUAGES) -> str | None:
+    """
+    Fetch the transcript for a YouTube video.
+    Priority: 1. Auto-generated, 2. Preferred languages, 3. First available.
+
+    This uses yt-ts-extract which provides robust transcript extraction. The caption
+    track list is fetched once and only the selected track is downloaded, so a call
+    makes at most two upstream requests.
+    Transcripts and "no transcript" results are served from the persistent cache;
+    retrieval errors are not cached. Concurrent calls for the same video and
+    languages share a single upstream fetch.
+
+    Args:
+        video_id (str): The ID or URL of the YouTube video.
+        languages (list): Preferred language codes, most preferred first; defaults to English.
+
+    Returns:
+        str: The video transcript text, or None if not found.
+
+    Raises:
+        InvalidVideoIdError: If video_id is not a video ID or URL; no request is made.
+    """
+    video_id = normalize_video_id(video_id)
+    try:
+        index = get_transcript_segments(video_id, languages)
     except Exception as e:
-        logger.error(f"Could not retrieve transcript: {e}")
+        logger.error("Could not retrieve transcript: %s", e)
         return f"Could not retrieve transcript: {e}"
+
+    if index is None:
+        logger.warning("No transcripts available for this video.")
+        return None
+
+    # The index stores segment texts already joined by spaces
+    return index.text
@@ -0,0 +1,262 @@
+"""
+Compact binary container for transcripts with their segment timings.
+
+Layout, all integers little-endian uint32 after the header:
+
+    header        magic, version, compression, flags, segments, segments per block, blocks
+    starts        segment start times in milliseconds, one per segment
+    durations     segment durations in milliseconds, one per segment
+    offsets       byte offset of each segment in the text, plus one past the end
+    block table   offset of each compressed block in the blob, plus one past the end
+    blob          the transcript text, compressed in blocks of `segments per block` segments
+
+The text is the plain transcript, segments joined by single spaces, as in
+SegmentIndex; segment i is text[offsets[i]:offsets[i + 1] - 1]. Blocks are
+compressed independently with zlib, so reading one segment decompresses only its
+block, and the timing arrays are read without touching the text at all. Files
+are read through mmap, and cached transcripts through SQLite's incremental blob
+I/O, so only the header, the arrays and the blocks actually used are read.
+"""
+
+import mmap
+import struct
+import sys
+import zlib
+from array import array
+from bisect import bisect_left, bisect_right
+from pathlib import Path
+from typing import Iterator
+
+from .cache import CachedBlob
+from .segments import SegmentIndex, format_timestamp
+
+MAGIC = b"YTTR"
+VERSION = 1
+# Values of the compression field
+COMPRESSION_NONE = 0
+COMPRESSION_ZLIB = 1
+# Flag: the text is ASCII, so byte offsets are also character offsets
+_FLAG_ASCII = 1
+# magic, version, compression, flags, segments, segments per block, blocks
+_HEADER = struct.Struct("<4sHBBIII")
+_BLOCK_SEGMENTS = 256
+_BIG_ENDIAN = sys.byteorder == "big"
+
+
+def _pack(values: array) -> bytes:
+    if _BIG_ENDIAN:
+        values = array("I", values)
+        values.byteswap()
+    return values.tobytes()
+
+
+def _unpack(data) -> array:
+    values = array("I")
+    values.frombytes(data)
+    if _BIG_ENDIAN:
+        values.byteswap()
+    return values
+
+
+def _milliseconds(seconds: array) -> array:
+    return array("I", [round(value * 1000) for value in seconds])
+
+
+def encode_transcript(
+    index: SegmentIndex, block_segments: int = _BLOCK_SEGMENTS, compression: int = COMPRESSION_ZLIB, level: int = 6
+) -> bytes:
+    """
+    Serialize transcript segments into the container format.
+
+    Times are stored with millisecond precision, which is what YouTube captions carry.
+
+    Args:
+        index: The transcript segments.
+        block_segments: Segments per independently compressed block; smaller blocks
+            make single segments cheaper to read and compress less well.
+        compression: COMPRESSION_ZLIB or COMPRESSION_NONE.
+        level: zlib compression level.
+
+    Returns:
+        bytes: The encoded transcript.
+    """
+    if compression not in (COMPRESSION_NONE, COMPRESSION_ZLIB):
+        raise ValueError(f"Unknown compression {compression}")
+    segments = len(index)
+    text = index.text.encode("utf-8")
+    ascii_only = len(text) == len(index.text)
+    if ascii_only:
+        offsets = array("I", index.offsets)
+    else:
+        offsets = array("I", [0])
+        for i in range(segments):
+            offsets.append(offsets[-1] + len(index.segment_text(i).encode("utf-8")) + 1)
+
+    blob = bytearray()
+    block_offsets = array("I", [0])
+    for lo in range(0, segments, block_segments):
+        hi = min(lo + block_segments, segments)
+        block = text[offsets[lo]:offsets[hi]]
+        blob += zlib.compress(block, level) if compression == COMPRESSION_ZLIB else block
+        block_offsets.append(len(blob))
+
+    header = _HEADER.pack(
+        MAGIC, VERSION, compression, _FLAG_ASCII if ascii_only else 0, segments, block_segments, len(block_offsets) - 1
+    )
+    return b"".join((
+        header,
+        _pack(_milliseconds(index.starts)),
+        _pack(_milliseconds(index.durations)),
+        _pack(offsets),
+        _pack(block_offsets),
+        blob,
+    ))
+
+
+def write_transcript(path: str | Path, index: SegmentIndex, **options) -> None:
+    """
+    Write transcript segments to a container file.
+
+    Args:
+        path: The file to write.
+        index: The transcript segments.
+        **options: Passed to encode_transcript.
+    """
+    Path(path).write_bytes(encode_transcript(index, **options))
+
+
+class TranscriptFile:
+    """
+    Read access to an encoded transcript, from bytes or a memory-mapped file.
+
+    Timings and offsets are read when the file is opened; text blocks are read
+    and decompressed on demand, keeping the last one for sequential reads.
+    """
+
+    def __init__(self, data: bytes | mmap.mmap | CachedBlob):
+        """
+        Args:
+            data: The output of encode_transcript, a mapping of a file holding it, or
+                a cache entry holding it.
+
+        Raises:
+            ValueError: If the data is not a transcript written by this version, or truncated.
+        """
+        if len(data) < _HEADER.size:
+            raise ValueError("Transcript data is truncated")
+        magic, version, self.compression, self.flags, segments, self.block_segments, blocks = _HEADER.unpack(
+            data[:_HEADER.size]
+        )
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"Not a version {VERSION} transcript")
+        if self.compression not in (COMPRESSION_NONE, COMPRESSION_ZLIB):
+            raise ValueError(f"Unknown compression {self.compression}")
+        # All four arrays in one read, which matters when every slice is a database read
+        counts = (segments, segments, segments + 1, blocks + 1)
+        arrays = data[_HEADER.size:_HEADER.size + 4 * sum(counts)]
+        position = 0
+        sections = []
+        for count in counts:
+            sections.append(_unpack(arrays[position:position + 4 * count]))
+            position += 4 * count
+        position += _HEADER.size
+        self.starts_ms, self.durations_ms, self.offsets, self._blocks = sections
+        if len(self._blocks) != blocks + 1 or len(data) < position + self._blocks[-1]:
+            raise ValueError("Transcript data is truncated")
+        self._data = data
+        self._blob = position
+        self._cached_block: tuple[int, bytes] = (-1, b"")
+
+    @classmethod
+    def open(cls, path: str | Path) -> "TranscriptFile":
+        """Open a container file through a read-only memory mapping."""
+        with open(path, "rb") as f:
+            return cls(mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ))
+
+    def __len__(self) -> int:
+        return len(self.starts_ms)
+
+    def _block(self, b: int) -> bytes:
+        cached_b, cached = self._cached_block
+        if cached_b == b:
+            return cached
+        data = self._data[self._blob + self._blocks[b]:self._blob + self._blocks[b + 1]]
+        if self.compression == COMPRESSION_ZLIB:
+            data = zlib.decompress(data)
+        self._cached_block = (b, data)
+        return data
+
+    def segment_text(self, i: int) -> str:
+        """Text of segment i, decompressing only the block that holds it."""
+        if not 0 <= i < len(self):
+            raise IndexError("segment index out of range")
+        b = i // self.block_segments
+        base = self.offsets[b * self.block_segments]
+        return self._block(b)[self.offsets[i] - base:self.offsets[i + 1] - base - 1].decode("utf-8")
+
+    def segment(self, i: int) -> dict:
+        """Segment i in yt-ts-extract form: text, start, duration and end."""
+        text = self.segment_text(i)
+        start = self.starts_ms[i] / 1000
+        duration = self.durations_ms[i] / 1000
+        return {"text": text, "start": start, "duration": duration, "end": start + duration}
+
+    def time_range(self, start: float | None = None, end: float | None = None) -> range:
+        """Find the segments that overlap a time window, like SegmentIndex.time_range."""
+        starts = self.starts_ms
+        lo = 0
+        if start is not None:
+            lo = bisect_left(starts, start * 1000)
+            if lo > 0 and starts[lo - 1] + self.durations_ms[lo - 1] > start * 1000:
+                lo -= 1
+        hi = len(self) if end is None else bisect_left(starts, end * 1000, lo)
+        return range(lo, max(lo, hi))
+
+    def text_between(self, lo: int, hi: int) -> str:
+        """Plain text of segments lo..hi-1, like SegmentIndex.text_between, decompressing only their blocks."""
+        if hi <= lo:
+            return ""
+        first = lo // self.block_segments
+        last = (hi - 1) // self.block_segments
+        data = b"".join(map(self._block, range(first, last + 1)))
+        base = self.offsets[first * self.block_segments]
+        return data[self.offsets[lo] - base:self.offsets[hi] - base - 1].decode("utf-8")
+
+    def chunk_end(self, lo: int, max_chars: int) -> int:
+        """
+        Find where a chunk starting at segment lo must end, like SegmentIndex.chunk_end.
+
+        Works on the offsets alone, without touching the text. They count UTF-8
+        bytes, so a chunk of non-ASCII text may stay further below max_chars.
+        """
+        if lo >= len(self):
+            return lo
+        hi = bisect_right(self.offsets, self.offsets[lo] + max_chars + 1, lo + 1) - 1
+        return min(len(self), max(hi, lo + 1))
+
+    def iter_timestamped(self, indices: range) -> Iterator[str]:
+        """Yield '[MM:SS] text' lines for the given segments, like SegmentIndex.iter_timestamped."""
+        for i in indices:
+            yield f"[{format_timestamp(self.starts_ms[i] / 1000)}] {self.segment_text(i)}"
+
+    def text(self) -> str:
+        """The whole transcript text, segments joined by spaces."""
+        # One read for all blocks rather than one per block
+        blob = self._data[self._blob:self._blob + self._blocks[-1]]
+        if self.compression == COMPRESSION_ZLIB:
+            blob = b"".join(zlib.decompress(blob[lo:hi]) for lo, hi in zip(self._blocks, self._blocks[1:]))
+        return blob.decode("utf-8")
+
+    def to_index(self) -> SegmentIndex:
+        """Decode everything into a SegmentIndex."""
+        text = self.text()
+        if self.flags & _FLAG_ASCII:
+            offsets = array("q", self.offsets)
+        else:
+            encoded = text.encode("utf-8")
+            offsets = array("q", [0])
+            for lo, hi in zip(self.offsets, self.offsets[1:]):
+                offsets.append(offsets[-1] + len(encoded[lo:hi - 1].decode("utf-8")) + 1)
+        starts = array("d", [value / 1000 for value in self.starts_ms])
+        durations = array("d", [value / 1000 for value in self.durations_ms])
+        return SegmentIndex(starts, durations, offsets, text)
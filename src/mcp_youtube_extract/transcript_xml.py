@@ -0,0 +1,97 @@
+"""
+Incremental parsing of YouTube timedtext XML into transcript segments.
+
+Segments are yielded as soon as their element is complete, so a transcript can
+be consumed while it is still downloading.
+"""
+
+import re
+import xml.etree.ElementTree as ET
+from html import unescape
+from typing import Iterable, Iterator
+
+_TAG_RE = re.compile(r"<[^>]+>")
+_SPACE_RE = re.compile(r"\s+")
+
+
+def _clean(text: str) -> str:
+    """Unescape entities, drop inline markup and normalize whitespace, as yt-ts-extract does."""
+    text = unescape(text).strip()
+    text = _TAG_RE.sub("", text)
+    return _SPACE_RE.sub(" ", text)
+
+
+def _text_segment(elem: ET.Element) -> dict | None:
+    """Segment from an older-format <text start=".." dur=".."> element (seconds)."""
+    text = _clean(elem.text or "")
+    if not text:
+        return None
+    start = float(elem.get("start", 0))
+    duration = float(elem.get("dur", 0))
+    return {"text": text, "start": start, "duration": duration, "end": start + duration}
+
+
+def _p_segment(elem: ET.Element) -> dict | None:
+    """Segment from a newer-format <p t=".." d=".."> element (milliseconds)."""
+    start_ms = elem.get("t")
+    if start_ms is None:
+        return None
+    start = float(start_ms) / 1000.0
+    duration_ms = elem.get("d")
+    duration = float(duration_ms) / 1000.0 if duration_ms else 0
+
+    text_parts = []
+    s_elements = elem.findall(".//s")
+    if s_elements:
+        for s_elem in s_elements:
+            if s_elem.text:
+                text_parts.append(s_elem.text.strip())
+    else:
+        if elem.text:
+            text_parts.append(elem.text.strip())
+        for child in elem:
+            if child.text:
+                text_parts.append(child.text.strip())
+            if child.tail:
+                text_parts.append(child.tail.strip())
+    text = _clean(" ".join(text_parts))
+    if not text:
+        return None
+    return {"text": text, "start": start, "duration": duration, "end": start + duration}
+
+
+def iter_segments(chunks: Iterable[bytes | str]) -> Iterator[dict]:
+    """
+    Parse timedtext XML incrementally.
+
+    Args:
+        chunks: The XML document in pieces, e.g. from a streamed HTTP response.
+
+    Yields:
+        dict: Segments with text, start, duration and end, in document order.
+
+    Raises:
+        Exception: If the XML is malformed.
+    """
+    parser = ET.XMLPullParser(events=("end",))
+    handlers = {"text": _text_segment, "p": _p_segment}
+
+    def drain() -> Iterator[dict]:
+        for _, elem in parser.read_events():
+            handler = handlers.get(elem.tag)
+            if handler is None:
+                continue
+            segment = handler(elem)
+            # Parsed elements are no longer needed; keep memory flat on long transcripts
+            elem.clear()
+            if segment:
+                yield segment
+
+    try:
+        for chunk in chunks:
+            parser.feed(chunk)
+            yield from drain()
+        parser.close()
+        yield from drain()
+    except ET.ParseError as e:
+        raise Exception(f"Failed to parse transcript XML: {e}")
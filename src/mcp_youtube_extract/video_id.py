@@ -0,0 +1,89 @@
+"""
+Video ID normalization.
+
+Tools accept a bare video ID or any of the URL shapes YouTube hands out:
+watch pages (desktop, mobile and music), youtu.be short links, shorts/, live/
+and embed/ pages, with or without a scheme and with any extra query parameters
+or fragment. Everything is reduced to the canonical 11-character ID before any
+request is made, so malformed input fails straight away and every alias of a
+video shares one cache entry.
+"""
+
+import re
+from urllib.parse import parse_qs, urlsplit
+
+VIDEO_ID_LENGTH = 11
+_VIDEO_ID = re.compile(r"[A-Za-z0-9_-]{11}")
+# Hosts serving YouTube pages, after dropping a leading www., m. or music.
+_YOUTUBE_HOSTS = frozenset({"youtube.com", "youtube-nocookie.com"})
+_SHORT_LINK_HOSTS = frozenset({"youtu.be"})
+_HOST_PREFIXES = ("www.", "m.", "music.")
+# First path segments followed by the video ID, as in /shorts/<id>
+_ID_PATHS = frozenset({"shorts", "embed", "live", "v", "e"})
+# Characters that end a bare ID followed by leftover query parameters, as in <id>&t=30
+_QUERY_SEPARATORS = re.compile(r"[?&#]")
+
+
+class InvalidVideoIdError(ValueError):
+    """The input is neither a YouTube video ID nor a URL of a YouTube video."""
+
+
+def is_video_id(value: str) -> bool:
+    """Whether value is a canonical 11-character video ID."""
+    return len(value) == VIDEO_ID_LENGTH and _VIDEO_ID.fullmatch(value) is not None
+
+
+def _id_from_url(text: str) -> str | None:
+    if "://" not in text:
+        text = "https://" + text.lstrip("/")
+    try:
+        parts = urlsplit(text)
+        host = (parts.hostname or "").lower()
+    except ValueError:
+        return None
+    for prefix in _HOST_PREFIXES:
+        if host.startswith(prefix):
+            host = host[len(prefix):]
+            break
+    segments = [segment for segment in parts.path.split("/") if segment]
+    if host in _SHORT_LINK_HOSTS:
+        return segments[0] if segments else None
+    if host not in _YOUTUBE_HOSTS:
+        return None
+    if segments == ["watch"]:
+        values = parse_qs(parts.query).get("v")
+        return values[0] if values else None
+    if len(segments) >= 2 and segments[0] in _ID_PATHS:
+        return segments[1]
+    return None
+
+
+def normalize_video_id(value: str) -> str:
+    """
+    Reduce a video ID or URL to the canonical 11-character video ID.
+
+    Args:
+        value: A video ID, possibly followed by query parameters, or a URL of a video page.
+
+    Returns:
+        str: The video ID.
+
+    Raises:
+        InvalidVideoIdError: If no valid video ID can be found; no request is made.
+    """
+    if not isinstance(value, str):
+        raise InvalidVideoIdError(f"Video ID must be a string, not {type(value).__name__}")
+    text = value.strip()
+    # Fast path: a bare ID, as most callers send
+    if is_video_id(text):
+        return text
+    if "/" in text or "." in text:
+        candidate = _id_from_url(text)
+    else:
+        candidate = _QUERY_SEPARATORS.split(text, 1)[0]
+    if candidate is None or not is_video_id(candidate):
+        shown = text if len(text) <= 100 else text[:100] + "..."
+        raise InvalidVideoIdError(
+            f"Not a YouTube video ID or video URL: {shown!r}; expected 11 characters of A-Z, a-z, 0-9, - and _"
+        )
+    return candidate
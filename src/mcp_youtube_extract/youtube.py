@@ -3,7 +3,17 @@ YouTube API utilities for fetching video information and transcripts.
 """
 
 from .google_api import get_video_info, format_video_info
-from .transcript_api import get_video_transcript
+from .transcript_api import (
+    get_video_transcript,
+    get_transcript_segments,
+    get_transcript_reader,
+    iter_transcript_segments,
+    search_transcript,
+    plan_transcripts,
+    download_transcript,
+)
 
 # Re-export the functions for backward compatibility
-__all__ = ['get_video_info', 'get_video_transcript', 'format_video_info'] 
\ No newline at end of file
+__all__ = ['get_video_info', 'get_video_transcript', 'get_transcript_segments', 'get_transcript_reader',
+           'iter_transcript_segments', 'search_transcript', 'plan_transcripts', 'download_transcript',
+           'format_video_info'] 
\ No newline at end of file
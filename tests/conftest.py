@@ -0,0 +1,38 @@
+import pytest
+from src.mcp_youtube_extract import cache, config, corpus, extractor_pool, google_api, metrics, ratelimit, transcript_api
+
+
+@pytest.fixture(autouse=True)
+def no_persistent_cache(monkeypatch):
+    """Keep unit tests away from the user's real cache and start from empty metrics; tests opt in with tmp_cache"""
+    monkeypatch.setattr(config, 'CACHE_ENABLED', False)
+    cache.set_cache(None)
+    metrics.reset_metrics()
+    yield
+    google_api.wait_for_refreshes()
+    corpus.wait_for_pending()
+    corpus.set_corpus(None)
+    cache.set_cache(None)
+    extractor_pool.set_extractor_pool(None)
+    ratelimit.reset_upstreams()
+    transcript_api.clear_segment_memo()
+
+
+@pytest.fixture
+def tmp_cache(tmp_path, monkeypatch):
+    """An enabled process-wide cache stored under a temporary directory"""
+    monkeypatch.setattr(config, 'CACHE_ENABLED', True)
+    disk_cache = cache.DiskCache(tmp_path / 'cache.sqlite3', max_bytes=1024 * 1024)
+    cache.set_cache(disk_cache)
+    corpus.set_corpus(corpus.Corpus(tmp_path / 'corpus'))
+    yield disk_cache
+    disk_cache.close()
+
+
+@pytest.fixture
+def use_extractor():
+    """Serve transcript fetches from the given (stub) extractor"""
+    def install(extractor, size=8):
+        extractor_pool.set_extractor_pool(extractor_pool.ExtractorPool(size, lambda: extractor))
+        return extractor
+    return install
@@ -0,0 +1,127 @@
+"""
+Local stand-ins for the yt-ts-extract network layer
+"""
+import io
+import json
+import threading
+import time
+from html import escape
+import requests
+from requests.adapters import HTTPAdapter
+from yt_ts_extract import YouTubeTranscriptExtractor
+
+
+def caption_track(language, auto_generated=False):
+    """Build a caption track entry as found in the Innertube player response"""
+    track = {
+        'languageCode': language,
+        'baseUrl': f'https://stub.invalid/timedtext?lang={language}&asr={int(auto_generated)}',
+        'name': {'simpleText': language},
+    }
+    if auto_generated:
+        track['kind'] = 'asr'
+    return track
+
+
+def player_response(tracks):
+    """Build an Innertube player response listing the given caption tracks"""
+    return {
+        'playabilityStatus': {'status': 'OK'},
+        'captions': {'playerCaptionsTracklistRenderer': {'captionTracks': list(tracks)}},
+    }
+
+
+def transcript_xml(texts, step=1.0):
+    """Build a timedtext XML document with one segment per text"""
+    body = ''.join(
+        f'<text start="{i * step}" dur="{step}">{escape(text)}</text>' for i, text in enumerate(texts)
+    )
+    return f'<?xml version="1.0" encoding="utf-8" ?><transcript>{body}</transcript>'
+
+
+class StubExtractor(YouTubeTranscriptExtractor):
+    """
+    Extractor whose upstream requests are answered locally.
+
+    Every request is recorded in `requests` as ('player', video_id) or
+    ('timedtext', url), so tests can count upstream round-trips. With chunk_size
+    set, transcripts are also served in pieces through iter_transcript_xml, each
+    arriving chunk_delay seconds after the previous one.
+    """
+
+    def __init__(self, tracks=(), texts=None, delay=0.0, chunk_size=None, chunk_delay=0.0):
+        super().__init__(min_delay=0)
+        self.tracks = list(tracks)
+        self.texts = texts if texts is not None else {}
+        self.delay = delay
+        self.chunk_size = chunk_size
+        self.chunk_delay = chunk_delay
+        if chunk_size is None:
+            # Exercise the fallback for extractors that cannot stream
+            self.iter_transcript_xml = None
+        self.requests = []
+        self._lock = threading.Lock()
+
+    def _record(self, request):
+        with self._lock:
+            self.requests.append(request)
+        if self.delay:
+            time.sleep(self.delay)
+
+    def call_innertube_api(self, video_id, api_key):
+        self._record(('player', video_id))
+        return player_response(self.tracks)
+
+    def fetch_transcript_xml(self, url):
+        self._record(('timedtext', url))
+        language = url.split('lang=')[1].split('&')[0]
+        return transcript_xml(self.texts.get(language, []))
+
+    def iter_transcript_xml(self, url):
+        xml = self.fetch_transcript_xml(url).encode('utf-8')
+        for i in range(0, len(xml), self.chunk_size):
+            if i and self.chunk_delay:
+                time.sleep(self.chunk_delay)
+            yield xml[i:i + self.chunk_size]
+
+
+class ThrottlingAdapter(HTTPAdapter):
+    """
+    Transport adapter answering YouTube requests locally, for mounting on real
+    extractor sessions.
+
+    Player requests get a response listing `tracks` and timedtext requests get
+    the transcript for their language, unless `throttle_status` is set, in which
+    case every request is answered with that status. Sent URLs are kept in `sent`.
+    """
+
+    def __init__(self, tracks=(), texts=None):
+        super().__init__()
+        self.tracks = list(tracks)
+        self.texts = texts if texts is not None else {}
+        self.throttle_status = None
+        self.sent = []
+
+    def send(self, request, **kwargs):
+        self.sent.append(request.url)
+        response = requests.Response()
+        response.request = request
+        response.url = request.url
+        if self.throttle_status is not None:
+            response.status_code = self.throttle_status
+            body = b'Too Many Requests'
+        elif '/youtubei/' in request.url:
+            response.status_code = 200
+            body = json.dumps(player_response(self.tracks)).encode('utf-8')
+        else:
+            response.status_code = 200
+            language = request.url.split('lang=')[1].split('&')[0]
+            body = transcript_xml(self.texts.get(language, [])).encode('utf-8')
+        response.raw = io.BytesIO(body)
+        return response
+
+    def mount_on(self, extractor):
+        """Route every session of a PooledTranscriptExtractor through this adapter"""
+        for session in (extractor.session, extractor.api_session):
+            session.mount('https://', self)
+        return extractor
@@ -0,0 +1,342 @@
+import pytest
+import sqlite3
+import subprocess
+import threading
+import sys
+from pathlib import Path
+from unittest.mock import patch
+from src.mcp_youtube_extract import cache, config, google_api, youtube, transcript_api
+from src.mcp_youtube_extract.cache import DiskCache, MISS
+from src.mcp_youtube_extract.video_id import InvalidVideoIdError
+from tests.stubs import StubExtractor, caption_track
+
+REPO = Path(__file__).resolve().parent.parent
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+# Test DiskCache
+def test_set_and_get(tmp_path):
+    disk_cache = DiskCache(tmp_path / 'c.sqlite3', max_bytes=10_000)
+    disk_cache.set('info', 'vid', {'title': 'T'}, ttl=60)
+    assert disk_cache.get('info', 'vid') == {'title': 'T'}
+    assert disk_cache.get('info', 'other') is MISS
+    assert disk_cache.get('transcript', 'vid') is MISS
+
+
+def test_bytes_are_stored_as_they_are(tmp_path):
+    disk_cache = DiskCache(tmp_path / 'c.sqlite3', max_bytes=10_000)
+    disk_cache.set('segments', 'vid', b'\x00YTTR\xff', ttl=60)
+    disk_cache.set('info', 'vid', 'YTTR', ttl=60)
+    assert disk_cache.get('segments', 'vid') == b'\x00YTTR\xff'
+    assert disk_cache.get('info', 'vid') == 'YTTR'
+    assert disk_cache.stats()['bytes'] == 6 + len('"YTTR"')
+
+
+
+def test_bytes_are_read_a_slice_at_a_time(tmp_path):
+    disk_cache = DiskCache(tmp_path / 'c.sqlite3', max_bytes=10_000)
+    disk_cache.set('segments', 'vid', bytes(range(200)), ttl=60)
+    disk_cache.set('info', 'vid', {'title': 'T'}, ttl=60)
+    blob = disk_cache.get_blob('segments', 'vid')
+    assert len(blob) == 200
+    assert blob[10:14] == bytes([10, 11, 12, 13])
+    assert blob[195:300] == bytes(range(195, 200))
+    assert blob[50:50] == b''
+    # JSON values and misses come back as get returns them
+    assert disk_cache.get_blob('info', 'vid') == {'title': 'T'}
+    assert disk_cache.get_blob('segments', 'other') is MISS
+
+
+def test_replaced_blob_is_not_read(tmp_path):
+    clock = FakeClock()
+    disk_cache = DiskCache(tmp_path / 'c.sqlite3', max_bytes=10_000, clock=clock)
+    disk_cache.set('segments', 'vid', b'old bytes', ttl=60)
+    blob = disk_cache.get_blob('segments', 'vid')
+    clock.now += 1
+    disk_cache.set('segments', 'vid', b'new bytes', ttl=60)
+    with pytest.raises(LookupError):
+        blob[0:3]
+    # Nor is one that was evicted
+    blob = disk_cache.get_blob('segments', 'vid')
+    disk_cache.clear()
+    with pytest.raises(LookupError):
+        blob[0:3]
+
+def test_language_is_part_of_key(tmp_path):
+    disk_cache = DiskCache(tmp_path / 'c.sqlite3', max_bytes=10_000)
+    disk_cache.set('transcript', 'vid', 'hello', ttl=60, language='en')
+    assert disk_cache.get('transcript', 'vid', 'en') == 'hello'
+    assert disk_cache.get('transcript', 'vid', 'fr') is MISS
+
+
+def test_entry_expires(tmp_path):
+    clock = FakeClock()
+    disk_cache = DiskCache(tmp_path / 'c.sqlite3', max_bytes=10_000, clock=clock)
+    disk_cache.set('info', 'vid', 'value', ttl=60)
+    clock.now += 59
+    assert disk_cache.get('info', 'vid') == 'value'
+    clock.now += 2
+    assert disk_cache.get('info', 'vid') is MISS
+
+
+def test_negative_result_is_cached(tmp_path):
+    disk_cache = DiskCache(tmp_path / 'c.sqlite3', max_bytes=10_000)
+    disk_cache.set('transcript', 'vid', None, ttl=60)
+    assert disk_cache.get('transcript', 'vid') is None
+
+
+def test_persists_across_instances(tmp_path):
+    DiskCache(tmp_path / 'c.sqlite3', max_bytes=10_000).set('info', 'vid', 'value', ttl=60)
+    assert DiskCache(tmp_path / 'c.sqlite3', max_bytes=10_000).get('info', 'vid') == 'value'
+
+
+def test_shared_between_processes(tmp_path):
+    # HTTP workers are separate processes writing the same database at the same time
+    path = tmp_path / 'c.sqlite3'
+    disk_cache = DiskCache(path, max_bytes=1_000_000)
+    writer = (
+        "import sys\n"
+        "from src.mcp_youtube_extract.cache import DiskCache\n"
+        "disk_cache = DiskCache(sys.argv[1], max_bytes=1_000_000)\n"
+        "for i in range(50):\n"
+        "    disk_cache.set('transcript', f'{sys.argv[2]}-{i}', 'x' * 100, ttl=60)\n"
+    )
+    workers = [
+        subprocess.Popen([sys.executable, '-c', writer, str(path), f'w{n}'], cwd=REPO, stderr=subprocess.PIPE)
+        for n in range(3)
+    ]
+    for worker in workers:
+        assert worker.wait(timeout=60) == 0, worker.stderr.read()
+    assert all(disk_cache.get('transcript', f'w{n}-{i}') == 'x' * 100 for n in range(3) for i in range(50))
+    assert disk_cache.stats()['entries'] == 150
+
+
+def test_lru_eviction_by_byte_budget(tmp_path):
+    clock = FakeClock()
+    disk_cache = DiskCache(tmp_path / 'c.sqlite3', max_bytes=250, clock=clock)
+    for video_id in ('a', 'b', 'c'):
+        clock.now += 1
+        disk_cache.set('transcript', video_id, 'x' * 100, ttl=60)
+        if video_id == 'b':
+            # Touch 'a' so 'b' becomes the least recently used entry
+            clock.now += 1
+            disk_cache.get('transcript', 'a')
+    assert disk_cache.get('transcript', 'b') is MISS
+    assert disk_cache.get('transcript', 'a') == 'x' * 100
+    assert disk_cache.get('transcript', 'c') == 'x' * 100
+    assert disk_cache.stats()['evictions'] == 1
+    assert disk_cache.stats()['bytes'] <= 250
+
+
+def test_size_total_is_kept_without_scanning(tmp_path):
+    clock = FakeClock()
+    disk_cache = DiskCache(tmp_path / 'c.sqlite3', max_bytes=10_000, clock=clock)
+    other = DiskCache(tmp_path / 'c.sqlite3', max_bytes=10_000, clock=clock)
+    disk_cache.set('segments', 'a', b'x' * 100, ttl=10)
+    disk_cache.set('segments', 'a', b'x' * 40, ttl=10)
+    other.set('info', 'b', 'y' * 8, ttl=60)
+    assert disk_cache.stats()['bytes'] == 40 + 10
+    # Expired entries leave the total on the next write
+    clock.now += 30
+    disk_cache.set('info', 'c', None, ttl=60)
+    assert other.stats()['bytes'] == 10 + 4
+    statements = []
+    disk_cache._conn.set_trace_callback(statements.append)
+    disk_cache.set('info', 'd', 'z', ttl=60)
+    assert not any('SUM(' in statement for statement in statements)
+
+
+def test_hit_miss_counters(tmp_path):
+    disk_cache = DiskCache(tmp_path / 'c.sqlite3', max_bytes=10_000)
+    disk_cache.get('info', 'vid')
+    disk_cache.set('info', 'vid', 'value', ttl=60)
+    disk_cache.get('info', 'vid')
+    disk_cache.get('info', 'vid')
+    stats = disk_cache.stats()
+    assert stats['hits'] == 2
+    assert stats['misses'] == 1
+    assert stats['entries'] == 1
+
+
+def test_entry_age_and_refresh_claims(tmp_path):
+    clock = FakeClock()
+    disk_cache = DiskCache(tmp_path / 'c.sqlite3', max_bytes=10_000, clock=clock)
+    assert disk_cache.claim('info', 'vid', 30) is False
+    disk_cache.set('info', 'vid', 'value', ttl=600)
+    clock.now += 100
+    assert disk_cache.get_entry('info', 'vid') == ('value', 100)
+    # One claimant at a time, also through another connection, until the claim lapses
+    assert disk_cache.claim('info', 'vid', 30) is True
+    assert DiskCache(tmp_path / 'c.sqlite3', max_bytes=10_000, clock=clock).claim('info', 'vid', 30) is False
+    clock.now += 31
+    assert disk_cache.claim('info', 'vid', 30) is True
+    # Storing a new value releases the claim
+    disk_cache.set('info', 'vid', 'new value', ttl=600)
+    assert disk_cache.claim('info', 'vid', 30) is True
+
+
+def test_older_schema_is_replaced(tmp_path):
+    path = tmp_path / 'c.sqlite3'
+    with sqlite3.connect(path) as conn:
+        conn.execute('CREATE TABLE entries (key TEXT PRIMARY KEY, kind TEXT, video_id TEXT, language TEXT, '
+                     'value BLOB, size INTEGER, expires_at REAL, last_access REAL)')
+        conn.execute("INSERT INTO entries VALUES ('k', 'info', 'vid', '', '1', 1, 1e12, 0)")
+    conn.close()
+    disk_cache = DiskCache(path, max_bytes=10_000)
+    assert disk_cache.stats()['entries'] == 0
+    disk_cache.set('info', 'vid', 'value', ttl=60)
+    assert DiskCache(path, max_bytes=10_000).get('info', 'vid') == 'value'
+
+
+# Test the cache underneath get_video_info / get_video_transcript
+@patch('src.mcp_youtube_extract.google_api.yt_get_video_info')
+def test_get_video_info_uses_cache(mock_yt_get_video_info, tmp_cache):
+    mock_yt_get_video_info.return_value = {'title': 'Test Title'}
+    assert youtube.get_video_info('', 'dQw4w9WgXcQ')['title'] == 'Test Title'
+    assert youtube.get_video_info('', 'dQw4w9WgXcQ')['title'] == 'Test Title'
+    assert mock_yt_get_video_info.call_count == 1
+
+
+@patch('src.mcp_youtube_extract.google_api.yt_get_video_info')
+def test_get_video_info_caches_not_found(mock_yt_get_video_info, tmp_cache):
+    mock_yt_get_video_info.return_value = None
+    assert youtube.get_video_info('', 'dQw4w9WgXcQ') is None
+    assert youtube.get_video_info('', 'dQw4w9WgXcQ') is None
+    assert mock_yt_get_video_info.call_count == 1
+
+
+@patch('src.mcp_youtube_extract.google_api.yt_get_video_info', side_effect=Exception('API error'))
+def test_get_video_info_does_not_cache_errors(mock_yt_get_video_info, tmp_cache):
+    assert youtube.get_video_info('', 'dQw4w9WgXcQ') is None
+    assert youtube.get_video_info('', 'dQw4w9WgXcQ') is None
+    assert mock_yt_get_video_info.call_count == 2
+
+
+def test_get_video_transcript_uses_cache(use_extractor, tmp_cache):
+    stub = StubExtractor([caption_track('en')], {'en': ['Hello world']})
+    use_extractor(stub)
+    assert youtube.get_video_transcript('dQw4w9WgXcQ') == 'Hello world'
+    # Drop the in-memory copy so the second call reads the disk cache
+    transcript_api.clear_segment_memo()
+    assert youtube.get_video_transcript('dQw4w9WgXcQ') == 'Hello world'
+    assert len(stub.requests) == 2
+    assert tmp_cache.stats()['hits'] == 1
+
+
+def test_get_video_transcript_caches_no_transcript(use_extractor, tmp_cache):
+    stub = StubExtractor([])
+    use_extractor(stub)
+    assert youtube.get_video_transcript('dQw4w9WgXcQ') is None
+    assert youtube.get_video_transcript('dQw4w9WgXcQ') is None
+    assert len(stub.requests) == 1
+
+
+@patch('src.mcp_youtube_extract.google_api.yt_get_video_info')
+def test_url_aliases_share_one_cache_entry(mock_yt_get_video_info, use_extractor, tmp_cache):
+    mock_yt_get_video_info.return_value = {'title': 'Test Title'}
+    stub = StubExtractor([caption_track('en')], {'en': ['Hello world']})
+    use_extractor(stub)
+    for alias in ('dQw4w9WgXcQ', 'https://youtu.be/dQw4w9WgXcQ', 'youtube.com/watch?v=dQw4w9WgXcQ&t=30'):
+        assert youtube.get_video_info('', alias)['title'] == 'Test Title'
+        assert youtube.get_video_transcript(alias) == 'Hello world'
+    assert mock_yt_get_video_info.call_args_list == [(('dQw4w9WgXcQ',),)]
+    assert len(stub.requests) == 2
+    assert tmp_cache.stats()['entries'] == 3
+
+
+@patch('src.mcp_youtube_extract.google_api.yt_get_video_info')
+def test_invalid_ids_are_rejected_without_a_request(mock_yt_get_video_info, use_extractor):
+    stub = StubExtractor([caption_track('en')], {'en': ['Hello world']})
+    use_extractor(stub)
+    with pytest.raises(InvalidVideoIdError):
+        youtube.get_video_info('', 'not a video')
+    with pytest.raises(InvalidVideoIdError):
+        youtube.get_video_transcript('https://example.com/watch?v=dQw4w9WgXcQ')
+    mock_yt_get_video_info.assert_not_called()
+    assert stub.requests == []
+
+
+# Test stale-while-revalidate for video info
+@pytest.fixture
+def clocked_cache(tmp_path, monkeypatch):
+    monkeypatch.setattr(config, 'CACHE_ENABLED', True)
+    clock = FakeClock()
+    disk_cache = DiskCache(tmp_path / 'c.sqlite3', max_bytes=10_000, clock=clock)
+    cache.set_cache(disk_cache)
+    yield clock
+    google_api.wait_for_refreshes()
+    disk_cache.close()
+
+
+def video_info(views):
+    return {'title': 'Title', 'views': views, 'publication_date': '2024-01-01'}
+
+
+def test_stale_info_is_served_and_refreshed(clocked_cache):
+    with patch.object(google_api, 'yt_get_video_info', side_effect=[video_info(1), video_info(2)]) as fetch:
+        assert youtube.get_video_info('', 'dQw4w9WgXcQ')['views'] == 1
+        clocked_cache.now += config.CACHE_VIEWS_TTL + 1
+        assert youtube.get_video_info('', 'dQw4w9WgXcQ')['views'] == 1
+        google_api.wait_for_refreshes()
+        assert fetch.call_count == 2
+        assert youtube.get_video_info('', 'dQw4w9WgXcQ')['views'] == 2
+
+
+def test_freshness_depends_on_requested_fields(clocked_cache):
+    with patch.object(google_api, 'yt_get_video_info', return_value=video_info(1)) as fetch:
+        youtube.get_video_info('', 'dQw4w9WgXcQ')
+        clocked_cache.now += config.CACHE_INFO_TTL + 1
+        youtube.get_video_info('', 'dQw4w9WgXcQ', fields=['publication_date'])
+        google_api.wait_for_refreshes()
+        assert fetch.call_count == 1
+        youtube.get_video_info('', 'dQw4w9WgXcQ', fields=['title'])
+        google_api.wait_for_refreshes()
+        assert fetch.call_count == 2
+
+
+def test_one_refresh_at_a_time(clocked_cache):
+    release = threading.Event()
+
+    def slow_fetch(video_id):
+        if fetch.call_count > 1:
+            release.wait(5)
+        return video_info(fetch.call_count)
+
+    with patch.object(google_api, 'yt_get_video_info', side_effect=slow_fetch) as fetch:
+        youtube.get_video_info('', 'dQw4w9WgXcQ')
+        clocked_cache.now += config.CACHE_VIEWS_TTL + 1
+        assert [youtube.get_video_info('', 'dQw4w9WgXcQ')['views'] for _ in range(5)] == [1] * 5
+        release.set()
+        google_api.wait_for_refreshes()
+        assert fetch.call_count == 2
+
+
+def test_failed_refresh_keeps_stale_entry(clocked_cache):
+    with patch.object(google_api, 'yt_get_video_info', side_effect=[video_info(1), Exception('HTTP Error 503'), None]) as fetch:
+        youtube.get_video_info('', 'dQw4w9WgXcQ')
+        clocked_cache.now += config.CACHE_VIEWS_TTL + 1
+        youtube.get_video_info('', 'dQw4w9WgXcQ')
+        google_api.wait_for_refreshes()
+        # Retried only once the claim lapses
+        youtube.get_video_info('', 'dQw4w9WgXcQ')
+        google_api.wait_for_refreshes()
+        assert fetch.call_count == 2
+        clocked_cache.now += config.INFO_TIMEOUT + 1
+        assert youtube.get_video_info('', 'dQw4w9WgXcQ')['views'] == 1
+        google_api.wait_for_refreshes()
+        assert fetch.call_count == 3
+        assert youtube.get_video_info('', 'dQw4w9WgXcQ')['views'] == 1
+
+
+def test_expired_info_is_fetched_again(clocked_cache):
+    with patch.object(google_api, 'yt_get_video_info', side_effect=[video_info(1), video_info(2)]):
+        youtube.get_video_info('', 'dQw4w9WgXcQ')
+        clocked_cache.now += config.CACHE_INFO_MAX_AGE + 1
+        assert youtube.get_video_info('', 'dQw4w9WgXcQ')['views'] == 2
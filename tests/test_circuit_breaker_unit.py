@@ -0,0 +1,270 @@
+import urllib.error
+import httplib2
+import pytest
+import yt_dlp
+from googleapiclient.errors import HttpError
+from unittest.mock import MagicMock, patch
+from src.mcp_youtube_extract import extractor_pool, google_api, info_extractor, ratelimit, server, youtube
+from src.mcp_youtube_extract.extractor_pool import ExtractorPool, PooledTranscriptExtractor
+from src.mcp_youtube_extract.info_extractor import GuardedVideoInfoExtractor, throttling_status
+from src.mcp_youtube_extract.metrics import CIRCUIT_REJECTED, UPSTREAM_THROTTLED
+from src.mcp_youtube_extract.ratelimit import CircuitBreaker, CircuitOpenError, TokenBucket, UpstreamError
+from tests.stubs import StubExtractor, ThrottlingAdapter, caption_track
+
+VIDEO_ID = 'dQw4w9WgXcQ'
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+@pytest.fixture
+def throttling_upstream(clock):
+    """A real pooled extractor whose requests are answered by a ThrottlingAdapter, on a fake clock"""
+    adapter = ThrottlingAdapter([caption_track('en')], {'en': ['Hello', 'world']})
+    limiter = TokenBucket(4, 4, clock=clock, sleep=clock.sleep, min_rate=0.5, step=0.5)
+    breaker = CircuitBreaker('transcript', 3, 30.0, probes=1, clock=clock)
+    extractor = adapter.mount_on(PooledTranscriptExtractor(limiter, breaker, max_retries=1))
+    extractor_pool.set_extractor_pool(ExtractorPool(1, lambda: extractor))
+    return adapter, limiter, breaker
+
+
+# Test the adaptive token bucket
+def test_rate_halves_on_throttle_and_recovers_step_by_step(clock):
+    bucket = TokenBucket(rate=4, capacity=4, clock=clock, sleep=clock.sleep, min_rate=0.5, step=1)
+    rates = []
+    for _ in range(4):
+        bucket.on_throttle()
+        rates.append(bucket.rate)
+    assert rates == [2, 1, 0.5, 0.5]
+    for _ in range(5):
+        bucket.on_success()
+    assert bucket.rate == 4
+
+
+def test_throttle_drops_saved_up_burst(clock):
+    bucket = TokenBucket(rate=4, capacity=4, clock=clock, sleep=clock.sleep, min_rate=0.5)
+    bucket.on_throttle()
+    assert bucket.acquire() == pytest.approx(0.5)
+
+
+def test_bucket_is_not_adaptive_by_default(clock):
+    bucket = TokenBucket(rate=2, capacity=5, clock=clock, sleep=clock.sleep)
+    bucket.on_throttle()
+    assert bucket.rate == 2
+
+
+# Test the circuit breaker
+def test_breaker_opens_after_consecutive_failures(clock):
+    breaker = CircuitBreaker('transcript', failure_threshold=3, reset_timeout=30, clock=clock)
+    for _ in range(2):
+        breaker.allow()
+        breaker.record_failure()
+    breaker.allow()
+    breaker.record_success()
+    for _ in range(3):
+        breaker.allow()
+        breaker.record_failure()
+    assert breaker.state == 'open'
+    clock.now += 10
+    with pytest.raises(CircuitOpenError, match='YouTube transcript requests are paused .* try again in 20s'):
+        breaker.check()
+    assert CIRCUIT_REJECTED.value(upstream='transcript') == 1
+
+
+def test_half_open_probes(clock):
+    breaker = CircuitBreaker('info', failure_threshold=1, reset_timeout=30, probes=2, clock=clock)
+    breaker.allow()
+    breaker.record_failure()
+    clock.now += 30
+    assert breaker.state == 'half_open'
+    breaker.allow()
+    breaker.allow()
+    with pytest.raises(CircuitOpenError):
+        breaker.allow()
+    breaker.record_success()
+    assert breaker.state == 'half_open'
+    breaker.record_success()
+    assert breaker.state == 'closed'
+
+
+def test_failed_probe_reopens(clock):
+    breaker = CircuitBreaker('info', failure_threshold=1, reset_timeout=30, clock=clock)
+    breaker.allow()
+    breaker.record_failure()
+    clock.now += 30
+    breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == 'open'
+    clock.now += 29
+    assert breaker.state == 'open'
+
+
+# Test transcripts against a throttling upstream
+def test_throttled_transcript_fails_without_retries(throttling_upstream):
+    adapter, limiter, breaker = throttling_upstream
+    adapter.throttle_status = 429
+    assert youtube.get_video_transcript('dQw4w9WgXcQ') == 'Could not retrieve transcript: YouTube is throttling player requests (HTTP 429)'
+    assert len(adapter.sent) == 1
+    assert limiter.rate == 2
+    assert UPSTREAM_THROTTLED.value(endpoint='player') == 1
+
+
+def test_open_circuit_fails_fast_then_probes(throttling_upstream, clock):
+    adapter, limiter, breaker = throttling_upstream
+    adapter.throttle_status = 503
+    for i in range(3):
+        youtube.get_video_transcript(f'video{i:06d}')
+    assert breaker.state == 'open'
+
+    sent = len(adapter.sent)
+    message = youtube.get_video_transcript('video000009')
+    assert message.startswith('Could not retrieve transcript: YouTube transcript requests are paused')
+    assert len(adapter.sent) == sent
+
+    # YouTube recovers; after the reset timeout one probe goes through and closes the circuit
+    adapter.throttle_status = None
+    clock.now += 30
+    assert youtube.get_video_transcript('video000009') == 'Hello world'
+    assert breaker.state == 'closed'
+    assert limiter.rate > limiter.min_rate
+
+
+def test_timedtext_throttling_counts(throttling_upstream):
+    adapter, limiter, breaker = throttling_upstream
+    real_send = ThrottlingAdapter.send
+
+    def throttle_timedtext(self, request, **kwargs):
+        self.throttle_status = 429 if 'timedtext' in request.url else None
+        return real_send(self, request, **kwargs)
+
+    with patch.object(ThrottlingAdapter, 'send', throttle_timedtext):
+        assert 'throttling timedtext requests' in youtube.get_video_transcript('dQw4w9WgXcQ')
+    assert UPSTREAM_THROTTLED.value(endpoint='timedtext') == 1
+
+
+def test_unexpected_error_in_probe_releases_the_slot(throttling_upstream, clock):
+    adapter, limiter, breaker = throttling_upstream
+    adapter.throttle_status = 503
+    for i in range(3):
+        youtube.get_video_transcript(f'video{i:06d}')
+    adapter.throttle_status = None
+    clock.now += 30
+    assert breaker.state == 'half_open'
+
+    # The trial request dies with something that is not a requests error
+    def explode(self, request, **kwargs):
+        raise RuntimeError('adapter bug')
+
+    with patch.object(ThrottlingAdapter, 'send', explode):
+        assert 'adapter bug' in youtube.get_video_transcript('video000009')
+    assert breaker.state == 'open'
+
+    # The failed probe was reported, so the next one is admitted once the timeout passes
+    clock.now += 30
+    assert youtube.get_video_transcript('video000009') == 'Hello world'
+    assert breaker.state == 'closed'
+
+
+# Test metadata lookups against a throttling upstream
+@pytest.mark.parametrize('error, status', [
+    (Exception('ERROR: [youtube] vid: HTTP Error 429: Too Many Requests'), 429),
+    (urllib.error.HTTPError('https://youtube.invalid', 503, 'Service Unavailable', {}, None), 503),
+    (Exception("Sign in to confirm you're not a bot"), 429),
+    (urllib.error.HTTPError('https://youtube.invalid', 404, 'Not Found', {}, None), None),
+    (Exception('Video unavailable'), None),
+])
+def test_throttling_status(error, status):
+    assert throttling_status(error) == status
+
+
+def test_throttled_info_lookup_stops_walking_strategies(monkeypatch, clock):
+    limiter = TokenBucket(5, 5, clock=clock, sleep=clock.sleep, min_rate=0.5)
+    breaker = CircuitBreaker('info', 5, 30, clock=clock)
+    monkeypatch.setattr(ratelimit, '_limiters', {'info': limiter})
+    monkeypatch.setattr(ratelimit, '_breakers', {'info': breaker})
+    throttled = Exception('HTTP Error 429: Too Many Requests')
+    with patch.object(GuardedVideoInfoExtractor, '_get_video_info_api', side_effect=throttled) as api, \
+         patch.object(GuardedVideoInfoExtractor, '_get_video_info_yt_dlp', side_effect=throttled) as yt_dlp, \
+         patch.object(GuardedVideoInfoExtractor, '_get_video_info_pytubefix', side_effect=throttled) as pytubefix:
+        with pytest.raises(UpstreamError, match='throttling video info requests'):
+            info_extractor.get_video_info(VIDEO_ID)
+    assert api.call_count + yt_dlp.call_count + pytubefix.call_count == 1
+    assert limiter.rate == 2.5
+
+
+def guarded_extractor(monkeypatch, clock, **options):
+    monkeypatch.setattr(ratelimit, '_limiters', {'info': TokenBucket(5, 5, clock=clock, sleep=clock.sleep)})
+    monkeypatch.setattr(ratelimit, '_breakers', {'info': CircuitBreaker('info', 5, 30, clock=clock)})
+    return GuardedVideoInfoExtractor(ratelimit.get_limiter('info'), ratelimit.get_breaker('info'),
+                                     backoff_factor=0, **options)
+
+
+def test_throttled_yt_dlp_page_is_detected(monkeypatch, clock):
+    extractor = guarded_extractor(monkeypatch, clock, strategy='yt_dlp')
+    throttled = yt_dlp.utils.DownloadError(f'ERROR: [youtube] {VIDEO_ID}: HTTP Error 429: Too Many Requests')
+    with patch.object(yt_dlp.YoutubeDL, 'extract_info', side_effect=throttled) as extract_info:
+        with pytest.raises(UpstreamError, match=r'HTTP 429'):
+            extractor.get_video_info(VIDEO_ID)
+    assert extract_info.call_count == 1
+    assert UPSTREAM_THROTTLED.value(endpoint='video_info') == 1
+
+
+def test_throttled_data_api_is_detected(monkeypatch, clock):
+    extractor = guarded_extractor(monkeypatch, clock, strategy='api')
+    extractor.youtube_service = MagicMock()
+    execute = extractor.youtube_service.videos.return_value.list.return_value.execute
+    execute.side_effect = HttpError(httplib2.Response({'status': 429}), b'rateLimitExceeded')
+    with pytest.raises(UpstreamError, match=r'HTTP 429'):
+        extractor.get_video_info(VIDEO_ID)
+    assert execute.call_count == 1
+
+
+def test_info_errors_other_than_throttling_keep_retrying(monkeypatch, clock):
+    monkeypatch.setattr(ratelimit, '_limiters', {'info': TokenBucket(5, 5, clock=clock, sleep=clock.sleep)})
+    monkeypatch.setattr(ratelimit, '_breakers', {'info': CircuitBreaker('info', 1, 30, clock=clock)})
+    extractor = GuardedVideoInfoExtractor(ratelimit.get_limiter('info'), ratelimit.get_breaker('info'),
+                                          strategy='yt_dlp', backoff_factor=0)
+    with patch.object(extractor, '_get_video_info_yt_dlp', side_effect=[Exception('timeout'), {'title': 'T'}]):
+        assert extractor.get_video_info(VIDEO_ID) == {'title': 'T'}
+    assert ratelimit.get_breaker('info').state == 'closed'
+
+
+
+def test_info_lookup_walks_strategies_in_order(monkeypatch, clock):
+    extractor = guarded_extractor(monkeypatch, clock, max_retries=1)
+    extractor.youtube_service = MagicMock()
+    calls = []
+
+    def strategy(name, result):
+        def extract(video_id):
+            calls.append(name)
+            return result
+        return extract
+
+    monkeypatch.setattr(extractor, '_get_video_info_api', strategy('api', None))
+    monkeypatch.setattr(extractor, '_get_video_info_yt_dlp', strategy('yt_dlp', None))
+    monkeypatch.setattr(extractor, '_get_video_info_pytubefix', strategy('pytubefix', {'title': 'T'}))
+    assert extractor.get_video_info(VIDEO_ID) == {'title': 'T'}
+    assert calls == ['api', 'yt_dlp', 'pytubefix']
+
+async def test_open_info_circuit_reported_by_tool(use_extractor):
+    use_extractor(StubExtractor([caption_track('en')], {'en': ['Hello']}))
+    paused = CircuitOpenError('YouTube info requests are paused after repeated throttled or failed requests; try again in 30s')
+    with patch.object(google_api, 'yt_get_video_info', side_effect=paused):
+        with pytest.raises(CircuitOpenError):
+            google_api.get_video_info('', 'dQw4w9WgXcQ')
+        result = await server.get_yt_video_info('dQw4w9WgXcQ')
+    assert result == f'Error processing video dQw4w9WgXcQ: {paused}'
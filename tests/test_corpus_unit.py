@@ -0,0 +1,192 @@
+import subprocess
+import sys
+from pathlib import Path
+import pytest
+from src.mcp_youtube_extract import config, corpus, server
+from src.mcp_youtube_extract.corpus import Corpus, decode_varints, document_key, encode_varints
+from src.mcp_youtube_extract.search_index import SearchIndex
+from src.mcp_youtube_extract.segments import SegmentIndex
+from tests.stubs import StubExtractor, caption_track
+
+REPO = Path(__file__).parent.parent
+
+TRANSCRIPTS = {
+    'physics': ['Today we talk about entropy', 'entropy always grows', 'and energy is conserved'],
+    'cooking': ['Heat the pan', 'the energy of a good breakfast'],
+    'history': ['The empire fell', 'after the long war'],
+}
+
+
+def add(target, video_id, texts, language='en'):
+    index = SegmentIndex.from_segments({'text': t, 'start': 10.0 * i, 'duration': 10.0} for i, t in enumerate(texts))
+    return target.add(video_id, language, index, SearchIndex.build(index))
+
+
+@pytest.fixture
+def lectures(tmp_path):
+    target = Corpus(tmp_path / 'corpus')
+    for video_id, texts in TRANSCRIPTS.items():
+        add(target, video_id, texts)
+    return target
+
+
+# Test the posting list encoding
+def test_varint_round_trip():
+    values = [0, 1, 127, 128, 300, 2**32 + 5]
+    data = bytearray()
+    encode_varints(values, data)
+    assert len(data) == 1 + 1 + 1 + 2 + 2 + 5
+    assert decode_varints(bytes(data)) == values
+
+
+# Test ranking
+def test_search_ranks_by_relevance(lectures):
+    total, results = lectures.search('entropy energy')
+    assert total == 2
+    assert [r['video_id'] for r in results] == ['physics', 'cooking']
+    assert results[0]['matched_terms'] == 2
+    assert (results[0]['first_match'], results[0]['timestamp']) == (0.0, '00:00')
+    assert results[1]['first_match'] == 10.0
+
+
+def test_match_all_and_limit(lectures):
+    assert lectures.search('entropy energy', match_all=True)[0] == 1
+    total, results = lectures.search('the', limit=1)
+    assert (total, len(results)) == (2, 1)
+    assert lectures.search('quantum') == (0, [])
+    assert lectures.search('!!') == (0, [])
+
+
+def test_duplicate_transcripts_are_skipped(lectures):
+    assert add(lectures, 'physics', ['something else']) is False
+    assert add(lectures, 'physics', ['entropy en français'], language='fr') is True
+    assert document_key('physics', 'fr') in lectures
+    assert (lectures.stats()['videos'], lectures.stats()['transcripts']) == (3, 4)
+
+
+def test_each_video_is_returned_once(lectures):
+    # An exact-language selector names the transcript already indexed under 'en'
+    assert add(lectures, 'physics', ['entropy entropy entropy'], language='=en') is False
+    assert add(lectures, 'physics', ['entropy entropy entropy'], language='en,fr') is True
+    total, results = lectures.search('entropy energy')
+    assert total == 2
+    assert [r['video_id'] for r in results] == ['physics', 'cooking']
+
+
+# Test the on-disk layout
+def test_similar_sized_files_are_merged(tmp_path):
+    target = Corpus(tmp_path / 'corpus', merge_factor=2)
+    for i in range(7):
+        add(target, f'v{i}', [f'common word{i}', 'common'])
+    stats = target.stats()
+    # 7 = 4 + 2 + 1 documents
+    assert (stats['videos'], stats['segments'], stats['files']) == (7, 14, 3)
+    total, results = target.search('common', limit=10)
+    assert total == 7
+    assert target.search('word3')[1][0]['video_id'] == 'v3'
+
+
+
+def test_merged_files_look_documents_up_by_key(tmp_path):
+    target = Corpus(tmp_path / 'corpus', merge_factor=2)
+    # Added out of key order, so merging has to sort the document table
+    for video_id in ['v3', 'v1', 'v2', 'v0']:
+        add(target, video_id, [f'common {video_id}'])
+    [segment] = target._segments.values()
+    assert segment.flags & corpus._FLAG_SORTED_KEYS
+    assert [segment.key(doc) for doc in range(segment.document_count)] == [f'v{i}\ten' for i in range(4)]
+    assert all(document_key(f'v{i}', 'en') in target for i in range(4))
+    assert document_key('v9', 'en') not in target
+    assert target.search('v2')[1][0]['video_id'] == 'v2'
+
+
+def test_files_with_unsorted_documents_still_work(tmp_path):
+    # Written before the document table was kept in key order
+    directory = tmp_path / 'corpus'
+    directory.mkdir()
+    data = bytearray()
+    encode_varints((0, 1, 0, 1, 2, 5000), data)
+    corpus._write_segment(directory / '000000000001.ytc', [('v2\ten', 3, 1), ('v1\ten', 4, 1)], [(b'common', bytes(data), 2)])
+    target = Corpus(directory, merge_factor=2)
+    assert document_key('v1', 'en') in target and document_key('v3', 'en') not in target
+    [segment] = target._segments.values()
+    assert not segment.flags & corpus._FLAG_SORTED_KEYS
+    assert target.stats()['transcripts'] == 2
+    assert [r['video_id'] for r in target.search('common')[1]] == ['v1', 'v2']
+
+    # Merging it with newer files sorts the documents and keeps every posting
+    add(target, 'v0', ['common'])
+    add(target, 'v3', ['common'])
+    [segment] = target._segments.values()
+    assert segment.flags & corpus._FLAG_SORTED_KEYS
+    assert [segment.key(doc) for doc in range(4)] == ['v0\ten', 'v1\ten', 'v2\ten', 'v3\ten']
+    first_matches = {r['video_id']: r['first_match'] for r in target.search('common')[1]}
+    assert first_matches == {'v0': 0.0, 'v1': 5.0, 'v2': 0.0, 'v3': 0.0}
+
+
+def test_search_reads_only_matching_documents(tmp_path, monkeypatch):
+    target = Corpus(tmp_path / 'corpus', merge_factor=4)
+    for i in range(64):
+        add(target, f'v{i:02d}', ['filler words here', f'needle{i % 32}'])
+    read = []
+    for name in ('key_bytes', 'length'):
+        real = getattr(corpus.CorpusSegment, name)
+        monkeypatch.setattr(corpus.CorpusSegment, name, lambda self, doc, real=real: read.append(doc) or real(self, doc))
+    total, results = target.search('needle7')
+    assert {r['video_id'] for r in results} == {'v07', 'v39'}
+    # A length and a key for each of the two matches
+    assert len(read) == 4
+
+def test_reopened_and_shared_directory(lectures, tmp_path):
+    other = Corpus(tmp_path / 'corpus')
+    assert [r['video_id'] for r in other.search('empire')[1]] == ['history']
+    add(other, 'astronomy', ['entropy of black holes'])
+    assert lectures.search('holes')[0] == 1
+    assert add(lectures, 'astronomy', ['entropy of black holes']) is False
+
+
+def test_corrupt_file_is_skipped(lectures, tmp_path):
+    (tmp_path / 'corpus' / '999999999999.ytc').write_bytes(b'garbage')
+    assert Corpus(tmp_path / 'corpus').search('empire')[0] == 1
+
+
+def test_shared_between_processes(tmp_path):
+    # HTTP workers add to and merge the same directory at the same time
+    writer = (
+        "import sys\n"
+        "from src.mcp_youtube_extract.corpus import Corpus\n"
+        "from src.mcp_youtube_extract.search_index import SearchIndex\n"
+        "from src.mcp_youtube_extract.segments import SegmentIndex\n"
+        "target = Corpus(sys.argv[1], merge_factor=2)\n"
+        "for i in range(12):\n"
+        "    index = SegmentIndex.from_segments(['shared words', f'{sys.argv[2]} {i}'])\n"
+        "    target.add(f'v{i}' if i % 2 else f'{sys.argv[2]}-{i}', 'en', index, SearchIndex.build(index))\n"
+    )
+    workers = [
+        subprocess.Popen([sys.executable, '-c', writer, str(tmp_path / 'corpus'), f'w{n}'], cwd=REPO, stderr=subprocess.PIPE)
+        for n in range(3)
+    ]
+    for worker in workers:
+        assert worker.wait(timeout=60) == 0, worker.stderr.read()
+    # 6 videos every writer added, 6 of each writer's own
+    total, results = Corpus(tmp_path / 'corpus').search('shared', limit=100)
+    assert total == 6 + 3 * 6
+    assert len({r['video_id'] for r in results}) == total
+
+
+# Test feeding and the search tool
+async def test_fetched_transcripts_feed_the_corpus(use_extractor, tmp_cache):
+    use_extractor(StubExtractor([caption_track('en')], {'en': TRANSCRIPTS['physics']}))
+    await server.get_yt_transcript_segments('physics0001')
+    corpus.wait_for_pending()
+    result = await server.search_yt_corpus('entropy')
+    assert result['videos_indexed'] == 1
+    assert result['total_matches'] == 1
+    assert result['results'][0]['video_id'] == 'physics0001'
+    assert result['results'][0]['language'] == 'en'
+
+
+async def test_corpus_tool_validation(tmp_cache, monkeypatch):
+    assert (await server.search_yt_corpus('x', max_results=0))['error'] == 'max_results must be at least 1'
+    monkeypatch.setattr(config, 'CORPUS_ENABLED', False)
+    assert 'disabled' in (await server.search_yt_corpus('x'))['error']
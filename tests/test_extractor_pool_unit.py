@@ -0,0 +1,139 @@
+import threading
+import time
+import pytest
+from unittest.mock import MagicMock
+from src.mcp_youtube_extract import youtube
+from src.mcp_youtube_extract.extractor_pool import ExtractorPool, PooledTranscriptExtractor
+from src.mcp_youtube_extract.ratelimit import TokenBucket
+from tests.stubs import StubExtractor, caption_track
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+        self.slept = []
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.slept.append(seconds)
+        self.now += seconds
+
+
+# Test TokenBucket
+def test_token_bucket_allows_burst_without_waiting():
+    clock = FakeClock()
+    bucket = TokenBucket(rate=2, capacity=5, clock=clock, sleep=clock.sleep)
+    waits = [bucket.acquire() for _ in range(5)]
+    assert waits == [0, 0, 0, 0, 0]
+    assert clock.slept == []
+
+
+def test_token_bucket_holds_sustained_rate():
+    clock = FakeClock()
+    bucket = TokenBucket(rate=2, capacity=1, clock=clock, sleep=clock.sleep)
+    bucket.acquire()
+    assert bucket.acquire() == pytest.approx(0.5)
+    assert bucket.acquire() == pytest.approx(0.5)
+
+
+def test_token_bucket_refills_over_time():
+    clock = FakeClock()
+    bucket = TokenBucket(rate=1, capacity=2, clock=clock, sleep=clock.sleep)
+    bucket.acquire()
+    bucket.acquire()
+    clock.now += 2
+    assert bucket.acquire() == 0
+    assert bucket.acquire() == 0
+
+
+def test_token_bucket_queues_concurrent_callers():
+    bucket = TokenBucket(rate=20, capacity=1)
+    start = time.perf_counter()
+    threads = [threading.Thread(target=bucket.acquire) for _ in range(5)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    # One token up front, then four more at 20/s
+    assert time.perf_counter() - start == pytest.approx(0.2, abs=0.1)
+
+
+# Test ExtractorPool
+def test_pool_reuses_extractors():
+    factory = MagicMock(side_effect=lambda: object())
+    pool = ExtractorPool(2, factory)
+    seen = []
+    for _ in range(5):
+        with pool.extractor() as extractor:
+            seen.append(extractor)
+    assert factory.call_count == 1
+    assert all(extractor is seen[0] for extractor in seen)
+
+
+def test_pool_bounds_concurrent_checkouts():
+    factory = MagicMock(side_effect=lambda: object())
+    pool = ExtractorPool(3, factory)
+    lock = threading.Lock()
+    in_use = set()
+    peak = [0]
+
+    def worker():
+        with pool.extractor() as extractor:
+            with lock:
+                assert extractor not in in_use
+                in_use.add(extractor)
+                peak[0] = max(peak[0], len(in_use))
+            time.sleep(0.02)
+            with lock:
+                in_use.remove(extractor)
+
+    threads = [threading.Thread(target=worker) for _ in range(12)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert factory.call_count == 3
+    assert peak[0] == 3
+
+
+def test_pool_recovers_from_factory_failure():
+    factory = MagicMock(side_effect=[Exception('boom'), 'extractor'])
+    pool = ExtractorPool(1, factory)
+    with pytest.raises(Exception):
+        with pool.extractor():
+            pass
+    with pool.extractor() as extractor:
+        assert extractor == 'extractor'
+
+
+def test_transcripts_share_one_extractor(use_extractor):
+    stub = use_extractor(StubExtractor([caption_track('en')], {'en': ['Hello']}), size=1)
+    assert youtube.get_video_transcript('aaaaaaaaaaa') == 'Hello'
+    assert youtube.get_video_transcript('bbbbbbbbbbb') == 'Hello'
+    assert [request[0] for request in stub.requests] == ['player', 'timedtext', 'player', 'timedtext']
+
+
+# Test PooledTranscriptExtractor
+def test_pooled_extractor_uses_shared_limiter():
+    limiter = MagicMock()
+    extractor = PooledTranscriptExtractor(limiter)
+    assert extractor.min_delay == 0
+    extractor._wait_if_needed()
+    extractor._wait_if_needed()
+    assert limiter.acquire.call_count == 2
+
+
+def test_pooled_extractor_sends_innertube_through_api_session():
+    extractor = PooledTranscriptExtractor(MagicMock())
+    extractor.api_session = MagicMock()
+    extractor.session = MagicMock()
+    extractor.api_session.post.return_value.status_code = 200
+    extractor.session.get.return_value.status_code = 200
+    extractor._request_with_retries('post', 'https://example.invalid/player', use_session=False, json={})
+    extractor.api_session.post.assert_called_once()
+    extractor.session.post.assert_not_called()
+
+    extractor._request_with_retries('get', 'https://example.invalid/watch')
+    extractor.session.get.assert_called_once()
@@ -0,0 +1,125 @@
+import json
+import pytest
+from unittest.mock import patch
+from src.mcp_youtube_extract import pipeline, server
+from src.mcp_youtube_extract.formatting import FIELDS, parse_fields, render_video, wanted_parts
+
+VIDEO_INFO = {
+    'title': 'Test Title',
+    'channel_name': 'Test Channel',
+    'publication_date': '2020-01-01T00:00:00Z',
+    'description': 'Test Description',
+    'views': 1000000,
+}
+TRANSCRIPT = 'one two three four five six'
+
+
+def legacy_report(video_info, transcript):
+    """The get_yt_video_info layout before output formats existed."""
+    info = '\n'.join([
+        f"Title: {video_info['title']}",
+        f"Channel: {video_info['channel_name']}",
+        f"Published: {video_info['publication_date']}",
+        f"Views: {video_info['views']:,}",
+        f"Description: {video_info['description']}",
+    ])
+    return f'=== VIDEO INFORMATION ===\n{info}\n\n=== TRANSCRIPT ===\n{transcript}'
+
+
+# Test field selection
+@pytest.mark.parametrize('fields, expected', [
+    (None, FIELDS),
+    ('views,title', ('title', 'views')),
+    (' transcript , title ,', ('title', 'transcript')),
+    (['description'], ('description',)),
+])
+def test_parse_fields(fields, expected):
+    assert parse_fields(fields) == expected
+
+
+@pytest.mark.parametrize('fields', ['title,likes', '', ' , '])
+def test_parse_fields_rejects(fields):
+    with pytest.raises(ValueError):
+        parse_fields(fields)
+
+
+def test_empty_selection_is_rejected():
+    with pytest.raises(ValueError, match='nothing to return'):
+        wanted_parts('metadata', ('transcript',))
+    assert wanted_parts('json', ('transcript',)) == (False, True)
+
+
+# Test rendering
+def test_text_matches_the_original_layout():
+    assert render_video('dQw4w9WgXcQ', VIDEO_INFO, TRANSCRIPT) == legacy_report(VIDEO_INFO, TRANSCRIPT)
+
+
+@pytest.mark.parametrize('transcript, expected', [
+    (None, 'No transcript available for this video.'),
+    ('Transcript error: blocked', 'Transcript issue: Transcript error: blocked'),
+])
+def test_text_without_transcript(transcript, expected):
+    assert render_video('dQw4w9WgXcQ', None, transcript).endswith(f'Video not found or unavailable.\n\n=== TRANSCRIPT ===\n{expected}')
+
+
+def test_metadata_format_and_field_selection():
+    assert render_video('dQw4w9WgXcQ', VIDEO_INFO, None, 'metadata', ('title', 'views', 'transcript')) == (
+        '=== VIDEO INFORMATION ===\nTitle: Test Title\nViews: 1,000,000'
+    )
+    assert render_video('dQw4w9WgXcQ', None, TRANSCRIPT, fields=('transcript',)) == f'=== TRANSCRIPT ===\n{TRANSCRIPT}'
+
+
+def test_compact_json():
+    result = render_video('dQw4w9WgXcQ', VIDEO_INFO, TRANSCRIPT, 'json', ('title', 'views', 'transcript'))
+    assert ', ' not in result and ': ' not in result
+    assert json.loads(result) == {'video_id': 'dQw4w9WgXcQ', 'title': 'Test Title', 'views': 1000000, 'transcript': TRANSCRIPT}
+    assert json.loads(render_video('dQw4w9WgXcQ', None, 'Could not retrieve transcript: timed out', 'json')) == {
+        'video_id': 'dQw4w9WgXcQ', 'error': 'Video not found or unavailable.',
+        'transcript_error': 'Could not retrieve transcript: timed out',
+    }
+
+
+@pytest.mark.parametrize('budget, kept', [(100, TRANSCRIPT), (13, 'one two three'), (15, 'one two three'), (2, 'on')])
+def test_transcript_budget(budget, kept):
+    result = json.loads(render_video('dQw4w9WgXcQ', None, TRANSCRIPT, 'json', ('transcript',), budget))
+    assert result['transcript'] == kept
+    assert result.get('transcript_chars') == (None if kept == TRANSCRIPT else len(TRANSCRIPT))
+
+
+def test_transcript_budget_in_text():
+    result = render_video('dQw4w9WgXcQ', None, TRANSCRIPT, fields=('transcript',), max_transcript_chars=8)
+    assert result == '=== TRANSCRIPT ===\none two [... truncated, 20 more characters]'
+
+
+# Test the tool
+async def test_metadata_only_skips_the_transcript_fetch():
+    with patch.object(pipeline, 'get_video_info', return_value=VIDEO_INFO) as info, \
+         patch.object(pipeline, 'get_video_transcript') as transcript:
+        result = await server.get_yt_video_info('dQw4w9WgXcQ', output_format='metadata')
+    assert 'Title: Test Title' in result
+    assert info.call_count == 1
+    transcript.assert_not_called()
+
+
+async def test_transcript_field_skips_the_info_fetch():
+    with patch.object(pipeline, 'get_video_info') as info, \
+         patch.object(pipeline, 'get_video_transcript', return_value=TRANSCRIPT):
+        result = await server.get_yt_video_info('dQw4w9WgXcQ', output_format='json', fields='transcript')
+    assert json.loads(result) == {'video_id': 'dQw4w9WgXcQ', 'transcript': TRANSCRIPT}
+    info.assert_not_called()
+
+
+async def test_selected_fields_decide_freshness():
+    with patch.object(pipeline, 'get_video_info', return_value=VIDEO_INFO) as info:
+        await server.get_yt_video_info('dQw4w9WgXcQ', output_format='metadata', fields='title,views')
+    assert info.call_args.args[1:] == ('dQw4w9WgXcQ', ('title', 'views'))
+
+
+@pytest.mark.parametrize('options', [
+    {'output_format': 'xml'}, {'fields': 'likes'}, {'max_transcript_chars': -1},
+    {'output_format': 'metadata', 'fields': 'transcript'},
+])
+async def test_invalid_options(options):
+    with patch.object(pipeline, 'get_video_info') as info:
+        assert (await server.get_yt_video_info('dQw4w9WgXcQ', **options)).startswith('Error: ')
+    info.assert_not_called()
@@ -0,0 +1,105 @@
+import json
+import os
+import pytest
+from unittest.mock import patch
+from starlette.testclient import TestClient
+from src.mcp_youtube_extract import config, ratelimit, server
+
+HEADERS = {'Accept': 'application/json, text/event-stream'}
+
+
+@pytest.fixture
+def http_settings(monkeypatch):
+    """Let tests change the transport settings and get a fresh session manager from create_app"""
+    for name in ('TRANSPORT', 'HOST', 'PORT', 'SERVER_WORKERS', 'MAX_IN_FLIGHT'):
+        monkeypatch.setattr(config, name, getattr(config, name))
+    for name in ('YOUTUBE_TRANSPORT', 'YOUTUBE_HOST', 'YOUTUBE_PORT', 'YOUTUBE_WORKERS', 'YOUTUBE_MAX_IN_FLIGHT'):
+        monkeypatch.delenv(name, raising=False)
+    monkeypatch.setattr(server.mcp.settings, 'stateless_http', False)
+    monkeypatch.setattr(server.mcp.settings, 'transport_security', server.mcp.settings.transport_security)
+    monkeypatch.setattr(server.mcp, '_session_manager', None)
+
+
+def call_tool(client, name, arguments):
+    """POST a tools/call request without a session and return the JSON-RPC result from the event stream"""
+    request = {'jsonrpc': '2.0', 'id': 1, 'method': 'tools/call', 'params': {'name': name, 'arguments': arguments}}
+    response = client.post('/mcp', json=request, headers=HEADERS)
+    assert response.status_code == 200
+    [data] = [line[len('data: '):] for line in response.text.splitlines() if line.startswith('data: ')]
+    return json.loads(data)['result']
+
+
+# Test command line parsing
+def test_defaults_come_from_config(http_settings, monkeypatch):
+    monkeypatch.setattr(config, 'SERVER_WORKERS', 4)
+    args = server.parse_args([])
+    assert (args.transport, args.host, args.port, args.workers) == ('stdio', '127.0.0.1', 8000, 4)
+    args = server.parse_args(['--transport', 'streamable-http', '--port', '9000', '--workers', '2', '--max-in-flight', '8'])
+    assert (args.transport, args.port, args.workers, args.max_in_flight) == ('streamable-http', 9000, 2, 8)
+
+
+@pytest.mark.parametrize('argv', [
+    ['--transport', 'sse', '--workers', '2'],
+    ['--workers', '0'],
+    ['--transport', 'websocket'],
+])
+def test_invalid_options_rejected(http_settings, argv):
+    with pytest.raises(SystemExit):
+        server.parse_args(argv)
+
+
+def test_stdio_runs_in_process(http_settings):
+    with patch.object(server.mcp, 'run') as run, patch.object(server, 'run_http') as run_http:
+        server.main([])
+    run.assert_called_once_with()
+    run_http.assert_not_called()
+
+
+def test_http_workers_get_settings_through_environment(http_settings):
+    with patch('uvicorn.run') as run:
+        server.main(['--transport', 'streamable-http', '--port', '9000', '--workers', '3', '--max-in-flight', '16'])
+    run.assert_called_once_with(
+        'src.mcp_youtube_extract.server:create_app',
+        factory=True, host='127.0.0.1', port=9000, workers=3, limit_concurrency=16,
+    )
+    assert os.environ['YOUTUBE_TRANSPORT'] == 'streamable-http'
+    assert os.environ['YOUTUBE_WORKERS'] == '3'
+    assert config.SERVER_WORKERS == 3
+
+
+# Test the app served by each worker
+def test_several_workers_serve_stateless_requests(http_settings):
+    config.TRANSPORT, config.SERVER_WORKERS = 'streamable-http', 2
+    app = server.create_app()
+    assert server.mcp.settings.stateless_http is True
+    # No initialize handshake: the next request may land on a different worker
+    with TestClient(app, base_url='http://127.0.0.1:8000') as client:
+        result = call_tool(client, 'get_yt_metrics', {})
+    assert 'stage_seconds' in json.loads(result['content'][0]['text'])
+
+
+def test_single_worker_keeps_sessions(http_settings):
+    config.TRANSPORT, config.SERVER_WORKERS = 'streamable-http', 1
+    server.create_app()
+    assert server.mcp.settings.stateless_http is False
+
+
+def test_remote_host_accepts_other_host_headers(http_settings):
+    config.TRANSPORT, config.HOST, config.SERVER_WORKERS = 'streamable-http', '0.0.0.0', 2
+    with TestClient(server.create_app(), base_url='http://10.0.0.5:8000') as client:
+        assert call_tool(client, 'get_yt_metrics', {})['isError'] is False
+
+
+def test_sse_transport(http_settings):
+    config.TRANSPORT = 'sse'
+    paths = {route.path for route in server.create_app().routes}
+    assert {'/sse', '/messages'} <= paths
+
+
+# Test the rate limit split between workers
+def test_rate_limit_split_between_workers(http_settings, monkeypatch):
+    monkeypatch.setattr(config, 'RATE_LIMIT', 8.0)
+    monkeypatch.setattr(config, 'RATE_BURST', 10.0)
+    config.SERVER_WORKERS = 4
+    limiter = ratelimit.get_limiter('transcript')
+    assert (limiter.rate, limiter.capacity) == (2.0, 2.5)
@@ -0,0 +1,70 @@
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+REPO = Path(__file__).resolve().parent.parent
+
+
+def run_fresh(code):
+    """Run code in a new interpreter from the repo root and return what it prints as JSON"""
+    result = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, cwd=REPO, check=True)
+    return json.loads(result.stdout.splitlines()[-1])
+
+
+# Test lazy loading
+def test_package_import_loads_no_heavy_dependencies():
+    loaded = run_fresh(
+        "import json, sys\n"
+        "import src.mcp_youtube_extract\n"
+        "print(json.dumps([m for m in ('mcp', 'yt_info_extract', 'yt_ts_extract', 'requests') if m in sys.modules]))"
+    )
+    assert loaded == []
+
+
+def test_format_video_info_without_server_or_extractors():
+    state = run_fresh(
+        "import json, sys\n"
+        "from src.mcp_youtube_extract import format_video_info, logger\n"
+        "text = format_video_info(None)\n"
+        "print(json.dumps({'text': text, 'writer': logger.writer is not None,\n"
+        "                  'loaded': [m for m in ('mcp', 'yt_info_extract', 'yt_ts_extract') if m in sys.modules]}))"
+    )
+    assert state == {'text': 'Video not found or unavailable.', 'writer': False, 'loaded': []}
+
+
+def test_server_import_defers_extractor_libraries():
+    loaded = run_fresh(
+        "import json, sys\n"
+        "import src.mcp_youtube_extract.server\n"
+        "print(json.dumps([m for m in ('yt_info_extract', 'yt_ts_extract', 'yt_dlp') if m in sys.modules]))"
+    )
+    assert loaded == []
+
+
+def test_lazy_attributes_resolve():
+    names = run_fresh(
+        "import json\n"
+        "import src.mcp_youtube_extract as package\n"
+        "print(json.dumps({name: getattr(package, name).__module__ for name in package.__all__ if name != 'mcp'}))"
+    )
+    assert names == {
+        'main': 'src.mcp_youtube_extract.server',
+        'get_video_info': 'src.mcp_youtube_extract.google_api',
+        'format_video_info': 'src.mcp_youtube_extract.google_api',
+        'get_video_transcript': 'src.mcp_youtube_extract.transcript_api',
+        'get_transcript_segments': 'src.mcp_youtube_extract.transcript_api',
+        'iter_transcript_segments': 'src.mcp_youtube_extract.transcript_api',
+    }
+
+
+def test_logging_configured_by_first_record():
+    state = run_fresh(
+        "import json\n"
+        "from src.mcp_youtube_extract import logger\n"
+        "before = logger.writer is not None\n"
+        "logger.root_logger.warning('first record')\n"
+        "print(json.dumps({'before': before, 'after': logger.writer is not None,\n"
+        "                  'handlers': [type(h).__name__ for h in logger.root_logger.handlers]}))"
+    )
+    assert state == {'before': False, 'after': True, 'handlers': ['DroppingQueueHandler']}
@@ -0,0 +1,84 @@
+import time
+from src.mcp_youtube_extract import config, server, transcript_api, youtube
+from tests.stubs import StubExtractor, caption_track
+
+TRACKS = [caption_track('en', auto_generated=True), caption_track('de'), caption_track('fr')]
+TEXTS = {'en': ['Hello', 'world'], 'de': ['Hallo', 'Welt'], 'fr': ['Bonjour', 'le monde']}
+
+
+def players(stub):
+    return [request for request in stub.requests if request[0] == 'player']
+
+
+async def test_one_track_list_for_all_languages(use_extractor, tmp_cache):
+    stub = use_extractor(StubExtractor(TRACKS, TEXTS))
+    result = await server.get_yt_transcripts('dQw4w9WgXcQ', ['de', 'en', 'ja'])
+    assert result['transcripts'] == {'de': 'Hallo Welt', 'en': 'Hello world'}
+    assert result['unavailable'] == ['ja']
+    assert result['errors'] == {}
+    assert result['available_languages'] == ['de', 'en', 'fr']
+    assert len(players(stub)) == 1
+    assert len(stub.requests) == 3
+
+
+async def test_languages_are_cached_separately(use_extractor, tmp_cache):
+    stub = use_extractor(StubExtractor(TRACKS, TEXTS))
+    await server.get_yt_transcripts('dQw4w9WgXcQ', ['de', 'en'])
+    transcript_api.clear_segment_memo()
+
+    # Cached languages and known missing ones need no requests
+    result = await server.get_yt_transcripts('dQw4w9WgXcQ', ['en', 'ja'])
+    assert (result['transcripts'], result['unavailable']) == ({'en': 'Hello world'}, ['ja'])
+    assert len(stub.requests) == 3
+
+    # Only the new language is downloaded
+    result = await server.get_yt_transcripts('dQw4w9WgXcQ', ['fr', 'de'])
+    assert result['transcripts'] == {'fr': 'Bonjour le monde', 'de': 'Hallo Welt'}
+    assert len(stub.requests) == 5
+
+
+async def test_no_fallback_to_another_language(use_extractor, tmp_cache):
+    use_extractor(StubExtractor(TRACKS, TEXTS))
+    # The single-language lookup falls back to the first track and caches it under 'ja'
+    assert youtube.get_video_transcript('dQw4w9WgXcQ', ['ja']) == 'Hello world'
+    result = await server.get_yt_transcripts('dQw4w9WgXcQ', ['ja'])
+    assert result['transcripts'] == {}
+    assert result['unavailable'] == ['ja']
+
+
+async def test_video_without_captions(use_extractor, tmp_cache):
+    stub = use_extractor(StubExtractor([]))
+    result = await server.get_yt_transcripts('dQw4w9WgXcQ', ['en', 'de'])
+    assert (result['unavailable'], result['available_languages']) == (['en', 'de'], [])
+    await server.get_yt_transcripts('dQw4w9WgXcQ', ['en'])
+    assert len(stub.requests) == 1
+
+
+async def test_downloads_run_in_parallel(use_extractor):
+    stub = use_extractor(StubExtractor(TRACKS, TEXTS, delay=0.2))
+    started = time.perf_counter()
+    result = await server.get_yt_transcripts('dQw4w9WgXcQ', ['en', 'de', 'fr'])
+    # One track list, then three downloads side by side, without a cache
+    assert time.perf_counter() - started < 0.7
+    assert len(result['transcripts']) == 3
+    assert len(stub.requests) == 4
+
+
+async def test_failed_download_is_reported(use_extractor, tmp_cache):
+    class FailingGerman(StubExtractor):
+        def fetch_transcript_xml(self, url):
+            if 'lang=de' in url:
+                raise RuntimeError('HTTP Error 404')
+            return super().fetch_transcript_xml(url)
+
+    use_extractor(FailingGerman(TRACKS, TEXTS))
+    result = await server.get_yt_transcripts('dQw4w9WgXcQ', ['de', 'fr'])
+    assert result['transcripts'] == {'fr': 'Bonjour le monde'}
+    assert result['errors'] == {'de': 'HTTP Error 404'}
+    assert result['unavailable'] == []
+
+
+async def test_language_list_validation(monkeypatch):
+    assert 'at least one' in (await server.get_yt_transcripts('dQw4w9WgXcQ', []))['error']
+    monkeypatch.setattr(config, 'LANGUAGES_LIMIT', 2)
+    assert 'At most 2' in (await server.get_yt_transcripts('dQw4w9WgXcQ', ['en', 'de', 'fr']))['error']
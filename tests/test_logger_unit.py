@@ -0,0 +1,140 @@
+import logging
+import queue
+import threading
+from src.mcp_youtube_extract.logger import (
+    ROOT_LOGGER_NAME,
+    BackgroundLogWriter,
+    BatchingRotatingFileHandler,
+    DroppingQueueHandler,
+    FORMATTER,
+)
+
+
+class RecordingHandler(logging.Handler):
+    """Handler that keeps formatted messages and counts flushes"""
+
+    def __init__(self, level=logging.NOTSET):
+        super().__init__(level)
+        self.messages = []
+        self.flushes = 0
+        self.first_record = threading.Event()
+        self.release = threading.Event()
+        self.release.set()
+
+    def emit(self, record):
+        self.messages.append(record.getMessage())
+        self.first_record.set()
+        self.release.wait()
+
+    def flush(self):
+        self.flushes += 1
+
+
+def make_logger(name, handler):
+    logger = logging.getLogger(name)
+    logger.handlers[:] = [handler]
+    logger.propagate = False
+    logger.setLevel(logging.DEBUG)
+    return logger
+
+
+# Test the background writer
+def test_records_written_in_order_and_drained_on_stop():
+    log_queue = queue.Queue()
+    sink = RecordingHandler()
+    writer = BackgroundLogWriter(log_queue, [sink])
+    writer.start()
+    logger = make_logger('test_logger.order', DroppingQueueHandler(log_queue))
+
+    for i in range(500):
+        logger.info('message %d', i)
+    writer.stop()
+
+    assert sink.messages == [f'message {i}' for i in range(500)]
+
+
+def test_flushes_once_per_batch():
+    log_queue = queue.Queue()
+    sink = RecordingHandler()
+    sink.release.clear()
+    writer = BackgroundLogWriter(log_queue, [sink], batch_size=50)
+    writer.start()
+    logger = make_logger('test_logger.batch', DroppingQueueHandler(log_queue))
+
+    # Hold the writer on the first record so the rest pile up in the queue
+    logger.info('first')
+    sink.first_record.wait(1)
+    for i in range(199):
+        logger.info('message %d', i)
+    sink.release.set()
+    writer.stop()
+
+    assert len(sink.messages) == 200
+    assert sink.flushes <= 6
+
+
+def test_handler_levels_respected():
+    log_queue = queue.Queue()
+    everything = RecordingHandler()
+    errors_only = RecordingHandler(logging.ERROR)
+    writer = BackgroundLogWriter(log_queue, [everything, errors_only])
+    writer.start()
+    logger = make_logger('test_logger.levels', DroppingQueueHandler(log_queue))
+
+    logger.info('info')
+    logger.error('error')
+    writer.stop()
+
+    assert everything.messages == ['info', 'error']
+    assert errors_only.messages == ['error']
+
+
+def test_full_queue_drops_instead_of_blocking():
+    handler = DroppingQueueHandler(queue.Queue(maxsize=2))
+    logger = make_logger('test_logger.full', handler)
+    for i in range(5):
+        logger.info('message %d', i)
+    assert handler.dropped == 3
+
+
+def test_filtered_records_are_never_formatted():
+    class Exploding:
+        def __str__(self):
+            raise AssertionError('formatted a filtered record')
+
+    handler = DroppingQueueHandler(queue.Queue())
+    logger = make_logger('test_logger.lazy', handler)
+    logger.setLevel(logging.INFO)
+    logger.debug('value: %s', Exploding())
+    assert handler.queue.empty()
+
+
+# Test the batching file handler
+def test_file_handler_defers_flush_until_batch(tmp_path):
+    path = tmp_path / 'app.log'
+    handler = BatchingRotatingFileHandler(path, maxBytes=0)
+    handler.setFormatter(FORMATTER)
+    handler.handle(logging.makeLogRecord({'msg': 'hello', 'levelno': logging.INFO, 'levelname': 'INFO'}))
+    assert path.read_text() == ''
+    handler.flush_batch()
+    assert 'hello' in path.read_text()
+    handler.close()
+
+
+def test_file_handler_rotates_by_size(tmp_path):
+    path = tmp_path / 'app.log'
+    handler = BatchingRotatingFileHandler(path, maxBytes=200, backupCount=2)
+    for i in range(50):
+        handler.handle(logging.makeLogRecord({'msg': f'line {i:03d} ' + 'x' * 40}))
+    handler.close()
+    assert (tmp_path / 'app.log.1').exists()
+    assert (tmp_path / 'app.log.2').exists()
+    assert not (tmp_path / 'app.log.3').exists()
+    assert 'line 049' in path.read_text()
+
+
+# Test the package logger
+def test_records_reach_the_root_logger(caplog):
+    with caplog.at_level(logging.INFO):
+        logging.getLogger(f'{ROOT_LOGGER_NAME}.test').info('seen by the host application')
+    assert 'seen by the host application' in caplog.messages
@@ -0,0 +1,171 @@
+import io
+import json
+import logging
+import pytest
+import requests
+from unittest.mock import patch
+from requests.adapters import HTTPAdapter
+import yt_ts_extract.extractor as yt_ts_extractor
+from src.mcp_youtube_extract import config, google_api, metrics, server, transcript_api
+from src.mcp_youtube_extract.extractor_pool import PooledTranscriptExtractor
+from src.mcp_youtube_extract.metrics import (
+    CACHE_LOOKUPS,
+    Counter,
+    Histogram,
+    STAGE_SECONDS,
+    UPSTREAM_REQUESTS,
+    UPSTREAM_RETRIES,
+    span,
+)
+from src.mcp_youtube_extract.ratelimit import TokenBucket
+from tests.stubs import StubExtractor, caption_track, player_response, transcript_xml
+
+
+# Test the metric types
+def test_histogram_quantiles_from_buckets():
+    histogram = Histogram('test_seconds', 'Test.', buckets=(0.01, 0.1, 1.0))
+    for value in [0.005] * 50 + [0.05] * 40 + [0.5] * 9 + [5.0]:
+        histogram.observe(value, stage='a')
+    [row] = histogram.snapshot()
+    assert row['labels'] == {'stage': 'a'}
+    assert row['count'] == 100
+    assert row['p50'] == 0.01
+    assert row['p90'] == 0.1
+    assert row['p99'] == 1.0
+    assert row['sum'] == pytest.approx(0.25 + 2.0 + 4.5 + 5.0)
+
+
+def test_prometheus_rendering():
+    histogram = Histogram('test_seconds', 'Test histogram.', buckets=(0.1, 1.0))
+    histogram.observe(0.05, stage='a')
+    histogram.observe(2.0, stage='a')
+    counter = Counter('test_total', 'Test counter.')
+    counter.inc(endpoint='player')
+    counter.inc(2, endpoint='player')
+
+    assert histogram.render() == [
+        '# HELP mcp_youtube_test_seconds Test histogram.',
+        '# TYPE mcp_youtube_test_seconds histogram',
+        'mcp_youtube_test_seconds_bucket{stage="a",le="0.1"} 1',
+        'mcp_youtube_test_seconds_bucket{stage="a",le="1"} 1',
+        'mcp_youtube_test_seconds_bucket{stage="a",le="+Inf"} 2',
+        'mcp_youtube_test_seconds_sum{stage="a"} 2.05',
+        'mcp_youtube_test_seconds_count{stage="a"} 2',
+    ]
+    assert counter.render()[-1] == 'mcp_youtube_test_total{endpoint="player"} 3'
+
+
+def test_disabled_metrics_record_nothing(monkeypatch):
+    monkeypatch.setattr(config, 'METRICS_ENABLED', False)
+    with span('stage'):
+        pass
+    UPSTREAM_REQUESTS.inc(endpoint='player')
+    assert STAGE_SECONDS.count(stage='stage', outcome='ok') == 0
+    assert UPSTREAM_REQUESTS.value(endpoint='player') == 0
+
+
+# Test spans
+def test_span_records_outcome():
+    with span('good'):
+        pass
+    with pytest.raises(ValueError):
+        with span('bad'):
+            raise ValueError('boom')
+    assert STAGE_SECONDS.count(stage='good', outcome='ok') == 1
+    assert STAGE_SECONDS.count(stage='bad', outcome='error') == 1
+
+
+def test_nested_spans_logged_with_parent_path():
+    messages = []
+
+    class Recorder(logging.Handler):
+        def emit(self, record):
+            messages.append(record.getMessage())
+
+    handler = Recorder()
+    metrics.logger.addHandler(handler)
+    level = metrics.logger.level
+    metrics.logger.setLevel(logging.DEBUG)
+    try:
+        with span('outer'):
+            with span('inner'):
+                pass
+    finally:
+        metrics.logger.removeHandler(handler)
+        metrics.logger.setLevel(level)
+    assert messages[0].startswith('Span outer/inner took')
+    assert messages[1].startswith('Span outer took')
+
+
+# Test instrumentation
+def test_transcript_stages_and_cache_lookups(use_extractor, tmp_cache):
+    use_extractor(StubExtractor(tracks=[caption_track('en')], texts={'en': ['Hello', 'world']}))
+    transcript_api.get_video_transcript('dQw4w9WgXcQ')
+    transcript_api.get_video_transcript('dQw4w9WgXcQ')
+    transcript_api.clear_segment_memo()
+    transcript_api.get_video_transcript('dQw4w9WgXcQ')
+
+    assert STAGE_SECONDS.count(stage='transcript.track_list', outcome='ok') == 1
+    assert STAGE_SECONDS.count(stage='transcript.download', outcome='ok') == 1
+    assert CACHE_LOOKUPS.value(kind='segments', tier='disk', result='miss') == 1
+    assert CACHE_LOOKUPS.value(kind='segments', tier='memory', result='hit') == 1
+    assert CACHE_LOOKUPS.value(kind='segments', tier='disk', result='hit') == 1
+
+
+def test_info_fetch_counted():
+    with patch.object(google_api, 'yt_get_video_info', return_value={'title': 'Test'}):
+        google_api.get_video_info('', 'dQw4w9WgXcQ')
+    assert UPSTREAM_REQUESTS.value(endpoint='video_info') == 1
+    assert STAGE_SECONDS.count(stage='info.fetch', outcome='ok') == 1
+
+
+def test_retries_counted_per_endpoint():
+    response = requests.Response()
+    response.status_code = 200
+    response._content = b'<transcript></transcript>'
+    extractor = PooledTranscriptExtractor(TokenBucket(1000, 1000), max_retries=3, backoff_factor=0)
+
+    with patch.object(HTTPAdapter, 'send', side_effect=[requests.ConnectionError('boom'), response]), \
+         patch.object(yt_ts_extractor.time, 'sleep'):
+        assert extractor.fetch_transcript_xml('https://www.youtube.com/api/timedtext?v=vid') == '<transcript></transcript>'
+
+    assert UPSTREAM_REQUESTS.value(endpoint='timedtext') == 1
+    assert UPSTREAM_RETRIES.value(endpoint='timedtext') == 1
+
+
+
+def test_fetch_logs_the_requests_it_sent(use_extractor, caplog):
+    def answer(body):
+        response = requests.Response()
+        response.status_code = 200
+        response.raw = io.BytesIO(body.encode('utf-8'))
+        return response
+
+    extractor = use_extractor(PooledTranscriptExtractor(TokenBucket(1000, 1000), max_retries=3, backoff_factor=0))
+    sent = [
+        requests.ConnectionError('boom'),
+        answer(json.dumps(player_response([caption_track('en')]))),
+        answer(transcript_xml(['Hello'])),
+    ]
+    with patch.object(HTTPAdapter, 'send', side_effect=sent), patch.object(yt_ts_extractor.time, 'sleep'), \
+         caplog.at_level(logging.INFO):
+        assert transcript_api.get_video_transcript('dQw4w9WgXcQ') == 'Hello'
+    # The retried player request counts twice
+    assert 'Transcript fetch for dQw4w9WgXcQ made 3 upstream request(s)' in caplog.messages
+    assert extractor.requests_sent == 3
+
+# Test the metrics tool and resource
+async def test_metrics_tool_and_resource():
+    with span('tool.example'):
+        pass
+    UPSTREAM_REQUESTS.inc(endpoint='player')
+
+    result = await server.get_yt_metrics()
+    [row] = result['stage_seconds']
+    assert row['labels'] == {'stage': 'tool.example', 'outcome': 'ok'}
+    assert result['upstream_requests_total'] == [{'labels': {'endpoint': 'player'}, 'value': 1}]
+
+    [content] = await server.mcp.read_resource('metrics://prometheus')
+    assert content.mime_type == 'text/plain'
+    assert '# TYPE mcp_youtube_stage_seconds histogram' in content.content
+    assert 'mcp_youtube_upstream_requests_total{endpoint="player"} 1' in content.content
@@ -0,0 +1,91 @@
+import pytest
+from src.mcp_youtube_extract import pagination, server
+from src.mcp_youtube_extract.segments import SegmentIndex
+from tests.stubs import StubExtractor, caption_track
+
+WORDS = [f'word{i:02d}' for i in range(40)]  # 6 characters each
+
+
+def make_index(words=WORDS):
+    return SegmentIndex.from_segments({'text': w, 'start': float(i), 'duration': 1.0} for i, w in enumerate(words))
+
+
+# Test chunking
+@pytest.mark.parametrize('max_chars, expected_end', [
+    (6, 1),     # exactly one segment
+    (13, 2),    # two segments plus the joining space
+    (12, 1),
+    (5, 1),     # a segment longer than the budget still makes progress
+    (10000, 40),
+])
+def test_chunk_end(max_chars, expected_end):
+    assert make_index().chunk_end(0, max_chars) == expected_end
+
+
+def test_pages_cover_transcript_exactly_once():
+    index = make_index()
+    pages = []
+    position = 0
+    while position < len(index):
+        page = pagination.build_page('dQw4w9WgXcQ', 'en', index, position, 20)
+        assert len(page['text']) <= 20
+        pages.append(page['text'])
+        if page['next_cursor'] is None:
+            break
+        _, _, position = pagination.decode_cursor(page['next_cursor'])
+    assert ' '.join(pages) == index.text
+
+
+def test_cursor_round_trip():
+    cursor = pagination.encode_cursor('dQw4w9WgXcQ', 'en,fr', 17)
+    assert pagination.decode_cursor(cursor) == ('dQw4w9WgXcQ', 'en,fr', 17)
+
+
+@pytest.mark.parametrize('cursor', ['not a cursor', '', 'e30'])
+def test_invalid_cursor(cursor):
+    with pytest.raises(ValueError):
+        pagination.decode_cursor(cursor)
+
+
+def test_chunk_chars_units():
+    assert pagination.chunk_chars(100, 'chars') == 100
+    assert pagination.chunk_chars(100, 'tokens') == 400
+    with pytest.raises(ValueError):
+        pagination.chunk_chars(100, 'pages')
+    with pytest.raises(ValueError):
+        pagination.chunk_chars(0, 'chars')
+
+
+# Test the page tool
+async def test_paging_never_refetches(use_extractor, tmp_cache):
+    stub = use_extractor(StubExtractor([caption_track('en')], {'en': WORDS}))
+    page = await server.get_yt_transcript_page('dQw4w9WgXcQ', chunk_size=20)
+    texts = [page['text']]
+    while page['next_cursor']:
+        page = await server.get_yt_transcript_page('dQw4w9WgXcQ', cursor=page['next_cursor'], chunk_size=20)
+        texts.append(page['text'])
+    assert ' '.join(texts) == ' '.join(WORDS)
+    assert page['last_segment'] == len(WORDS) - 1
+    # Only the first page went upstream
+    assert len(stub.requests) == 2
+
+
+async def test_page_reports_time_span(use_extractor):
+    use_extractor(StubExtractor([caption_track('en')], {'en': WORDS}))
+    page = await server.get_yt_transcript_page('dQw4w9WgXcQ', chunk_size=4, unit='tokens')
+    assert page['text'] == 'word00 word01'
+    assert (page['start'], page['end']) == (0.0, 2.0)
+    assert page['total_segments'] == 40
+
+
+async def test_cursor_for_other_video_is_rejected(use_extractor):
+    use_extractor(StubExtractor([caption_track('en')], {'en': WORDS}))
+    cursor = pagination.encode_cursor('other', 'en', 3)
+    page = await server.get_yt_transcript_page('dQw4w9WgXcQ', cursor=cursor)
+    assert page['error'] == 'Cursor belongs to video other'
+
+
+async def test_page_without_transcript(use_extractor):
+    use_extractor(StubExtractor([]))
+    page = await server.get_yt_transcript_page('dQw4w9WgXcQ')
+    assert page['error'] == 'No transcript available for this video.'
@@ -0,0 +1,215 @@
+import asyncio
+import threading
+import time
+import pytest
+from unittest.mock import patch
+from src.mcp_youtube_extract import pipeline, server
+
+VIDEO_INFO = {
+    'title': 'Test Title',
+    'channel_name': 'Test Channel',
+    'publication_date': '2020-01-01T00:00:00Z',
+    'description': 'Test Description',
+    'views': 1000000
+}
+
+
+def slow_info(delay):
+    def fetch(api_key, video_id):
+        time.sleep(delay)
+        return VIDEO_INFO
+    return fetch
+
+
+def slow_transcript(delay, text='Hello world'):
+    def fetch(video_id):
+        time.sleep(delay)
+        return text
+    return fetch
+
+
+# Test concurrent fetch
+async def test_fetches_run_concurrently():
+    with patch.object(pipeline, 'get_video_info', slow_info(0.3)), \
+         patch.object(pipeline, 'get_video_transcript', slow_transcript(0.5)):
+        start = time.perf_counter()
+        video_info, transcript = await pipeline.fetch_video_info_and_transcript('', 'fakeVideoId')
+        elapsed = time.perf_counter() - start
+    assert video_info == VIDEO_INFO
+    assert transcript == 'Hello world'
+    # Bounded by the slower fetch, not the sum of both
+    assert elapsed < 0.7
+
+
+async def test_info_timeout_keeps_transcript():
+    with patch.object(pipeline, 'get_video_info', slow_info(1.0)), \
+         patch.object(pipeline, 'get_video_transcript', slow_transcript(0.05)):
+        video_info, transcript = await pipeline.fetch_video_info_and_transcript(
+            '', 'fakeVideoId', info_timeout=0.1
+        )
+    assert video_info is None
+    assert transcript == 'Hello world'
+
+
+async def test_transcript_timeout_reported_as_issue():
+    with patch.object(pipeline, 'get_video_info', slow_info(0.05)), \
+         patch.object(pipeline, 'get_video_transcript', slow_transcript(1.0)):
+        video_info, transcript = await pipeline.fetch_video_info_and_transcript(
+            '', 'fakeVideoId', transcript_timeout=0.1
+        )
+    assert video_info == VIDEO_INFO
+    assert transcript.startswith('Could not retrieve transcript: timed out')
+
+
+# Test the tool output format
+async def test_get_yt_video_info_output_format():
+    with patch.object(pipeline, 'get_video_info', slow_info(0)), \
+         patch.object(pipeline, 'get_video_transcript', slow_transcript(0)):
+        result = await server.get_yt_video_info('fakeVideoId')
+    assert result == (
+        "=== VIDEO INFORMATION ===\n"
+        "Title: Test Title\n"
+        "Channel: Test Channel\n"
+        "Published: 2020-01-01T00:00:00Z\n"
+        "Views: 1,000,000\n"
+        "Description: Test Description\n"
+        "\n"
+        "=== TRANSCRIPT ===\n"
+        "Hello world"
+    )
+
+
+async def test_get_yt_video_info_transcript_issue():
+    with patch.object(pipeline, 'get_video_info', slow_info(0)), \
+         patch.object(pipeline, 'get_video_transcript', slow_transcript(0, 'Could not retrieve transcript: boom')):
+        result = await server.get_yt_video_info('fakeVideoId')
+    assert result.endswith("=== TRANSCRIPT ===\nTranscript issue: Could not retrieve transcript: boom")
+
+
+async def test_get_yt_video_info_no_transcript():
+    with patch.object(pipeline, 'get_video_info', slow_info(0)), \
+         patch.object(pipeline, 'get_video_transcript', slow_transcript(0, None)):
+        result = await server.get_yt_video_info('fakeVideoId')
+    assert result.endswith("=== TRANSCRIPT ===\nNo transcript available for this video.")
+
+
+# Test the batch tool
+class ConcurrencyProbe:
+    """Stub fetcher that records how many calls overlap"""
+
+    def __init__(self, delay):
+        self.delay = delay
+        self.active = 0
+        self.peak = 0
+        self.calls = []
+        self.lock = threading.Lock()
+
+    def info(self, api_key, video_id):
+        with self.lock:
+            self.calls.append(video_id)
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+        try:
+            time.sleep(self.delay)
+            return dict(VIDEO_INFO, title=f'Title {video_id}')
+        finally:
+            with self.lock:
+                self.active -= 1
+
+
+async def test_batch_preserves_order_and_deduplicates():
+    probe = ConcurrencyProbe(0)
+    with patch.object(pipeline, 'get_video_info', probe.info), \
+         patch.object(pipeline, 'get_video_transcript', slow_transcript(0)):
+        results = await pipeline.collect_videos_info('', ['bbbbbbbbbbb', 'aaaaaaaaaaa', 'bbbbbbbbbbb', 'ccccccccccc'])
+    assert [r['video_id'] for r in results] == ['bbbbbbbbbbb', 'aaaaaaaaaaa', 'bbbbbbbbbbb', 'ccccccccccc']
+    assert 'Title bbbbbbbbbbb' in results[0]['result']
+    assert 'Title aaaaaaaaaaa' in results[1]['result']
+    assert results[0] is results[2]
+    assert sorted(probe.calls) == ['aaaaaaaaaaa', 'bbbbbbbbbbb', 'ccccccccccc']
+
+
+async def test_batch_error_does_not_abort_others():
+    with patch.object(pipeline, 'fetch_video_info_and_transcript', side_effect=[RuntimeError('boom'), (VIDEO_INFO, 'Hello world')]):
+        results = await pipeline.collect_videos_info('', ['brokenVideo', 'goodVideo01'], max_concurrency=1)
+    assert results[0] == {'video_id': 'brokenVideo', 'result': None, 'error': 'boom'}
+    assert results[1]['error'] is None
+    assert 'Hello world' in results[1]['result']
+
+
+async def test_batch_respects_concurrency_limit():
+    probe = ConcurrencyProbe(0.1)
+    video_ids = [f'video{i:06d}' for i in range(8)]
+    with patch.object(pipeline, 'get_video_info', probe.info), \
+         patch.object(pipeline, 'get_video_transcript', slow_transcript(0)):
+        start = time.perf_counter()
+        results = await pipeline.collect_videos_info('', video_ids, max_concurrency=4)
+        elapsed = time.perf_counter() - start
+    assert all(r['error'] is None for r in results)
+    assert probe.peak == 4
+    # Two waves of four rather than eight sequential fetches
+    assert elapsed < 0.5
+
+
+async def test_batch_concurrency_capped_by_config(monkeypatch):
+    monkeypatch.setattr(pipeline.config, 'BATCH_CONCURRENCY', 2)
+    probe = ConcurrencyProbe(0.05)
+    with patch.object(pipeline, 'get_video_info', probe.info), \
+         patch.object(pipeline, 'get_video_transcript', slow_transcript(0)):
+        await pipeline.collect_videos_info('', [f'video{i:06d}' for i in range(6)], max_concurrency=100)
+    assert probe.peak == 2
+
+
+# Test the metadata-only and transcript-only tools
+async def test_metadata_tool_never_fetches_the_transcript():
+    with patch.object(pipeline, 'get_video_info', return_value=VIDEO_INFO) as info, \
+         patch.object(pipeline, 'get_video_transcript') as transcript:
+        result = await server.get_yt_video_metadata('dQw4w9WgXcQ', fields='title,views')
+    assert result == '=== VIDEO INFORMATION ===\nTitle: Test Title\nViews: 1,000,000'
+    assert info.call_args.args[1:] == ('dQw4w9WgXcQ', ('title', 'views'))
+    transcript.assert_not_called()
+
+
+async def test_transcript_tool_never_fetches_metadata():
+    with patch.object(pipeline, 'get_video_info') as info, \
+         patch.object(pipeline, 'get_video_transcript', return_value='Hello world'):
+        result = await server.get_yt_transcript('dQw4w9WgXcQ', output_format='json', max_transcript_chars=5)
+    assert result == '{"video_id":"dQw4w9WgXcQ","transcript":"Hello","transcript_chars":11}'
+    info.assert_not_called()
+
+
+async def test_combined_tool_is_both_parts():
+    with patch.object(pipeline, 'get_video_info', slow_info(0)), \
+         patch.object(pipeline, 'get_video_transcript', slow_transcript(0)):
+        combined = await server.get_yt_video_info('dQw4w9WgXcQ')
+        metadata = await server.get_yt_video_metadata('dQw4w9WgXcQ')
+        transcript = await server.get_yt_transcript('dQw4w9WgXcQ')
+    assert combined == f'{metadata}\n\n{transcript}'
+
+
+async def test_transcript_timeout_in_transcript_tool(monkeypatch):
+    monkeypatch.setattr(pipeline.config, 'TRANSCRIPT_TIMEOUT', 0.05)
+    with patch.object(pipeline, 'get_video_transcript', slow_transcript(0.5)):
+        result = await server.get_yt_transcript('dQw4w9WgXcQ')
+    assert result == '=== TRANSCRIPT ===\nTranscript issue: Could not retrieve transcript: timed out after 0.05s'
+
+
+@pytest.mark.parametrize('tool, options', [
+    ('get_yt_video_metadata', {'fields': 'title,transcript'}),
+    ('get_yt_video_metadata', {'fields': 'transcript'}),
+    ('get_yt_video_metadata', {'output_format': 'metadata'}),
+    ('get_yt_transcript', {'output_format': 'xml'}),
+    ('get_yt_transcript', {'max_transcript_chars': -1}),
+])
+async def test_single_part_tools_reject_invalid_options(tool, options):
+    with patch.object(pipeline, 'get_video_info') as info, \
+         patch.object(pipeline, 'get_video_transcript') as transcript:
+        assert (await getattr(server, tool)('dQw4w9WgXcQ', **options)).startswith('Error: ')
+    info.assert_not_called()
+    transcript.assert_not_called()
+
+
+async def test_metadata_collector_rejects_an_empty_selection():
+    with patch.object(pipeline, 'get_video_info') as info, pytest.raises(ValueError, match='nothing to return'):
+        await pipeline.collect_video_metadata('', 'dQw4w9WgXcQ', 'text', ('transcript',))
+    info.assert_not_called()
@@ -0,0 +1,156 @@
+import asyncio
+import threading
+import pytest
+from unittest.mock import patch
+from src.mcp_youtube_extract import config, pipeline, playlist, server
+from src.mcp_youtube_extract.playlist import StaticVideoListSource, VideoListSource, YtDlpVideoListSource
+
+VIDEO_IDS = [f'video{i:02d}' for i in range(6)]
+
+
+@pytest.fixture(autouse=True)
+def video_lists():
+    source = StaticVideoListSource({'PLcourse': VIDEO_IDS}, page_size=2)
+    playlist.set_video_list_source(source)
+    yield source
+    playlist.set_video_list_source(None)
+
+
+def fake_info(api_key, video_id):
+    return {'title': f'Title of {video_id}'}
+
+
+def fake_transcript(video_id):
+    return f'Transcript of {video_id}'
+
+
+class Reports:
+    def __init__(self):
+        self.entries = []
+
+    async def __call__(self, videos_done, entry):
+        self.entries.append((videos_done, entry))
+
+
+class FailingSource(VideoListSource):
+    """Lists one page, then fails like a listing cut off by YouTube"""
+
+    def iter_videos(self, identifier):
+        yield {'video_id': 'video00', 'title': 'First'}
+        yield {'video_id': 'video01', 'title': 'Second'}
+        raise RuntimeError('HTTP Error 429: Too Many Requests')
+
+
+# Test the pipeline
+async def test_videos_fetched_while_later_pages_are_listed(video_lists):
+    video_lists.page_delay = 0.1
+    pages_at_first_fetch = []
+
+    def transcript(video_id):
+        pages_at_first_fetch.append(video_lists.pages_served)
+        return fake_transcript(video_id)
+
+    reports = Reports()
+    with patch.object(pipeline, 'get_video_info', fake_info), patch.object(pipeline, 'get_video_transcript', transcript):
+        summary = await playlist.collect_playlist_info('', 'PLcourse', reports, max_concurrency=2)
+    assert pages_at_first_fetch[0] == 1
+    assert video_lists.pages_served == 3
+    assert [done for done, _ in reports.entries] == [1, 2, 3, 4, 5, 6]
+    assert summary['videos'] == 6
+    assert summary['error'] is None
+    assert [r['video_id'] for r in summary['results']] == VIDEO_IDS
+    assert [r['position'] for r in summary['results']] == list(range(6))
+    assert 'Transcript of video03' in summary['results'][3]['result']
+
+
+async def test_listing_waits_for_fetchers(video_lists):
+    video_lists.lists['PLlong'] = [f'long{i:03d}' for i in range(100)]
+    video_lists.page_size = 1
+    release = threading.Event()
+
+    def blocked_info(api_key, video_id):
+        release.wait(5)
+        return fake_info(api_key, video_id)
+
+    reports = Reports()
+    with patch.object(pipeline, 'get_video_info', blocked_info), patch.object(pipeline, 'get_video_transcript', fake_transcript):
+        task = asyncio.ensure_future(playlist.collect_playlist_info('', 'PLlong', reports, max_concurrency=2))
+        await asyncio.sleep(0.3)
+        # Two fetches in flight, two listed videos queued, one waiting to be queued
+        assert video_lists.pages_served <= 5
+        release.set()
+        summary = await task
+    assert summary['videos'] == 100
+
+
+async def test_max_videos_stops_listing(video_lists):
+    video_lists.lists['PLlong'] = [f'long{i:03d}' for i in range(100)]
+    with patch.object(pipeline, 'get_video_info', fake_info), patch.object(pipeline, 'get_video_transcript', fake_transcript):
+        summary = await playlist.collect_playlist_info('', 'PLlong', Reports(), max_videos=3)
+    assert [r['video_id'] for r in summary['results']] == ['long000', 'long001', 'long002']
+    assert video_lists.pages_served == 2
+
+
+async def test_max_videos_capped_by_config(monkeypatch):
+    monkeypatch.setattr(config, 'PLAYLIST_MAX_VIDEOS', 4)
+    with patch.object(pipeline, 'get_video_info', fake_info), patch.object(pipeline, 'get_video_transcript', fake_transcript):
+        summary = await playlist.collect_playlist_info('', 'PLcourse', Reports(), max_videos=50)
+    assert summary['videos'] == 4
+
+
+async def test_listing_failure_keeps_listed_videos():
+    playlist.set_video_list_source(FailingSource())
+    with patch.object(pipeline, 'get_video_info', fake_info), patch.object(pipeline, 'get_video_transcript', fake_transcript):
+        summary = await playlist.collect_playlist_info('', 'PLbroken', Reports())
+    assert [r['title'] for r in summary['results']] == ['First', 'Second']
+    assert summary['error'] == 'Could not list all videos: HTTP Error 429: Too Many Requests'
+
+
+async def test_failed_video_does_not_stop_the_rest():
+    async def collect(api_key, video_id):
+        if video_id == 'video02':
+            raise RuntimeError('boom')
+        return f'Report for {video_id}'
+
+    with patch.object(playlist, 'collect_video_info', collect):
+        summary = await playlist.collect_playlist_info('', 'PLcourse', Reports())
+    assert summary['results'][2]['error'] == 'boom'
+    assert sum(r['error'] is None for r in summary['results']) == 5
+
+
+# Test the yt-dlp source
+@pytest.mark.parametrize('identifier, url', [
+    ('PLrAXtmErZgOeiKm4sgNOknGvNjby9efdf', 'https://www.youtube.com/playlist?list=PLrAXtmErZgOeiKm4sgNOknGvNjby9efdf'),
+    ('UC_x5XG1OV2P6uZZ5FSM9Ttw', 'https://www.youtube.com/channel/UC_x5XG1OV2P6uZZ5FSM9Ttw/videos'),
+    ('@GoogleDevelopers', 'https://www.youtube.com/@GoogleDevelopers/videos'),
+    ('https://www.youtube.com/playlist?list=PL1', 'https://www.youtube.com/playlist?list=PL1'),
+])
+def test_resolve_url(identifier, url):
+    assert YtDlpVideoListSource.resolve_url(identifier) == url
+
+
+# Test the tool
+async def test_playlist_tool_streams_each_video():
+    class FakeContext:
+        def __init__(self):
+            self.progress = []
+
+        async def report_progress(self, progress, total=None, message=None):
+            self.progress.append((progress, message))
+
+    ctx = FakeContext()
+    with patch.object(pipeline, 'get_video_info', fake_info), patch.object(pipeline, 'get_video_transcript', fake_transcript):
+        summary = await server.get_yt_playlist_info('PLcourse', ctx, max_videos=2)
+    assert summary['videos'] == 2
+    assert sorted(progress for progress, _ in ctx.progress) == [1, 2]
+    assert any(message.startswith('[1] video00\n') and 'Transcript of video00' in message for _, message in ctx.progress)
+
+
+async def test_playlist_tool_unknown_list():
+    class FakeContext:
+        async def report_progress(self, progress, total=None, message=None):
+            raise AssertionError('nothing to report')
+
+    summary = await server.get_yt_playlist_info('PLmissing', FakeContext())
+    assert summary['videos'] == 0
+    assert summary['error'] == 'Could not list all videos: Unknown playlist or channel: PLmissing'
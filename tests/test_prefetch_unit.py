@@ -0,0 +1,124 @@
+import io
+import threading
+import pytest
+from unittest.mock import patch
+from src.mcp_youtube_extract import google_api, prefetch, server
+from src.mcp_youtube_extract.prefetch import Progress, read_video_ids
+from tests.stubs import StubExtractor, caption_track
+
+VIDEO_IDS = ['alpha000001', 'bravo000001', 'charlie0001', 'delta000001']
+
+
+def fake_info(video_id):
+    if video_id == 'broken00001':
+        raise RuntimeError('HTTP Error 500')
+    return {'title': f'Title of {video_id}', 'channel': 'Channel', 'description': ''}
+
+
+@pytest.fixture
+def ids_file(tmp_path):
+    path = tmp_path / 'ids.txt'
+    path.write_text('# lectures\nalpha000001 bravo000001\n\ncharlie0001  # the long one\ndelta000001\nalpha000001\n')
+    return path
+
+
+@pytest.fixture
+def stub(use_extractor):
+    return use_extractor(StubExtractor([caption_track('en')], {'en': ['first line', 'second line']}))
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+# Test input and progress reporting
+def test_read_video_ids():
+    lines = ['alpha000001 bravo000001', '# charlie0001', '', 'delta000001 # echo0000001', 'alpha000001']
+    assert read_video_ids(lines) == ['alpha000001', 'bravo000001', 'delta000001']
+
+
+def test_read_video_ids_normalizes_urls():
+    invalid = []
+    lines = ['https://youtu.be/alpha000001?si=x', 'https://www.youtube.com/watch?v=alpha000001&t=30 short', 'bravo000001']
+    assert read_video_ids(lines, invalid) == ['alpha000001', 'bravo000001']
+    assert invalid == ['short']
+
+
+def test_progress_reports_throughput_and_eta():
+    clock, stream = Clock(), io.StringIO()
+    progress = Progress(10, stream, interval=5.0, clock=clock)
+    clock.now = 1.0
+    progress.record('cached')
+    assert stream.getvalue() == ''
+    clock.now = 5.0
+    progress.record('fetched')
+    progress.record('failed')
+    assert progress.summary() == {
+        'total': 10, 'done': 3, 'fetched': 1, 'cached': 1, 'failed': 1, 'seconds': 5.0, 'videos_per_second': 0.4,
+    }
+    assert stream.getvalue() == 'prefetch: 2/10 (20.0%)  fetched 1  cached 1  failed 0  0.20 videos/s  ETA 0m40s\n'
+
+
+# Test filling the cache
+def test_fills_cache_and_resumes(tmp_cache, stub, ids_file, capsys):
+    with patch.object(google_api, 'yt_get_video_info', side_effect=fake_info) as info:
+        assert prefetch.main([str(ids_file), '--concurrency', '2']) == 0
+        assert info.call_count == 4
+    assert all(prefetch.is_cached(tmp_cache, video_id) for video_id in VIDEO_IDS)
+    assert len(stub.requests) == 8
+    assert 'prefetch: 4/4 (100.0%)  fetched 4  cached 0  failed 0' in capsys.readouterr().err
+
+    # A second run finds everything cached and makes no upstream requests
+    with patch.object(google_api, 'yt_get_video_info', side_effect=fake_info) as info:
+        assert prefetch.main([str(ids_file)]) == 0
+        assert info.call_count == 0
+    assert len(stub.requests) == 8
+    assert 'fetched 0  cached 4  failed 0' in capsys.readouterr().err
+
+
+def test_failed_videos_are_retried_by_the_next_run(tmp_cache, stub, monkeypatch, capsys):
+    monkeypatch.setattr('sys.stdin', io.StringIO('alpha000001\nbroken00001\n'))
+    with patch.object(google_api, 'yt_get_video_info', side_effect=fake_info):
+        assert prefetch.main(['-']) == 1
+    assert 'fetched 1  cached 0  failed 1' in capsys.readouterr().err
+    assert not prefetch.is_cached(tmp_cache, 'broken00001')
+
+
+def test_cache_disabled(ids_file, capsys):
+    assert prefetch.main([str(ids_file)]) == 2
+    assert 'cache is disabled' in capsys.readouterr().err
+
+
+def test_unreadable_ids_file(tmp_cache, tmp_path, capsys):
+    assert prefetch.main([str(tmp_path / 'missing.txt')]) == 2
+    assert 'cannot read' in capsys.readouterr().err
+    (tmp_path / 'binary.txt').write_bytes(b'\xff\xfe\x00')
+    assert prefetch.main([str(tmp_path / 'binary.txt')]) == 2
+
+
+def test_cache_checks_run_off_the_event_loop(tmp_cache, stub, ids_file):
+    threads = []
+
+    def is_cached(cache, video_id):
+        threads.append(threading.current_thread().name)
+        return True
+
+    with patch.object(prefetch, 'is_cached', is_cached):
+        assert prefetch.main([str(ids_file)]) == 0
+    assert len(threads) == 4
+    assert all(name.startswith('yt-fetch') for name in threads)
+
+
+def test_concurrency_must_be_positive(ids_file):
+    with pytest.raises(SystemExit):
+        prefetch.parse_args([str(ids_file), '--concurrency', '0'])
+
+
+def test_server_dispatches_prefetch(tmp_cache, stub, ids_file):
+    with patch.object(google_api, 'yt_get_video_info', side_effect=fake_info):
+        assert server.main(['prefetch', str(ids_file)]) == 0
+    assert prefetch.is_cached(tmp_cache, 'delta000001')
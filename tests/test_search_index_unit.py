@@ -0,0 +1,110 @@
+import pytest
+from unittest.mock import patch
+from src.mcp_youtube_extract import config, server, transcript_api
+from src.mcp_youtube_extract.search_index import SearchIndex, parse_query, tokenize
+from src.mcp_youtube_extract.segments import SegmentIndex
+from tests.stubs import StubExtractor, caption_track
+
+TEXTS = [
+    'Never gonna give you up,',
+    'never gonna let you down.',
+    'Never gonna run around',
+    'and desert you!',
+    "We've known each other",
+]
+
+
+def make_search_index(texts=TEXTS):
+    index = SegmentIndex.from_segments({'text': t, 'start': 2.0 * i, 'duration': 2.0} for i, t in enumerate(texts))
+    return index, SearchIndex.build(index)
+
+
+# Test tokenizing and query parsing
+def test_tokenize_folds_case_and_drops_punctuation():
+    assert tokenize("We've known, each OTHER!") == ['we', 've', 'known', 'each', 'other']
+
+
+def test_parse_query():
+    assert parse_query('gonna "let you down" up') == [['let', 'you', 'down'], ['gonna'], ['up']]
+    assert parse_query('"" ,') == []
+
+
+# Test searching
+@pytest.mark.parametrize('query, expected', [
+    ('gonna', [(0, 0), (1, 1), (2, 2)]),
+    ('GONNA you', [(0, 0), (1, 1)]),
+    ('"gonna let"', [(1, 1)]),
+    ('"run around and desert"', [(2, 3)]),     # phrase across a segment boundary
+    ('"around and" never', [(2, 3)]),
+    ('"you gonna"', []),
+    ('rickroll', []),
+    ('', []),
+])
+def test_search(query, expected):
+    _, search_index = make_search_index()
+    assert search_index.search(query) == expected
+
+
+def test_term_positions_and_segments():
+    _, search_index = make_search_index()
+    assert search_index.term_positions('never').tolist() == [0, 5, 10]
+    assert [search_index.segment_of(p) for p in (0, 4, 5, 13, 14, 17)] == [0, 0, 1, 2, 3, 4]
+
+
+def test_dict_round_trip():
+    _, search_index = make_search_index()
+    restored = SearchIndex.from_dict(search_index.to_dict())
+    assert restored.terms == search_index.terms
+    assert restored.search('"desert you"') == [(3, 3)]
+
+
+# Test the search tool
+async def test_search_tool_reports_timestamps_and_snippets(use_extractor):
+    use_extractor(StubExtractor([caption_track('en')], {'en': TEXTS}))
+    result = await server.search_yt_transcript('dQw4w9WgXcQ', '"run around and"')
+    assert result == {
+        'video_id': 'dQw4w9WgXcQ',
+        'query': '"run around and"',
+        'total_matches': 1,
+        'matches': [{'start': 2.0, 'end': 4.0, 'timestamp': '00:02', 'text': 'Never gonna run around and desert you!'}],
+    }
+
+
+async def test_search_results_are_capped(use_extractor, monkeypatch):
+    monkeypatch.setattr(config, 'SEARCH_RESULTS_LIMIT', 2)
+    use_extractor(StubExtractor([caption_track('en')], {'en': TEXTS}))
+    result = await server.search_yt_transcript('dQw4w9WgXcQ', 'gonna', max_results=50)
+    assert result['total_matches'] == 3
+    assert [m['timestamp'] for m in result['matches']] == ['00:00', '00:01']
+    assert (await server.search_yt_transcript('dQw4w9WgXcQ', 'gonna', max_results=0))['error'] == 'max_results must be at least 1'
+
+
+async def test_search_without_transcript(use_extractor):
+    use_extractor(StubExtractor([]))
+    result = await server.search_yt_transcript('dQw4w9WgXcQ', 'gonna')
+    assert result['error'] == 'No transcript available for this video.'
+
+
+async def test_index_built_once_and_persisted(use_extractor, tmp_cache):
+    stub = use_extractor(StubExtractor([caption_track('en')], {'en': TEXTS}))
+    await server.get_yt_transcript_page('dQw4w9WgXcQ')
+    assert tmp_cache.get('search_index', 'dQw4w9WgXcQ', 'en') is not None
+
+    # A fresh process: nothing in memory, everything on disk
+    transcript_api.clear_segment_memo()
+    with patch.object(SearchIndex, 'build', side_effect=AssertionError('re-tokenized')):
+        result = await server.search_yt_transcript('dQw4w9WgXcQ', 'desert')
+        assert (await server.search_yt_transcript('dQw4w9WgXcQ', 'never'))['total_matches'] == 3
+    assert result['matches'][0]['text'] == 'and desert you!'
+    assert len(stub.requests) == 2
+
+
+async def test_missing_index_rebuilt_from_cached_segments(use_extractor, tmp_cache):
+    stub = use_extractor(StubExtractor([caption_track('en')], {'en': TEXTS}))
+    await server.get_yt_transcript_page('dQw4w9WgXcQ')
+    # Expire just the index, e.g. evicted ahead of the segments
+    tmp_cache.set('search_index', 'dQw4w9WgXcQ', None, ttl=-1, language='en')
+    transcript_api.clear_segment_memo()
+    assert (await server.search_yt_transcript('dQw4w9WgXcQ', 'desert'))['total_matches'] == 1
+    assert tmp_cache.get('search_index', 'dQw4w9WgXcQ', 'en')['terms']
+    assert len(stub.requests) == 2
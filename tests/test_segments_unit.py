@@ -0,0 +1,109 @@
+import time
+import pytest
+from src.mcp_youtube_extract import youtube, server
+from src.mcp_youtube_extract.segments import SegmentIndex, SegmentIndexBuilder, format_timestamp
+from tests.stubs import StubExtractor, caption_track
+
+SEGMENTS = [
+    {'text': 'zero', 'start': 0.0, 'duration': 4.0},
+    {'text': 'five', 'start': 5.0, 'duration': 5.0},
+    {'text': 'ten', 'start': 10.0, 'duration': 3.0},
+    {'text': 'twenty', 'start': 20.0, 'duration': 2.0},
+]
+
+
+# Test SegmentIndex
+def test_text_is_space_joined():
+    index = SegmentIndex.from_segments(SEGMENTS)
+    assert index.text == 'zero five ten twenty'
+    assert [index.segment_text(i) for i in range(len(index))] == ['zero', 'five', 'ten', 'twenty']
+    assert index.segment(1) == {'text': 'five', 'start': 5.0, 'duration': 5.0, 'end': 10.0}
+
+
+def test_unsorted_segments_are_sorted():
+    index = SegmentIndex.from_segments(list(reversed(SEGMENTS)))
+    assert index.text == 'zero five ten twenty'
+
+
+def test_string_segments_are_accepted():
+    index = SegmentIndex.from_segments(['Hello', 'world'])
+    assert index.text == 'Hello world'
+
+
+
+def test_builder_indexes_segments_as_they_arrive():
+    builder = SegmentIndexBuilder()
+    for segment in [SEGMENTS[2], SEGMENTS[0], {'start': 1.0}, SEGMENTS[3], SEGMENTS[1]]:
+        builder.add(segment)
+    assert len(builder) == 4
+    index = builder.build()
+    assert index.to_dict() == SegmentIndex.from_segments(SEGMENTS).to_dict()
+
+@pytest.mark.parametrize('start, end, expected', [
+    (None, None, ['zero', 'five', 'ten', 'twenty']),
+    (5.0, 10.0, ['five']),
+    (6.0, 12.0, ['five', 'ten']),    # 'five' is still playing at 6s
+    (4.5, 9.0, ['five']),            # 'zero' ended at 4s
+    (11.0, None, ['ten', 'twenty']),
+    (None, 5.0, ['zero']),
+    (14.0, 19.0, []),
+    (30.0, None, []),
+])
+def test_time_range(start, end, expected):
+    index = SegmentIndex.from_segments(SEGMENTS)
+    indices = index.time_range(start, end)
+    assert [index.segment_text(i) for i in indices] == expected
+    assert index.text_between(indices.start, indices.stop) == ' '.join(expected)
+
+
+def test_round_trip_through_dict():
+    index = SegmentIndex.from_segments(SEGMENTS)
+    restored = SegmentIndex.from_dict(index.to_dict())
+    assert restored.text == index.text
+    assert restored.time_range(6.0, 12.0) == index.time_range(6.0, 12.0)
+
+
+def test_slicing_long_transcript_is_fast():
+    # Ten hours of two-second segments
+    index = SegmentIndex.from_segments(
+        {'text': f'segment {i}', 'start': i * 2.0, 'duration': 2.0} for i in range(18000)
+    )
+    start = time.perf_counter()
+    for _ in range(1000):
+        indices = index.time_range(5 * 3600, 5 * 3600 + 60)
+    assert time.perf_counter() - start < 0.1
+    assert len(indices) == 30
+
+
+@pytest.mark.parametrize('seconds, expected', [(0, '00:00'), (65.9, '01:05'), (3600, '01:00:00'), (36125, '10:02:05')])
+def test_format_timestamp(seconds, expected):
+    assert format_timestamp(seconds) == expected
+
+
+# Test get_transcript_segments and the tool
+def test_get_transcript_segments_uses_cache(use_extractor, tmp_cache):
+    stub = use_extractor(StubExtractor([caption_track('en')], {'en': ['Hello', 'world']}))
+    index = youtube.get_transcript_segments('dQw4w9WgXcQ')
+    assert [index.segment_text(i) for i in range(len(index))] == ['Hello', 'world']
+    # The plain transcript is served from the same cache entry
+    assert youtube.get_video_transcript('dQw4w9WgXcQ') == 'Hello world'
+    assert len(stub.requests) == 2
+
+
+async def test_tool_returns_timestamped_window(use_extractor):
+    use_extractor(StubExtractor([caption_track('en')], {'en': ['a', 'b', 'c', 'd']}))
+    # The stub spaces segments one second apart
+    result = await server.get_yt_transcript_segments('dQw4w9WgXcQ', start=1.0, end=3.0)
+    assert result == '[00:01] b\n[00:02] c'
+
+
+async def test_tool_reports_empty_window(use_extractor):
+    use_extractor(StubExtractor([caption_track('en')], {'en': ['a', 'b']}))
+    result = await server.get_yt_transcript_segments('dQw4w9WgXcQ', start=60.0, end=120.0)
+    assert result == 'No transcript segments between 01:00 and 02:00.'
+
+
+async def test_tool_reports_missing_transcript(use_extractor):
+    use_extractor(StubExtractor([]))
+    result = await server.get_yt_transcript_segments('dQw4w9WgXcQ')
+    assert result == 'No transcript available for this video.'
@@ -0,0 +1,122 @@
+import threading
+import time
+import pytest
+from unittest.mock import patch
+from src.mcp_youtube_extract import youtube
+from src.mcp_youtube_extract.singleflight import SingleFlight
+from tests.stubs import StubExtractor, caption_track
+
+
+def run_concurrently(func, callers):
+    """Start all callers at the same moment and collect their results in order"""
+    barrier = threading.Barrier(callers)
+    results = [None] * callers
+
+    def worker(index):
+        barrier.wait()
+        results[index] = func()
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(callers)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results
+
+
+@pytest.fixture
+def fresh_flight(monkeypatch):
+    """A SingleFlight with zeroed counters in place of the shared one"""
+    flight = SingleFlight()
+    monkeypatch.setattr('src.mcp_youtube_extract.google_api.in_flight', flight)
+    monkeypatch.setattr('src.mcp_youtube_extract.transcript_api.in_flight', flight)
+    return flight
+
+
+# Test SingleFlight
+def test_concurrent_calls_share_one_execution():
+    flight = SingleFlight()
+    calls = []
+
+    def fetch():
+        calls.append(1)
+        time.sleep(0.2)
+        return 'result'
+
+    results = run_concurrently(lambda: flight.do('key', fetch), 8)
+    assert results == ['result'] * 8
+    assert len(calls) == 1
+    assert flight.stats() == {'executions': 1, 'coalesced': 7, 'in_flight': 0}
+
+
+def test_different_keys_run_separately():
+    flight = SingleFlight()
+    assert flight.do('a', lambda: 1) == 1
+    assert flight.do('b', lambda: 2) == 2
+    assert flight.stats()['executions'] == 2
+
+
+def test_sequential_calls_are_not_coalesced():
+    flight = SingleFlight()
+    flight.do('key', lambda: 1)
+    flight.do('key', lambda: 1)
+    assert flight.stats()['executions'] == 2
+    assert flight.stats()['coalesced'] == 0
+
+
+def test_error_is_shared_with_waiters():
+    flight = SingleFlight()
+
+    def fetch():
+        time.sleep(0.2)
+        raise ValueError('upstream down')
+
+    def call():
+        try:
+            flight.do('key', fetch)
+        except ValueError as e:
+            return str(e)
+
+    assert run_concurrently(call, 4) == ['upstream down'] * 4
+    assert flight.stats()['in_flight'] == 0
+
+
+# Test coalescing in front of get_video_transcript / get_video_info
+def test_simultaneous_transcript_requests_make_one_upstream_fetch(use_extractor, fresh_flight):
+    stub = use_extractor(StubExtractor([caption_track('en')], {'en': ['Hello world']}, delay=0.1))
+    results = run_concurrently(lambda: youtube.get_video_transcript('dQw4w9WgXcQ'), 10)
+    assert results == ['Hello world'] * 10
+    # One track list request and one download for all ten callers
+    assert len(stub.requests) == 2
+    assert fresh_flight.stats()['coalesced'] == 9
+
+
+@patch('src.mcp_youtube_extract.google_api.yt_get_video_info')
+def test_simultaneous_info_requests_make_one_upstream_fetch(mock_yt_get_video_info, fresh_flight):
+    def slow_info(video_id):
+        time.sleep(0.2)
+        return {'title': 'Test Title'}
+
+    mock_yt_get_video_info.side_effect = slow_info
+    results = run_concurrently(lambda: youtube.get_video_info('', 'dQw4w9WgXcQ'), 10)
+    assert all(result == {'title': 'Test Title'} for result in results)
+    assert mock_yt_get_video_info.call_count == 1
+    assert fresh_flight.stats()['coalesced'] == 9
+
+
+def test_languages_are_part_of_the_key(use_extractor, fresh_flight):
+    stub = use_extractor(StubExtractor([caption_track('en'), caption_track('fr')], {'en': ['Hello'], 'fr': ['Bonjour']}, delay=0.1))
+    barrier = threading.Barrier(2)
+    results = {}
+
+    def fetch(languages):
+        barrier.wait()
+        results[languages[0]] = youtube.get_video_transcript('dQw4w9WgXcQ', languages=languages)
+
+    threads = [threading.Thread(target=fetch, args=(langs,)) for langs in (['en'], ['fr'])]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert results == {'en': 'Hello', 'fr': 'Bonjour'}
+    assert len(stub.requests) == 4
@@ -0,0 +1,189 @@
+import asyncio
+import threading
+import time
+import pytest
+from src.mcp_youtube_extract import config, pipeline, transcript_api
+from src.mcp_youtube_extract.transcript_xml import iter_segments
+from tests.stubs import StubExtractor, caption_track
+
+TEXTS = [f'line {i}' for i in range(20)]
+
+
+def split(document, size):
+    return [document[i:i + size] for i in range(0, len(document), size)]
+
+
+# Test the incremental parser
+def test_text_format_parsed_across_chunk_boundaries():
+    xml = ('<transcript><text start="1.5" dur="2">Hello &amp;amp; &lt;b&gt;bold&lt;/b&gt;</text>'
+           '<text start="3.5" dur="1">world</text><text start="5" dur="1">  </text></transcript>')
+    segments = list(iter_segments(split(xml.encode(), 7)))
+    assert segments == [
+        {'text': 'Hello & bold', 'start': 1.5, 'duration': 2.0, 'end': 3.5},
+        {'text': 'world', 'start': 3.5, 'duration': 1.0, 'end': 4.5},
+    ]
+
+
+def test_p_format_in_milliseconds():
+    xml = ('<timedtext format="3"><body>'
+           '<p t="1000" d="2500"><s>Hello</s><s> there</s></p>'
+           '<p t="4000">plain</p>'
+           '</body></timedtext>')
+    segments = list(iter_segments(split(xml, 5)))
+    assert segments == [
+        {'text': 'Hello there', 'start': 1.0, 'duration': 2.5, 'end': 3.5},
+        {'text': 'plain', 'start': 4.0, 'duration': 0, 'end': 4.0},
+    ]
+
+
+def test_segments_yielded_before_document_ends():
+    chunks = iter([b'<transcript><text start="0" dur="1">first</text>', b'<text start="1"'])
+    segments = iter_segments(chunks)
+    assert next(segments)['text'] == 'first'
+    with pytest.raises(Exception, match='Failed to parse transcript XML'):
+        next(segments)
+
+
+# Test iter_transcript_segments
+def test_stream_matches_regular_fetch(use_extractor):
+    use_extractor(StubExtractor(tracks=[caption_track('en')], texts={'en': TEXTS}, chunk_size=16))
+    streamed = [segment['text'] for segment in transcript_api.iter_transcript_segments('dQw4w9WgXcQ')]
+    assert streamed == TEXTS
+    assert transcript_api.get_video_transcript('dQw4w9WgXcQ') == ' '.join(TEXTS)
+
+
+def test_completed_stream_is_cached(use_extractor, tmp_cache):
+    stub = use_extractor(StubExtractor(tracks=[caption_track('en')], texts={'en': TEXTS}, chunk_size=16))
+    list(transcript_api.iter_transcript_segments('dQw4w9WgXcQ'))
+    transcript_api.clear_segment_memo()
+
+    replayed = [segment['text'] for segment in transcript_api.iter_transcript_segments('dQw4w9WgXcQ')]
+    assert replayed == TEXTS
+    assert transcript_api.get_video_transcript('dQw4w9WgXcQ') == ' '.join(TEXTS)
+    assert len(stub.requests) == 2
+
+
+def test_abandoned_stream_is_not_cached(use_extractor, tmp_cache):
+    stub = use_extractor(StubExtractor(tracks=[caption_track('en')], texts={'en': TEXTS}, chunk_size=16))
+    segments = transcript_api.iter_transcript_segments('dQw4w9WgXcQ')
+    next(segments)
+    segments.close()
+
+    assert transcript_api.get_video_transcript('dQw4w9WgXcQ') == ' '.join(TEXTS)
+    assert len(stub.requests) == 4
+
+
+# Test stream_transcript
+class ProgressRecorder:
+    def __init__(self):
+        self.reports = []
+
+    async def __call__(self, segments_done, text):
+        self.reports.append((time.perf_counter(), segments_done, text))
+
+
+async def test_first_segments_reported_before_download_finishes(use_extractor):
+    use_extractor(StubExtractor(
+        tracks=[caption_track('en')], texts={'en': TEXTS}, chunk_size=64, chunk_delay=0.02,
+    ))
+    report = ProgressRecorder()
+    start = time.perf_counter()
+    result = await pipeline.stream_transcript('dQw4w9WgXcQ', report)
+    elapsed = time.perf_counter() - start
+
+    assert result == ' '.join(TEXTS)
+    first_at, first_count, first_text = report.reports[0]
+    assert first_text.startswith('[00:00] line 0')
+    assert first_at - start < elapsed / 2
+    assert report.reports[-1][1] == len(TEXTS)
+    assert len(report.reports) > 1
+
+
+async def test_batches_respect_size_limit(use_extractor):
+    use_extractor(StubExtractor(tracks=[caption_track('en')], texts={'en': TEXTS}))
+    report = ProgressRecorder()
+    await pipeline.stream_transcript('dQw4w9WgXcQ', report, batch_chars=40)
+
+    lines = [line for _, _, text in report.reports for line in text.split('\n')]
+    assert lines == [f'[00:{i:02d}] line {i}' for i in range(len(TEXTS))]
+    assert all(len(text) < 40 + 20 for _, _, text in report.reports)
+
+
+async def test_stream_without_transcript(use_extractor):
+    use_extractor(StubExtractor(tracks=[]))
+    report = ProgressRecorder()
+    assert await pipeline.stream_transcript('dQw4w9WgXcQ', report) == 'No transcript available for this video.'
+    assert report.reports == []
+
+
+async def test_stream_error_reported(use_extractor):
+    class BrokenExtractor(StubExtractor):
+        def call_innertube_api(self, video_id, api_key):
+            raise Exception('upstream down')
+
+    use_extractor(BrokenExtractor())
+    result = await pipeline.stream_transcript('dQw4w9WgXcQ', ProgressRecorder())
+    assert result == 'Could not retrieve transcript: upstream down'
+
+
+async def test_stalled_stream_stops_the_producer(use_extractor, monkeypatch):
+    monkeypatch.setattr(config, 'TRANSCRIPT_TIMEOUT', 0.05)
+    use_extractor(StubExtractor(
+        tracks=[caption_track('en')], texts={'en': TEXTS}, chunk_size=64, chunk_delay=0.3,
+    ))
+    result = await pipeline.stream_transcript('dQw4w9WgXcQ', ProgressRecorder())
+    assert result == 'Could not retrieve transcript: timed out after 0.05s'
+    # The producer task does not outlive the call
+    await asyncio.sleep(0)
+    assert asyncio.all_tasks() == {asyncio.current_task()}
+
+
+def counting(monkeypatch):
+    """Count the segments the streaming worker has taken, and note when it finishes"""
+    seen = []
+    finished = threading.Event()
+    real = pipeline.iter_transcript_segments
+
+    def iter_segments_counted(video_id):
+        try:
+            for segment in real(video_id):
+                seen.append(segment)
+                yield segment
+        finally:
+            finished.set()
+
+    monkeypatch.setattr(pipeline, 'iter_transcript_segments', iter_segments_counted)
+    return seen, finished
+
+
+async def test_slow_client_pauses_the_download(use_extractor, monkeypatch):
+    monkeypatch.setattr(config, 'STREAM_QUEUE_SIZE', 2)
+    texts = [f'line {i}' for i in range(200)]
+    use_extractor(StubExtractor(tracks=[caption_track('en')], texts={'en': texts}, chunk_size=64))
+    seen, _ = counting(monkeypatch)
+    taken_while_busy = []
+
+    async def slow_report(segments_done, text):
+        if not taken_while_busy:
+            await asyncio.sleep(0.2)
+            taken_while_busy.append(len(seen))
+
+    result = await pipeline.stream_transcript('dQw4w9WgXcQ', slow_report, batch_chars=1)
+    assert result == ' '.join(texts)
+    # One segment being reported, two queued and one waiting for room
+    assert taken_while_busy[0] <= 4
+
+
+async def test_worker_blocked_on_full_queue_stops_when_client_fails(use_extractor, monkeypatch):
+    monkeypatch.setattr(config, 'STREAM_QUEUE_SIZE', 1)
+    use_extractor(StubExtractor(tracks=[caption_track('en')], texts={'en': TEXTS}, chunk_size=64))
+    seen, finished = counting(monkeypatch)
+
+    async def failing_report(segments_done, text):
+        await asyncio.sleep(0.05)
+        raise Exception('client went away')
+
+    result = await pipeline.stream_transcript('dQw4w9WgXcQ', failing_report, batch_chars=1)
+    assert result == 'Could not retrieve transcript: client went away'
+    assert await asyncio.to_thread(finished.wait, 2)
+    assert len(seen) < len(TEXTS)
@@ -0,0 +1,141 @@
+import zlib
+import pytest
+from unittest.mock import patch
+from src.mcp_youtube_extract import pagination, server, transcript_file, youtube
+from src.mcp_youtube_extract.cache import DiskCache
+from src.mcp_youtube_extract.segments import SegmentIndex
+from src.mcp_youtube_extract.transcript_file import COMPRESSION_NONE, TranscriptFile, encode_transcript, write_transcript
+from tests.stubs import StubExtractor, caption_track
+
+
+def make_index(texts):
+    return SegmentIndex.from_segments(
+        {'text': text, 'start': round(1.5 * i, 3), 'duration': 1.25} for i, text in enumerate(texts)
+    )
+
+
+LECTURE = make_index([f'line {i} of the lecture' for i in range(50)])
+
+
+# Test encoding round trips
+@pytest.mark.parametrize('texts', [
+    [f'line {i}' for i in range(50)],
+    ['café au lait', 'naïve', '日本語の字幕', 'plain'] * 10,
+    ['only one'],
+    [],
+])
+@pytest.mark.parametrize('compression', [transcript_file.COMPRESSION_ZLIB, COMPRESSION_NONE])
+def test_round_trip(texts, compression):
+    index = make_index(texts)
+    decoded = TranscriptFile(encode_transcript(index, block_segments=8, compression=compression))
+    assert decoded.to_index().to_dict() == index.to_dict()
+    assert [decoded.segment(i) for i in range(len(decoded))] == [index.segment(i) for i in range(len(index))]
+
+
+def test_times_are_kept_to_the_millisecond():
+    index = SegmentIndex.from_segments([{'text': 'a', 'start': 12.345, 'duration': 0.1234}])
+    assert TranscriptFile(encode_transcript(index)).segment(0) == {
+        'text': 'a', 'start': 12.345, 'duration': 0.123, 'end': 12.345 + 0.123,
+    }
+
+
+def test_smaller_than_json():
+    import json
+    index = make_index([f'segment {i} repeats the same few words' for i in range(2000)])
+    assert len(encode_transcript(index)) < len(json.dumps(index.to_dict())) / 2
+
+
+# Test random access
+def test_one_segment_decompresses_one_block():
+    data = encode_transcript(LECTURE, block_segments=8)
+    with patch.object(transcript_file.zlib, 'decompress', wraps=zlib.decompress) as decompress:
+        decoded = TranscriptFile(data)
+        assert decoded.segment_text(42) == 'line 42 of the lecture'
+        assert decoded.segment_text(41) == 'line 41 of the lecture'
+        assert decompress.call_count == 1
+        assert decoded.segment_text(3) == 'line 3 of the lecture'
+        assert decompress.call_count == 2
+    with pytest.raises(IndexError):
+        decoded.segment_text(50)
+
+
+@pytest.mark.parametrize('start, end', [(None, None), (0.0, 3.0), (2.0, 10.0), (60.0, None), (200.0, 300.0)])
+def test_time_range_matches_segment_index(start, end):
+    assert TranscriptFile(encode_transcript(LECTURE)).time_range(start, end) == LECTURE.time_range(start, end)
+
+
+@pytest.mark.parametrize('texts', [[f'line {i} of the lecture' for i in range(50)], ['café', 'naïve', '日本語'] * 20])
+def test_reading_parts_matches_segment_index(texts):
+    index = make_index(texts)
+    decoded = TranscriptFile(encode_transcript(index, block_segments=8))
+    for lo, hi in [(0, 0), (0, 1), (5, 17), (7, 8), (40, len(texts))]:
+        assert decoded.text_between(lo, hi) == index.text_between(lo, hi)
+    window = index.time_range(10.0, 30.0)
+    assert list(decoded.iter_timestamped(window)) == list(index.iter_timestamped(window))
+    # Offsets count bytes, so non-ASCII chunks may only end earlier
+    for lo in range(0, len(texts), 7):
+        assert lo < decoded.chunk_end(lo, 30) <= index.chunk_end(lo, 30)
+        assert len(decoded.text_between(lo, decoded.chunk_end(lo, 30))) <= max(30, len(index.segment_text(lo)))
+
+
+def test_memory_mapped_file(tmp_path):
+    write_transcript(tmp_path / 'lecture.yttr', LECTURE)
+    mapped = TranscriptFile.open(tmp_path / 'lecture.yttr')
+    assert len(mapped) == 50
+    assert mapped.segment(10)['text'] == 'line 10 of the lecture'
+    assert mapped.to_index().text == LECTURE.text
+
+
+@pytest.mark.parametrize('data', [b'', b'JSON' + bytes(40), encode_transcript(LECTURE)[:-10]])
+def test_invalid_data(data):
+    with pytest.raises(ValueError):
+        TranscriptFile(data)
+
+
+# Test the transcript cache
+def test_transcripts_are_cached_in_the_container_format(use_extractor, tmp_cache):
+    use_extractor(StubExtractor([caption_track('en')], {'en': ['Hello world', 'second line']}))
+    youtube.get_video_transcript('dQw4w9WgXcQ')
+    cached = tmp_cache.get('segments', 'dQw4w9WgXcQ', 'en')
+    assert isinstance(cached, bytes)
+    assert TranscriptFile(cached).to_index().text == 'Hello world second line'
+
+
+async def test_pages_and_windows_decompress_only_their_blocks(tmp_cache):
+    # 2000 segments in blocks of 256; segments 1000-1019 are in block 3
+    index = make_index([f'segment {i} of a long livestream' for i in range(2000)])
+    tmp_cache.set('segments', 'dQw4w9WgXcQ', encode_transcript(index), ttl=60, language='en')
+    with patch.object(transcript_file.zlib, 'decompress', wraps=zlib.decompress) as decompress:
+        cursor = pagination.encode_cursor('dQw4w9WgXcQ', 'en', 1000)
+        page = await server.get_yt_transcript_page('dQw4w9WgXcQ', cursor=cursor, chunk_size=200)
+        assert page['text'].startswith('segment 1000 of') and page['start'] == 1500.0
+        assert decompress.call_count == 1
+        window = await server.get_yt_transcript_segments('dQw4w9WgXcQ', start=1500, end=1530)
+        assert window == '\n'.join(index.iter_timestamped(range(1000, 1020)))
+        assert decompress.call_count == 2
+
+
+
+async def test_pages_read_only_their_blocks_from_the_cache(tmp_cache):
+    index = make_index([f'segment {i} of a long livestream' for i in range(2000)])
+    encoded = encode_transcript(index)
+    tmp_cache.set('segments', 'dQw4w9WgXcQ', encoded, ttl=60, language='en')
+    with patch.object(DiskCache, '_read_blob', autospec=True, side_effect=DiskCache._read_blob) as read_blob:
+        cursor = pagination.encode_cursor('dQw4w9WgXcQ', 'en', 1000)
+        page = await server.get_yt_transcript_page('dQw4w9WgXcQ', cursor=cursor, chunk_size=200)
+    assert page['text'].startswith('segment 1000 of')
+    # The header and arrays, then block 3 of the compressed text and none of the others
+    blocks = TranscriptFile(encoded)._blocks
+    assert [call.args[-1] for call in read_blob.call_args_list[2:]] == [blocks[4] - blocks[3]]
+    total = sum(call.args[-1] for call in read_blob.call_args_list)
+    assert total == len(encoded) - blocks[-1] + blocks[4] - blocks[3]
+
+def test_cached_replay_decompresses_as_it_goes(tmp_cache):
+    index = make_index([f'segment {i} of a long livestream' for i in range(2000)])
+    tmp_cache.set('segments', 'dQw4w9WgXcQ', encode_transcript(index), ttl=60, language='en')
+    with patch.object(transcript_file.zlib, 'decompress', wraps=zlib.decompress) as decompress:
+        segments = youtube.iter_transcript_segments('dQw4w9WgXcQ')
+        assert next(segments) == index.segment(0)
+        assert decompress.call_count == 1
+        assert [segment['text'] for segment in segments] == [index.segment_text(i) for i in range(1, 2000)]
+        assert decompress.call_count == 8
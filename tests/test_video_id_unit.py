@@ -0,0 +1,124 @@
+import pytest
+from unittest.mock import patch
+from src.mcp_youtube_extract import pipeline, server, transcript_api
+from src.mcp_youtube_extract.video_id import InvalidVideoIdError, is_video_id, normalize_video_id
+from tests.stubs import StubExtractor, caption_track
+
+VIDEO_ID = 'dQw4w9WgXcQ'
+
+
+# Test normalization
+@pytest.mark.parametrize('value', [
+    'dQw4w9WgXcQ',
+    '  dQw4w9WgXcQ\n',
+    'dQw4w9WgXcQ&t=30s',
+    'dQw4w9WgXcQ?si=AbCdEf',
+    'dQw4w9WgXcQ#t=42',
+    'https://www.youtube.com/watch?v=dQw4w9WgXcQ',
+    'http://www.youtube.com/watch?v=dQw4w9WgXcQ',
+    'https://youtube.com/watch?v=dQw4w9WgXcQ&list=PLx&index=2',
+    'https://www.youtube.com/watch?feature=share&v=dQw4w9WgXcQ',
+    'https://www.youtube.com/watch?v=dQw4w9WgXcQ#t=1m',
+    'www.youtube.com/watch?v=dQw4w9WgXcQ',
+    'youtube.com/watch?v=dQw4w9WgXcQ',
+    'https://m.youtube.com/watch?v=dQw4w9WgXcQ&app=m',
+    'https://music.youtube.com/watch?v=dQw4w9WgXcQ',
+    'HTTPS://WWW.YOUTUBE.COM/watch?v=dQw4w9WgXcQ',
+    'https://youtu.be/dQw4w9WgXcQ',
+    'https://youtu.be/dQw4w9WgXcQ?si=AbCdEf&t=30',
+    'youtu.be/dQw4w9WgXcQ',
+    '//youtu.be/dQw4w9WgXcQ',
+    'https://www.youtube.com/shorts/dQw4w9WgXcQ',
+    'https://youtube.com/shorts/dQw4w9WgXcQ?feature=share',
+    'https://www.youtube.com/live/dQw4w9WgXcQ?si=x',
+    'https://www.youtube.com/embed/dQw4w9WgXcQ?start=10',
+    'https://www.youtube-nocookie.com/embed/dQw4w9WgXcQ',
+    'https://www.youtube.com/v/dQw4w9WgXcQ',
+    'https://www.youtube.com/e/dQw4w9WgXcQ',
+])
+def test_aliases_normalize_to_the_video_id(value):
+    assert normalize_video_id(value) == VIDEO_ID
+
+
+@pytest.mark.parametrize('value', ['a-b_c-D_e-F', '-__________', '01234567890'])
+def test_dashes_underscores_and_digits_are_valid(value):
+    assert normalize_video_id(value) == value
+
+
+@pytest.mark.parametrize('value', [
+    '',
+    '   ',
+    'vid',
+    'dQw4w9WgXc',
+    'dQw4w9WgXcQQ',
+    'dQw4w9WgX!Q',
+    'dQw4w9 gXcQ',
+    'dQw4w9WgXcQQ&t=30',
+    'https://www.youtube.com/',
+    'https://www.youtube.com/watch',
+    'https://www.youtube.com/watch?v=',
+    'https://www.youtube.com/watch?v=dQw4w9WgXc',
+    'https://www.youtube.com/watch?list=PLx',
+    'https://www.youtube.com/playlist?list=PLx',
+    'https://www.youtube.com/@somechannel',
+    'https://www.youtube.com/channel/UCxxxxxxxxxxxxxxxxxxxxxx',
+    'https://www.youtube.com/shorts/',
+    'https://youtu.be/',
+    'https://vimeo.com/watch?v=dQw4w9WgXcQ',
+    'https://youtube.com.example.org/watch?v=dQw4w9WgXcQ',
+    'http://[::1',
+    None,
+    12345678901,
+])
+def test_invalid_input_is_rejected(value):
+    with pytest.raises(InvalidVideoIdError):
+        normalize_video_id(value)
+
+
+def test_error_is_a_value_error_and_bounded():
+    with pytest.raises(ValueError, match=r"'x{100}\.\.\.'"):
+        normalize_video_id('x' * 500)
+    assert is_video_id(VIDEO_ID) and not is_video_id(' ' + VIDEO_ID)
+
+
+# Test the tools
+@pytest.mark.parametrize('tool, error', [
+    ('get_yt_video_info', lambda result: result.startswith('Error: Not a YouTube video')),
+    ('get_yt_video_metadata', lambda result: result.startswith('Error: Not a YouTube video')),
+    ('get_yt_transcript', lambda result: result.startswith('Error: Not a YouTube video')),
+    ('get_yt_transcript_segments', lambda result: result.startswith('Error: Not a YouTube video')),
+    ('get_yt_transcript_page', lambda result: result['error'].startswith('Not a YouTube video')),
+    ('get_yt_transcripts', lambda result: result['error'].startswith('Not a YouTube video')),
+])
+async def test_tools_reject_invalid_ids_without_requests(tool, error, use_extractor):
+    stub = use_extractor(StubExtractor([caption_track('en')], {'en': ['Hello']}))
+    args = (['en'],) if tool == 'get_yt_transcripts' else ()
+    with patch.object(pipeline, 'get_video_info') as info:
+        assert error(await getattr(server, tool)('https://www.youtube.com/watch?v=nope', *args))
+    info.assert_not_called()
+    assert stub.requests == []
+
+
+async def test_search_tool_rejects_invalid_ids():
+    result = await server.search_yt_transcript('nope', 'hello')
+    assert result['video_id'] == 'nope'
+    assert result['error'].startswith('Not a YouTube video')
+
+
+async def test_aliases_share_one_cache_entry(use_extractor, tmp_cache):
+    stub = use_extractor(StubExtractor([caption_track('en')], {'en': ['Hello', 'world']}))
+    for alias in ('https://youtu.be/dQw4w9WgXcQ?si=x', 'https://www.youtube.com/shorts/dQw4w9WgXcQ', VIDEO_ID):
+        assert (await server.get_yt_transcript(alias)) == '=== TRANSCRIPT ===\nHello world'
+        transcript_api.clear_segment_memo()
+    assert len(stub.requests) == 2
+    assert tmp_cache.contains('segments', VIDEO_ID, 'en')
+
+
+async def test_batch_normalizes_and_reports_invalid_entries():
+    with patch.object(pipeline, 'get_video_info', return_value={'title': 'T'}) as info, \
+         patch.object(pipeline, 'get_video_transcript', return_value='Hello'):
+        results = await pipeline.collect_videos_info('', [VIDEO_ID, 'bad', f'https://youtu.be/{VIDEO_ID}'])
+    assert [r['video_id'] for r in results] == [VIDEO_ID, 'bad', VIDEO_ID]
+    assert results[0] is results[2]
+    assert results[1]['error'].startswith('Not a YouTube video')
+    assert info.call_count == 1
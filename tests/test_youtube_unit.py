@@ -1,6 +1,7 @@
 import pytest
 from unittest.mock import patch, MagicMock
-from src.mcp_youtube_extract import youtube
+from src.mcp_youtube_extract import youtube, transcript_api, extractor_pool
+from tests.stubs import StubExtractor, caption_track
 
 # Test get_video_info
 @patch('src.mcp_youtube_extract.google_api.yt_get_video_info')
@@ -12,71 +13,76 @@ def test_get_video_info_success(mock_yt_get_video_info):
         'description': 'Test Description',
         'views': 1000000
     }
-    result = youtube.get_video_info('fake_api_key', 'fake_video_id')
+    result = youtube.get_video_info('fake_api_key', 'dQw4w9WgXcQ')
     assert result['title'] == 'Test Title'
 
 @patch('src.mcp_youtube_extract.google_api.yt_get_video_info')
 def test_get_video_info_not_found(mock_yt_get_video_info):
     mock_yt_get_video_info.return_value = None
-    result = youtube.get_video_info('fake_api_key', 'fake_video_id')
+    result = youtube.get_video_info('fake_api_key', 'dQw4w9WgXcQ')
     assert result is None
 
 @patch('src.mcp_youtube_extract.google_api.yt_get_video_info', side_effect=Exception('API error'))
 def test_get_video_info_error(mock_yt_get_video_info):
-    result = youtube.get_video_info('fake_api_key', 'fake_video_id')
+    result = youtube.get_video_info('fake_api_key', 'dQw4w9WgXcQ')
     assert result is None
 
-# Test get_video_transcript - Updated for yt-ts-extract
-@patch('src.mcp_youtube_extract.transcript_api.get_transcript')
-@patch('src.mcp_youtube_extract.transcript_api.get_transcript_text')
-@patch('src.mcp_youtube_extract.transcript_api.get_available_languages')
-@patch('src.mcp_youtube_extract.transcript_api.YouTubeTranscriptExtractor')
-def test_get_video_transcript_success(mock_extractor_class, mock_get_langs, mock_get_text, mock_get_transcript):
-    # Mock the extractor instance
-    mock_extractor = MagicMock()
-    mock_extractor_class.return_value = mock_extractor
-    
-    # Mock available languages
-    mock_get_langs.return_value = [{'code': 'en'}]
-    
-    # Mock transcript segments
-    mock_transcript = [{'text': 'Hello world'}]
-    mock_extractor.get_transcript.return_value = mock_transcript
-    
-    result = youtube.get_video_transcript('fake_video_id')
-    assert 'Hello world' in result
-
-@patch('src.mcp_youtube_extract.transcript_api.get_transcript')
-@patch('src.mcp_youtube_extract.transcript_api.get_transcript_text')
-@patch('src.mcp_youtube_extract.transcript_api.get_available_languages')
-@patch('src.mcp_youtube_extract.transcript_api.YouTubeTranscriptExtractor')
-def test_get_video_transcript_no_transcript(mock_extractor_class, mock_get_langs, mock_get_text, mock_get_transcript):
-    # Mock the extractor instance
-    mock_extractor = MagicMock()
-    mock_extractor_class.return_value = mock_extractor
-    
-    # Mock available languages
-    mock_get_langs.return_value = []
-    
-    # Mock all transcript methods to return None/empty
-    mock_extractor.get_transcript.return_value = None
-    mock_get_transcript.return_value = None
-    mock_get_text.return_value = None
-    
-    result = youtube.get_video_transcript('fake_video_id')
+# Test get_video_transcript - planned single-track fetch via yt-ts-extract
+def test_get_video_transcript_success(use_extractor):
+    stub = StubExtractor([caption_track('en')], {'en': ['Hello', 'world']})
+    use_extractor(stub)
+
+    result = youtube.get_video_transcript('dQw4w9WgXcQ')
+    assert result == 'Hello world'
+    assert len(stub.requests) == 2
+
+def test_get_video_transcript_no_transcript(use_extractor):
+    stub = StubExtractor([])
+    use_extractor(stub)
+
+    result = youtube.get_video_transcript('dQw4w9WgXcQ')
     assert result is None
+    # A miss costs only the track list request
+    assert stub.requests == [('player', 'dQw4w9WgXcQ')]
+
+def test_get_video_transcript_language_miss_uses_first_available(use_extractor):
+    stub = StubExtractor([caption_track('de'), caption_track('fr')], {'de': ['Hallo'], 'fr': ['Bonjour']})
+    use_extractor(stub)
 
-@patch('src.mcp_youtube_extract.transcript_api.get_transcript')
-@patch('src.mcp_youtube_extract.transcript_api.get_transcript_text')
-@patch('src.mcp_youtube_extract.transcript_api.get_available_languages')
-@patch('src.mcp_youtube_extract.transcript_api.YouTubeTranscriptExtractor')
-def test_get_video_transcript_error(mock_extractor_class, mock_get_langs, mock_get_text, mock_get_transcript):
-    # Mock the extractor class to raise an exception
-    mock_extractor_class.side_effect = Exception('API error')
+    result = youtube.get_video_transcript('dQw4w9WgXcQ', languages=['en'])
+    assert result == 'Hallo'
+    assert len(stub.requests) == 2
+
+def test_get_video_transcript_error():
+    # Mock the extractor factory to raise an exception
+    extractor_pool.set_extractor_pool(extractor_pool.ExtractorPool(1, MagicMock(side_effect=Exception('API error'))))
     
-    result = youtube.get_video_transcript('fake_video_id')
+    result = youtube.get_video_transcript('dQw4w9WgXcQ')
     assert 'Could not retrieve transcript' in result
 
+def test_get_video_transcript_upstream_failure(use_extractor):
+    stub = StubExtractor([caption_track('en')])
+    stub.fetch_transcript_xml = MagicMock(side_effect=Exception('Failed to fetch transcript XML: 500'))
+    use_extractor(stub)
+
+    result = youtube.get_video_transcript('dQw4w9WgXcQ')
+    assert result == 'Could not retrieve transcript: Failed to fetch transcript XML: 500'
+
+# Test caption track selection
+@pytest.mark.parametrize('tracks, languages, expected', [
+    ([caption_track('en'), caption_track('en', auto_generated=True)], ['en'], ('en', True)),
+    ([caption_track('fr', auto_generated=True), caption_track('en')], ['en'], ('en', False)),
+    ([caption_track('fr'), caption_track('es')], ['es', 'fr'], ('es', False)),
+    ([caption_track('fr'), caption_track('es', auto_generated=True)], ['es', 'fr'], ('es', True)),
+    ([caption_track('de'), caption_track('ja')], ['en'], ('de', False)),
+])
+def test_select_caption_track(tracks, languages, expected):
+    track = transcript_api.select_caption_track(tracks, languages)
+    assert (track['languageCode'], track.get('kind') == 'asr') == expected
+
+def test_select_caption_track_none():
+    assert transcript_api.select_caption_track([], ['en']) is None
+
 # Test format_video_info
 def test_format_video_info_success():
     video_info = {